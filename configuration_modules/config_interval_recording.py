@@ -20,6 +20,9 @@ from operations_modules import logger
 from operations_modules import file_locations
 from operations_modules.app_generic_functions import CreateGeneralConfiguration
 
+# Queued recordings are held in memory until written, so the write delay is kept to at most this
+database_write_delay_max_seconds = 300.0
+
 
 class CreateIntervalRecordingConfiguration(CreateGeneralConfiguration):
     """ Creates the Interval Recording Configuration object and loads settings from file (by default). """
@@ -27,12 +30,15 @@ class CreateIntervalRecordingConfiguration(CreateGeneralConfiguration):
     def __init__(self, load_from_file=True):
         CreateGeneralConfiguration.__init__(self, file_locations.interval_config, load_from_file=load_from_file)
         self.config_file_header = "Enable = 1 and Disable = 0"
-        self.valid_setting_count = 17
+        self.valid_setting_count = 22
         self.config_settings_names = [
             "Enable interval recording", "Recording interval in seconds * Caution *", "Enable sensor uptime",
             "Enable CPU temperature", "Enable environmental temperature", "Enable pressure", "Enable humidity",
             "Enable altitude", "Enable distance", "Enable lumen", "Enable color", "Enable ultra violet", "Enable GAS",
-            "Enable particulate matter", "Enable accelerometer", "Enable magnetometer", "Enable gyroscope"
+            "Enable particulate matter", "Enable accelerometer", "Enable magnetometer", "Enable gyroscope",
+            "Max seconds recordings wait before being saved to the database",
+            "Enable recording to a new database partition file every X months", "Months per database partition",
+            "Months of database partitions to keep, 0 keeps all", "Compress old database partitions instead of deleting"
         ]
 
         self.enable_interval_recording = 1
@@ -55,6 +61,15 @@ class CreateIntervalRecordingConfiguration(CreateGeneralConfiguration):
         self.magnetometer_enabled = 1
         self.gyroscope_enabled = 1
 
+        # Queued Interval & Trigger recordings are written to the database together at least this often
+        self.database_write_delay_seconds = 2.0
+
+        # Interval & Trigger recordings go into a new database file every X months, instead of the main database
+        self.enable_database_partitions = 0
+        self.database_partition_months = 1
+        self.database_partition_keep_months = 0
+        self.database_partition_archive = 1
+
         self.update_configuration_settings_list()
         if load_from_file:
             self._init_config_variables()
@@ -84,12 +99,25 @@ class CreateIntervalRecordingConfiguration(CreateGeneralConfiguration):
         self.accelerometer_enabled = 0
         self.magnetometer_enabled = 0
         self.gyroscope_enabled = 0
+        self.enable_database_partitions = 0
+        self.database_partition_archive = 0
 
         if html_request.form.get("enable_interval_recording") is not None:
             self.enable_interval_recording = 1
         if html_request.form.get("interval_delay_seconds") is not None:
             new_sleep_duration = float(html_request.form.get("interval_delay_seconds"))
             self.sleep_duration_interval = new_sleep_duration
+        if html_request.form.get("database_write_delay_seconds") is not None:
+            self.database_write_delay_seconds = float(html_request.form.get("database_write_delay_seconds"))
+            self._check_database_write_delay()
+        if html_request.form.get("enable_database_partitions") is not None:
+            self.enable_database_partitions = 1
+        if html_request.form.get("database_partition_months") is not None:
+            self.database_partition_months = int(html_request.form.get("database_partition_months"))
+        if html_request.form.get("database_partition_keep_months") is not None:
+            self.database_partition_keep_months = int(html_request.form.get("database_partition_keep_months"))
+        if html_request.form.get("database_partition_archive") is not None:
+            self.database_partition_archive = 1
 
         if html_request.form.get("checkbox_sensor_uptime") is not None:
             self.sensor_uptime_enabled = 1
@@ -132,7 +160,9 @@ class CreateIntervalRecordingConfiguration(CreateGeneralConfiguration):
             str(self.humidity_enabled), str(self.altitude_enabled), str(self.distance_enabled), str(self.lumen_enabled),
             str(self.colour_enabled), str(self.ultra_violet_enabled), str(self.gas_enabled),
             str(self.particulate_matter_enabled), str(self.accelerometer_enabled), str(self.magnetometer_enabled),
-            str(self.gyroscope_enabled)
+            str(self.gyroscope_enabled), str(self.database_write_delay_seconds), str(self.enable_database_partitions),
+            str(self.database_partition_months), str(self.database_partition_keep_months),
+            str(self.database_partition_archive)
         ]
 
     def _update_variables_from_settings_list(self):
@@ -154,6 +184,12 @@ class CreateIntervalRecordingConfiguration(CreateGeneralConfiguration):
             self.accelerometer_enabled = int(self.config_settings[14])
             self.magnetometer_enabled = int(self.config_settings[15])
             self.gyroscope_enabled = int(self.config_settings[16])
+            self.database_write_delay_seconds = float(self.config_settings[17])
+            self._check_database_write_delay()
+            self.enable_database_partitions = int(self.config_settings[18])
+            self.database_partition_months = int(self.config_settings[19])
+            self.database_partition_keep_months = int(self.config_settings[20])
+            self.database_partition_archive = int(self.config_settings[21])
         except Exception as error:
             if self.load_from_file:
                 logger.primary_logger.debug("Interval Config: " + str(error))
@@ -161,3 +197,9 @@ class CreateIntervalRecordingConfiguration(CreateGeneralConfiguration):
             if self.load_from_file:
                 logger.primary_logger.info("Saving Interval Recording Configuration.")
                 self.save_config_to_file()
+
+    def _check_database_write_delay(self):
+        if not 0 <= self.database_write_delay_seconds <= database_write_delay_max_seconds:
+            log_msg = "Interval Config - Invalid Database Write Delay: "
+            logger.primary_logger.warning(log_msg + str(self.database_write_delay_seconds) + ", using 2.0")
+            self.database_write_delay_seconds = 2.0
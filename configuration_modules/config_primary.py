@@ -28,12 +28,14 @@ class CreatePrimaryConfiguration(CreateGeneralConfiguration):
     def __init__(self, load_from_file=True):
         CreateGeneralConfiguration.__init__(self, file_locations.primary_config, load_from_file=load_from_file)
         self.config_file_header = "Enable = 1 and Disable = 0"
-        self.valid_setting_count = 10
+        self.valid_setting_count = 13
         self.config_settings_names = [
             "HTTPS port number (Default is 10065)", "Enable debug logging", "Enable temperature offset",
             "Temperature offset", "Enable temperature compensation factor", "Temperature compensation factor",
             "Enable sensor check-ins", "Checkin URL", "Checkin every hours",
-            "DateTime offset in hours (Program uses UTC 0)"
+            "DateTime offset in hours (Program uses UTC 0)",
+            "Max seconds sensor readings are reused, 0 uses twice the sensor's sampling rate",
+            "Max seconds particulate matter readings are reused", "Max seconds CPU temperature readings are reused"
         ]
 
         self.enable_checkin = 1
@@ -49,6 +51,11 @@ class CreatePrimaryConfiguration(CreateGeneralConfiguration):
         self.enable_temperature_comp_factor = 0
         self.temperature_comp_factor = 0.0
 
+        # Stored sensor readings are returned until this old, then the sensor is read again
+        self.sensor_reading_max_age_seconds = 0.0
+        self.particulate_matter_max_age_seconds = 20.0
+        self.cpu_temperature_max_age_seconds = 5.0
+
         self.flask_http_ip = ""
         self.web_portal_port = 10065
 
@@ -100,6 +107,13 @@ class CreatePrimaryConfiguration(CreateGeneralConfiguration):
             self.checkin_url = str(html_request.form.get("checkin_address")).strip()
             if ":" not in self.checkin_url:
                 self.checkin_url = self.checkin_url + ":10065"
+
+        if html_request.form.get("sensor_reading_max_age") is not None:
+            self.sensor_reading_max_age_seconds = float(html_request.form.get("sensor_reading_max_age"))
+        if html_request.form.get("particulate_matter_max_age") is not None:
+            self.particulate_matter_max_age_seconds = float(html_request.form.get("particulate_matter_max_age"))
+        if html_request.form.get("cpu_temperature_max_age") is not None:
+            self.cpu_temperature_max_age_seconds = float(html_request.form.get("cpu_temperature_max_age"))
         self.update_configuration_settings_list()
 
     def update_configuration_settings_list(self):
@@ -108,7 +122,9 @@ class CreatePrimaryConfiguration(CreateGeneralConfiguration):
         self.config_settings = [
             str(self.web_portal_port), str(self.enable_debug_logging), str(self.enable_custom_temp),
             str(self.temperature_offset), str(self.enable_temperature_comp_factor), str(self.temperature_comp_factor),
-            str(self.enable_checkin), str(self.checkin_url), str(self.checkin_wait_in_hours), str(self.utc0_hour_offset)
+            str(self.enable_checkin), str(self.checkin_url), str(self.checkin_wait_in_hours), str(self.utc0_hour_offset),
+            str(self.sensor_reading_max_age_seconds), str(self.particulate_matter_max_age_seconds),
+            str(self.cpu_temperature_max_age_seconds)
         ]
 
     def _update_variables_from_settings_list(self):
@@ -123,6 +139,9 @@ class CreatePrimaryConfiguration(CreateGeneralConfiguration):
             self.checkin_url = self.config_settings[7].strip()
             self.checkin_wait_in_hours = float(self.config_settings[8].strip())
             self.utc0_hour_offset = float(self.config_settings[9].strip())
+            self.sensor_reading_max_age_seconds = float(self.config_settings[10].strip())
+            self.particulate_matter_max_age_seconds = float(self.config_settings[11].strip())
+            self.cpu_temperature_max_age_seconds = float(self.config_settings[12].strip())
         except Exception as error:
             if self.load_from_file:
                 logger.primary_logger.debug("Primary Config: " + str(error))
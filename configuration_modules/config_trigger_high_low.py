@@ -20,6 +20,11 @@ from operations_modules import logger
 from operations_modules import file_locations
 from operations_modules.app_generic_functions import CreateGeneralConfiguration
 
+# Largest hysteresis allowed, as a percent of a trigger's Low to High range
+hysteresis_max_percent = 50.0
+# Most samples a new state can be required to be seen in a row before it's recorded
+debounce_max_samples = 100
+
 
 class CreateTriggerHighLowConfiguration(CreateGeneralConfiguration):
     """ Creates the Trigger High/Low Configuration object and loads settings from file (by default). """
@@ -59,7 +64,9 @@ class CreateTriggerHighLowConfiguration(CreateGeneralConfiguration):
             "Magnetometer Z High Trigger", "Seconds between Magnetometer readings", "Enable Gyroscope",
             "Gyroscope X Low Trigger", "Gyroscope X High Trigger", "Gyroscope Y Low Trigger",
             "Gyroscope Y High Trigger", "Gyroscope Z Low Trigger", "Gyroscope Z High Trigger",
-            "Seconds between Gyroscope readings"
+            "Seconds between Gyroscope readings",
+            "Percent of the Low to High range a reading must come back inside a trigger to return to Normal",
+            "Samples in a row a new High/Low state must be seen before it's recorded"
         ]
         self.valid_setting_count = len(self.config_settings_names)
 
@@ -161,6 +168,10 @@ class CreateTriggerHighLowConfiguration(CreateGeneralConfiguration):
         self.gyroscope_z_high = 70.0
         self.gyroscope_wait_seconds = 0.3
 
+        # Stops readings sitting on a trigger from flapping between states & writing a row every sample
+        self.hysteresis_percent = 2.0
+        self.debounce_samples = 2
+
         self.update_configuration_settings_list()
         if load_from_file:
             self._init_config_variables()
@@ -377,6 +388,13 @@ class CreateTriggerHighLowConfiguration(CreateGeneralConfiguration):
             self.gyroscope_z_high = float(html_request.form.get("trigger_high_gyroscope_z"))
         if html_request.form.get("seconds_gyroscope") is not None:
             self.gyroscope_wait_seconds = float(html_request.form.get("seconds_gyroscope"))
+
+        if html_request.form.get("hysteresis_percent") is not None:
+            self.hysteresis_percent = float(html_request.form.get("hysteresis_percent"))
+            self._check_hysteresis_percent()
+        if html_request.form.get("debounce_samples") is not None:
+            self.debounce_samples = int(html_request.form.get("debounce_samples"))
+            self._check_debounce_samples()
         self.update_configuration_settings_list()
 
     def update_configuration_settings_list(self):
@@ -414,7 +432,7 @@ class CreateTriggerHighLowConfiguration(CreateGeneralConfiguration):
             str(self.magnetometer_z_high), str(self.magnetometer_wait_seconds), str(self.gyroscope_enabled),
             str(self.gyroscope_x_low), str(self.gyroscope_x_high), str(self.gyroscope_y_low),
             str(self.gyroscope_y_high), str(self.gyroscope_z_low), str(self.gyroscope_z_high),
-            str(self.gyroscope_wait_seconds)
+            str(self.gyroscope_wait_seconds), str(self.hysteresis_percent), str(self.debounce_samples)
         ]
 
     def _update_variables_from_settings_list(self):
@@ -514,6 +532,10 @@ class CreateTriggerHighLowConfiguration(CreateGeneralConfiguration):
             self.gyroscope_z_low = float(self.config_settings[92])
             self.gyroscope_z_high = float(self.config_settings[93])
             self.gyroscope_wait_seconds = float(self.config_settings[94])
+            self.hysteresis_percent = float(self.config_settings[95])
+            self._check_hysteresis_percent()
+            self.debounce_samples = int(self.config_settings[96])
+            self._check_debounce_samples()
         except Exception as error:
             logger.primary_logger.debug("Trigger High/Low Config: " + str(error))
             self.update_configuration_settings_list()
@@ -521,6 +543,18 @@ class CreateTriggerHighLowConfiguration(CreateGeneralConfiguration):
                 logger.primary_logger.info("Saving Trigger High/Low Configuration.")
                 self.save_config_to_file()
 
+    def _check_hysteresis_percent(self):
+        if not 0 <= self.hysteresis_percent <= hysteresis_max_percent:
+            log_msg = "Trigger High/Low Config - Invalid Hysteresis Percent: "
+            logger.primary_logger.warning(log_msg + str(self.hysteresis_percent) + ", using 2.0")
+            self.hysteresis_percent = 2.0
+
+    def _check_debounce_samples(self):
+        if not 1 <= self.debounce_samples <= debounce_max_samples:
+            log_msg = "Trigger High/Low Config - Invalid Debounce Samples: "
+            logger.primary_logger.warning(log_msg + str(self.debounce_samples) + ", using 2")
+            self.debounce_samples = 2
+
     def _disable_all_triggers(self):
         self.enable_high_low_trigger_recording = 0
         self.cpu_temperature_enabled = 0
@@ -24,7 +24,7 @@ from operations_modules import file_locations
 from operations_modules import app_cached_variables
 from configuration_modules import app_config_access
 from http_server.server_http_generic_functions import get_html_hidden_state, get_html_checkbox_state
-from http_server import server_plotly_graph
+from http_server import server_plotly_graph_jobs
 
 html_graphing_routes = Blueprint("html_graphing_routes", __name__)
 
@@ -33,11 +33,7 @@ html_graphing_routes = Blueprint("html_graphing_routes", __name__)
 def html_graphing():
     logger.network_logger.debug("* Graphing viewed by " + str(request.remote_addr))
 
-    extra_message = ""
-    button_disabled = ""
-    if server_plotly_graph.server_plotly_graph_variables.graph_creation_in_progress:
-        extra_message = "Creating Graph - Please Wait"
-        button_disabled = "disabled"
+    extra_message = server_plotly_graph_jobs.get_active_graph_jobs_message()
 
     try:
         unix_creation_date = os.path.getmtime(file_locations.plotly_graph_interval)
@@ -50,16 +46,22 @@ def html_graphing():
         triggers_creation_date = str(datetime.fromtimestamp(triggers_plotly_file_creation_date_unix))[:-7]
     except FileNotFoundError:
         triggers_creation_date = "No Plotly Graph Found"
+
+    downsample_min_max_checked = "checked"
+    downsample_lttb_checked = ""
+    if app_cached_variables.quick_graph_downsample_mode == "LTTB":
+        downsample_min_max_checked = ""
+        downsample_lttb_checked = "checked"
     return render_template("graphing.html",
                            PageURL="/Graphing",
                            RestartServiceHidden=get_html_hidden_state(app_cached_variables.html_service_restart),
                            RebootSensorHidden=get_html_hidden_state(app_cached_variables.html_sensor_reboot),
                            ExtraTextMessage=extra_message,
-                           CreateButtonDisabled=button_disabled,
                            IntervalPlotlyDate=interval_creation_date,
                            TriggerPlotlyDate=triggers_creation_date,
                            UTCOffset=app_config_access.primary_config.utc0_hour_offset,
-                           SkipSQLEntries=app_cached_variables.quick_graph_skip_sql_entries,
+                           DownsampleMinMaxChecked=downsample_min_max_checked,
+                           DownsampleLTTBChecked=downsample_lttb_checked,
                            MaxSQLEntries=app_cached_variables.quick_graph_max_sql_entries,
                            SensorUptimeChecked=get_html_checkbox_state(app_cached_variables.quick_graph_uptime),
                            CPUTemperatureChecked=get_html_checkbox_state(app_cached_variables.quick_graph_cpu_temp),
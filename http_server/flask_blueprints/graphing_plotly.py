@@ -17,13 +17,14 @@
     along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 import os
-from flask import Blueprint, request, send_file
+import json
+from flask import Blueprint, request, send_file, Response
 from operations_modules import logger
 from operations_modules import file_locations
-from operations_modules import app_generic_functions
 from http_server.server_http_auth import auth
 from http_server.server_http_generic_functions import message_and_return
 from http_server import server_plotly_graph
+from http_server import server_plotly_graph_jobs
 from http_server import server_plotly_graph_variables
 from http_server.flask_blueprints.graphing import html_graphing
 
@@ -33,8 +34,7 @@ html_plotly_graphing_routes = Blueprint("html_plotly_graphing_routes", __name__)
 @html_plotly_graphing_routes.route("/CreatePlotlyGraph", methods=["POST"])
 @auth.login_required
 def html_create_plotly_graph():
-    if not server_plotly_graph_variables.graph_creation_in_progress and \
-            request.method == "POST" and "SQLRecordingType" in request.form:
+    if request.method == "POST" and "SQLRecordingType" in request.form:
         logger.network_logger.info("* Plotly Graph Initiated by " + str(request.remote_addr))
         try:
             new_graph_data = server_plotly_graph_variables.CreateGraphData()
@@ -49,13 +49,15 @@ def html_create_plotly_graph():
             new_graph_data.graph_start = request.form.get("graph_datetime_start").replace("T", " ") + ":00"
             new_graph_data.graph_end = request.form.get("graph_datetime_end").replace("T", " ") + ":00"
             new_graph_data.datetime_offset = float(request.form.get("HourOffset"))
-            new_graph_data.sql_queries_skip = int(request.form.get("SkipSQL"))
+            new_graph_data.downsample_mode = request.form.get("DownsampleMode")
+            new_graph_data.max_graph_points = int(request.form.get("MaxGraphPoints"))
             new_graph_data.graph_columns = server_plotly_graph.check_form_columns(request.form)
 
             if len(new_graph_data.graph_columns) < 4:
                 return message_and_return("Please Select at least One Sensor", url="/Graphing")
-            else:
-                app_generic_functions.thread_function(server_plotly_graph.create_plotly_graph, args=new_graph_data)
+            elif server_plotly_graph_jobs.submit_graph_job(new_graph_data) is None:
+                return message_and_return("Too many Graphs Queued", text_message2="Please try again later",
+                                          url="/Graphing")
         except Exception as error:
             logger.primary_logger.warning("Plotly Graph: " + str(error))
     return html_graphing()
@@ -80,3 +82,22 @@ def html_view_triggers_graph_plotly():
         message1 = "No Triggers Plotly Graph Generated - Click to Close Tab"
         special_command = "JavaScript:window.close()"
         return message_and_return(message1, special_command=special_command, url="")
+
+
+@html_plotly_graphing_routes.route("/PlotlyGraphJobStatus")
+def html_plotly_graph_job_status():
+    graph_job = server_plotly_graph_jobs.get_graph_job(request.args.get("JobID"))
+    if graph_job is None:
+        return Response(json.dumps({"Error": "Unknown Graph Job"}), status=404, mimetype="application/json")
+    return Response(json.dumps(graph_job.get_status_dictionary()), mimetype="application/json")
+
+
+@html_plotly_graphing_routes.route("/ViewPlotlyGraphJob")
+def html_view_graph_job_plotly():
+    logger.network_logger.debug("* Plotly Graph Job Viewed from " + str(request.remote_addr))
+    graph_job = server_plotly_graph_jobs.get_graph_job(request.args.get("JobID"))
+    if graph_job is not None and graph_job.state == server_plotly_graph_jobs.job_state_complete and \
+            os.path.isfile(graph_job.graph_file_location):
+        return send_file(graph_job.graph_file_location)
+    message_title = "Plotly Graph Job Not Found or Not Complete - Click to Close Tab"
+    return message_and_return(message_title, special_command="JavaScript:window.close()", url="")
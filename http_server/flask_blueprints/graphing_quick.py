@@ -16,26 +16,38 @@
     You should have received a copy of the GNU General Public License
     along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
+import json
+import math
 from datetime import datetime, timedelta
-from flask import render_template, Blueprint, request
+from flask import render_template, Blueprint, request, Response
 from operations_modules import logger
 from operations_modules import file_locations
 from operations_modules import app_cached_variables
-from operations_modules.app_generic_functions import get_file_content, adjust_datetime
+from operations_modules.app_generic_functions import get_file_content
 from configuration_modules import app_config_access
-from operations_modules.sqlite_database import sql_execute_get_data
+from http_server.server_graph_downsampling import get_downsampled_columns_data, get_adjusted_datetimes
 from http_server.flask_blueprints.graphing import html_graphing
 
 html_quick_graphing_routes = Blueprint("html_quick_graphing_routes", __name__)
 db_v = app_cached_variables.database_variables
 
+# Seconds between Live Graph requests for readings recorded since the last request
+live_graph_refresh_seconds = 15
+# A chart holding this many times Max Plot Points reloads its whole time frame, downsampled again
+live_graph_reload_points_multiplier = 2
+# Largest time frame in hours a Live Graph can show (10 years)
+live_graph_max_hours = 87600
+
 
 @html_quick_graphing_routes.route("/LiveGraphView", methods=["GET", "POST"])
 def html_live_graphing():
     logger.network_logger.debug("* Live Graphs viewed by " + str(request.remote_addr))
     if request.method == "POST":
         if request.form.get("graph_hours") is not None:
-            app_cached_variables.quick_graph_hours = float(request.form.get("graph_hours"))
+            try:
+                app_cached_variables.quick_graph_hours = _get_clean_graph_hours(request.form.get("graph_hours"))
+            except ValueError as error:
+                logger.network_logger.warning("Live Graph - Bad Hours: " + str(error))
             return get_html_live_graphing_page()
         app_cached_variables.quick_graph_uptime = 0
         app_cached_variables.quick_graph_cpu_temp = 0
@@ -53,8 +65,8 @@ def html_live_graphing():
         app_cached_variables.quick_graph_mag = 0
         app_cached_variables.quick_graph_gyro = 0
 
-        if request.form.get("SkipSQL") is not None:
-            app_cached_variables.quick_graph_skip_sql_entries = int(request.form.get("SkipSQL"))
+        if request.form.get("DownsampleMode") is not None:
+            app_cached_variables.quick_graph_downsample_mode = request.form.get("DownsampleMode")
         if request.form.get("MaxSQLData") is not None:
             app_cached_variables.quick_graph_max_sql_entries = int(request.form.get("MaxSQLData"))
         if request.form.get("SensorUptime") is not None:
@@ -91,6 +103,77 @@ def html_live_graphing():
     return get_html_live_graphing_page()
 
 
+@html_quick_graphing_routes.route("/LiveGraphData")
+def html_live_graph_data():
+    """
+    Returns the requested Columns for the past Hours as JSON, with each column's DateTimes & Values as lists.
+    Since is the LastDateTime of a previous response, only readings recorded after it are returned.
+    DateTimes are adjusted to the sensor's hour offset, except LastDateTime which is kept as stored for Since.
+    """
+    sensor_columns = db_v.get_sensor_columns_list()
+    selected_columns = []
+    for column in request.args.get("Columns", "").split(","):
+        if column in sensor_columns and column not in selected_columns:
+            selected_columns.append(column)
+    try:
+        hours_to_view = _get_clean_graph_hours(request.args.get("Hours", app_cached_variables.quick_graph_hours))
+    except ValueError:
+        hours_to_view = app_cached_variables.quick_graph_hours
+    window_start = (datetime.utcnow() - timedelta(hours=hours_to_view)).strftime("%Y-%m-%d %H:%M:%S")
+
+    since_datetime = None
+    if request.args.get("Since") is not None:
+        since_datetime = _get_clean_since_datetime(request.args.get("Since"))
+        if since_datetime is None:
+            return Response(json.dumps({"Error": "Bad Since DateTime"}), status=400, mimetype="application/json")
+
+    start_date = window_start
+    if since_datetime is not None and since_datetime > window_start:
+        start_date = since_datetime
+    columns_data = {db_v.all_tables_datetime: [[], []]}
+    if selected_columns:
+        columns_data = get_downsampled_columns_data(selected_columns, start_datetime=start_date,
+                                                    max_points=app_cached_variables.quick_graph_max_sql_entries,
+                                                    downsample_mode=app_cached_variables.quick_graph_downsample_mode)
+
+    hour_offset = app_config_access.primary_config.utc0_hour_offset
+    last_datetime = since_datetime
+    graph_data = {}
+    for column in selected_columns:
+        sensor_dates, sensor_values = columns_data[column]
+        if since_datetime is not None:
+            # SQL compares whole seconds, drop anything already sent
+            new_indexes = [index for index, var_datetime in enumerate(sensor_dates) if var_datetime > since_datetime]
+            sensor_dates = [sensor_dates[index] for index in new_indexes]
+            sensor_values = [sensor_values[index] for index in new_indexes]
+        if sensor_dates and (last_datetime is None or sensor_dates[-1] > last_datetime):
+            last_datetime = sensor_dates[-1]
+        graph_data[column] = {"DateTimes": get_adjusted_datetimes(sensor_dates, hour_offset),
+                              "Values": sensor_values}
+    live_graph_data = {"Columns": graph_data,
+                       "LastDateTime": last_datetime,
+                       "WindowStart": get_adjusted_datetimes([window_start], hour_offset)[0]}
+    return Response(json.dumps(live_graph_data), mimetype="application/json")
+
+
+def _get_clean_graph_hours(graph_hours):
+    """ Returns the hours as a float from 0 to live_graph_max_hours, raises ValueError if it's not a finite number. """
+    graph_hours = float(graph_hours)
+    if not math.isfinite(graph_hours):
+        raise ValueError("Hours must be a finite number, got " + str(graph_hours))
+    return min(max(graph_hours, 0.0), live_graph_max_hours)
+
+
+def _get_clean_since_datetime(since_datetime):
+    """ Returns the provided DateTime re-formatted as stored in the database, or None if it's not a DateTime. """
+    for datetime_format in ["%Y-%m-%d %H:%M:%S.%f", "%Y-%m-%d %H:%M:%S"]:
+        try:
+            return datetime.strptime(since_datetime, datetime_format).strftime(datetime_format)[:23]
+        except ValueError:
+            pass
+    return None
+
+
 def get_html_live_graphing_page(email_graph=False):
     if email_graph:
         graph_past_hours = app_config_access.email_config.graph_past_hours
@@ -159,38 +242,50 @@ def get_html_live_graphing_page(email_graph=False):
         "violet", "violet", "violet", "grey", "grey", "grey", "grey", "grey", "grey", "grey", "grey", "grey"
     ]
 
-    graph_javascript_code = ""
+    # Charts are created empty & filled from /LiveGraphData, emailed graphs can't fetch so their data is included
+    graph_javascript_code_list = ["var liveGraphCharts = {};"]
     html_code = ""
-    total_data_points = _get_graph_db_data(db_v.all_tables_datetime, get_len_only=True)
+    selected_columns = [sensor_db_name[1] for sensor_db_name in sensors_list if sensor_db_name[0]]
+    total_data_points = app_cached_variables.quick_graph_max_sql_entries
+    if email_graph:
+        columns_data = _get_graph_db_data(selected_columns)
+        total_data_points = len(columns_data[db_v.all_tables_datetime][0])
     for sensor_db_name, sensor_measurement, colour in zip(sensors_list, measurements_list, colour_list):
         try:
             if sensor_db_name[0]:
-                sensor_data = _get_graph_db_data(sensor_db_name[1])
-                if sensor_data is not False:
-                    html_code += "<div style='height: 300px'><canvas id='" + sensor_db_name[
-                        1] + """'></canvas></div>\n"""
-                    tmp_starter = start_sensor_code.replace("{{ ChartName }}", sensor_db_name[1])
-                    tmp_starter = tmp_starter.replace("{{ DisplayHours }}", str(graph_past_hours))
-
-                    sensor_dates = get_graph_datetime_from_column(sensor_db_name[1])
-                    checkin_hour_offset = app_config_access.primary_config.utc0_hour_offset
-                    clean_first_checkin_date = datetime.strptime(sensor_dates[-1][0][:-4], "%Y-%m-%d %H:%M:%S")
-                    clean_first_checkin_date = clean_first_checkin_date + timedelta(hours=checkin_hour_offset)
-                    clean_last_checkin_date = datetime.strptime(sensor_dates[0][0][:-4], "%Y-%m-%d %H:%M:%S")
-                    clean_last_checkin_date = clean_last_checkin_date + timedelta(hours=checkin_hour_offset)
-
-                    tmp_starter = tmp_starter.replace("{{ StartDate }}",
-                                                      clean_first_checkin_date.strftime("%Y-%m-%d %H:%M:%S"))
-                    tmp_starter = tmp_starter.replace("{{ EndDate }}",
-                                                      clean_last_checkin_date.strftime("%Y-%m-%d %H:%M:%S"))
-                    tmp_starter = tmp_starter.replace("{{ UTCOffset }}",
-                                                      str(app_config_access.primary_config.utc0_hour_offset))
-
-                    replacement_code = _add_single_sensor(sensor_db_name[1], sensor_data, colour)
-                    graph_javascript_code += tmp_starter.replace("{{ MainDataSet }}", replacement_code) + "\n"
-                    graph_javascript_code = graph_javascript_code.replace("{{ Measurement }}", sensor_measurement)
+                start_date = ""
+                end_date = ""
+                sensor_data = ""
+                if email_graph:
+                    sensor_dates, sensor_values = columns_data[sensor_db_name[1]]
+                    if len(sensor_values) < 2:
+                        continue
+                    sensor_data = _get_chart_data_points(sensor_dates, sensor_values)
+                    start_date, end_date = get_adjusted_datetimes([sensor_dates[0], sensor_dates[-1]],
+                                                                  app_config_access.primary_config.utc0_hour_offset)
+                html_code += "<div style='height: 300px'><canvas id='" + sensor_db_name[1] + \
+                             """'></canvas></div>\n"""
+                tmp_starter = start_sensor_code.replace("{{ ChartName }}", sensor_db_name[1])
+                tmp_starter = tmp_starter.replace("{{ DisplayHours }}", str(graph_past_hours))
+                tmp_starter = tmp_starter.replace("{{ StartDate }}", start_date)
+                tmp_starter = tmp_starter.replace("{{ EndDate }}", end_date)
+                tmp_starter = tmp_starter.replace("{{ UTCOffset }}",
+                                                  str(app_config_access.primary_config.utc0_hour_offset))
+                tmp_starter = tmp_starter.replace("{{ Measurement }}", sensor_measurement)
+
+                replacement_code = _add_single_sensor(sensor_db_name[1], sensor_data, colour)
+                graph_javascript_code_list.append(tmp_starter.replace("{{ MainDataSet }}", replacement_code))
         except Exception as error:
             logger.network_logger.warning("Live Graph - Error Adding Graph: " + str(error))
+    if not email_graph and selected_columns:
+        live_graph_code = live_graph_fetch_code.replace("{{ Columns }}", ",".join(selected_columns))
+        live_graph_code = live_graph_code.replace("{{ DisplayHours }}", str(graph_past_hours))
+        live_graph_code = live_graph_code.replace("{{ RefreshMilliseconds }}",
+                                                  str(int(live_graph_refresh_seconds * 1000)))
+        reload_points = app_cached_variables.quick_graph_max_sql_entries * live_graph_reload_points_multiplier
+        live_graph_code = live_graph_code.replace("{{ ReloadPoints }}", str(reload_points))
+        graph_javascript_code_list.append(live_graph_code)
+    graph_javascript_code = "\n".join(graph_javascript_code_list)
     if email_graph:
         quick_graph = get_file_content(file_locations.program_root_dir + "/http_server/templates/graphing_quick.html")
 
@@ -217,49 +312,25 @@ def _add_single_sensor(sensor_db_name, sensor_data, colour="red"):
     return return_text
 
 
-def get_graph_data_from_column(sql_column, graph_table="IntervalData",
-                               start_date="1111-08-21 00:00:01", end_date="9999-01-01 00:00:01"):
-    var_sql_query = "SELECT " + sql_column + \
-                    " FROM " + graph_table + \
-                    " WHERE " + sql_column + \
-                    " IS NOT NULL AND DateTime BETWEEN datetime('" + start_date + \
-                    "') AND datetime('" + end_date + \
-                    "') AND ROWID % " + str(app_cached_variables.quick_graph_skip_sql_entries + 1) + " = 0" + \
-                    " ORDER BY DateTime DESC LIMIT " + str(app_cached_variables.quick_graph_max_sql_entries)
-    return sql_execute_get_data(var_sql_query)
-
-
-def get_graph_datetime_from_column(sql_column, graph_table="IntervalData",
-                                   start_date="1111-08-21 00:00:01",
-                                   end_date="9999-01-01 00:00:01"):
-    var_time_sql_query = "SELECT DateTime" + \
-                         " FROM " + graph_table + \
-                         " WHERE " + sql_column + \
-                         " IS NOT NULL AND DateTime BETWEEN datetime('" + start_date + \
-                         "') AND datetime('" + end_date + \
-                         "') AND ROWID % " + str(app_cached_variables.quick_graph_skip_sql_entries + 1) + " = 0" + \
-                         " ORDER BY DateTime DESC LIMIT " + str(app_cached_variables.quick_graph_max_sql_entries)
-    return sql_execute_get_data(var_time_sql_query)
-
-
-def _get_graph_db_data(database_column, get_len_only=False):
+def _get_graph_db_data(database_columns):
+    """ Returns the selected columns for the past quick_graph_hours, oldest first, downsampled to Max Plot Points. """
     hours_to_view = app_cached_variables.quick_graph_hours
     start_date = (datetime.utcnow() - timedelta(hours=hours_to_view)).strftime("%Y-%m-%d %H:%M:%S")
-    if get_len_only:
-        return len(get_graph_datetime_from_column(database_column, start_date=start_date))
-    temp_data = get_graph_data_from_column(database_column, start_date=start_date)
-    temp_dates = get_graph_datetime_from_column(database_column, start_date=start_date)
-    if len(temp_data) < 2:
-        return False
-    db_temp_data = " "
-    for var_datetime, var_data in zip(temp_dates, temp_data):
-        replacement_dates = adjust_datetime(var_datetime[0], app_config_access.primary_config.utc0_hour_offset)
-        db_temp_data += "{ x: '" + replacement_dates + "', y: " + var_data[0] + " },"
-    return db_temp_data[:-1]
+    return get_downsampled_columns_data(database_columns, start_datetime=start_date,
+                                        max_points=app_cached_variables.quick_graph_max_sql_entries,
+                                        downsample_mode=app_cached_variables.quick_graph_downsample_mode)
+
+
+def _get_chart_data_points(sensor_dates, sensor_values):
+    replacement_dates = get_adjusted_datetimes(sensor_dates, app_config_access.primary_config.utc0_hour_offset)
+    data_points = []
+    for var_datetime, var_data in zip(replacement_dates, sensor_values):
+        data_points.append("{ x: '" + var_datetime + "', y: " + str(var_data) + " }")
+    return " " + ",".join(data_points)
 
 
 start_sensor_code = """
-new Chart(document.getElementById('{{ ChartName }}').getContext('2d'),
+liveGraphCharts['{{ ChartName }}'] = new Chart(document.getElementById('{{ ChartName }}').getContext('2d'),
     { 
         type: 'line',
         data: {
@@ -312,22 +383,57 @@ new Chart(document.getElementById('{{ ChartName }}').getContext('2d'),
         }
     }
 );
+"""
 
-url = "{{ FetchURL }}"
+live_graph_fetch_code = """
+var liveGraphLastDateTime = "";
 
-function sleep(ms) {
-    return new Promise(resolve => setTimeout(resolve, ms));
-}
-
-function sleep(ms) {
-    return new Promise(resolve => setTimeout(resolve, ms));
-}
-
-function updateDisplay() {
-    fetch(url).then(function (response) {
-        response.text().then(function (text) {
-            poemDisplay.textContent = text;
-        });
+function updateLiveGraphs() {
+    var fetchURL = "/LiveGraphData?Columns={{ Columns }}&Hours={{ DisplayHours }}";
+    if (liveGraphLastDateTime !== "") {
+        fetchURL += "&Since=" + encodeURIComponent(liveGraphLastDateTime);
+    }
+    var fullReload = liveGraphLastDateTime === "";
+    fetch(fetchURL).then(function (response) {
+        return response.json();
+    }).then(function (graphData) {
+        var reloadNeeded = false;
+        for (var columnName in graphData.Columns) {
+            var chart = liveGraphCharts[columnName];
+            if (chart === undefined) {
+                continue;
+            }
+            var columnData = graphData.Columns[columnName];
+            var chartPoints = fullReload ? [] : chart.data.datasets[0].data;
+            for (var index = 0; index < columnData.DateTimes.length; index++) {
+                chartPoints.push({x: columnData.DateTimes[index], y: columnData.Values[index]});
+            }
+            chartPoints = chartPoints.filter(function (point) {
+                return point.x >= graphData.WindowStart;
+            });
+            chart.data.datasets[0].data = chartPoints;
+            if (chartPoints.length >= {{ ReloadPoints }}) {
+                reloadNeeded = true;
+            }
+            if (chartPoints.length > 0) {
+                chart.options.title.text = "Past {{ DisplayHours }} Hours || " + chartPoints[0].x + " <--> " +
+                    chartPoints[chartPoints.length - 1].x;
+            }
+            chart.update();
+        }
+        if (graphData.LastDateTime !== null) {
+            liveGraphLastDateTime = graphData.LastDateTime;
+        }
+        // New readings are added as they're recorded, so the whole time frame is downsampled again once they pile up
+        if (reloadNeeded) {
+            liveGraphLastDateTime = "";
+        }
+    }).catch(function (error) {
+        console.log("Live Graph Update Failed: " + error);
+    }).then(function () {
+        setTimeout(updateLiveGraphs, {{ RefreshMilliseconds }});
     });
 }
+
+updateLiveGraphs();
 """
@@ -17,20 +17,26 @@
     along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 import os
-import sqlite3
 from datetime import datetime, timedelta
 from flask import Blueprint, render_template, request
 from operations_modules import logger
 from operations_modules import file_locations
 from operations_modules import app_cached_variables
 from configuration_modules import app_config_access
-from operations_modules.sqlite_database import create_table_and_datetime, check_sql_table_and_column, \
-    sql_execute_get_data, write_to_sql_database
+from operations_modules.sqlite_database import sql_execute_get_data, write_to_sql_database, \
+    database_connection_pool, checkin_write_queue, get_checkin_columns
 from http_server.server_http_auth import auth
-from http_server.server_http_generic_functions import get_html_hidden_state, get_html_checkbox_state
+from http_server.server_http_generic_functions import get_html_hidden_state, get_html_checkbox_state, \
+    get_html_selected_state
+from http_server import server_checkin_statistics
+from http_server.server_checkin_statistics import checkin_statistics_cache, latest_checkin_columns, \
+    get_utc_datetime_days_ago
 
 html_sensor_check_ins_routes = Blueprint("html_sensor_check_ins_routes", __name__)
-max_statistics_lines = 200
+statistics_sensors_per_page = 25
+max_checkins_per_batch = 5000
+
+db_v = app_cached_variables.database_variables
 
 
 @html_sensor_check_ins_routes.route("/SensorCheckin", methods=["POST"])
@@ -39,41 +45,10 @@ def remote_sensor_check_ins():
         if request.form.get("checkin_id"):
             checkin_id = "KS" + str(request.form.get("checkin_id"))
             logger.network_logger.debug("* Sensor ID:" + checkin_id + " checked in from " + str(request.remote_addr))
-
-            current_datetime = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
-            db_all_tables_datetime = app_cached_variables.database_variables.all_tables_datetime
-            db_sensor_check_in_version = app_cached_variables.database_variables.sensor_check_in_version
-            db_sensor_uptime = app_cached_variables.database_variables.sensor_uptime
-            db_sensor_installed_sensors = app_cached_variables.database_variables.sensor_check_in_installed_sensors
-            db_sensor_check_in_primary_log = app_cached_variables.database_variables.sensor_check_in_primary_log
-            db_sensor_check_in_sensors_log = app_cached_variables.database_variables.sensor_check_in_sensors_log
-
+            if checkin_write_queue.is_full():
+                return "Checkin Queue Full", 503
             try:
-                db_connection = sqlite3.connect(file_locations.sensor_checkin_database)
-                db_cursor = db_connection.cursor()
-
-                create_table_and_datetime(checkin_id, db_cursor)
-                check_sql_table_and_column(checkin_id, db_sensor_check_in_version, db_cursor)
-                check_sql_table_and_column(checkin_id, db_sensor_installed_sensors, db_cursor)
-                check_sql_table_and_column(checkin_id, db_sensor_uptime, db_cursor)
-                check_sql_table_and_column(checkin_id, db_sensor_check_in_primary_log, db_cursor)
-                check_sql_table_and_column(checkin_id, db_sensor_check_in_sensors_log, db_cursor)
-                db_connection.commit()
-                db_connection.close()
-
-                sql_ex_string = "INSERT OR IGNORE INTO '" + checkin_id + "' (" + \
-                                db_all_tables_datetime + "," + \
-                                db_sensor_check_in_version + "," + \
-                                db_sensor_installed_sensors + "," + \
-                                db_sensor_uptime + "," + \
-                                db_sensor_check_in_primary_log + "," + \
-                                db_sensor_check_in_sensors_log + ")" + \
-                                " VALUES (?,?,?,?,?,?);"
-
-                sql_data = [current_datetime, str(request.form.get("program_version")),
-                            str(request.form.get("installed_sensors")), str(request.form.get("sensor_uptime")),
-                            str(request.form.get("primary_log")), str(request.form.get("sensor_log"))]
-                write_to_sql_database(sql_ex_string, sql_data, sql_database_location=file_locations.sensor_checkin_database)
+                _queue_sensor_checkin(request.form, datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"))
                 return "OK", 202
             except Exception as error:
                 logger.network_logger.warning("Sensor Checkin error for " + str(checkin_id) + ": " + str(error))
@@ -81,37 +56,134 @@ def remote_sensor_check_ins():
     return "Checkin Recording Disabled", 202
 
 
+@html_sensor_check_ins_routes.route("/SensorCheckinBatch", methods=["POST"])
+def remote_sensor_check_ins_batch():
+    """
+    Queues a JSON list of Check-Ins forwarded by a gateway, each with the same fields as /SensorCheckin.
+    Each Check-In may include the UTC checkin_datetime it was made at ('YYYY-MM-DD HH:MM:SS'), otherwise it's now.
+    Check-Ins without a checkin_id are skipped, and ones from the same sensor at the same DateTime are combined.
+    """
+    if app_config_access.checkin_config.enable_checkin_recording:
+        checkins = request.get_json(silent=True)
+        if not isinstance(checkins, list):
+            return "Failed - Expected a JSON list of Check-Ins", 400
+        if len(checkins) > max_checkins_per_batch:
+            return "Failed - Over " + str(max_checkins_per_batch) + " Check-Ins", 413
+        if checkin_write_queue.is_full():
+            return "Checkin Queue Full", 503
+
+        current_datetime = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+        # Only one Check-In per sensor & DateTime is recorded, combine them so the Check-In count matches
+        combined_checkins = {}
+        checkin_keys = []
+        for checkin in checkins:
+            if isinstance(checkin, dict) and checkin.get("checkin_id"):
+                checkin_datetime = _get_batch_checkin_datetime(checkin, current_datetime)
+                checkin_key = str(checkin.get("checkin_id")) + " " + checkin_datetime
+                if checkin_key in combined_checkins:
+                    combined_checkin = combined_checkins[checkin_key][0]
+                    for field_name, field_value in checkin.items():
+                        if field_value not in [None, ""]:
+                            combined_checkin[field_name] = field_value
+                else:
+                    combined_checkins[checkin_key] = [dict(checkin), checkin_datetime]
+                    checkin_keys.append(checkin_key)
+        for checkin_key in checkin_keys:
+            checkin, checkin_datetime = combined_checkins[checkin_key]
+            _queue_sensor_checkin(checkin, checkin_datetime)
+        checkins_queued = len(checkin_keys)
+        logger.network_logger.debug("* " + str(checkins_queued) + " Sensor Check-Ins from " + str(request.remote_addr))
+        return "OK - " + str(checkins_queued) + " Queued", 202
+    return "Checkin Recording Disabled", 202
+
+
+def _get_batch_checkin_datetime(checkin, current_datetime):
+    """ Returns the Check-In's checkin_datetime if valid and not in the future, otherwise current_datetime. """
+    checkin_datetime = str(checkin.get("checkin_datetime", ""))
+    try:
+        datetime.strptime(checkin_datetime, "%Y-%m-%d %H:%M:%S")
+        if checkin_datetime <= current_datetime:
+            return checkin_datetime
+    except ValueError:
+        pass
+    return current_datetime
+
+
+def _queue_sensor_checkin(checkin_fields, checkin_datetime):
+    """ Queues a Check-In & update to the sensor's latest Check-In state from the provided form or dictionary. """
+    sql_data = ["KS" + _get_checkin_field(checkin_fields, "checkin_id"), checkin_datetime,
+                _get_checkin_field(checkin_fields, "program_version"),
+                _get_checkin_field(checkin_fields, "installed_sensors"),
+                _get_checkin_field(checkin_fields, "sensor_uptime"),
+                _get_checkin_field(checkin_fields, "primary_log"),
+                _get_checkin_field(checkin_fields, "sensor_log")]
+    checkin_statistics_cache.add_checkin(sql_data[0], checkin_datetime, sql_data[2], sql_data[3], sql_data[4])
+
+    insert_checkin_sql, insert_latest_sql, update_latest_sql = checkin_sql_queries
+    database_location = file_locations.sensor_checkin_database
+    checkin_write_queue.add_row(insert_checkin_sql, sql_data, database_location)
+    checkin_write_queue.add_row(insert_latest_sql, [sql_data[0]], database_location)
+    checkin_write_queue.add_row(update_latest_sql, dict(zip(get_checkin_columns(), sql_data)), database_location)
+
+
+def _get_checkin_field(checkin_fields, field_name):
+    """ Returns the Check-In field as a String, or a blank String if it's missing. """
+    field_value = checkin_fields.get(field_name)
+    if field_value is None:
+        return ""
+    return str(field_value)
+
+
+def _get_checkin_sql_queries():
+    """
+    Returns SQL queries to record a Check-In, add the sensor's latest Check-In state if missing, then update it.
+    Queued Check-Ins are written grouped by query, so each query must give the same result when run in that order.
+    """
+    insert_checkin_sql = "INSERT OR IGNORE INTO " + db_v.table_checkins + \
+                         " (" + ",".join(get_checkin_columns()) + ") VALUES (?,?,?,?,?,?,?);"
+    insert_latest_sql = "INSERT OR IGNORE INTO " + db_v.table_checkins_latest + \
+                        " (" + db_v.sensor_check_in_id + "," + db_v.sensor_check_in_count + ") VALUES (?,0);"
+
+    # Installed sensors & logs are only sent when they change, keep the last ones sent
+    update_latest_sql = "UPDATE " + db_v.table_checkins_latest + " SET "
+    for column in get_checkin_columns()[1:]:
+        if column in [db_v.sensor_check_in_installed_sensors,
+                      db_v.sensor_check_in_primary_log,
+                      db_v.sensor_check_in_sensors_log]:
+            update_latest_sql += column + " = CASE WHEN :" + column + " != '' THEN :" + column + \
+                                 " ELSE " + column + " END, "
+        else:
+            update_latest_sql += column + " = :" + column + ", "
+    update_latest_sql += db_v.sensor_check_in_count + " = " + db_v.sensor_check_in_count + " + 1" + \
+                         " WHERE " + db_v.sensor_check_in_id + " = :" + db_v.sensor_check_in_id + ";"
+    return [insert_checkin_sql, insert_latest_sql, update_latest_sql]
+
+
+checkin_sql_queries = _get_checkin_sql_queries()
+
+
 @html_sensor_check_ins_routes.route("/ViewSensorCheckin")
 @auth.login_required
 def view_sensor_check_ins():
-    db_location = file_locations.sensor_checkin_database
-    get_sensor_checkin_count_sql = "SELECT count(*) FROM sqlite_master WHERE type = 'table'" + \
-                                   "AND name != 'android_metadata' AND name != 'sqlite_sequence';"
-    sensor_count = sql_execute_get_data(get_sensor_checkin_count_sql, sql_database_location=db_location)
-
-    id_date_list = _get_check_in_sensor_ids(include_last_datetime=True)
+    sort_by = str(request.args.get("SortBy", server_checkin_statistics.sort_by_last_checkin))
+    if sort_by not in server_checkin_statistics.sort_by_options:
+        sort_by = server_checkin_statistics.sort_by_last_checkin
+    sensor_count = checkin_statistics_cache.get_sensor_count()
+    page_count = max(1, (sensor_count + statistics_sensors_per_page - 1) // statistics_sensors_per_page)
+    try:
+        page_number = min(max(1, int(request.args.get("Page", 1))), page_count)
+    except ValueError:
+        page_number = 1
 
     sensor_statistics = "Per Sensor Check-in Information\n\n"
-    current_date_time = datetime.utcnow()
-
-    sensor_contact_count = 0
-    count_contact_days = app_config_access.checkin_config.count_contact_days
-    for date_and_sensor_id in id_date_list:
-        cleaned_id = date_and_sensor_id[1]
-        clean_last_checkin_date = date_and_sensor_id[0].strftime("%Y-%m-%d %H:%M:%S")
-        if len(clean_last_checkin_date) > 16:
-            try:
-                checkin_date_converted = datetime.strptime(clean_last_checkin_date, "%Y-%m-%d %H:%M:%S")
-                if (current_date_time - checkin_date_converted) < timedelta(days=count_contact_days):
-                    sensor_contact_count += 1
-            except Exception as error:
-                logger.network_logger.warning("Error in last checkin verification: " + str(error))
-        sensor_statistics += _get_sensor_info_string(cleaned_id)
-    sensor_statistics_lines = sensor_statistics.split("\n")
-    if len(sensor_statistics_lines) > max_statistics_lines:
-        sensor_statistics = ""
-        for line in sensor_statistics_lines[:max_statistics_lines]:
-            sensor_statistics += line + "\n"
+    for latest_checkin in checkin_statistics_cache.get_page(sort_by, page_number, statistics_sensors_per_page):
+        sensor_statistics += _get_sensor_info_string(latest_checkin)
+
+    sort_selected_states = []
+    for sort_option in server_checkin_statistics.sort_by_options:
+        sort_selected_states.append(get_html_selected_state(sort_option == sort_by))
+    page_url = "/ViewSensorCheckin?SortBy=" + sort_by + "&Page="
+    contact_days = app_config_access.checkin_config.count_contact_days
     enable_checkin_recording = app_config_access.checkin_config.enable_checkin_recording
     if os.path.isfile(file_locations.sensor_checkin_database):
         db_size_mb = round(os.path.getsize(file_locations.sensor_checkin_database) / 1000000, 3)
@@ -119,14 +191,25 @@ def view_sensor_check_ins():
         db_size_mb = 0.0
     return render_template("software_checkin.html",
                            PageURL="/ViewSensorCheckin",
+                           CurrentPageURL=page_url + str(page_number),
                            RestartServiceHidden=get_html_hidden_state(app_cached_variables.html_service_restart),
                            RebootSensorHidden=get_html_hidden_state(app_cached_variables.html_sensor_reboot),
-                           SensorsInDatabase=_get_sql_element(sensor_count),
-                           TotalSensorCount=sensor_contact_count,
+                           SensorsInDatabase=sensor_count,
+                           TotalSensorCount=checkin_statistics_cache.get_contact_count(contact_days),
                            CheckinSensorStatistics=sensor_statistics,
+                           SortLastCheckinSelected=sort_selected_states[0],
+                           SortSensorIDSelected=sort_selected_states[1],
+                           SortVersionSelected=sort_selected_states[2],
+                           SortUptimeSelected=sort_selected_states[3],
+                           SortCheckinCountSelected=sort_selected_states[4],
+                           PageNumber=page_number,
+                           PageCount=page_count,
+                           PreviousPageURL=page_url + str(max(1, page_number - 1)),
+                           NextPageURL=page_url + str(min(page_count, page_number + 1)),
                            CheckedEnableCheckin=get_html_checkbox_state(enable_checkin_recording),
-                           ContactInPastDays=app_config_access.checkin_config.count_contact_days,
+                           ContactInPastDays=contact_days,
                            CheckinDBSize=db_size_mb,
+                           CheckinWriteQueueStatus=checkin_write_queue.get_status_str(),
                            DeleteSensorsOlderDays=app_config_access.checkin_config.delete_sensors_older_days)
 
 
@@ -137,13 +220,17 @@ def delete_sensors_older_then():
         app_config_access.checkin_config.update_with_html_request(request, skip_all_but_delete_setting=True)
         app_config_access.checkin_config.save_config_to_file()
         delete_sensors_older_days = app_config_access.checkin_config.delete_sensors_older_days
-        datetime_sensor_ids_list = _get_check_in_sensor_ids(include_last_datetime=True)
-        current_date_time = datetime.utcnow()
-        for date_and_sensor_id in datetime_sensor_ids_list:
-            clean_last_checkin_date = date_and_sensor_id[0]
-            cleaned_id = date_and_sensor_id[1]
-            if (current_date_time - clean_last_checkin_date).days >= delete_sensors_older_days:
-                _delete_sensor_id(cleaned_id)
+        delete_cutoff_datetime = get_utc_datetime_days_ago(delete_sensors_older_days)
+
+        checkin_write_queue.flush()
+        old_sensor_ids_sql = "SELECT " + db_v.sensor_check_in_id + " FROM " + db_v.table_checkins_latest + \
+                             " WHERE " + db_v.all_tables_datetime + " <= ?"
+        database_connection_pool.write_transaction(
+            [["DELETE FROM " + db_v.table_checkins + " WHERE " + db_v.sensor_check_in_id +
+              " IN (" + old_sensor_ids_sql + ");", [delete_cutoff_datetime]],
+             ["DELETE FROM " + db_v.table_checkins_latest + " WHERE " + db_v.all_tables_datetime + " <= ?;",
+              [delete_cutoff_datetime]]], file_locations.sensor_checkin_database)
+        checkin_statistics_cache.reload()
         write_to_sql_database("VACUUM;", None, sql_database_location=file_locations.sensor_checkin_database)
     except Exception as error:
         logger.primary_logger.warning("Error trying to delete old sensors from the Check-Ins database: " + str(error))
@@ -177,10 +264,9 @@ def search_sensor_clear_old_check_ins():
 @html_sensor_check_ins_routes.route("/DeleteSensorCheckinID")
 @auth.login_required
 def search_sensor_delete_senor_id():
-    db_location = file_locations.sensor_checkin_database
     sensor_id = app_cached_variables.checkin_search_sensor_id
     if app_cached_variables.checkin_search_sensor_id != "" and app_cached_variables.checkin_search_sensor_id.isalnum():
-        write_to_sql_database("DROP TABLE '" + sensor_id + "';", None, sql_database_location=db_location)
+        _delete_sensor_id(sensor_id)
         _update_search_sensor_check_ins(app_cached_variables.checkin_search_sensor_id)
     return view_search_sensor_check_ins()
 
@@ -196,10 +282,11 @@ def search_sensor_check_ins():
 
 def _update_search_sensor_check_ins(sensor_id):
     if len(sensor_id) == 34 and sensor_id.isalnum():
-        if check_sensor_id_exists(sensor_id):
+        latest_checkin = _get_latest_checkin(sensor_id)
+        if latest_checkin is not None:
             app_cached_variables.checkin_search_sensor_id = sensor_id
-            new_sensor_info_string = _get_sensor_info_string(app_cached_variables.checkin_search_sensor_id)
-            app_cached_variables.checkin_sensor_info = new_sensor_info_string
+            app_cached_variables.checkin_sensor_info = _get_sensor_info_string(latest_checkin)
+            app_cached_variables.checkin_search_sensor_installed_sensors = _get_text(latest_checkin[3])
             _search_checkin_get_logs(app_cached_variables.checkin_search_sensor_id)
         else:
             app_cached_variables.checkin_search_sensor_id = ""
@@ -219,69 +306,45 @@ def _search_checkin_get_logs(sensor_id, db_location=file_locations.sensor_checki
     app_cached_variables.checkin_search_primary_log = ""
     app_cached_variables.checkin_search_sensors_log = ""
     if sensor_id.isalnum():
-        get_primary_log_sql = "SELECT primary_log FROM '" + sensor_id + "' ORDER BY DateTime DESC;"
-        primary_logs = sql_execute_get_data(get_primary_log_sql, sql_database_location=db_location)
-
-        get_sensors_log_sql = "SELECT sensors_log FROM '" + sensor_id + "' ORDER BY DateTime DESC;"
-        sensors_logs = sql_execute_get_data(get_sensors_log_sql, sql_database_location=db_location)
-
-        found_log = False
-        for data_entry in primary_logs:
-            if found_log:
-                break
-            for log_entry in data_entry:
-                if log_entry != "":
-                    app_cached_variables.checkin_search_primary_log = str(log_entry)
-                    found_log = True
-        found_log = False
-        for data_entry in sensors_logs:
-            if found_log:
-                break
-            for log_entry in data_entry:
-                if log_entry != "":
-                    app_cached_variables.checkin_search_sensors_log = str(log_entry)
-                    found_log = True
-
-
-def _get_sensor_info_string(sensor_id, db_location=file_locations.sensor_checkin_database):
-    if sensor_id.isalnum():
-        get_sensor_checkin_count_per_id_sql = "SELECT count('DateTime') FROM '" + sensor_id + "';"
-        checkin_count = sql_execute_get_data(get_sensor_checkin_count_per_id_sql, sql_database_location=db_location)
-
-        get_last_sensor_checkin_date_sql = "SELECT DateTime FROM '" + sensor_id + "' ORDER BY DateTime DESC LIMIT 1;"
-        last_checkin_date = sql_execute_get_data(get_last_sensor_checkin_date_sql, sql_database_location=db_location)
-
-        get_current_version_sql = "SELECT KootnetVersion FROM '" + sensor_id + "' ORDER BY DateTime DESC LIMIT 1;"
-        current_sensor_version = sql_execute_get_data(get_current_version_sql, sql_database_location=db_location)
-
-        get_installed_sensors_sql = "SELECT installed_sensors FROM '" + sensor_id + "' ORDER BY DateTime DESC;"
-        current_installed_sensors = sql_execute_get_data(get_installed_sensors_sql, sql_database_location=db_location)
+        get_logs_sql = "SELECT " + db_v.sensor_check_in_primary_log + "," + db_v.sensor_check_in_sensors_log + \
+                       " FROM " + db_v.table_checkins_latest + \
+                       " WHERE " + db_v.sensor_check_in_id + " = '" + sensor_id + "';"
+        for primary_log, sensors_log in sql_execute_get_data(get_logs_sql, sql_database_location=db_location):
+            app_cached_variables.checkin_search_primary_log = _get_text(primary_log)
+            app_cached_variables.checkin_search_sensors_log = _get_text(sensors_log)
 
-        found_installed_sensors = False
-        for data_entry in current_installed_sensors:
-            if found_installed_sensors:
-                break
-            for log_entry in data_entry:
-                if log_entry != "":
-                    app_cached_variables.checkin_search_sensor_installed_sensors = str(log_entry)
-                    found_installed_sensors = True
-
-        get_current_uptime_sql = "SELECT SensorUpTime FROM '" + sensor_id + "' ORDER BY DateTime DESC LIMIT 1;"
-        current_sensor_uptime = sql_execute_get_data(get_current_uptime_sql, sql_database_location=db_location)
-        clean_last_checkin_date = _get_sql_element(last_checkin_date)
 
+def _get_latest_checkin(sensor_id, db_location=file_locations.sensor_checkin_database):
+    """ Returns the provided Sensor ID's latest Check-In state as a list of latest_checkin_columns or None. """
+    if sensor_id.isalnum():
+        get_latest_checkin_sql = "SELECT " + ",".join(latest_checkin_columns) + \
+                                 " FROM " + db_v.table_checkins_latest + \
+                                 " WHERE " + db_v.sensor_check_in_id + " = '" + sensor_id + "';"
+        for latest_checkin in sql_execute_get_data(get_latest_checkin_sql, sql_database_location=db_location):
+            return latest_checkin
+    return None
+
+
+def _get_sensor_info_string(latest_checkin):
+    """ Returns a text summary of a sensor's latest Check-In state, a row of latest_checkin_columns. """
+    sensor_id, last_checkin_date, sensor_version, installed_sensors, sensor_uptime, checkin_count = latest_checkin
+    if sensor_id is not None and str(sensor_id).isalnum():
         checkin_hour_offset = app_config_access.primary_config.utc0_hour_offset
-        web_view_last_checkin_date = clean_last_checkin_date
-        if clean_last_checkin_date != "NA":
-            checkin_date_converted = datetime.strptime(clean_last_checkin_date[:19], "%Y-%m-%d %H:%M:%S")
-            checkin_date_converted = checkin_date_converted + timedelta(hours=checkin_hour_offset)
-            web_view_last_checkin_date = checkin_date_converted.strftime("%Y-%m-%d %H:%M:%S")
-        return "Sensor ID: " + sensor_id + \
-               "\nSoftware Version: " + _get_sql_element(current_sensor_version) + \
-               "\n" + app_cached_variables.checkin_search_sensor_installed_sensors + \
-               "\nSensor Uptime in Minutes: " + _get_sql_element(current_sensor_uptime) + \
-               "\nTotal Checkin Count: " + _get_sql_element(checkin_count) + \
-               "\nLast Check-in DateTime: " + str(web_view_last_checkin_date) + "\n\n"
+        web_view_last_checkin_date = "NA"
+        if last_checkin_date is not None:
+            try:
+                checkin_date_converted = datetime.strptime(last_checkin_date[:19], "%Y-%m-%d %H:%M:%S")
+                checkin_date_converted = checkin_date_converted + timedelta(hours=checkin_hour_offset)
+                web_view_last_checkin_date = checkin_date_converted.strftime("%Y-%m-%d %H:%M:%S")
+            except Exception as error:
+                logger.network_logger.warning("Error in last checkin verification: " + str(error))
+                web_view_last_checkin_date = str(last_checkin_date)
+        return "Sensor ID: " + str(sensor_id) + \
+               "\nSoftware Version: " + _get_text(sensor_version) + \
+               "\n" + _get_text(installed_sensors) + \
+               "\nSensor Uptime in Minutes: " + _get_text(sensor_uptime) + \
+               "\nTotal Checkin Count: " + _get_text(checkin_count) + \
+               "\nLast Check-in DateTime: " + web_view_last_checkin_date + "\n\n"
     return "Sensor ID: Bad Sensor ID" + \
            "\nSoftware Version: NA" + \
            "\nSensor Uptime in Minutes: NA" + \
@@ -292,128 +355,54 @@ def _get_sensor_info_string(sensor_id, db_location=file_locations.sensor_checkin
 @html_sensor_check_ins_routes.route("/ClearOldCheckinData")
 @auth.login_required
 def clear_check_ins_counts():
-    db_location = file_locations.sensor_checkin_database
-    get_sensor_checkin_ids_sql = "SELECT name FROM sqlite_master WHERE type='table';"
-    sensor_ids = sql_execute_get_data(get_sensor_checkin_ids_sql, sql_database_location=db_location)
-
-    for sensor_id in sensor_ids:
-        cleaned_sensor_id = str(sensor_id[0]).strip()
-        _clear_old_sensor_checkin_data(cleaned_sensor_id)
+    _clear_old_sensor_checkin_data()
     write_to_sql_database("VACUUM;", None, sql_database_location=file_locations.sensor_checkin_database)
     return view_sensor_check_ins()
 
 
-def _clear_old_sensor_checkin_data(sensor_id):
-    db_location = file_locations.sensor_checkin_database
-    db_all_tables_datetime = app_cached_variables.database_variables.all_tables_datetime
-    db_sensor_check_in_version = app_cached_variables.database_variables.sensor_check_in_version
-    db_sensor_check_in_installed_sensors = app_cached_variables.database_variables.sensor_check_in_installed_sensors
-    db_sensor_check_in_primary_log = app_cached_variables.database_variables.sensor_check_in_primary_log
-    db_sensor_check_in_sensors_log = app_cached_variables.database_variables.sensor_check_in_sensors_log
-    db_sensor_uptime = app_cached_variables.database_variables.sensor_uptime
-
-    get_last_checkin_date_sql = "SELECT " + db_all_tables_datetime + " FROM '" + sensor_id + \
-                                "' ORDER BY DateTime DESC LIMIT 1;"
-    raw_last_checkin_date = sql_execute_get_data(get_last_checkin_date_sql, sql_database_location=db_location)
-
-    get_version_sql = "SELECT " + db_sensor_check_in_version + " FROM '" + sensor_id + \
-                      "' ORDER BY DateTime DESC LIMIT 1;"
-    sensor_version = sql_execute_get_data(get_version_sql, sql_database_location=db_location)
-
-    get_installed_sensors_sql = "SELECT " + db_sensor_check_in_installed_sensors + " FROM '" + sensor_id + \
-                                "' WHERE " + db_sensor_check_in_installed_sensors + " != '' ORDER BY DateTime DESC LIMIT 1;"
-    sensor_installed_sensors = sql_execute_get_data(get_installed_sensors_sql, sql_database_location=db_location)
-
-    get_uptime_sql = "SELECT " + db_sensor_uptime + " FROM '" + sensor_id + \
-                     "' ORDER BY DateTime DESC LIMIT 1;"
-    sensor_uptime = sql_execute_get_data(get_uptime_sql, sql_database_location=db_location)
-
-    get_primary_log_sql = "SELECT " + db_sensor_check_in_primary_log + " FROM '" + sensor_id + \
-                          "' WHERE " + db_sensor_check_in_primary_log + " != '' ORDER BY DateTime DESC LIMIT 1;"
-    sensor_primary_log = sql_execute_get_data(get_primary_log_sql, sql_database_location=db_location)
-
-    get_sensor_log_sql = "SELECT " + db_sensor_check_in_sensors_log + " FROM '" + sensor_id + \
-                         "' WHERE " + db_sensor_check_in_sensors_log + " != '' ORDER BY DateTime DESC LIMIT 1;"
-    sensor_sensor_log = sql_execute_get_data(get_sensor_log_sql, sql_database_location=db_location)
-
-    write_to_sql_database("DELETE FROM '" + sensor_id + "';", None, sql_database_location=db_location)
-
-    sql_ex_string = "INSERT OR IGNORE INTO '" + sensor_id + "' (" + \
-                    db_all_tables_datetime + "," + \
-                    db_sensor_check_in_version + "," + \
-                    db_sensor_check_in_installed_sensors + "," + \
-                    db_sensor_uptime + "," + \
-                    db_sensor_check_in_primary_log + "," + \
-                    db_sensor_check_in_sensors_log + ")" + \
-                    " VALUES (?,?,?,?,?,?);"
-
-    sql_data = [_get_sql_element(raw_last_checkin_date), _get_sql_element(sensor_version),
-                _get_sql_element(sensor_installed_sensors), _get_sql_element(sensor_uptime),
-                _get_sql_element(sensor_primary_log), _get_sql_element(sensor_sensor_log)]
-    if _get_sql_element(raw_last_checkin_date) != "NA":
-        write_to_sql_database(sql_ex_string, sql_data, sql_database_location=db_location)
-
-
-def _get_sql_element(sql_data):
-    try:
-        for entry1 in sql_data:
-            for entry2 in entry1:
-                return str(entry2)
-    except Exception as error:
-        logger.network_logger.debug("Error extracting data in Sensor Check-ins: " + str(error))
-        return "Error"
-    return ""
-
-
-def _get_check_in_sensor_ids(include_last_datetime=False):
+def _clear_old_sensor_checkin_data(sensor_id=None):
     """
-    Returns a list of Sensor ID's from the Check-In database.
-    If include_last_datetime=True, returns a list of [datetime, sensor_id]
+    Deletes all but the latest Check-In of the provided Sensor ID, or of all sensors if None.
+    Installed sensors & logs are kept in the sensor's latest Check-In state.
     """
-    db_location = file_locations.sensor_checkin_database
+    delete_checkins_sql = "DELETE FROM " + db_v.table_checkins + \
+                          " WHERE " + db_v.all_tables_datetime + " < (SELECT " + db_v.all_tables_datetime + \
+                          " FROM " + db_v.table_checkins_latest + " WHERE " + db_v.table_checkins_latest + "." + \
+                          db_v.sensor_check_in_id + " = " + db_v.table_checkins + "." + db_v.sensor_check_in_id + ")"
+    reset_count_sql = "UPDATE " + db_v.table_checkins_latest + " SET " + db_v.sensor_check_in_count + " = 1"
+    sql_data = None
+    if sensor_id is not None:
+        delete_checkins_sql += " AND " + db_v.sensor_check_in_id + " = ?"
+        reset_count_sql += " WHERE " + db_v.sensor_check_in_id + " = ?"
+        sql_data = [sensor_id]
     try:
-        get_sensor_checkin_ids_sql = "SELECT name FROM sqlite_master WHERE type='table';"
-        sensor_ids = sql_execute_get_data(get_sensor_checkin_ids_sql, sql_database_location=db_location)
-
-        cleaned_sensor_list = []
-        for sensor_id in sensor_ids:
-            cleaned_sensor_list.append(str(sensor_id[0]).strip())
-        if include_last_datetime:
-            return_sensor_ids_list = []
-            for sensor_id in cleaned_sensor_list:
-                get_last_checkin_date_sql = "SELECT DateTime FROM '" + sensor_id + "' ORDER BY DateTime DESC LIMIT 1;"
-                raw_last_checkin_date = sql_execute_get_data(get_last_checkin_date_sql, sql_database_location=db_location)
-                clean_last_checkin_date = _get_sql_element(raw_last_checkin_date)
-                if clean_last_checkin_date != "NA":
-                    return_sensor_ids_list.append([datetime.strptime(clean_last_checkin_date[:19], "%Y-%m-%d %H:%M:%S"), sensor_id])
-                else:
-                    return_sensor_ids_list.append([datetime.strptime("1901-01-01 01:01:01", "%Y-%m-%d %H:%M:%S"), sensor_id])
-            return_sensor_ids_list.sort(reverse=True)
-        else:
-            return_sensor_ids_list = cleaned_sensor_list
-        return return_sensor_ids_list
+        checkin_write_queue.flush()
+        database_connection_pool.write_transaction([[delete_checkins_sql + ";", sql_data],
+                                                    [reset_count_sql + ";", sql_data]],
+                                                   file_locations.sensor_checkin_database)
+        checkin_statistics_cache.reset_checkin_counts(sensor_id=sensor_id)
     except Exception as error:
-        logger.network_logger.error("Unable to retrieve Check-In Sensor IDs: " + str(error))
-    return []
+        logger.primary_logger.warning("Error trying to clear old Check-Ins from the Check-Ins database: " + str(error))
+
+
+def _get_text(sql_value):
+    if sql_value is None:
+        return ""
+    return str(sql_value)
 
 
 def _delete_sensor_id(sensor_id):
     """ Deletes provided Text Sensor ID from the Check-In database """
-    database_location = file_locations.sensor_checkin_database
-    write_to_sql_database("DROP TABLE '" + sensor_id + "';", None, sql_database_location=database_location)
+    try:
+        checkin_write_queue.flush()
+        database_connection_pool.write_transaction(
+            [["DELETE FROM " + db_v.table_checkins + " WHERE " + db_v.sensor_check_in_id + " = ?;", [sensor_id]],
+             ["DELETE FROM " + db_v.table_checkins_latest + " WHERE " + db_v.sensor_check_in_id + " = ?;",
+              [sensor_id]]], file_locations.sensor_checkin_database)
+        checkin_statistics_cache.remove_sensor(sensor_id)
+    except Exception as error:
+        logger.primary_logger.warning("Error trying to delete a sensor from the Check-Ins database: " + str(error))
 
 
 def check_sensor_id_exists(sensor_id):
-    sql_query = "SELECT count(name) FROM sqlite_master WHERE type='table' AND name='" + sensor_id + "'"
-    try:
-        database_connection = sqlite3.connect(file_locations.sensor_checkin_database)
-        sqlite_database = database_connection.cursor()
-        sqlite_database.execute(sql_query)
-        if sqlite_database.fetchone()[0]:
-            database_connection.close()
-            return True
-        else:
-            database_connection.close()
-            return False
-    except Exception as error:
-        logger.primary_logger.error("Unable to access CheckIns Database: " + str(error))
+    return _get_latest_checkin(sensor_id) is not None
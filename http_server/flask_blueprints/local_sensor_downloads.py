@@ -18,12 +18,15 @@
 """
 import os
 import time
-from flask import Blueprint, send_file, request
+from flask import Blueprint, send_file, request, Response
 from operations_modules import logger
 from operations_modules import file_locations
 from operations_modules import app_cached_variables
 from operations_modules import app_generic_functions
+from operations_modules import database_partitions
+from operations_modules.sqlite_database import checkpoint_database
 from http_server import server_http_generic_functions
+from http_server import server_data_export
 
 html_local_download_routes = Blueprint("html_local_download_routes", __name__)
 
@@ -36,8 +39,9 @@ def download_sensors_sql_database_zipped():
         sql_filename = file_name_part1 + "SensorDatabase.sqlite"
         zip_filename = file_name_part1 + "SensorDatabase.zip"
         start_time = time.time()
-        zip_content = app_generic_functions.get_file_content(file_locations.sensor_database, open_type="rb")
-        app_generic_functions.zip_files([sql_filename], [zip_content], save_type="save_to_disk",
+        checkpoint_database(file_locations.sensor_database)
+        zip_names, zip_contents = _get_database_zip_names_and_contents(sql_filename)
+        app_generic_functions.zip_files(zip_names, zip_contents, save_type="save_to_disk",
                                         file_location=file_locations.database_zipped)
         end_time = time.time()
         logger.network_logger.info("* SQL Database zipped and sent to " + str(request.remote_addr))
@@ -54,29 +58,71 @@ def download_sensors_sql_database_raw():
     try:
         file_name_part1 = app_cached_variables.ip.split(".")[-1] + "-" + app_cached_variables.hostname
         sql_filename = file_name_part1 + "SensorDatabase.sqlite"
+        if database_partitions.get_partition_locations():
+            # Partitions are separate files, so they are sent together in the zipped download
+            return download_sensors_sql_database_zipped()
+        checkpoint_database(file_locations.sensor_database)
         return send_file(file_locations.sensor_database, as_attachment=True, attachment_filename=sql_filename)
     except Exception as error:
         logger.primary_logger.error("* Unable to Send Database to " + str(request.remote_addr) + ": " + str(error))
         return server_http_generic_functions.message_and_return("Error sending Database - " + str(error))
 
 
+@html_local_download_routes.route("/ExportSensorData")
+def export_sensor_data():
+    """
+    Streams rows of the Table (IntervalData or TriggerData) from Start to End (UTC DateTimes) as they're read.
+    Optional Columns is a comma separated list of columns, all sensor columns are exported if not set.
+    Format is CSV (default), CSVGZ (gzip compressed CSV), NDJSON (a JSON object per line) or Parquet.
+    """
+    logger.network_logger.debug("* Sensor Data Export Accessed by " + str(request.remote_addr))
+    sql_columns = None
+    if request.args.get("Columns"):
+        sql_columns = request.args.get("Columns").split(",")
+    data_export = server_data_export.get_data_export(request.args.get("Table", "IntervalData"), sql_columns,
+                                                     request.args.get("Start"), request.args.get("End"),
+                                                     request.args.get("Format", server_data_export.export_format_csv))
+    if isinstance(data_export, str):
+        return Response(data_export, status=400, mimetype="text/plain")
+
+    file_name = app_cached_variables.hostname + "_" + data_export.sql_table + "_" + \
+        data_export.start_datetime[:10] + "_" + data_export.end_datetime[:10] + data_export.get_file_extension()
+    logger.network_logger.info("* Streaming " + file_name + " to " + str(request.remote_addr))
+    response = Response(data_export.get_chunks(), mimetype=data_export.get_mimetype())
+    response.headers["Content-Disposition"] = "attachment; filename=\"" + file_name + "\""
+    return response
+
+
 @html_local_download_routes.route("/DownloadZippedEverything")
 def download_zipped_everything():
     logger.network_logger.debug("* Download Zip of Everything Accessed by " + str(request.remote_addr))
     zip_name = "Everything_" + app_cached_variables.ip.split(".")[-1] + app_cached_variables.hostname + ".zip"
     database_name = "Database_" + app_cached_variables.hostname + ".sqlite"
     try:
-        return_names = [database_name,
-                        os.path.basename(file_locations.primary_log),
-                        os.path.basename(file_locations.network_log),
-                        os.path.basename(file_locations.sensors_log)]
-        return_files = [app_generic_functions.get_file_content(file_locations.sensor_database, open_type="rb"),
-                        app_generic_functions.get_file_content(file_locations.primary_log),
-                        app_generic_functions.get_file_content(file_locations.network_log),
-                        app_generic_functions.get_file_content(file_locations.sensors_log)]
+        checkpoint_database(file_locations.sensor_database)
+        return_names, return_files = _get_database_zip_names_and_contents(database_name)
+        return_names += [os.path.basename(file_locations.primary_log),
+                         os.path.basename(file_locations.network_log),
+                         os.path.basename(file_locations.sensors_log)]
+        return_files += [app_generic_functions.get_file_content(file_locations.primary_log),
+                         app_generic_functions.get_file_content(file_locations.network_log),
+                         app_generic_functions.get_file_content(file_locations.sensors_log)]
 
         return_zip_file = app_generic_functions.zip_files(return_names, return_files)
         return send_file(return_zip_file, attachment_filename=zip_name, as_attachment=True)
     except Exception as error:
         logger.primary_logger.error("* Unable to Zip Logs: " + str(error))
         return server_http_generic_functions.message_and_return("Unable to zip logs for Download", url="/GetLogsHTML")
+
+
+def _get_database_zip_names_and_contents(main_database_name):
+    """ Returns zip file names & contents for the main database, plus any database partitions in their own folder. """
+    zip_names = []
+    zip_contents = []
+    for file_name, file_location in database_partitions.get_database_download_files():
+        if file_location == file_locations.sensor_database:
+            zip_names.append(main_database_name)
+        else:
+            zip_names.append("DatabasePartitions/" + file_name)
+        zip_contents.append(app_generic_functions.get_file_content(file_location, open_type="rb"))
+    return zip_names, zip_contents
@@ -37,15 +37,32 @@ def html_set_installed_sensors():
         try:
             app_config_access.installed_sensors.update_with_html_request(request)
             app_config_access.installed_sensors.save_config_to_file()
-            sensor_access.sensors_direct.__init__()
+            changed_sensors = sensor_access.update_installed_sensors(restart_consumers=False)
+            # Threads & Trigger rules are restarted after the available sensors are updated, as they use them
             recording_interval.available_sensors.__init__()
-            return_page = message_and_return("Installed Sensors Set & Re-Initialized", url="/MainConfigurationsHTML")
+            sensor_access.restart_sensor_consumers(changed_sensors)
+            message2 = str(len(changed_sensors)) + " Sensors Added or Removed, other sensors were left running"
+            return_page = message_and_return("Installed Sensors Set & Re-Initialized", text_message2=message2,
+                                             url="/MainConfigurationsHTML")
             return return_page
         except Exception as error:
             logger.primary_logger.error("HTML Apply - Installed Sensors - Error: " + str(error))
             return message_and_return("Bad Installed Sensors POST Request", url="/MainConfigurationsHTML")
 
 
+@html_config_installed_sensors_routes.route("/ReInitializeSensor")
+@auth.login_required
+def html_reinitialize_sensor():
+    sensor_name = str(request.args.get("Sensor", ""))
+    logger.network_logger.info("** Sensor " + sensor_name + " Re-Initialize Initiated by " + str(request.remote_addr))
+    if sensor_access.reinitialize_sensor(sensor_name):
+        recording_interval.available_sensors.__init__()
+        return message_and_return("Sensor " + sensor_name + " Re-Initialized", url="/SensorInformation")
+    message2 = "Sensor must be installed, use names like pimoroni_bme680_a"
+    return message_and_return("Unable to Re-Initialize Sensor " + sensor_name, text_message2=message2,
+                              url="/SensorInformation")
+
+
 def get_config_installed_sensors_tab():
     try:
         installed_sensors = app_config_access.installed_sensors
@@ -19,6 +19,9 @@
 from flask import Blueprint, render_template, request
 from operations_modules import logger
 from operations_modules import app_cached_variables
+from operations_modules import sqlite_database
+from operations_modules import database_partitions
+from operations_modules import deadline_scheduler
 from configuration_modules import app_config_access
 from http_server.server_http_auth import auth
 from http_server.server_http_generic_functions import get_html_checkbox_state, message_and_return
@@ -34,8 +37,12 @@ def html_set_config_interval_recording():
         try:
             app_config_access.interval_recording_config.update_with_html_request(request)
             app_config_access.interval_recording_config.save_config_to_file()
+            new_write_delay = app_config_access.interval_recording_config.database_write_delay_seconds
+            sqlite_database.database_write_queue.max_write_delay_seconds = new_write_delay
+            database_partitions.update_database_partitions()
             page_msg = "Config Set, Restarting Interval Server"
             app_cached_variables.restart_interval_recording_thread = True
+            deadline_scheduler.notify_restart()
             return_page = message_and_return(page_msg, url="/MainConfigurationsHTML")
             return return_page
         except Exception as error:
@@ -51,6 +58,11 @@ def get_config_interval_recording_tab():
             PageURL="/MainConfigurationsHTML",
             CheckedInterval=get_html_checkbox_state(interval_config.enable_interval_recording),
             IntervalDelay=float(interval_config.sleep_duration_interval),
+            DatabaseWriteDelay=float(interval_config.database_write_delay_seconds),
+            CheckedDatabasePartitions=get_html_checkbox_state(interval_config.enable_database_partitions),
+            DatabasePartitionMonths=interval_config.database_partition_months,
+            DatabasePartitionKeepMonths=interval_config.database_partition_keep_months,
+            CheckedDatabasePartitionArchive=get_html_checkbox_state(interval_config.database_partition_archive),
             CheckedSensorUptime=get_html_checkbox_state(interval_config.sensor_uptime_enabled),
             CheckedCPUTemperature=get_html_checkbox_state(interval_config.cpu_temperature_enabled),
             CheckedEnvTemperature=get_html_checkbox_state(interval_config.env_temperature_enabled),
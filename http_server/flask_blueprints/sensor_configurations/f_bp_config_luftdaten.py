@@ -23,6 +23,7 @@ from configuration_modules import app_config_access
 from http_server.server_http_auth import auth
 from http_server.server_http_generic_functions import get_html_checkbox_state, message_and_return, get_restart_service_text
 from operations_modules.online_services_modules.luftdaten import start_luftdaten_server
+from operations_modules import deadline_scheduler
 
 html_config_luftdaten_routes = Blueprint("html_config_luftdaten_routes", __name__)
 
@@ -40,6 +41,7 @@ def html_edit_online_services_luftdaten():
             if app_cached_variables.luftdaten_thread != "Disabled":
                 if app_cached_variables.luftdaten_thread.monitored_thread.is_alive():
                     app_cached_variables.restart_luftdaten_thread = True
+                    deadline_scheduler.notify_restart()
                 else:
                     start_luftdaten_server()
             else:
@@ -48,6 +50,7 @@ def html_edit_online_services_luftdaten():
             if app_cached_variables.luftdaten_thread is not None:
                 app_cached_variables.luftdaten_thread.shutdown_thread = True
                 app_cached_variables.restart_luftdaten_thread = True
+                deadline_scheduler.notify_restart()
         return message_and_return(return_text, url="/3rdPartyConfigurationsHTML")
     else:
         logger.primary_logger.error("HTML Edit Luftdaten set Error")
@@ -24,6 +24,7 @@ from http_server.server_http_auth import auth
 from http_server.server_http_generic_functions import get_html_checkbox_state, message_and_return, \
     get_restart_service_text, get_html_selected_state
 from operations_modules.mqtt.server_mqtt_publisher import start_mqtt_publisher_server
+from operations_modules import deadline_scheduler
 
 html_config_mqtt_publisher_routes = Blueprint("html_config_mqtt_publisher_routes", __name__)
 
@@ -38,6 +39,7 @@ def html_set_config_mqtt_publisher():
             app_config_access.mqtt_publisher_config.save_config_to_file()
             return_text = get_restart_service_text("MQTT Publisher")
             app_cached_variables.restart_mqtt_publisher_thread = True
+            deadline_scheduler.notify_restart()
             return_page = message_and_return(return_text, url="/MQTTConfigurationsHTML")
             return return_page
         except Exception as error:
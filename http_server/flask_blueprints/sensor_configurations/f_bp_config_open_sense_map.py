@@ -24,6 +24,7 @@ from http_server.server_http_auth import auth
 from http_server.server_http_generic_functions import message_and_return, get_restart_service_text
 from operations_modules.online_services_modules.open_sense_map import start_open_sense_map_server
 from operations_modules.online_services_modules.open_sense_map import add_sensor_to_account
+from operations_modules import deadline_scheduler
 
 html_config_osm_routes = Blueprint("html_config_osm_routes", __name__)
 
@@ -41,6 +42,7 @@ def html_edit_online_services_open_sense_map():
             if app_cached_variables.open_sense_map_thread != "Disabled":
                 if app_cached_variables.open_sense_map_thread.monitored_thread.is_alive():
                     app_cached_variables.restart_open_sense_map_thread = True
+                    deadline_scheduler.notify_restart()
                 else:
                     start_open_sense_map_server()
             else:
@@ -49,6 +51,7 @@ def html_edit_online_services_open_sense_map():
             if app_cached_variables.open_sense_map_thread is not None:
                 app_cached_variables.open_sense_map_thread.shutdown_thread = True
                 app_cached_variables.restart_open_sense_map_thread = True
+                deadline_scheduler.notify_restart()
         return message_and_return(return_text, url="/3rdPartyConfigurationsHTML")
     else:
         logger.primary_logger.error("HTML Edit Open Sense Map set Error")
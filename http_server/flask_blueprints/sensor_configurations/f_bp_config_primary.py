@@ -52,6 +52,9 @@ def get_config_primary_tab():
                                IPWebPort=app_config_access.primary_config.web_portal_port,
                                CheckedDebug=debug_logging,
                                HourOffset=app_config_access.primary_config.utc0_hour_offset,
+                               SensorReadingMaxAge=app_config_access.primary_config.sensor_reading_max_age_seconds,
+                               PMReadingMaxAge=app_config_access.primary_config.particulate_matter_max_age_seconds,
+                               CPUTempReadingMaxAge=app_config_access.primary_config.cpu_temperature_max_age_seconds,
                                CheckedSensorCheckIns=sensor_check_ins,
                                CheckinHours=app_config_access.primary_config.checkin_wait_in_hours,
                                CheckinAddress=app_config_access.primary_config.checkin_url,
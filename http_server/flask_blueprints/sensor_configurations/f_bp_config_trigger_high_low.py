@@ -125,7 +125,9 @@ def get_config_trigger_high_low_tab():
                                TriggerHighGyroscopeY=high_low_settings.gyroscope_y_high,
                                TriggerLowGyroscopeZ=high_low_settings.gyroscope_z_low,
                                TriggerHighGyroscopeZ=high_low_settings.gyroscope_z_high,
-                               SecondsGyroscope=high_low_settings.gyroscope_wait_seconds)
+                               SecondsGyroscope=high_low_settings.gyroscope_wait_seconds,
+                               HysteresisPercent=high_low_settings.hysteresis_percent,
+                               DebounceSamples=high_low_settings.debounce_samples)
     except Exception as error:
         logger.network_logger.error("Error building Trigger High/Low configuration page: " + str(error))
         return render_template("edit_configurations/config_load_error.html", TabID="trigger-high-low-config-tab")
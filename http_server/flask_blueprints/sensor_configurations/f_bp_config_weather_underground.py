@@ -24,6 +24,7 @@ from http_server.server_http_auth import auth
 from http_server.server_http_generic_functions import get_html_checkbox_state, message_and_return, \
     get_restart_service_text
 from operations_modules.online_services_modules.weather_underground import start_weather_underground_server
+from operations_modules import deadline_scheduler
 
 html_config_weather_underground_routes = Blueprint("html_config_weather_underground_routes", __name__)
 
@@ -41,6 +42,7 @@ def html_edit_online_services_wu():
             if app_cached_variables.weather_underground_thread != "Disabled":
                 if app_cached_variables.weather_underground_thread.monitored_thread.is_alive():
                     app_cached_variables.restart_weather_underground_thread = True
+                    deadline_scheduler.notify_restart()
                 else:
                     start_weather_underground_server()
             else:
@@ -49,6 +51,7 @@ def html_edit_online_services_wu():
             if app_cached_variables.weather_underground_thread is not None:
                 app_cached_variables.weather_underground_thread.shutdown_thread = True
                 app_cached_variables.restart_weather_underground_thread = True
+                deadline_scheduler.notify_restart()
         return message_and_return(return_text, url="/3rdPartyConfigurationsHTML")
     else:
         logger.primary_logger.error("HTML Edit Weather Underground set Error")
@@ -22,6 +22,7 @@ from operations_modules import file_locations
 from configuration_modules import app_config_access
 from operations_modules import app_cached_variables
 from operations_modules.app_generic_functions import write_file_to_disk
+from operations_modules import deadline_scheduler
 from configuration_modules.config_primary import CreatePrimaryConfiguration
 from configuration_modules.config_installed_sensors import CreateInstalledSensorsConfiguration
 from configuration_modules.config_interval_recording import CreateIntervalRecordingConfiguration
@@ -146,6 +147,7 @@ def receive_online_services():
         app_config_access.weather_underground_config.update_configuration_settings_list()
         app_config_access.weather_underground_config.save_config_to_file()
         app_cached_variables.restart_weather_underground_thread = True
+        deadline_scheduler.notify_restart()
     elif request.form.get("online_service_selected_action") == "luftdaten":
         if send_interval < 10.0:
             send_interval = 10.0
@@ -154,6 +156,7 @@ def receive_online_services():
         app_config_access.luftdaten_config.update_configuration_settings_list()
         app_config_access.luftdaten_config.save_config_to_file()
         app_cached_variables.restart_luftdaten_thread = True
+        deadline_scheduler.notify_restart()
     elif request.form.get("online_service_selected_action") == "open_sense_map":
         if send_interval < 10.0:
             send_interval = 10.0
@@ -162,4 +165,5 @@ def receive_online_services():
         app_config_access.open_sense_map_config.update_configuration_settings_list()
         app_config_access.open_sense_map_config.save_config_to_file()
         app_cached_variables.restart_open_sense_map_thread = True
+        deadline_scheduler.notify_restart()
     return "Received"
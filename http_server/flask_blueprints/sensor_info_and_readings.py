@@ -23,7 +23,11 @@ from operations_modules import file_locations
 from operations_modules import app_cached_variables
 from configuration_modules import app_config_access
 from operations_modules import software_version
+from operations_modules import sqlite_database
+from operations_modules.startup_profile import startup_profile
 from sensor_modules import sensor_access
+from sensor_modules import sensor_bus_access
+from sensor_recording_modules.recording_interval import interval_capture_statistics
 from http_server.server_http_generic_functions import get_html_hidden_state
 
 html_sensor_info_readings_routes = Blueprint("html_sensor_info_readings_routes", __name__)
@@ -83,6 +87,14 @@ def html_system_information():
         DiskUsage=sensor_access.get_disk_usage_percent(),
         InstalledSensors=app_config_access.installed_sensors.get_installed_names_str(),
         IntervalRecording=app_cached_variables.interval_recording_thread.current_state,
+        IntervalCaptureStatus=interval_capture_statistics.get_status_str(),
+        DatabaseWriteQueue=app_cached_variables.database_write_queue_thread.current_state,
+        DatabaseWriteQueueStatus=sqlite_database.database_write_queue.get_status_str(),
+        SensorSamplingStatus=sensor_access.sensor_sampling_engine.get_status_str(),
+        SensorBusAccessStatus=sensor_bus_access.get_status_str(),
+        WebPortalStartTime=startup_profile.get_web_portal_ready_str(),
+        DatabaseRollups=app_cached_variables.rollup_recording_thread.current_state,
+        DatabasePartitions=app_cached_variables.database_partitions_thread.current_state,
         TriggerHighLowRecording=_get_text_check_enabled(enable_high_low_trigger_recording),
         TriggerVarianceRecording=_get_text_check_enabled(enable_trigger_recording),
         DebugLogging=debug_logging,
@@ -144,6 +156,17 @@ def html_sql_recording_status():
     )
 
 
+@html_sensor_info_readings_routes.route("/StartupProfile")
+def html_startup_profile():
+    logger.network_logger.debug("** Startup Profile accessed from " + str(request.remote_addr))
+    return render_template(
+        "startup_profile.html",
+        PageURL="/StartupProfile",
+        WebPortalStartTime=startup_profile.get_web_portal_ready_str(),
+        StartupProfile=startup_profile.get_profile_str()
+    )
+
+
 def _get_enabled_state(state):
     if state:
         return "Enabled"
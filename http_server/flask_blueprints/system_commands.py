@@ -26,7 +26,8 @@ from operations_modules import app_generic_functions
 from operations_modules import app_cached_variables
 from operations_modules import software_version
 from operations_modules.sqlite_database import validate_sqlite_database, check_main_database_structure, \
-    write_to_sql_database
+    write_to_sql_database, checkpoint_database, close_database_connections
+from upgrade_modules.database_upgrades import check_and_upgrade_main_database
 from configuration_modules.app_config_access import primary_config
 from http_server.server_http_auth import auth
 from http_server.server_http_generic_functions import message_and_return
@@ -107,6 +108,7 @@ def put_sql_db():
             check_main_database_structure(database_location=temp_db_location)
             if _move_database():
                 os.system("mv -f " + temp_db_location + " " + file_locations.sensor_database)
+                app_generic_functions.thread_function(check_and_upgrade_main_database)
                 logger.primary_logger.info(return_message_ok)
                 return message_and_return("Sensor Database Uploaded OK", text_message2=return_message_ok, url="/")
             else:
@@ -120,10 +122,12 @@ def _move_database():
     sql_filename = app_cached_variables.ip.split(".")[-1] + app_cached_variables.hostname + "SensorDatabase.sqlite"
     zip_filename = str(datetime.utcnow().strftime("%Y-%m-%d_%H_%M_%S")) + "SensorDatabase.zip"
     try:
+        checkpoint_database(file_locations.sensor_database)
         zip_content = app_generic_functions.get_file_content(file_locations.sensor_database, open_type="rb")
         app_generic_functions.zip_files([sql_filename], [zip_content], save_type="save_to_disk",
                                         file_location=file_locations.sensor_data_dir + "/" + zip_filename)
         logger.network_logger.info("* Sensor's Database backed up as " + file_locations.sensor_data_dir + zip_filename)
+        close_database_connections(file_locations.sensor_database)
         os.system("rm " + file_locations.sensor_database)
         return True
     except Exception as error:
@@ -137,6 +141,7 @@ def get_zipped_sql_database_size():
     try:
         database_name = app_cached_variables.hostname + "SensorDatabase.sqlite"
         start_time = time.time()
+        checkpoint_database(file_locations.sensor_database)
         sql_database = app_generic_functions.get_file_content(file_locations.sensor_database, open_type="rb")
         zip_file = app_generic_functions.zip_files([database_name], [sql_database])
         sql_database_size = round(app_generic_functions.get_zip_size(zip_file) / 1000000, 2)
@@ -16,12 +16,14 @@
     You should have received a copy of the GNU General Public License
     along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
-from flask import Blueprint, request
+from hashlib import sha1
+from flask import Blueprint, request, Response
 from operations_modules import logger
 from operations_modules.app_cached_variables import command_data_separator
 from configuration_modules import app_config_access
 from sensor_recording_modules.recording_interval import get_interval_sensor_readings
 from sensor_modules import sensor_access
+from http_server import server_live_readings_stream
 
 html_sensor_readings_routes = Blueprint("html_sensor_readings_routes", __name__)
 
@@ -37,6 +39,38 @@ def get_interval_readings():
     return str(sensor_readings[0] + command_data_separator + readings_data)
 
 
+@html_sensor_readings_routes.route("/GetAllSensorReadingsJSON")
+def get_all_sensor_readings_json():
+    """
+    Returns all available sensor readings with units and capture DateTimes as one JSON document.
+    The ETag is a hash of the document, so pollers sending If-None-Match get a 304 until a reading changes.
+    """
+    logger.network_logger.debug("* All Sensor Readings in JSON sent to " + str(request.remote_addr))
+    readings_json = sensor_access.get_all_sensors_as_json()
+    response = Response(readings_json, mimetype="application/json")
+    response.set_etag(sha1(readings_json.encode()).hexdigest())
+    return response.make_conditional(request)
+
+
+@html_sensor_readings_routes.route("/LiveReadingsStream")
+def get_live_readings_stream():
+    """
+    Streams new sensor readings as Server-Sent Events, in the same format as /GetAllSensorReadingsJSON Readings.
+    Optional Measurements is a comma separated list of the database columns to stream, like SystemTemp,Humidity.
+    """
+    sql_columns = None
+    if request.args.get("Measurements"):
+        sql_columns = request.args.get("Measurements").split(",")
+    stream_client = server_live_readings_stream.add_stream_client(sql_columns)
+    if stream_client is None:
+        return Response("Too many Live Reading Streams, please try again later", status=503)
+    logger.network_logger.debug("* Live Readings Stream started for " + str(request.remote_addr))
+    response = Response(server_live_readings_stream.get_stream_events(stream_client), mimetype="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+
 @html_sensor_readings_routes.route("/GetSensorsLatency")
 def get_sensors_latency():
     logger.network_logger.debug("* Sensor Latency sent to " + str(request.remote_addr))
@@ -0,0 +1,198 @@
+"""
+    KootNet Sensors is a collection of programs and scripts to deploy,
+    interact with, and collect readings from various Sensors.
+    Copyright (C) 2018  Chad Ermacora  chad.ermacora@gmail.com
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import time
+from datetime import datetime, timedelta
+from collections import OrderedDict
+from threading import Lock
+from operations_modules import logger
+from operations_modules import file_locations
+from operations_modules import app_cached_variables
+from operations_modules.sqlite_database import sql_execute_get_data, checkin_write_queue
+
+db_v = app_cached_variables.database_variables
+
+sort_by_last_checkin = "LastCheckin"
+sort_by_sensor_id = "SensorID"
+sort_by_version = "Version"
+sort_by_uptime = "Uptime"
+sort_by_checkin_count = "CheckinCount"
+sort_by_options = [sort_by_last_checkin, sort_by_sensor_id, sort_by_version, sort_by_uptime, sort_by_checkin_count]
+
+# Sensors changed by other programs, like the Check-In database upgrade, show up once the cache is reloaded
+statistics_cache_reload_seconds = 900
+# Sorting other than by last Check-In is redone at most this often, so a busy server doesn't re-sort every view
+statistics_cache_sort_seconds = 30
+statistics_cache_contact_count_seconds = 60
+
+# Latest state columns, in the order of each cached sensor's statistics list
+latest_checkin_columns = [db_v.sensor_check_in_id, db_v.all_tables_datetime, db_v.sensor_check_in_version,
+                          db_v.sensor_check_in_installed_sensors, db_v.sensor_uptime, db_v.sensor_check_in_count]
+
+
+class CreateCheckinStatisticsCache:
+    """
+    Creates a in memory copy of every sensor's latest Check-In statistics, updated as each Check-In arrives.
+    Sensors are kept in Check-In order, so pages sorted by last Check-In only look at the sensors shown.
+    Statistics are lists in the order of latest_checkin_columns.
+    """
+
+    def __init__(self):
+        self.cache_lock = Lock()
+        self.latest_checkins = OrderedDict()
+        self.last_load_time = None
+        self.sorted_sensor_ids = {}
+        self.contact_count = None
+
+    def reload(self):
+        """ Reloads all sensor statistics from the Check-In database on next use. """
+        with self.cache_lock:
+            self.last_load_time = None
+
+    def add_checkin(self, sensor_id, checkin_datetime, version, installed_sensors, sensor_uptime):
+        """ Updates the provided sensor's statistics with a new Check-In. Blank installed sensors are skipped. """
+        with self.cache_lock:
+            self._check_loaded()
+            sensor_statistics = self.latest_checkins.pop(sensor_id, None)
+            if sensor_statistics is None:
+                sensor_statistics = [sensor_id, None, None, "", None, 0]
+            sensor_statistics[1] = checkin_datetime
+            sensor_statistics[2] = version
+            if installed_sensors != "":
+                sensor_statistics[3] = installed_sensors
+            sensor_statistics[4] = sensor_uptime
+            sensor_statistics[5] += 1
+            self.latest_checkins[sensor_id] = sensor_statistics
+            self.sorted_sensor_ids = {}
+
+    def remove_sensor(self, sensor_id):
+        with self.cache_lock:
+            self._check_loaded()
+            self.latest_checkins.pop(sensor_id, None)
+            self.sorted_sensor_ids = {}
+            self.contact_count = None
+
+    def reset_checkin_counts(self, sensor_id=None):
+        """ Sets the Check-In count to 1 for the provided sensor, or all sensors if None. """
+        with self.cache_lock:
+            self._check_loaded()
+            for cached_sensor_id, sensor_statistics in self.latest_checkins.items():
+                if sensor_id is None or cached_sensor_id == sensor_id:
+                    sensor_statistics[5] = 1
+            self.sorted_sensor_ids.pop(sort_by_checkin_count, None)
+
+    def get_sensor_count(self):
+        with self.cache_lock:
+            self._check_loaded()
+            return len(self.latest_checkins)
+
+    def get_contact_count(self, count_contact_days):
+        """ Returns the number of sensors that checked in within the provided number of days. """
+        with self.cache_lock:
+            self._check_loaded()
+            if self.contact_count is not None:
+                cached_days, count_time, sensor_contact_count = self.contact_count
+                if cached_days == count_contact_days and \
+                        time.monotonic() - count_time < statistics_cache_contact_count_seconds:
+                    return sensor_contact_count
+
+            contact_cutoff_datetime = get_utc_datetime_days_ago(count_contact_days)
+            sensor_contact_count = 0
+            for sensor_statistics in reversed(self.latest_checkins.values()):
+                if sensor_statistics[1] is None or sensor_statistics[1] < contact_cutoff_datetime:
+                    break
+                sensor_contact_count += 1
+            self.contact_count = [count_contact_days, time.monotonic(), sensor_contact_count]
+            return sensor_contact_count
+
+    def get_page(self, sort_by, page_number, sensors_per_page):
+        """ Returns a list of sensor statistics for the provided page number (starting at 1) and sort option. """
+        with self.cache_lock:
+            self._check_loaded()
+            page_start = (page_number - 1) * sensors_per_page
+            if sort_by not in sort_by_options or sort_by == sort_by_last_checkin:
+                page_sensor_ids = []
+                for sensor_id in reversed(self.latest_checkins):
+                    if len(page_sensor_ids) == page_start + sensors_per_page:
+                        break
+                    page_sensor_ids.append(sensor_id)
+                page_sensor_ids = page_sensor_ids[page_start:]
+            else:
+                page_sensor_ids = self._get_sorted_sensor_ids(sort_by)[page_start:page_start + sensors_per_page]
+
+            sensors_statistics = []
+            for sensor_id in page_sensor_ids:
+                if sensor_id in self.latest_checkins:
+                    sensors_statistics.append(list(self.latest_checkins[sensor_id]))
+            return sensors_statistics
+
+    def _get_sorted_sensor_ids(self, sort_by):
+        if sort_by in self.sorted_sensor_ids:
+            sort_time, sensor_ids = self.sorted_sensor_ids[sort_by]
+            if time.monotonic() - sort_time < statistics_cache_sort_seconds:
+                return sensor_ids
+
+        sensors_statistics = list(self.latest_checkins.values())
+        if sort_by == sort_by_sensor_id:
+            sensors_statistics.sort(key=lambda statistics: statistics[0])
+        elif sort_by == sort_by_version:
+            sensors_statistics.sort(key=lambda statistics: str(statistics[2]), reverse=True)
+        elif sort_by == sort_by_uptime:
+            sensors_statistics.sort(key=lambda statistics: _get_uptime_number(statistics[4]), reverse=True)
+        elif sort_by == sort_by_checkin_count:
+            sensors_statistics.sort(key=lambda statistics: statistics[5], reverse=True)
+        sensor_ids = [statistics[0] for statistics in sensors_statistics]
+        self.sorted_sensor_ids[sort_by] = [time.monotonic(), sensor_ids]
+        return sensor_ids
+
+    def _check_loaded(self):
+        if self.last_load_time is None or time.monotonic() - self.last_load_time > statistics_cache_reload_seconds:
+            # Queued Check-Ins are already in the cache, write them so they are not lost by the reload
+            checkin_write_queue.flush()
+            get_latest_checkins_sql = "SELECT " + ",".join(latest_checkin_columns) + \
+                                      " FROM " + db_v.table_checkins_latest + \
+                                      " ORDER BY " + db_v.all_tables_datetime + ";"
+            latest_checkins = sql_execute_get_data(get_latest_checkins_sql,
+                                                   sql_database_location=file_locations.sensor_checkin_database)
+            self.latest_checkins = OrderedDict()
+            for latest_checkin in latest_checkins:
+                sensor_statistics = list(latest_checkin)
+                if sensor_statistics[3] is None:
+                    sensor_statistics[3] = ""
+                if sensor_statistics[5] is None:
+                    sensor_statistics[5] = 0
+                self.latest_checkins[sensor_statistics[0]] = sensor_statistics
+            self.sorted_sensor_ids = {}
+            self.contact_count = None
+            self.last_load_time = time.monotonic()
+            logger.network_logger.debug("Check-In Statistics Cache Loaded " + str(len(self.latest_checkins)) + " Sensors")
+
+
+def get_utc_datetime_days_ago(days):
+    """ Returns the UTC DateTime the provided number of days ago, as stored in the Check-Ins database. """
+    return (datetime.utcnow() - timedelta(days=days)).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _get_uptime_number(sensor_uptime):
+    try:
+        return float(sensor_uptime)
+    except (TypeError, ValueError):
+        return -1.0
+
+
+checkin_statistics_cache = CreateCheckinStatisticsCache()
@@ -0,0 +1,228 @@
+"""
+    KootNet Sensors is a collection of programs and scripts to deploy,
+    interact with, and collect readings from various Sensors.
+    Copyright (C) 2018  Chad Ermacora  chad.ermacora@gmail.com
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import io
+import csv
+import json
+import zlib
+from datetime import datetime
+from operations_modules import logger
+from operations_modules import file_locations
+from operations_modules.app_cached_variables import database_variables
+from operations_modules.sqlite_database import database_connection_pool, get_sql_column_type, get_sql_numeric_value
+try:
+    import pyarrow
+    from pyarrow import parquet
+except ImportError as import_error:
+    pyarrow, parquet = None, None
+    logger.primary_logger.debug("pyarrow not installed - Parquet Data Exports Disabled: " + str(import_error))
+
+export_format_csv = "CSV"
+export_format_csv_gzip = "CSVGZ"
+export_format_ndjson = "NDJSON"
+export_format_parquet = "Parquet"
+export_formats = {export_format_csv: ["text/csv", ".csv"],
+                  export_format_csv_gzip: ["application/gzip", ".csv.gz"],
+                  export_format_ndjson: ["application/x-ndjson", ".ndjson"],
+                  export_format_parquet: ["application/vnd.apache.parquet", ".parquet"]}
+
+# Rows read from the database at a time, only this many rows are held in memory
+export_rows_per_fetch = 1000
+# Parquet row groups are written after this many rows, larger groups compress better but use more memory
+export_parquet_rows_per_group = 20000
+export_gzip_level = 6
+
+
+class CreateDataExport:
+    """
+    Creates a streamed export of a Interval or Trigger table's columns over a UTC DateTime range,
+    read from a database cursor a chunk at a time so memory use doesn't grow with the export size.
+    """
+
+    def __init__(self, sql_table, sql_columns, start_datetime, end_datetime, export_format,
+                 sql_database_location=file_locations.sensor_database):
+        self.sql_table = sql_table
+        self.sql_columns = sql_columns
+        self.start_datetime = start_datetime
+        self.end_datetime = end_datetime
+        self.export_format = export_format
+        self.sql_database_location = sql_database_location
+        self.rows_exported = 0
+
+    def get_mimetype(self):
+        return export_formats[self.export_format][0]
+
+    def get_file_extension(self):
+        return export_formats[self.export_format][1]
+
+    def get_chunks(self):
+        """ Yields the export as bytes, a chunk of rows at a time. """
+        if self.export_format == export_format_csv:
+            return self._get_csv_chunks()
+        elif self.export_format == export_format_csv_gzip:
+            return self._get_gzip_chunks(self._get_csv_chunks())
+        elif self.export_format == export_format_ndjson:
+            return self._get_ndjson_chunks()
+        return self._get_parquet_chunks()
+
+    def _get_row_chunks(self, sql_select_columns):
+        db_connection = database_connection_pool.get_long_read_connection(self.sql_database_location)
+        try:
+            db_cursor = db_connection.connection.cursor()
+            db_cursor.arraysize = export_rows_per_fetch
+            sql_query = "SELECT " + ",".join(sql_select_columns) + " FROM " + self.sql_table + \
+                        " WHERE DateTime BETWEEN ? AND ? ORDER BY DateTime"
+            # DateTimes are stored with milliseconds, include all of the End second
+            db_cursor.execute(sql_query, [self.start_datetime, self.end_datetime + ".999"])
+            while True:
+                sql_rows = db_cursor.fetchmany()
+                if not sql_rows:
+                    break
+                self.rows_exported += len(sql_rows)
+                yield sql_rows
+        finally:
+            db_connection.close()
+            logger.network_logger.debug("Data Export - " + str(self.rows_exported) + " " + self.sql_table + " Rows")
+
+    def _get_csv_chunks(self):
+        csv_buffer = io.StringIO()
+        csv_writer = csv.writer(csv_buffer)
+        csv_writer.writerow(self.sql_columns)
+        for sql_rows in self._get_row_chunks(self.sql_columns):
+            csv_writer.writerows(sql_rows)
+            yield csv_buffer.getvalue().encode()
+            csv_buffer.seek(0)
+            csv_buffer.truncate()
+        if csv_buffer.tell():
+            yield csv_buffer.getvalue().encode()
+
+    @staticmethod
+    def _get_gzip_chunks(chunks):
+        # wbits of 31 writes a gzip header & trailer around the deflate data
+        gzip_compressor = zlib.compressobj(export_gzip_level, zlib.DEFLATED, 31)
+        for chunk in chunks:
+            compressed_chunk = gzip_compressor.compress(chunk)
+            if compressed_chunk:
+                yield compressed_chunk
+        yield gzip_compressor.flush()
+
+    def _get_ndjson_chunks(self):
+        for sql_rows in self._get_row_chunks(self.sql_columns):
+            json_lines = [json.dumps(dict(zip(self.sql_columns, sql_row))) for sql_row in sql_rows]
+            yield ("\n".join(json_lines) + "\n").encode()
+
+    def _get_parquet_chunks(self):
+        # Numeric columns are read as numbers, text like 'NoSensor' becomes NULL, so each column has one type
+        sql_select_columns = []
+        schema_fields = []
+        for column in self.sql_columns:
+            column_type = get_sql_column_type(column)
+            if column_type == "TEXT":
+                sql_select_columns.append(column)
+                schema_fields.append(pyarrow.field(column, pyarrow.string()))
+            else:
+                sql_select_columns.append(get_sql_numeric_value(column) + " AS " + column)
+                schema_fields.append(pyarrow.field(column, pyarrow.float64()))
+        parquet_schema = pyarrow.schema(schema_fields)
+
+        parquet_buffer = _CreateParquetStreamBuffer()
+        parquet_writer = parquet.ParquetWriter(parquet_buffer, parquet_schema)
+        group_rows = []
+        for sql_rows in self._get_row_chunks(sql_select_columns):
+            group_rows += sql_rows
+            if len(group_rows) >= export_parquet_rows_per_group:
+                parquet_writer.write_table(_get_parquet_table(group_rows, parquet_schema))
+                group_rows = []
+                yield parquet_buffer.take_bytes()
+        if group_rows:
+            parquet_writer.write_table(_get_parquet_table(group_rows, parquet_schema))
+        parquet_writer.close()
+        yield parquet_buffer.take_bytes()
+
+
+class _CreateParquetStreamBuffer(io.RawIOBase):
+    """ Creates a write only file for ParquetWriter, holding written bytes until they're taken to be sent. """
+
+    def __init__(self):
+        super().__init__()
+        self.written_bytes = bytearray()
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.written_bytes += data
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def take_bytes(self):
+        taken_bytes = bytes(self.written_bytes)
+        self.written_bytes = bytearray()
+        return taken_bytes
+
+
+def _get_parquet_table(sql_rows, parquet_schema):
+    columns_data = [list(column_data) for column_data in zip(*sql_rows)]
+    return pyarrow.Table.from_arrays([pyarrow.array(column_data, type=field.type)
+                                      for column_data, field in zip(columns_data, parquet_schema)],
+                                     schema=parquet_schema)
+
+
+def get_data_export(sql_table, sql_columns, start_datetime, end_datetime, export_format):
+    """
+    Returns a CreateDataExport for the provided table, columns, UTC DateTime range & format,
+    or an error message as a String if any of them are not valid.
+    """
+    if sql_table not in [database_variables.table_interval, database_variables.table_trigger]:
+        return "Table must be " + database_variables.table_interval + " or " + database_variables.table_trigger
+    if export_format not in export_formats:
+        return "Format must be one of " + ", ".join(export_formats)
+    if export_format == export_format_parquet and pyarrow is None:
+        return "Parquet exports need the pyarrow Python module, which is not installed"
+
+    table_columns = database_variables.get_sensor_columns_list()
+    if sql_table == database_variables.table_trigger:
+        table_columns = table_columns + [database_variables.trigger_state]
+    if sql_columns is None:
+        sql_columns = table_columns
+    bad_columns = [column for column in sql_columns if column not in table_columns]
+    if bad_columns:
+        return "Unknown Columns: " + ", ".join(bad_columns)
+    sql_columns = [database_variables.all_tables_datetime] + \
+                  [column for column in sql_columns if column != database_variables.all_tables_datetime]
+
+    clean_datetimes = []
+    for var_datetime in [start_datetime, end_datetime]:
+        clean_datetime = _get_clean_datetime(var_datetime)
+        if clean_datetime is None:
+            return "Start & End must be UTC DateTimes like 2020-01-31 23:59:59"
+        clean_datetimes.append(clean_datetime)
+    return CreateDataExport(sql_table, sql_columns, clean_datetimes[0], clean_datetimes[1], export_format)
+
+
+def _get_clean_datetime(var_datetime):
+    for datetime_format in ["%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d"]:
+        try:
+            return datetime.strptime(var_datetime.replace("T", " "), datetime_format).strftime("%Y-%m-%d %H:%M:%S")
+        except (AttributeError, ValueError):
+            pass
+    return None
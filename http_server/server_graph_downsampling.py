@@ -0,0 +1,289 @@
+"""
+    KootNet Sensors is a collection of programs and scripts to deploy,
+    interact with, and collect readings from various Sensors.
+    Copyright (C) 2018  Chad Ermacora  chad.ermacora@gmail.com
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from datetime import datetime
+from operations_modules import logger
+from operations_modules.app_generic_functions import adjust_datetime
+from operations_modules import file_locations
+from operations_modules.app_cached_variables import database_variables
+from operations_modules.sqlite_database import sql_execute_get_data, get_sql_columns_data, get_sql_numeric_value
+from sensor_recording_modules import recording_rollups
+try:
+    import numpy
+except ImportError as import_error:
+    numpy = None
+    log_message = "**** Missing NumPy - LTTB Graph Downsampling will use Min/Max instead: "
+    logger.primary_logger.error(log_message + str(import_error))
+
+downsample_mode_min_max = "MinMax"
+downsample_mode_lttb = "LTTB"
+downsample_mode_none = "None"
+
+# LTTB runs on raw rows up to this count, larger time frames are first reduced to this by SQL Min/Max buckets
+lttb_max_input_rows = 100000
+
+text_columns = [database_variables.sensor_name, database_variables.ip]
+
+
+def get_downsampled_columns_data(sql_columns, sql_table=database_variables.table_interval,
+                                 start_datetime="1111-08-21 00:00:01", end_datetime="9999-01-01 00:00:01",
+                                 max_points=2000, downsample_mode=downsample_mode_min_max,
+                                 sql_database_location=file_locations.sensor_database):
+    """
+    Returns DateTime and the provided columns as a dictionary of column: [DateTimes, Values], oldest first,
+    with each column reduced to about max_points, evenly spread over the time frame.
+
+    Modes:
+    MinMax - Splits the time frame into max_points / 2 buckets and keeps each bucket's min & max. Done in SQL.
+    LTTB - Largest-Triangle-Three-Buckets, keeps the points that best preserve the shape of the line. Uses NumPy.
+    None - Returns up to max_points rows without downsampling.
+
+    MinMax buckets are read from the coarsest Interval rollup table that still fits in a bucket, when there is one.
+    """
+    sql_columns = [column for column in sql_columns if column != database_variables.all_tables_datetime]
+    sql_where = " WHERE DateTime BETWEEN datetime('" + start_datetime + "') AND datetime('" + end_datetime + "')"
+    sql_query = "SELECT min(DateTime), max(DateTime) FROM " + sql_table + sql_where
+    datetime_range_rows = sql_execute_get_data(sql_query, sql_database_location)
+    # Counting stops past the most rows used without buckets, so long time frames don't count every row
+    sql_query = "SELECT count(*) FROM (SELECT 1 FROM " + sql_table + sql_where + \
+                " LIMIT " + str(max(max_points, lttb_max_input_rows) + 1) + ")"
+    row_count_rows = sql_execute_get_data(sql_query, sql_database_location)
+    if not datetime_range_rows or not row_count_rows:
+        # The queries failed, like from a missing table or database
+        return _get_empty_columns_data(sql_columns)
+    first_datetime, last_datetime = datetime_range_rows[0]
+    row_count = row_count_rows[0][0]
+
+    if downsample_mode == downsample_mode_lttb and numpy is None:
+        downsample_mode = downsample_mode_min_max
+    if downsample_mode == downsample_mode_none or row_count <= max_points or first_datetime == last_datetime:
+        return get_sql_columns_data(sql_columns, sql_table=sql_table, start_datetime=start_datetime,
+                                    end_datetime=end_datetime, max_rows=max_points,
+                                    sql_database_location=sql_database_location)
+
+    bucket_datetimes = [start_datetime, end_datetime, first_datetime, last_datetime]
+    if downsample_mode == downsample_mode_min_max:
+        return _get_min_max_buckets(sql_columns, sql_table, bucket_datetimes,
+                                    max(1, int(max_points / 2)), sql_database_location)
+    elif row_count <= lttb_max_input_rows:
+        columns_data = get_sql_columns_data(sql_columns, sql_table=sql_table, start_datetime=start_datetime,
+                                            end_datetime=end_datetime, max_rows=row_count,
+                                            sql_database_location=sql_database_location)
+    else:
+        columns_data = _get_min_max_buckets(sql_columns, sql_table, bucket_datetimes,
+                                            int(lttb_max_input_rows / 2), sql_database_location)
+
+    kept_datetimes = set()
+    for column in sql_columns:
+        if column in text_columns:
+            columns_data[column] = _get_text_changes_column(columns_data[column])
+        else:
+            columns_data[column] = _get_lttb_column(columns_data[column], max_points)
+        kept_datetimes.update(columns_data[column][0])
+    datetime_list = sorted(kept_datetimes)
+    columns_data[database_variables.all_tables_datetime] = [datetime_list, datetime_list]
+    return columns_data
+
+
+def _get_empty_columns_data(sql_columns):
+    columns_data = {database_variables.all_tables_datetime: [[], []]}
+    for column in sql_columns:
+        columns_data[column] = [[], []]
+    return columns_data
+
+
+def _get_min_max_buckets(sql_columns, sql_table, bucket_datetimes, bucket_count, sql_database_location):
+    """
+    Returns each column's min & max per time bucket, using a single SQL aggregate query.
+    bucket_datetimes is the requested [start, end] followed by the first & last DateTime found in between.
+    """
+    start_datetime, end_datetime, first_datetime, last_datetime = bucket_datetimes
+    time_frame_seconds = (_get_datetime(last_datetime) - _get_datetime(first_datetime)).total_seconds()
+    sql_source = _get_sql_bucket_source(sql_columns, sql_table, start_datetime, end_datetime,
+                                        time_frame_seconds / bucket_count, sql_database_location)
+
+    sql_bucket_seconds = "(julianday('" + last_datetime + "') - julianday('" + first_datetime + "')) * 86400.0"
+    # The last DateTime lands on bucket_count, so it's folded into the final bucket
+    sql_bucket = "max(0, min(CAST((julianday(DateTime) - julianday('" + first_datetime + "')) * 86400.0 / (" + \
+                 sql_bucket_seconds + " / " + str(bucket_count) + ") AS INTEGER), " + str(bucket_count - 1) + "))"
+
+    sql_aggregates = []
+    for column in sql_columns:
+        if column in text_columns:
+            sql_aggregates += ["max(" + column + ")", "max(" + column + ")"]
+        else:
+            sql_aggregates += ["min(" + column + database_variables.rollup_min + ")",
+                               "max(" + column + database_variables.rollup_max + ")"]
+    sql_query = "SELECT min(DateTime)," + ",".join(sql_aggregates) + " FROM (" + sql_source + ")" + \
+                " GROUP BY " + sql_bucket + " ORDER BY 1"
+    sql_rows = sql_execute_get_data(sql_query, sql_database_location)
+
+    datetime_list = [row[0] for row in sql_rows]
+    columns_data = {database_variables.all_tables_datetime: [datetime_list, datetime_list]}
+    for index, column in enumerate(sql_columns):
+        column_datetime_list = []
+        column_values_list = []
+        for row in sql_rows:
+            bucket_min = row[index * 2 + 1]
+            bucket_max = row[index * 2 + 2]
+            if bucket_min is None:
+                continue
+            if column in text_columns or bucket_min == bucket_max:
+                bucket_values = [bucket_min]
+            elif column_values_list and abs(column_values_list[-1] - bucket_max) < \
+                    abs(column_values_list[-1] - bucket_min):
+                # Draw from whichever is closer to the previous point, to avoid a saw tooth line
+                bucket_values = [bucket_max, bucket_min]
+            else:
+                bucket_values = [bucket_min, bucket_max]
+            for value in bucket_values:
+                column_datetime_list.append(row[0])
+                column_values_list.append(value)
+        columns_data[column] = [column_datetime_list, column_values_list]
+    return columns_data
+
+
+def _get_sql_bucket_source(sql_columns, sql_table, start_datetime, end_datetime, bucket_seconds,
+                           sql_database_location):
+    """
+    Returns a SQL query of DateTime, text columns and each numeric column's Min & Max over the time frame.
+    Interval data is read from the coarsest rollups with buckets no larger then bucket_seconds,
+    then finer rollups, then the Interval rows not yet rolled up.
+    """
+    sql_raw_columns = [database_variables.all_tables_datetime]
+    sql_rollup_columns = [database_variables.all_tables_datetime]
+    for column in sql_columns:
+        if column in text_columns:
+            sql_raw_columns.append(column)
+            sql_rollup_columns.append(column)
+        else:
+            sql_numeric_value = get_sql_numeric_value(column)
+            sql_raw_columns += [sql_numeric_value + " AS " + column + database_variables.rollup_min,
+                                sql_numeric_value + " AS " + column + database_variables.rollup_max]
+            sql_rollup_columns += [column + database_variables.rollup_min, column + database_variables.rollup_max]
+
+    sql_selects = []
+    sql_source_start = "datetime('" + start_datetime + "')"
+    sql_source_end = " AND DateTime <= datetime('" + end_datetime + "')"
+    rollup_columns = database_variables.get_rollup_columns_list()
+    if sql_table == database_variables.table_interval and \
+            all(column in rollup_columns for column in sql_rollup_columns[1:]):
+        for rollup_level in reversed(recording_rollups.rollup_levels):
+            if rollup_level.bucket_seconds > bucket_seconds:
+                continue
+            complete_before = recording_rollups.get_rollup_complete_before(rollup_level, sql_database_location)
+            if complete_before is not None:
+                sql_selects.append("SELECT " + ",".join(sql_rollup_columns) + " FROM " + rollup_level.table_name +
+                                   " WHERE DateTime >= " + sql_source_start +
+                                   " AND DateTime < '" + complete_before + "'" + sql_source_end)
+                sql_source_start = "max(" + sql_source_start + ", '" + complete_before + "')"
+    sql_selects.append("SELECT " + ",".join(sql_raw_columns) + " FROM " + sql_table +
+                       " WHERE DateTime >= " + sql_source_start + sql_source_end)
+    return " UNION ALL ".join(sql_selects)
+
+
+def get_adjusted_datetimes(datetime_list, hour_offset):
+    """
+    Returns the provided DateTime strings adjusted by the hour offset, as a list of "YYYY-MM-DD HH:MM:SS" strings.
+    Converts the whole list at once with NumPy, falling back to adjusting each unique DateTime on its own.
+    """
+    if numpy is not None and datetime_list:
+        try:
+            datetimes = numpy.array(datetime_list, dtype="datetime64[ms]").astype("datetime64[s]")
+            datetimes += numpy.timedelta64(int(round(hour_offset * 3600)), "s")
+            return numpy.char.replace(numpy.datetime_as_string(datetimes, unit="s"), "T", " ").tolist()
+        except ValueError as error:
+            logger.primary_logger.debug("Graph DateTimes not in ISO format, adjusting one at a time: " + str(error))
+
+    # Each DateTime is adjusted once, then shared by every time it's repeated
+    adjusted_datetimes = {}
+    for var_datetime in datetime_list:
+        if var_datetime not in adjusted_datetimes:
+            adjusted_datetimes[var_datetime] = adjust_datetime(var_datetime, hour_offset)
+    return [adjusted_datetimes[var_datetime] for var_datetime in datetime_list]
+
+
+def _get_datetime(datetime_str):
+    if len(datetime_str) > 19:
+        return datetime.strptime(datetime_str, "%Y-%m-%d %H:%M:%S.%f")
+    return datetime.strptime(datetime_str, "%Y-%m-%d %H:%M:%S")
+
+
+def _get_text_changes_column(column_data):
+    """ Returns the provided [DateTimes, Values] with only the first, last and changed values. """
+    datetime_list, values_list = column_data
+    changes_datetime_list = []
+    changes_values_list = []
+    for index, value in enumerate(values_list):
+        if index == 0 or index == len(values_list) - 1 or value != values_list[index - 1]:
+            changes_datetime_list.append(datetime_list[index])
+            changes_values_list.append(value)
+    return [changes_datetime_list, changes_values_list]
+
+
+def _get_lttb_column(column_data, max_points):
+    """ Returns the provided [DateTimes, Values] reduced to max_points using Largest-Triangle-Three-Buckets. """
+    datetime_list, values_list = column_data
+    numeric_datetime_list = []
+    numeric_values_list = []
+    for var_datetime, value in zip(datetime_list, values_list):
+        try:
+            numeric_values_list.append(float(value))
+            numeric_datetime_list.append(var_datetime)
+        except (TypeError, ValueError):
+            pass
+    if len(numeric_values_list) <= max_points:
+        return [numeric_datetime_list, numeric_values_list]
+
+    x_values = numpy.array(numeric_datetime_list, dtype="datetime64[ms]").astype(numpy.float64)
+    y_values = numpy.array(numeric_values_list, dtype=numpy.float64)
+    kept_indexes = get_lttb_indexes(x_values, y_values, max_points)
+    return [[numeric_datetime_list[index] for index in kept_indexes], y_values[kept_indexes].tolist()]
+
+
+def get_lttb_indexes(x_values, y_values, target_points):
+    """
+    Returns the indexes of the points kept by Largest-Triangle-Three-Buckets, as a NumPy array.
+    The first and last points are always kept, each bucket in between keeps the point forming the largest
+    triangle with the previously kept point and the average of the next bucket.
+    """
+    point_count = len(x_values)
+    if target_points >= point_count or target_points < 3:
+        return numpy.arange(point_count)
+
+    bucket_edges = numpy.linspace(1, point_count - 1, target_points - 1).astype(numpy.int64)
+    bucket_edges = numpy.append(bucket_edges, point_count)
+    kept_indexes = numpy.empty(target_points, dtype=numpy.int64)
+    kept_indexes[0] = 0
+    kept_indexes[-1] = point_count - 1
+
+    previous_index = 0
+    for bucket_number in range(target_points - 2):
+        bucket_start = bucket_edges[bucket_number]
+        bucket_end = bucket_edges[bucket_number + 1]
+        next_bucket_end = bucket_edges[bucket_number + 2]
+        next_average_x = x_values[bucket_end:next_bucket_end].mean()
+        next_average_y = y_values[bucket_end:next_bucket_end].mean()
+
+        previous_x = x_values[previous_index]
+        previous_y = y_values[previous_index]
+        triangle_areas = numpy.abs((previous_x - next_average_x) * (y_values[bucket_start:bucket_end] - previous_y) -
+                                   (previous_x - x_values[bucket_start:bucket_end]) * (next_average_y - previous_y))
+        previous_index = bucket_start + int(triangle_areas.argmax())
+        kept_indexes[bucket_number + 1] = previous_index
+    return kept_indexes
@@ -20,6 +20,7 @@ from operations_modules import logger
 from operations_modules import file_locations
 from operations_modules.app_generic_functions import CreateMonitoredThread
 from operations_modules import app_cached_variables
+from operations_modules.startup_profile import startup_profile
 from operations_modules.app_cached_variables_update import update_cached_variables
 from configuration_modules import app_config_access
 
@@ -138,6 +139,8 @@ class CreateSensorHTTP:
             http_server = WSGIServer((flask_http_ip, flask_port_number), app,
                                      keyfile=file_locations.http_ssl_key,
                                      certfile=file_locations.http_ssl_crt)
+            http_server.start()
+            startup_profile.set_web_portal_ready()
             logger.primary_logger.info(" -- HTTPS Server Started on port " + str(flask_port_number))
             http_server.serve_forever()
         except Exception as error:
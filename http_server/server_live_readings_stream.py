@@ -0,0 +1,169 @@
+"""
+    KootNet Sensors is a collection of programs and scripts to deploy,
+    interact with, and collect readings from various Sensors.
+    Copyright (C) 2018  Chad Ermacora  chad.ermacora@gmail.com
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import json
+import time
+from threading import Lock
+from operations_modules import logger
+from operations_modules.app_generic_functions import thread_function
+from operations_modules.app_cached_variables import database_variables
+from sensor_modules import sensor_access
+from sensor_modules import sensor_sampling
+try:
+    from gevent import sleep as stream_sleep
+except ImportError as import_error:
+    stream_sleep = time.sleep
+    log_message = "**** Missing gevent - Live Reading Streams will hold a thread per client: "
+    logger.primary_logger.warning(log_message + str(import_error))
+
+# Seconds between checking for new readings while clients are streaming, matches the default sensor sampling rate
+stream_publish_seconds = sensor_sampling.sampling_rate_default_seconds
+# Seconds between each client checking for readings to send
+stream_client_wait_seconds = 0.25
+# Seconds between comments sent to clients with nothing new, so proxies & browsers keep the connection open
+stream_keep_alive_seconds = 15.0
+# Clients that haven't taken their readings in this long are disconnected
+stream_client_timeout_seconds = 60.0
+stream_max_clients = 20
+
+_stream_lock = Lock()
+_stream_clients = []
+_stream_publisher_running = False
+# SQL Column: Latest published reading, sent to new clients so they don't wait for the next change
+_latest_readings = {}
+
+
+class CreateStreamClient:
+    """
+    Creates a live readings stream client, subscribed to the provided Interval database columns.
+    Unsent readings are kept by column, so a slow client gets each measurement's newest reading
+    instead of a growing backlog.
+    """
+
+    def __init__(self, sql_columns):
+        self.sql_columns = set(sql_columns)
+        self.pending_readings = {}
+        self.dropped_readings_count = 0
+        self.last_taken_time = time.monotonic()
+        self.is_closed = False
+
+    def add_readings(self, new_readings):
+        """ Queues the subscribed readings from new_readings. Call with _stream_lock held. """
+        for sql_column, reading in new_readings.items():
+            if sql_column in self.sql_columns:
+                if sql_column in self.pending_readings:
+                    self.dropped_readings_count += 1
+                self.pending_readings[sql_column] = reading
+
+    def take_pending_readings(self):
+        """ Returns and clears the readings waiting to be sent. """
+        with _stream_lock:
+            pending_readings = self.pending_readings
+            self.pending_readings = {}
+            self.last_taken_time = time.monotonic()
+        return pending_readings
+
+
+def add_stream_client(sql_columns=None):
+    """
+    Returns a new CreateStreamClient for the provided columns, or all sensor columns if None.
+    Returns None when stream_max_clients are already streaming.
+    """
+    global _stream_publisher_running
+    sensor_columns = database_variables.get_sensor_columns_list()
+    if sql_columns is None:
+        sql_columns = sensor_columns
+    stream_client = CreateStreamClient([column for column in sql_columns if column in sensor_columns])
+    with _stream_lock:
+        if len(_stream_clients) >= stream_max_clients:
+            return None
+        stream_client.add_readings(_latest_readings)
+        _stream_clients.append(stream_client)
+        if not _stream_publisher_running:
+            _stream_publisher_running = True
+            thread_function(_stream_publisher)
+    logger.network_logger.debug("Live Readings Stream - " + str(len(_stream_clients)) + " Clients")
+    return stream_client
+
+
+def remove_stream_client(stream_client):
+    with _stream_lock:
+        stream_client.is_closed = True
+        if stream_client in _stream_clients:
+            _stream_clients.remove(stream_client)
+
+
+def get_stream_events(stream_client):
+    """ Yields Server-Sent Events of the client's new readings as JSON, until the client disconnects. """
+    try:
+        yield "retry: 5000\n\n"
+        last_sent_time = time.monotonic()
+        while not stream_client.is_closed:
+            pending_readings = stream_client.take_pending_readings()
+            if pending_readings:
+                last_sent_time = time.monotonic()
+                yield "event: readings\ndata: " + json.dumps(pending_readings) + "\n\n"
+            elif time.monotonic() - last_sent_time > stream_keep_alive_seconds:
+                last_sent_time = time.monotonic()
+                yield ": keep-alive\n\n"
+            stream_sleep(stream_client_wait_seconds)
+    finally:
+        remove_stream_client(stream_client)
+
+
+def get_stream_status_str():
+    """ Returns the number of streaming clients and readings dropped for slow clients, as a human readable String. """
+    with _stream_lock:
+        dropped_readings_count = sum([client.dropped_readings_count for client in _stream_clients])
+        return str(len(_stream_clients)) + " Streaming Clients || " + \
+            str(dropped_readings_count) + " Readings Replaced Before Sending"
+
+
+def _stream_publisher():
+    """ Reads the sensor readings subscribed to and queues the new ones for each client, until no clients remain. """
+    global _stream_publisher_running
+    while True:
+        with _stream_lock:
+            timeout_cutoff = time.monotonic() - stream_client_timeout_seconds
+            for stream_client in list(_stream_clients):
+                if stream_client.last_taken_time < timeout_cutoff:
+                    stream_client.is_closed = True
+                    _stream_clients.remove(stream_client)
+            if not _stream_clients:
+                _stream_publisher_running = False
+                _latest_readings.clear()
+                return
+            subscribed_columns = set()
+            for stream_client in _stream_clients:
+                subscribed_columns.update(stream_client.sql_columns)
+
+        new_readings = {}
+        try:
+            # One read shared by every client, from the sampling store when recent enough
+            for sql_column, reading in sensor_access.get_readings_by_sql_column(subscribed_columns).items():
+                latest_reading = _latest_readings.get(sql_column)
+                if latest_reading is None or latest_reading["CaptureDateTime"] != reading["CaptureDateTime"]:
+                    new_readings[sql_column] = reading
+        except Exception as error:
+            logger.network_logger.error("Live Readings Stream - Unable to get Readings: " + str(error))
+
+        with _stream_lock:
+            _latest_readings.update(new_readings)
+            for stream_client in _stream_clients:
+                stream_client.add_readings(new_readings)
+        time.sleep(stream_publish_seconds)
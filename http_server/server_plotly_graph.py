@@ -16,14 +16,14 @@
     You should have received a copy of the GNU General Public License
     along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
-from multiprocessing import Process
+import queue
+from multiprocessing import Process, Queue
 from operations_modules import app_cached_variables
 from operations_modules import logger
 from operations_modules import file_locations
 from operations_modules.app_generic_functions import adjust_datetime
-from operations_modules.sqlite_database import sql_execute_get_data
+from http_server import server_graph_downsampling
 from http_server import server_plotly_graph_extras
-from http_server import server_plotly_graph_variables
 try:
     from plotly import subplots, offline, io as plotly_io
 except ImportError as import_error:
@@ -33,171 +33,136 @@ except ImportError as import_error:
 
 plotly_io.templates.default = app_cached_variables.plotly_theme
 
-
-def create_plotly_graph(new_graph_data):
-    """ Create Plotly offline HTML Graph, based on user selections in the Web Portal Graphing section. """
-    server_plotly_graph_variables.graph_creation_in_progress = True
-
-    if new_graph_data.graph_table is "Triggers":
-        new_graph_data.bypass_sql_skip = True
+_db_v = app_cached_variables.database_variables
+# SQL Column: [CreateGraphData data attribute, CreateGraphData DateTime attribute]
+graph_data_attribute_names = {
+    _db_v.ip: ["sql_ip", "sql_ip_date_time"],
+    _db_v.sensor_name: ["sql_host_name", "sql_host_name_date_time"],
+    _db_v.sensor_uptime: ["sql_up_time", "sql_up_time_date_time"],
+    _db_v.system_temperature: ["sql_cpu_temp", "sql_cpu_temp_date_time"],
+    _db_v.env_temperature: ["sql_hat_temp", "sql_hat_temp_date_time"],
+    _db_v.pressure: ["sql_pressure", "sql_pressure_date_time"],
+    _db_v.altitude: ["sql_altitude", "sql_altitude_date_time"],
+    _db_v.humidity: ["sql_humidity", "sql_humidity_date_time"],
+    _db_v.distance: ["sql_distance", "sql_distance_date_time"],
+    _db_v.gas_resistance_index: ["sql_gas_resistance", "sql_gas_resistance_date_time"],
+    _db_v.gas_oxidising: ["sql_gas_oxidising", "sql_gas_oxidising_date_time"],
+    _db_v.gas_reducing: ["sql_gas_reducing", "sql_gas_reducing_date_time"],
+    _db_v.gas_nh3: ["sql_gas_nh3", "sql_gas_nh3_date_time"],
+    _db_v.particulate_matter_1: ["sql_pm_1", "sql_pm_1_date_time"],
+    _db_v.particulate_matter_2_5: ["sql_pm_2_5", "sql_pm_2_5_date_time"],
+    _db_v.particulate_matter_10: ["sql_pm_10", "sql_pm_10_date_time"],
+    _db_v.lumen: ["sql_lumen", "sql_lumen_date_time"],
+    _db_v.red: ["sql_red", "sql_red_date_time"],
+    _db_v.orange: ["sql_orange", "sql_orange_date_time"],
+    _db_v.yellow: ["sql_yellow", "sql_yellow_date_time"],
+    _db_v.green: ["sql_green", "sql_green_date_time"],
+    _db_v.blue: ["sql_blue", "sql_blue_date_time"],
+    _db_v.violet: ["sql_violet", "sql_violet_date_time"],
+    _db_v.ultra_violet_index: ["sql_uv_index", "sql_uv_index_date_time"],
+    _db_v.ultra_violet_a: ["sql_uv_a", "sql_uv_a_date_time"],
+    _db_v.ultra_violet_b: ["sql_uv_b", "sql_uv_b_date_time"],
+    _db_v.acc_x: ["sql_acc_x", "sql_acc_x_date_time"],
+    _db_v.acc_y: ["sql_acc_y", "sql_acc_y_date_time"],
+    _db_v.acc_z: ["sql_acc_z", "sql_acc_z_date_time"],
+    _db_v.mag_x: ["sql_mg_x", "sql_mg_x_date_time"],
+    _db_v.mag_y: ["sql_mg_y", "sql_mg_y_date_time"],
+    _db_v.mag_z: ["sql_mg_z", "sql_mg_z_date_time"],
+    _db_v.gyro_x: ["sql_gyro_x", "sql_gyro_x_date_time"],
+    _db_v.gyro_y: ["sql_gyro_y", "sql_gyro_y_date_time"],
+    _db_v.gyro_z: ["sql_gyro_z", "sql_gyro_z_date_time"]
+}
+
+
+def create_plotly_graph(new_graph_data, progress_function=None):
+    """
+    Creates a Plotly offline HTML Graph in a separate process & waits for it to finish.
+    progress_function is called with the progress percent & message as the graph is created.
+    Returns True if the graph was created.
+    """
+    if new_graph_data.graph_table == app_cached_variables.database_variables.table_trigger:
+        # Trigger entries are already sparse & each one matters, don't thin them out
+        new_graph_data.downsample_mode = server_graph_downsampling.downsample_mode_none
 
     logger.primary_logger.info("Plotly Graph Generation Started")
-    graph_multiprocess = Process(target=_start_plotly_graph, args=(new_graph_data,))
+    progress_queue = Queue()
+    graph_multiprocess = Process(target=_start_plotly_graph, args=(new_graph_data, progress_queue))
     graph_multiprocess.start()
+    progress_percent = 0
+    while True:
+        try:
+            progress_percent, progress_message = progress_queue.get(timeout=1)
+        except queue.Empty:
+            if graph_multiprocess.is_alive():
+                continue
+            break
+        if progress_function is not None:
+            progress_function(progress_percent, progress_message)
     graph_multiprocess.join()
     logger.primary_logger.info("Plotly Graph Generation Complete")
-    server_plotly_graph_variables.graph_creation_in_progress = False
+    return progress_percent == 100
+
+
+def get_sql_graph_window(graph_data):
+    """ Returns the graph's start & end DateTime adjusted to the Database timezone (UTC 0), as a list. """
+    new_time_offset = graph_data.datetime_offset * -1
+    get_sql_graph_start = adjust_datetime(graph_data.graph_start, new_time_offset)
+    get_sql_graph_end = adjust_datetime(graph_data.graph_end, new_time_offset)
+    return [get_sql_graph_start, get_sql_graph_end]
 
 
-def _start_plotly_graph(graph_data):
+def _start_plotly_graph(graph_data, progress_queue=None):
     """ Creates a Offline Plotly graph from a SQL database. """
     logger.primary_logger.debug("SQL Columns: " + str(graph_data.graph_columns))
     logger.primary_logger.debug("SQL Table(s): " + graph_data.graph_table)
     logger.primary_logger.debug("SQL Start DateTime: " + graph_data.graph_start)
     logger.primary_logger.debug("SQL End DateTime: " + graph_data.graph_end)
+    _send_progress(progress_queue, 10, "Reading Database")
 
     # Adjust dates to Database timezone in UTC 0
     sql_column_names = app_cached_variables.database_variables
-    new_time_offset = graph_data.datetime_offset * -1
-    get_sql_graph_start = adjust_datetime(graph_data.graph_start, new_time_offset)
-    get_sql_graph_end = adjust_datetime(graph_data.graph_end, new_time_offset)
+    get_sql_graph_start, get_sql_graph_end = get_sql_graph_window(graph_data)
+
+    logger.primary_logger.debug("Graph Downsampling: " + graph_data.downsample_mode + " to " +
+                                str(graph_data.max_graph_points) + " Points")
+    columns_data = server_graph_downsampling.get_downsampled_columns_data(
+        graph_data.graph_columns, sql_table=graph_data.graph_table,
+        start_datetime=get_sql_graph_start, end_datetime=get_sql_graph_end,
+        max_points=graph_data.max_graph_points, downsample_mode=graph_data.downsample_mode,
+        sql_database_location=graph_data.db_location)
+
+    _send_progress(progress_queue, 40, "Adjusting DateTimes")
+    # Each DateTime is adjusted once, then shared by every column it has a reading in
+    datetime_list = columns_data[sql_column_names.all_tables_datetime][0]
+    adjusted_datetime_list = server_graph_downsampling.get_adjusted_datetimes(datetime_list,
+                                                                              graph_data.datetime_offset)
+    adjusted_date_times = dict(zip(datetime_list, adjusted_datetime_list))
 
     for var_column in graph_data.graph_columns:
-        var_sql_query = "SELECT " + var_column + \
-                        " FROM " + graph_data.graph_table + \
-                        " WHERE " + var_column + \
-                        " IS NOT NULL AND DateTime BETWEEN datetime('" + get_sql_graph_start + \
-                        "') AND datetime('" + get_sql_graph_end + \
-                        "') AND ROWID % " + str(graph_data.sql_queries_skip + 1) + " = 0" + \
-                        " LIMIT " + str(graph_data.max_sql_queries)
-
-        var_time_sql_query = "SELECT " + sql_column_names.all_tables_datetime + \
-                             " FROM " + graph_data.graph_table + \
-                             " WHERE " + var_column + \
-                             " IS NOT NULL AND DateTime BETWEEN datetime('" + get_sql_graph_start + \
-                             "') AND datetime('" + get_sql_graph_end + \
-                             "') AND ROWID % " + str(graph_data.sql_queries_skip + 1) + " = 0" + \
-                             " LIMIT " + str(graph_data.max_sql_queries)
-
-        # Get accompanying DateTime based on sensor data actually being present
-        original_sql_column_date_time = sql_execute_get_data(var_time_sql_query)
-        sql_column_date_time = []
-        for var_d_time in original_sql_column_date_time:
-            sql_column_date_time.append(adjust_datetime(var_d_time[0], graph_data.datetime_offset))
+        column_date_times, column_data = columns_data[var_column]
+        sql_column_date_time = [adjusted_date_times[var_d_time] for var_d_time in column_date_times]
         if var_column == sql_column_names.all_tables_datetime:
             graph_data.sql_time = sql_column_date_time
-        elif var_column == sql_column_names.ip:
-            graph_data.sql_ip = _clean_sql_query_return(sql_execute_get_data(var_sql_query))
-            graph_data.sql_ip_date_time = sql_column_date_time
-        elif var_column == sql_column_names.sensor_name:
-            graph_data.sql_host_name = _clean_sql_query_return(sql_execute_get_data(var_sql_query))
-            graph_data.sql_host_name_date_time = sql_column_date_time
-        elif var_column == sql_column_names.sensor_uptime:
-            graph_data.sql_up_time = _clean_sql_query_return(sql_execute_get_data(var_sql_query))
-            graph_data.sql_up_time_date_time = sql_column_date_time
-        elif var_column == sql_column_names.system_temperature:
-            graph_data.sql_cpu_temp = _clean_sql_query_return(sql_execute_get_data(var_sql_query))
-            graph_data.sql_cpu_temp_date_time = sql_column_date_time
-        elif var_column == sql_column_names.env_temperature:
-            graph_data.sql_hat_temp = _clean_sql_query_return(sql_execute_get_data(var_sql_query))
-            graph_data.sql_hat_temp_date_time = sql_column_date_time
-        elif var_column == sql_column_names.pressure:
-            graph_data.sql_pressure = _clean_sql_query_return(sql_execute_get_data(var_sql_query))
-            graph_data.sql_pressure_date_time = sql_column_date_time
-        elif var_column == sql_column_names.altitude:
-            graph_data.sql_altitude = _clean_sql_query_return(sql_execute_get_data(var_sql_query))
-            graph_data.sql_altitude_date_time = sql_column_date_time
-        elif var_column == sql_column_names.humidity:
-            graph_data.sql_humidity = _clean_sql_query_return(sql_execute_get_data(var_sql_query))
-            graph_data.sql_humidity_date_time = sql_column_date_time
-        elif var_column == sql_column_names.distance:
-            graph_data.sql_distance = _clean_sql_query_return(sql_execute_get_data(var_sql_query))
-            graph_data.sql_distance_date_time = sql_column_date_time
-        elif var_column == sql_column_names.gas_resistance_index:
-            graph_data.sql_gas_resistance = _clean_sql_query_return(sql_execute_get_data(var_sql_query))
-            graph_data.sql_gas_resistance_date_time = sql_column_date_time
-        elif var_column == sql_column_names.gas_oxidising:
-            graph_data.sql_gas_oxidising = _clean_sql_query_return(sql_execute_get_data(var_sql_query))
-            graph_data.sql_gas_oxidising_date_time = sql_column_date_time
-        elif var_column == sql_column_names.gas_reducing:
-            graph_data.sql_gas_reducing = _clean_sql_query_return(sql_execute_get_data(var_sql_query))
-            graph_data.sql_gas_reducing_date_time = sql_column_date_time
-        elif var_column == sql_column_names.gas_nh3:
-            graph_data.sql_gas_nh3 = _clean_sql_query_return(sql_execute_get_data(var_sql_query))
-            graph_data.sql_gas_nh3_date_time = sql_column_date_time
-        elif var_column == sql_column_names.particulate_matter_1:
-            graph_data.sql_pm_1 = _clean_sql_query_return(sql_execute_get_data(var_sql_query))
-            graph_data.sql_pm_1_date_time = sql_column_date_time
-        elif var_column == sql_column_names.particulate_matter_2_5:
-            graph_data.sql_pm_2_5 = _clean_sql_query_return(sql_execute_get_data(var_sql_query))
-            graph_data.sql_pm_2_5_date_time = sql_column_date_time
-        elif var_column == sql_column_names.particulate_matter_10:
-            graph_data.sql_pm_10 = _clean_sql_query_return(sql_execute_get_data(var_sql_query))
-            graph_data.sql_pm_10_date_time = sql_column_date_time
-        elif var_column == sql_column_names.lumen:
-            graph_data.sql_lumen = _clean_sql_query_return(sql_execute_get_data(var_sql_query))
-            graph_data.sql_lumen_date_time = sql_column_date_time
-        elif var_column == sql_column_names.red:
-            graph_data.sql_red = _clean_sql_query_return(sql_execute_get_data(var_sql_query))
-            graph_data.sql_red_date_time = sql_column_date_time
-        elif var_column == sql_column_names.orange:
-            graph_data.sql_orange = _clean_sql_query_return(sql_execute_get_data(var_sql_query))
-            graph_data.sql_orange_date_time = sql_column_date_time
-        elif var_column == sql_column_names.yellow:
-            graph_data.sql_yellow = _clean_sql_query_return(sql_execute_get_data(var_sql_query))
-            graph_data.sql_yellow_date_time = sql_column_date_time
-        elif var_column == sql_column_names.green:
-            graph_data.sql_green = _clean_sql_query_return(sql_execute_get_data(var_sql_query))
-            graph_data.sql_green_date_time = sql_column_date_time
-        elif var_column == sql_column_names.blue:
-            graph_data.sql_blue = _clean_sql_query_return(sql_execute_get_data(var_sql_query))
-            graph_data.sql_blue_date_time = sql_column_date_time
-        elif var_column == sql_column_names.violet:
-            graph_data.sql_violet = _clean_sql_query_return(sql_execute_get_data(var_sql_query))
-            graph_data.sql_violet_date_time = sql_column_date_time
-        elif var_column == sql_column_names.ultra_violet_index:
-            graph_data.sql_uv_index = _clean_sql_query_return(sql_execute_get_data(var_sql_query))
-            graph_data.sql_uv_index_date_time = sql_column_date_time
-        elif var_column == sql_column_names.ultra_violet_a:
-            graph_data.sql_uv_a = _clean_sql_query_return(sql_execute_get_data(var_sql_query))
-            graph_data.sql_uv_a_date_time = sql_column_date_time
-        elif var_column == sql_column_names.ultra_violet_b:
-            graph_data.sql_uv_b = _clean_sql_query_return(sql_execute_get_data(var_sql_query))
-            graph_data.sql_uv_b_date_time = sql_column_date_time
-        elif var_column == sql_column_names.acc_x:
-            graph_data.sql_acc_x = _clean_sql_query_return(sql_execute_get_data(var_sql_query))
-            graph_data.sql_acc_x_date_time = sql_column_date_time
-        elif var_column == sql_column_names.acc_y:
-            graph_data.sql_acc_y = _clean_sql_query_return(sql_execute_get_data(var_sql_query))
-            graph_data.sql_acc_y_date_time = sql_column_date_time
-        elif var_column == sql_column_names.acc_z:
-            graph_data.sql_acc_z = _clean_sql_query_return(sql_execute_get_data(var_sql_query))
-            graph_data.sql_acc_z_date_time = sql_column_date_time
-        elif var_column == sql_column_names.mag_x:
-            graph_data.sql_mg_x = _clean_sql_query_return(sql_execute_get_data(var_sql_query))
-            graph_data.sql_mg_x_date_time = sql_column_date_time
-        elif var_column == sql_column_names.mag_y:
-            graph_data.sql_mg_y = _clean_sql_query_return(sql_execute_get_data(var_sql_query))
-            graph_data.sql_mg_y_date_time = sql_column_date_time
-        elif var_column == sql_column_names.mag_z:
-            graph_data.sql_mg_z = _clean_sql_query_return(sql_execute_get_data(var_sql_query))
-            graph_data.sql_mg_z_date_time = sql_column_date_time
-        elif var_column == sql_column_names.gyro_x:
-            graph_data.sql_gyro_x = _clean_sql_query_return(sql_execute_get_data(var_sql_query))
-            graph_data.sql_gyro_x_date_time = sql_column_date_time
-        elif var_column == sql_column_names.gyro_y:
-            graph_data.sql_gyro_y = _clean_sql_query_return(sql_execute_get_data(var_sql_query))
-            graph_data.sql_gyro_y_date_time = sql_column_date_time
-        elif var_column == sql_column_names.gyro_z:
-            graph_data.sql_gyro_z = _clean_sql_query_return(sql_execute_get_data(var_sql_query))
-            graph_data.sql_gyro_z_date_time = sql_column_date_time
+        elif var_column in graph_data_attribute_names:
+            data_attribute_name, datetime_attribute_name = graph_data_attribute_names[var_column]
+            setattr(graph_data, data_attribute_name, column_data)
+            setattr(graph_data, datetime_attribute_name, sql_column_date_time)
         else:
             logger.primary_logger.error(var_column + " - Does Not Exist")
-    _plotly_graph(graph_data)
+    _send_progress(progress_queue, 60, "Building Plots")
+    if _plotly_graph(graph_data):
+        _send_progress(progress_queue, 100, "Complete")
+    else:
+        _send_progress(progress_queue, -1, "Failed")
+
+
+def _send_progress(progress_queue, progress_percent, progress_message):
+    if progress_queue is not None:
+        progress_queue.put([progress_percent, progress_message])
 
 
 def _plotly_graph(graph_data):
-    """ Create and open a HTML offline Plotly graph with the data provided. """
+    """ Create and save a HTML offline Plotly graph with the data provided. Returns True if saved. """
     graph_data.sub_plots = []
     graph_data.row_count = 0
     graph_data.graph_collection = []
@@ -217,16 +182,20 @@ def _plotly_graph(graph_data):
             if graph_data.row_count > 4:
                 fig['layout'].update(height=2048)
 
-            if graph_data.graph_table == app_cached_variables.database_variables.table_interval:
+            if graph_data.graph_file_location is not None:
+                plot_file_location = graph_data.graph_file_location
+            elif graph_data.graph_table == app_cached_variables.database_variables.table_interval:
                 plot_file_location = file_locations.plotly_graph_interval
             else:
                 plot_file_location = file_locations.plotly_graph_triggers
             offline.plot(fig, filename=plot_file_location, auto_open=False)
             logger.primary_logger.debug("Plotly Graph Creation - OK")
+            return True
         except Exception as error:
             logger.primary_logger.error("Plotly Graph Creation - Failed: " + str(error))
     else:
         logger.primary_logger.error("Graph Plot Failed - No SQL data found in Database within the selected Time Frame")
+    return False
 
 
 def check_form_columns(form_request):
@@ -297,9 +266,3 @@ def check_form_columns(form_request):
         sql_column_selection.append(app_cached_variables.database_variables.gyro_z)
     return sql_column_selection
 
-
-def _clean_sql_query_return(sql_data_tuple):
-    cleaned_list = []
-    for data in sql_data_tuple:
-        cleaned_list.append(data[0])
-    return cleaned_list
@@ -295,7 +295,7 @@ def _add_scatter(scatter_data):
                                      mode="markers",
                                      marker=scatter_data.set_marker)
         else:
-            if scatter_data.graph_table == "IntervalData":
+            if scatter_data.text_graph_table == "IntervalData":
                 trace = go.Scatter(x=scatter_data.sql_time_list,
                                    y=scatter_data.sql_data_list,
                                    name=scatter_data.text_sensor_name,
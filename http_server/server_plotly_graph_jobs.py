@@ -0,0 +1,262 @@
+"""
+    KootNet Sensors is a collection of programs and scripts to deploy,
+    interact with, and collect readings from various Sensors.
+    Copyright (C) 2018  Chad Ermacora  chad.ermacora@gmail.com
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import os
+import uuid
+import queue
+import shutil
+from hashlib import sha1
+from threading import Lock
+from collections import OrderedDict
+from operations_modules import logger
+from operations_modules import file_locations
+from operations_modules import app_cached_variables
+from operations_modules.app_generic_functions import thread_function
+from operations_modules.sqlite_database import sql_execute_get_data
+from http_server import server_plotly_graph
+from http_server import server_graph_downsampling
+
+# Graphs created at the same time, each one runs in its own process
+graph_job_workers = 2
+# Graph jobs waiting for a worker, new jobs are refused when full
+graph_job_queue_size = 10
+# Created graphs kept for identical requests, the oldest are removed first
+graph_cache_max_entries = 10
+# Finished jobs kept for status polling
+graph_job_history_size = 20
+
+job_state_queued = "Queued"
+job_state_running = "Running"
+job_state_complete = "Complete"
+job_state_failed = "Failed"
+
+_graph_jobs_lock = Lock()
+_graph_job_queue = queue.Queue(maxsize=graph_job_queue_size)
+# Job ID: CreateGraphJob
+_graph_jobs = OrderedDict()
+# Cache Key: CreateGraphJob, so identical requests share one graph creation
+_active_graph_jobs = {}
+# Cache Key: [Graph file location, row count & newest DateTime in the time frame when created]
+_graph_cache = OrderedDict()
+_graph_workers_started = False
+
+
+class CreateGraphJob:
+    """ Creates an object to track a Plotly graph as it's queued, created & viewed. """
+
+    def __init__(self, graph_data, cache_key):
+        self.job_id = uuid.uuid4().hex[:16]
+        self.graph_data = graph_data
+        self.cache_key = cache_key
+        self.graph_file_location = _get_cache_file_location(cache_key)
+
+        self.state = job_state_queued
+        self.progress_percent = 0
+        self.progress_message = "Waiting for a Graph Worker"
+        self.from_cache = False
+
+    def set_progress(self, progress_percent, progress_message):
+        if progress_percent >= 0:
+            self.progress_percent = progress_percent
+        self.progress_message = progress_message
+
+    def get_status_dictionary(self):
+        """ Returns the job's state & progress as a dictionary. """
+        graph_url = ""
+        if self.state == job_state_complete:
+            graph_url = "/ViewPlotlyGraphJob?JobID=" + self.job_id
+        return {"JobID": self.job_id,
+                "State": self.state,
+                "Progress": self.progress_percent,
+                "Message": self.progress_message,
+                "FromCache": self.from_cache,
+                "GraphURL": graph_url}
+
+
+def submit_graph_job(graph_data):
+    """
+    Returns a CreateGraphJob for the graph, or None if the job queue is full.
+    A cached graph is used if no rows have been added or removed in its time frame since it was created,
+    and a graph already being created is shared with identical requests.
+    """
+    cache_key = get_graph_cache_key(graph_data)
+    data_version = _get_data_version(graph_data)
+    with _graph_jobs_lock:
+        if cache_key in _active_graph_jobs:
+            return _active_graph_jobs[cache_key]
+
+        graph_job = CreateGraphJob(graph_data, cache_key)
+        if cache_key in _graph_cache:
+            cache_file_location, cache_data_version = _graph_cache[cache_key]
+            if data_version is not None and data_version == cache_data_version \
+                    and os.path.isfile(cache_file_location):
+                _graph_cache.move_to_end(cache_key)
+                graph_job.state = job_state_complete
+                graph_job.from_cache = True
+                graph_job.set_progress(100, "Complete")
+                try:
+                    _update_latest_graph(graph_job)
+                except Exception as error:
+                    logger.primary_logger.warning("Plotly Graph Cache - Unable to update the latest graph: " +
+                                                  str(error))
+                _add_graph_job(graph_job)
+                return graph_job
+            del _graph_cache[cache_key]
+
+        _start_graph_workers()
+        try:
+            _graph_job_queue.put_nowait(graph_job)
+        except queue.Full:
+            logger.network_logger.warning("Plotly Graph Job Refused - " + str(graph_job_queue_size) + " Jobs Queued")
+            return None
+        _active_graph_jobs[cache_key] = graph_job
+        _add_graph_job(graph_job)
+    return graph_job
+
+
+def get_graph_job(job_id):
+    """ Returns the CreateGraphJob with the provided ID, or None if it's unknown or has been removed. """
+    with _graph_jobs_lock:
+        return _graph_jobs.get(job_id)
+
+
+def get_active_graph_jobs_message():
+    """ Returns a message with the progress of graphs being created, or an empty string if there are none. """
+    with _graph_jobs_lock:
+        active_jobs = list(_active_graph_jobs.values())
+    job_messages = []
+    for graph_job in active_jobs:
+        job_table = graph_job.graph_data.graph_table.replace("Data", "")
+        if graph_job.state == job_state_running:
+            job_messages.append(job_table + " " + str(graph_job.progress_percent) + "% " + graph_job.progress_message)
+        else:
+            job_messages.append(job_table + " " + graph_job.state)
+    if job_messages:
+        return "Creating Graphs - " + ", ".join(job_messages)
+    return ""
+
+
+def get_graph_cache_key(graph_data):
+    """ Returns the graph's cache key, made from the database, table, columns, time frame & graph options. """
+    downsample_mode = graph_data.downsample_mode
+    if graph_data.graph_table == app_cached_variables.database_variables.table_trigger:
+        downsample_mode = server_graph_downsampling.downsample_mode_none
+    return (graph_data.db_location, graph_data.graph_table, tuple(graph_data.graph_columns),
+            graph_data.graph_start, graph_data.graph_end, graph_data.datetime_offset,
+            downsample_mode, graph_data.max_graph_points, graph_data.enable_plotly_webgl)
+
+
+def _get_cache_file_location(cache_key):
+    return file_locations.plotly_graph_cache_dir + "/" + sha1(str(cache_key).encode()).hexdigest() + ".html"
+
+
+def _get_data_version(graph_data):
+    """
+    Returns the row count & newest DateTime recorded in the graph's time frame as a string,
+    used to tell if a cached graph is out of date. Returns None if the database could not be read.
+    """
+    sql_graph_start, sql_graph_end = server_plotly_graph.get_sql_graph_window(graph_data)
+    sql_query = "SELECT count(*), max(DateTime) FROM " + graph_data.graph_table + \
+                " WHERE DateTime BETWEEN datetime('" + sql_graph_start + "') AND datetime('" + sql_graph_end + "')"
+    try:
+        row_count, newest_datetime = sql_execute_get_data(sql_query, graph_data.db_location)[0]
+        return str(row_count) + " " + str(newest_datetime)
+    except Exception as error:
+        logger.primary_logger.warning("Plotly Graph Cache - Unable to check for new rows: " + str(error))
+    return None
+
+
+def _add_graph_job(graph_job):
+    _graph_jobs[graph_job.job_id] = graph_job
+    finished_job_ids = [job_id for job_id, job in _graph_jobs.items() if job.cache_key not in _active_graph_jobs]
+    while len(_graph_jobs) > graph_job_history_size and finished_job_ids:
+        removed_graph_job = _graph_jobs.pop(finished_job_ids.pop(0))
+        _remove_unused_graph_file(removed_graph_job.graph_file_location)
+
+
+def _start_graph_workers():
+    global _graph_workers_started
+    if not _graph_workers_started:
+        _graph_workers_started = True
+        for _ in range(graph_job_workers):
+            thread_function(_graph_job_worker)
+
+
+def _graph_job_worker():
+    while True:
+        graph_job = _graph_job_queue.get()
+        graph_job.state = job_state_running
+        graph_job.set_progress(0, "Starting")
+        graph_created = False
+        try:
+            os.makedirs(file_locations.plotly_graph_cache_dir, exist_ok=True)
+            # Checked before the graph's rows are read, so rows recorded while creating it mark the cache out of date
+            data_version = _get_data_version(graph_job.graph_data)
+            graph_job.graph_data.graph_file_location = graph_job.graph_file_location
+            graph_created = server_plotly_graph.create_plotly_graph(graph_job.graph_data,
+                                                                    progress_function=graph_job.set_progress)
+            if graph_created:
+                _update_latest_graph(graph_job)
+        except Exception as error:
+            logger.primary_logger.error("Plotly Graph Job Failed: " + str(error))
+            data_version = None
+
+        with _graph_jobs_lock:
+            del _active_graph_jobs[graph_job.cache_key]
+            if graph_created:
+                graph_job.state = job_state_complete
+                graph_job.set_progress(100, "Complete")
+                if data_version is not None:
+                    _add_to_graph_cache(graph_job.cache_key, graph_job.graph_file_location, data_version)
+            else:
+                graph_job.state = job_state_failed
+                graph_job.set_progress(-1, "No Graph Created, see Primary Log for details")
+
+
+def _update_latest_graph(graph_job):
+    """ Copies the created graph to the default Interval or Trigger graph location, used by the Graphing page. """
+    if graph_job.graph_data.graph_table == app_cached_variables.database_variables.table_interval:
+        shutil.copyfile(graph_job.graph_file_location, file_locations.plotly_graph_interval)
+    else:
+        shutil.copyfile(graph_job.graph_file_location, file_locations.plotly_graph_triggers)
+
+
+def _add_to_graph_cache(cache_key, graph_file_location, data_version):
+    _graph_cache[cache_key] = [graph_file_location, data_version]
+    _graph_cache.move_to_end(cache_key)
+    while len(_graph_cache) > graph_cache_max_entries:
+        removed_file_location = _graph_cache.popitem(last=False)[1][0]
+        _remove_unused_graph_file(removed_file_location)
+
+
+def _remove_unused_graph_file(graph_file_location):
+    """
+    Removes a graph file once it's no longer cached & no kept job uses it,
+    so graphs of finished jobs can still be viewed after they leave the cache.
+    """
+    for cache_entry in _graph_cache.values():
+        if cache_entry[0] == graph_file_location:
+            return
+    for graph_job in _graph_jobs.values():
+        if graph_job.graph_file_location == graph_file_location:
+            return
+    try:
+        if os.path.isfile(graph_file_location):
+            os.remove(graph_file_location)
+    except Exception as error:
+        logger.primary_logger.warning("Plotly Graph Cache - Unable to remove old graph: " + str(error))
@@ -18,8 +18,6 @@
 """
 from operations_modules import file_locations
 
-graph_creation_in_progress = False
-
 mark_red_line = dict(size=10, color='rgba(255, 0, 0, .9)', line=dict(width=2, color='rgb(0, 0, 0)'))
 
 mark_orange_line = dict(size=10, color='rgba(255, 102, 0, .9)', line=dict(width=2, color='rgb(0, 0, 0)'))
@@ -61,12 +59,13 @@ class CreateGraphData:
     def __init__(self):
         self.enable_plotly_webgl = False
         self.db_location = file_locations.sensor_database
+        # None saves to the default Interval or Trigger graph location
+        self.graph_file_location = None
         self.graph_table = "IntervalData"
         self.graph_start = "1111-08-21 00:00:01"
         self.graph_end = "9999-01-01 00:00:01"
         self.datetime_offset = 7.0
-        self.sql_queries_skip = 12
-        self.bypass_sql_skip = False
+        self.downsample_mode = "MinMax"
         self.enable_custom_temp_offset = False
         self.temperature_offset = 0.0
 
@@ -80,7 +79,7 @@ class CreateGraphData:
                               "Particulate_Matter_1", "Particulate_Matter_2_5", "Particulate_Matter_10",
                               "Red", "Orange", "Yellow", "Green", "Blue", "Violet", "Ultra_Violet_Index",
                               "Ultra_Violet_A", "Ultra_Violet_B"]
-        self.max_sql_queries = 200000
+        self.max_graph_points = 5000
 
         # Graph data holders for SQL DataBase
         self.sql_time = []
@@ -140,9 +140,21 @@ class CreateDatabaseVariables:
         self.table_trigger = "TriggerData"
         self.table_other = "OtherData"
 
+        self.table_interval_rollup_minute = "IntervalDataRollupMinute"
+        self.table_interval_rollup_hour = "IntervalDataRollupHour"
+        self.table_interval_rollup_day = "IntervalDataRollupDay"
+        self.rollup_min = "_Min"
+        self.rollup_max = "_Max"
+        self.rollup_average = "_Avg"
+        self.rollup_count = "_Count"
+
         self.other_table_column_user_date_time = "UserDateTime"
         self.other_table_column_notes = "Notes"
 
+        self.table_checkins = "SensorCheckins"
+        self.table_checkins_latest = "SensorCheckinsLatest"
+        self.sensor_check_in_id = "SensorID"
+        self.sensor_check_in_count = "CheckinCount"
         self.sensor_check_in_version = "KootnetVersion"
         self.sensor_check_in_installed_sensors = "installed_sensors"
         self.sensor_check_in_primary_log = "primary_log"
@@ -234,6 +246,22 @@ class CreateDatabaseVariables:
                               self.gyro_z]
         return sensor_sql_columns
 
+    def get_rollup_tables_list(self):
+        """ Returns Interval rollup SQL Tables as a list, finest first. """
+        return [self.table_interval_rollup_minute, self.table_interval_rollup_hour, self.table_interval_rollup_day]
+
+    def get_rollup_sensor_columns_list(self):
+        """ Returns Interval SQL Table columns that get a Min, Max, Avg & Count in the rollup tables. """
+        return [column for column in self.get_sensor_columns_list() if column not in [self.sensor_name, self.ip]]
+
+    def get_rollup_columns_list(self):
+        """ Returns rollup SQL Table columns (other then DateTime) as a list. """
+        rollup_sql_columns = [self.sensor_name, self.ip]
+        for column in self.get_rollup_sensor_columns_list():
+            rollup_sql_columns += [column + self.rollup_min, column + self.rollup_max,
+                                   column + self.rollup_average, column + self.rollup_count]
+        return rollup_sql_columns
+
     def get_other_columns_list(self):
         """ Returns "Other" SQL Table columns as a list. """
         other_sql_columns = [self.other_table_column_user_date_time,
@@ -327,6 +355,10 @@ mqtt_publisher_thread = CreateEmptyThreadClass()
 weather_underground_thread = CreateEmptyThreadClass()
 luftdaten_thread = CreateEmptyThreadClass()
 open_sense_map_thread = CreateEmptyThreadClass()
+database_write_queue_thread = CreateEmptyThreadClass()
+checkin_write_queue_thread = CreateEmptyThreadClass()
+rollup_recording_thread = CreateEmptyThreadClass()
+database_partitions_thread = CreateEmptyThreadClass()
 
 # Running High/Low Trigger Recording Threads
 trigger_high_low_cpu_temp = CreateEmptyThreadClass()
@@ -373,6 +405,9 @@ restart_weather_underground_thread = False
 restart_luftdaten_thread = False
 restart_open_sense_map_thread = False
 
+# Counts sensors added or removed while running, threads that only check for sensors on start can compare it
+installed_sensors_changes = 0
+
 # If set to True, it will prompt to restart service or reboot system in the HTTPS Web Portal
 html_service_restart = False
 html_sensor_reboot = False
@@ -437,7 +472,7 @@ note_current = 1
 
 # Quick Graph's Variables
 quick_graph_max_sql_entries = 1000
-quick_graph_skip_sql_entries = 0
+quick_graph_downsample_mode = "MinMax"
 quick_graph_hours = 48
 quick_graph_uptime = 1
 quick_graph_cpu_temp = 0
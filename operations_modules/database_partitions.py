@@ -0,0 +1,216 @@
+"""
+    KootNet Sensors is a collection of programs and scripts to deploy,
+    interact with, and collect readings from various Sensors.  
+    Copyright (C) 2018  Chad Ermacora  chad.ermacora@gmail.com  
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import os
+import gzip
+import shutil
+from datetime import datetime
+from threading import RLock
+from time import sleep
+from operations_modules import logger
+from operations_modules import file_locations
+from operations_modules import app_cached_variables
+from operations_modules.app_cached_variables import database_variables
+from operations_modules.app_generic_functions import CreateMonitoredThread
+from operations_modules import sqlite_database
+from configuration_modules import app_config_access
+
+# SQLite allows 10 attached databases by default, 1 is left free for other use
+max_attached_partitions = 9
+partition_maintenance_interval_seconds = 3600
+partition_file_name_start = "SensorRecordingDatabase_"
+partition_file_name_end = ".sqlite"
+
+# Guards _partitions_state, re-entrant as creating a new partition also attaches it
+_partition_lock = RLock()
+_partitions_state = {"name": None, "location": file_locations.sensor_database, "attached_locations": []}
+
+
+def start_database_partitions_server():
+    update_database_partitions()
+    text_name = "Database Partitions"
+    function = _database_partitions_maintenance
+    app_cached_variables.database_partitions_thread = CreateMonitoredThread(function, thread_name=text_name)
+    if not app_config_access.interval_recording_config.enable_database_partitions:
+        app_cached_variables.database_partitions_thread.current_state = "Disabled"
+
+
+def _database_partitions_maintenance():
+    """ Applies the partition retention policy and keeps partitions attached to the main database hourly. """
+    while True:
+        sleep(partition_maintenance_interval_seconds)
+        update_database_partitions()
+        if app_config_access.interval_recording_config.enable_database_partitions:
+            app_cached_variables.database_partitions_thread.current_state = "Running"
+        else:
+            app_cached_variables.database_partitions_thread.current_state = "Disabled"
+
+
+def update_database_partitions():
+    """ Creates the current partition, archives or removes expired ones, then attaches the rest for reading. """
+    try:
+        get_recording_database_location()
+        _apply_partition_retention()
+        _attach_partitions()
+    except Exception as error:
+        logger.primary_logger.error("Database Partitions Update Failed: " + str(error))
+
+
+def get_recording_database_location():
+    """
+    Returns the database Interval & Trigger recordings are saved to.
+    That's the current partition when database partitions are enabled, otherwise the main database.
+    """
+    if not app_config_access.interval_recording_config.enable_database_partitions:
+        return file_locations.sensor_database
+
+    partition_name = get_partition_name(datetime.utcnow())
+    if partition_name != _partitions_state["name"]:
+        with _partition_lock:
+            if partition_name != _partitions_state["name"]:
+                partition_location = get_partition_location(partition_name)
+                if not os.path.isfile(partition_location):
+                    os.makedirs(file_locations.database_partitions_dir, exist_ok=True)
+                    logger.primary_logger.info("Creating Database Partition " + partition_name)
+                if sqlite_database.check_partition_database_structure(partition_location):
+                    _partitions_state["location"] = partition_location
+                    _partitions_state["name"] = partition_name
+                    if partition_location not in _partitions_state["attached_locations"]:
+                        _attach_partitions()
+    return _partitions_state["location"]
+
+
+def get_partition_name(datetime_value):
+    """ Returns the partition name (first month, 'YYYY-MM') holding the provided datetime. """
+    partition_months = max(1, app_config_access.interval_recording_config.database_partition_months)
+    month_number = datetime_value.year * 12 + datetime_value.month - 1
+    month_number -= month_number % partition_months
+    return str(month_number // 12) + "-" + str(month_number % 12 + 1).zfill(2)
+
+
+def get_partition_location(partition_name):
+    return file_locations.database_partitions_dir + "/" + partition_file_name_start + partition_name + \
+           partition_file_name_end
+
+
+def get_partition_locations():
+    """ Returns the location of all database partitions, oldest first. """
+    partition_locations = []
+    if os.path.isdir(file_locations.database_partitions_dir):
+        for file_name in sorted(os.listdir(file_locations.database_partitions_dir)):
+            if file_name.startswith(partition_file_name_start) and file_name.endswith(partition_file_name_end):
+                partition_locations.append(file_locations.database_partitions_dir + "/" + file_name)
+    return partition_locations
+
+
+def get_database_download_files():
+    """ Returns [[file_name, file_location], ...] for the main database followed by each database partition. """
+    download_files = [[os.path.basename(file_locations.sensor_database), file_locations.sensor_database]]
+    for partition_location in get_partition_locations():
+        sqlite_database.checkpoint_database(partition_location)
+        download_files.append([os.path.basename(partition_location), partition_location])
+    return download_files
+
+
+def _attach_partitions(excluded_locations=None):
+    """
+    Attaches the newest partitions to each of the main database's read connections, with TEMP views named
+    after the Interval & Trigger tables. That way, reading those tables from the main database reads all
+    of them, main database first, without changing any queries.
+    """
+    with _partition_lock:
+        partition_locations = get_partition_locations()
+        if excluded_locations is not None:
+            partition_locations = [location for location in partition_locations if location not in excluded_locations]
+        if len(partition_locations) > max_attached_partitions:
+            logger.primary_logger.warning(
+                str(len(partition_locations) - max_attached_partitions) + " Old Database Partitions not Attached, " +
+                "only the newest " + str(max_attached_partitions) + " can be. Older data remains in the rollups.")
+            partition_locations = partition_locations[-max_attached_partitions:]
+        if partition_locations == _partitions_state["attached_locations"]:
+            return
+
+        setup_sql_queries = []
+        interval_columns = [database_variables.all_tables_datetime] + database_variables.get_sensor_columns_list()
+        trigger_columns = interval_columns + [database_variables.trigger_state]
+        interval_selects = ["SELECT " + ",".join(interval_columns) + " FROM main." + database_variables.table_interval]
+        trigger_selects = ["SELECT " + ",".join(trigger_columns) + " FROM main." + database_variables.table_trigger]
+        for index, partition_location in enumerate(partition_locations):
+            schema_name = "Partition" + str(index)
+            setup_sql_queries.append(["ATTACH DATABASE ? AS " + schema_name, [partition_location]])
+            interval_selects.append("SELECT " + ",".join(interval_columns) + " FROM " + schema_name + "." +
+                                    database_variables.table_interval)
+            trigger_selects.append("SELECT " + ",".join(trigger_columns) + " FROM " + schema_name + "." +
+                                   database_variables.table_trigger)
+        if partition_locations:
+            setup_sql_queries.append(["CREATE TEMP VIEW " + database_variables.table_interval + " AS " +
+                                      " UNION ALL ".join(interval_selects), []])
+            setup_sql_queries.append(["CREATE TEMP VIEW " + database_variables.table_trigger + " AS " +
+                                      " UNION ALL ".join(trigger_selects), []])
+        sqlite_database.database_connection_pool.set_reader_setup(setup_sql_queries, file_locations.sensor_database)
+        _partitions_state["attached_locations"] = partition_locations
+        logger.primary_logger.debug(str(len(partition_locations)) + " Database Partitions Attached")
+
+
+def _apply_partition_retention():
+    """ Compresses (or removes) partitions that start more then the set months to keep ago. """
+    keep_months = app_config_access.interval_recording_config.database_partition_keep_months
+    if keep_months < 1:
+        return
+
+    utc_now = datetime.utcnow()
+    oldest_month_number = utc_now.year * 12 + utc_now.month - 1 - keep_months
+    oldest_kept_name = str(oldest_month_number // 12) + "-" + str(oldest_month_number % 12 + 1).zfill(2)
+    for partition_location in get_partition_locations():
+        partition_name = os.path.basename(partition_location)[len(partition_file_name_start):
+                                                               -len(partition_file_name_end)]
+        # Partitions are only removed once all their months are past the months to keep
+        if get_partition_name_end(partition_name) <= oldest_kept_name and \
+                partition_location != _partitions_state["location"]:
+            _remove_partition(partition_location)
+
+
+def get_partition_name_end(partition_name):
+    """ Returns the month ('YYYY-MM') after the last month in the provided partition. """
+    partition_months = max(1, app_config_access.interval_recording_config.database_partition_months)
+    year, month = partition_name.split("-")
+    month_number = int(year) * 12 + int(month) - 1 + partition_months
+    return str(month_number // 12) + "-" + str(month_number % 12 + 1).zfill(2)
+
+
+def _remove_partition(partition_location):
+    with _partition_lock:
+        # Detach from the main database & close the partition before touching the file
+        _attach_partitions(excluded_locations=[partition_location])
+        sqlite_database.checkpoint_database(partition_location)
+        sqlite_database.close_database_connections(partition_location)
+        try:
+            if app_config_access.interval_recording_config.database_partition_archive:
+                os.makedirs(file_locations.database_partitions_archive_dir, exist_ok=True)
+                archive_location = file_locations.database_partitions_archive_dir + "/" + \
+                    os.path.basename(partition_location) + ".gz"
+                with open(partition_location, "rb") as partition_file:
+                    with gzip.open(archive_location, "wb") as archive_file:
+                        shutil.copyfileobj(partition_file, archive_file)
+                logger.primary_logger.info("Database Partition Compressed to " + archive_location)
+            for file_location in [partition_location, partition_location + "-wal", partition_location + "-shm"]:
+                if os.path.isfile(file_location):
+                    os.remove(file_location)
+            logger.primary_logger.info("Database Partition Removed: " + partition_location)
+        except Exception as error:
+            logger.primary_logger.error("Database Partition Removal Failed: " + str(error))
@@ -0,0 +1,79 @@
+"""
+    KootNet Sensors is a collection of programs and scripts to deploy,
+    interact with, and collect readings from various Sensors.  
+    Copyright (C) 2018  Chad Ermacora  chad.ermacora@gmail.com  
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from time import monotonic
+from threading import Condition
+
+# Restart flags set without calling notify_restart() are still noticed within this many seconds
+restart_check_seconds = 5.0
+
+_restart_condition = Condition()
+
+
+class CreateDeadlineScheduler:
+    """
+    Creates a scheduler for loops that run every X seconds, like Interval Recording & the Online Services.
+    Ticks are at exact multiples of the interval from when the scheduler was created, on the monotonic clock,
+    so the time spent doing the work does not push the next tick back.
+    Ticks missed because the work took longer then the interval are skipped, not run back to back.
+    is_cancelled_function is checked while waiting, returning True stops the wait right away.
+    """
+
+    def __init__(self, interval_seconds, is_cancelled_function):
+        self.interval_seconds = max(float(interval_seconds), 0.001)
+        self.is_cancelled_function = is_cancelled_function
+        self.start_time = monotonic()
+        self.tick_number = 0
+        self.skipped_ticks = 0
+
+    def wait_for_next_tick(self):
+        """ Waits for the next interval tick. Returns True on the tick, or False if cancelled. """
+        due_tick_number = self.tick_number + 1
+        current_tick_number = int((monotonic() - self.start_time) // self.interval_seconds)
+        if current_tick_number >= due_tick_number:
+            self.skipped_ticks += current_tick_number - due_tick_number + 1
+            due_tick_number = current_tick_number + 1
+        self.tick_number = due_tick_number
+        return _wait_until(self.start_time + due_tick_number * self.interval_seconds, self.is_cancelled_function)
+
+
+def sleep_unless_cancelled(seconds, is_cancelled_function):
+    """ Sleeps the provided seconds, unless cancelled first. Returns True if the sleep finished. """
+    return _wait_until(monotonic() + seconds, is_cancelled_function)
+
+
+def wait_until_cancelled(is_cancelled_function):
+    """ Waits for the provided is_cancelled_function to return True. """
+    while _wait_until(monotonic() + 3600, is_cancelled_function):
+        continue
+
+
+def notify_restart():
+    """ Wakes up all waiting schedulers, so the ones with a restart flag that was just set stop right away. """
+    with _restart_condition:
+        _restart_condition.notify_all()
+
+
+def _wait_until(deadline_time, is_cancelled_function):
+    with _restart_condition:
+        while not is_cancelled_function():
+            remaining_seconds = deadline_time - monotonic()
+            if remaining_seconds <= 0:
+                return True
+            _restart_condition.wait(min(remaining_seconds, restart_check_seconds))
+    return False
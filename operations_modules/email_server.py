@@ -34,6 +34,7 @@ from operations_modules.app_validation_checks import email_is_valid
 from configuration_modules import app_config_access
 from http_server.flask_blueprints.sensor_control_files.sensor_control_functions import generate_html_reports_combo
 from http_server.flask_blueprints.graphing_quick import get_html_live_graphing_page
+from sensor_modules import sensor_bus_access
 
 email_config = app_config_access.email_config
 
@@ -174,6 +175,7 @@ def start_report_email_server():
 
 
 def _report_email_server():
+    sensor_bus_access.set_thread_priority(sensor_bus_access.priority_display)
     sleep(10)
     app_cached_variables.report_email_thread.current_state = "Disabled"
     while not app_config_access.email_config.enable_combo_report_emails:
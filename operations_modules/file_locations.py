@@ -50,6 +50,8 @@ if os.geteuid() != 0:
 sensor_database = sensor_data_dir + "/SensorRecordingDatabase.sqlite"
 sensor_checkin_database = sensor_data_dir + "/SensorCheckinDatabase.sqlite"
 database_zipped = sensor_data_dir + "/MainDatabaseZipped.zip"
+database_partitions_dir = sensor_data_dir + "/DatabasePartitions"
+database_partitions_archive_dir = database_partitions_dir + "/Archived"
 
 log_directory = sensor_data_dir + "/logs/"
 primary_log = log_directory + "primary_log.txt"
@@ -89,6 +91,7 @@ osm_config = sensor_config_dir + "/online_services_open_sense_map.conf"
 
 plotly_graph_interval = sensor_data_dir + "/IntervalPlotlySensorGraph.html"
 plotly_graph_triggers = sensor_data_dir + "/TriggersPlotlySensorGraph.html"
+plotly_graph_cache_dir = sensor_data_dir + "/PlotlyGraphCache"
 
 dhcpcd_config_file = "/etc/dhcpcd.conf"
 wifi_config_file = "/etc/wpa_supplicant/wpa_supplicant.conf"
@@ -25,9 +25,9 @@ from operations_modules import file_locations
 from operations_modules import software_version
 from operations_modules import app_cached_variables
 from operations_modules.app_generic_functions import write_file_to_disk, thread_function, get_file_content
-from operations_modules.sqlite_database import check_main_database_structure, check_checkin_database_structure, \
-    run_database_integrity_check
+from operations_modules.sqlite_database import check_checkin_database_structure, run_database_integrity_check
 from upgrade_modules.program_upgrade_checks import run_configuration_upgrade_checks
+from upgrade_modules.database_upgrades import check_and_upgrade_main_database
 
 create_directories_for_files = [file_locations.mosquitto_configuration]
 
@@ -47,11 +47,11 @@ def run_program_start_checks():
         run_database_integrity_check(file_locations.sensor_database, quick=False)
         run_database_integrity_check(file_locations.sensor_checkin_database, quick=False)
         run_configuration_upgrade_checks()
-        thread_function(check_checkin_database_structure)
     else:
         run_database_integrity_check(file_locations.sensor_database)
         run_database_integrity_check(file_locations.sensor_checkin_database)
-    thread_function(check_main_database_structure)
+    thread_function(check_checkin_database_structure)
+    thread_function(check_and_upgrade_main_database)
     logger.primary_logger.info(" -- Pre-Start Initializations Complete")
 
 
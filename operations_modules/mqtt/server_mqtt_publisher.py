@@ -20,6 +20,7 @@ from time import sleep
 from paho.mqtt import client as mqtt
 from operations_modules import logger
 from operations_modules.app_generic_functions import CreateMonitoredThread
+from operations_modules.deadline_scheduler import CreateDeadlineScheduler, sleep_unless_cancelled
 from operations_modules import app_cached_variables
 from configuration_modules import app_config_access
 from sensor_modules import sensor_access
@@ -80,13 +81,10 @@ def _mqtt_publisher_server():
                 logger.network_logger.debug("MQTT Publisher Connection Failure # " + str(max_tries_log))
                 seconds_to_wait = 300
             max_tries_log += 1
+            sleep_unless_cancelled(seconds_to_wait, _mqtt_publisher_restart_requested)
 
-            sleep_fraction_interval = 5
-            sleep_total = 0
-            while sleep_total < seconds_to_wait and not app_cached_variables.restart_mqtt_publisher_thread:
-                sleep(sleep_fraction_interval)
-                sleep_total += sleep_fraction_interval
-
+    seconds_to_wait = app_config_access.mqtt_publisher_config.seconds_to_wait
+    scheduler = CreateDeadlineScheduler(seconds_to_wait, _mqtt_publisher_restart_requested)
     while not app_cached_variables.restart_mqtt_publisher_thread:
         mqtt_publisher_qos = app_config_access.mqtt_publisher_config.mqtt_publisher_qos
         try:
@@ -157,18 +155,16 @@ def _mqtt_publisher_server():
                                qos=mqtt_publisher_qos)
         except Exception as error:
             logger.primary_logger.error("MQTT Publisher Failure: " + str(error))
-
-        sleep_fraction_interval = 5
-        sleep_total = 0
-        seconds_to_wait = app_config_access.mqtt_publisher_config.seconds_to_wait
-        while sleep_total < seconds_to_wait and not app_cached_variables.restart_mqtt_publisher_thread:
-            sleep(sleep_fraction_interval)
-            sleep_total += sleep_fraction_interval
+        scheduler.wait_for_next_tick()
     client.disconnect(reasoncode=0)
     client.connected_flag = False
     client.disconnect_flag = True
 
 
+def _mqtt_publisher_restart_requested():
+    return app_cached_variables.restart_mqtt_publisher_thread
+
+
 def _readings_to_text(readings):
     return_text = ""
     if type(readings) is not list and type(readings) is not tuple:
@@ -17,9 +17,9 @@
     along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 import requests
-from time import sleep
 from operations_modules import logger
 from operations_modules.app_generic_functions import CreateMonitoredThread
+from operations_modules.deadline_scheduler import CreateDeadlineScheduler, wait_until_cancelled
 from operations_modules import app_cached_variables
 from configuration_modules.app_config_access import installed_sensors, luftdaten_config
 from sensor_modules import sensor_access
@@ -38,6 +38,7 @@ def start_luftdaten_server():
 def _luftdaten_server():
     """ Sends compatible sensor readings to Luftdaten every X seconds based on set Interval. """
     app_cached_variables.restart_luftdaten_thread = False
+    scheduler = CreateDeadlineScheduler(luftdaten_config.interval_seconds, _luftdaten_restart_requested)
     while not app_cached_variables.restart_luftdaten_thread:
         no_sensors = True
         try:
@@ -56,14 +57,12 @@ def _luftdaten_server():
 
         if no_sensors:
             logger.primary_logger.error("Luftdaten - No Compatible Sensors: No further attempts will be made")
-            while not app_cached_variables.restart_luftdaten_thread:
-                sleep(5)
-
-        sleep_fraction_interval = 5
-        sleep_total = 0
-        while sleep_total < luftdaten_config.interval_seconds and not app_cached_variables.restart_luftdaten_thread:
-            sleep(sleep_fraction_interval)
-            sleep_total += sleep_fraction_interval
+            wait_until_cancelled(_luftdaten_restart_requested)
+        scheduler.wait_for_next_tick()
+
+
+def _luftdaten_restart_requested():
+    return app_cached_variables.restart_luftdaten_thread
 
 
 def _bmp280():
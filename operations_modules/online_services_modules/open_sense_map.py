@@ -17,10 +17,10 @@
     along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 import requests
-from time import sleep
 from operations_modules import logger
 from operations_modules import app_cached_variables
 from operations_modules.app_generic_functions import CreateMonitoredThread
+from operations_modules.deadline_scheduler import CreateDeadlineScheduler, wait_until_cancelled
 from configuration_modules.app_config_access import installed_sensors, open_sense_map_config as osm_config
 from operations_modules.online_services_modules.osm_sensor_templates import raspberry_pi_sense_hat
 from operations_modules.online_services_modules.osm_sensor_templates import pimoroni_enviro
@@ -56,6 +56,7 @@ def _open_sense_map_server():
         url = osm_config.open_sense_map_main_url_start + "/" + osm_config.sense_box_id + "/data"
         url_header = {"content-type": "application/json"}
 
+        scheduler = CreateDeadlineScheduler(osm_config.interval_seconds, _open_sense_map_restart_requested)
         while not app_cached_variables.restart_open_sense_map_thread:
             body_json = {}
             try:
@@ -157,17 +158,15 @@ def _open_sense_map_server():
                     log_msg = "Open Sense Map - No further updates will be attempted: " + \
                               "No Compatible Sensors or Missing Sensor IDs"
                     logger.network_logger.warning(log_msg)
-                    while not app_cached_variables.restart_open_sense_map_thread:
-                        sleep(5)
+                    wait_until_cancelled(_open_sense_map_restart_requested)
             except Exception as error:
                 logger.network_logger.error("Open Sense Map - Error sending data")
                 logger.network_logger.debug("Open Sense Map - Detailed Error: " + str(error))
+            scheduler.wait_for_next_tick()
 
-            sleep_fraction_interval = 5
-            sleep_total = 0
-            while sleep_total < osm_config.interval_seconds and not app_cached_variables.restart_open_sense_map_thread:
-                sleep(sleep_fraction_interval)
-                sleep_total += sleep_fraction_interval
+
+def _open_sense_map_restart_requested():
+    return app_cached_variables.restart_open_sense_map_thread
 
 
 def add_sensor_to_account(html_request):
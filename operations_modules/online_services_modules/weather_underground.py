@@ -17,11 +17,11 @@
     along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 import requests
-from time import sleep
 from operations_modules import logger
 from operations_modules import software_version
 from operations_modules import app_cached_variables
 from operations_modules.app_generic_functions import CreateMonitoredThread
+from operations_modules.deadline_scheduler import CreateDeadlineScheduler, wait_until_cancelled
 from configuration_modules.app_config_access import weather_underground_config
 from operations_modules.app_validation_checks import valid_sensor_reading
 from sensor_modules import sensor_access
@@ -44,6 +44,7 @@ def _weather_underground_server():
     """ Sends compatible sensor readings to Weather Underground every X seconds based on set Interval. """
     app_cached_variables.restart_weather_underground_thread = False
     interval_seconds = weather_underground_config.interval_seconds
+    scheduler = CreateDeadlineScheduler(interval_seconds, _weather_underground_restart_requested)
     while not app_cached_variables.restart_weather_underground_thread:
         try:
             sensor_readings = get_weather_underground_readings()
@@ -82,17 +83,15 @@ def _weather_underground_server():
             else:
                 log_msg = "Weather Underground - No Compatible Sensors: No further attempts will be made"
                 logger.primary_logger.error(log_msg)
-                while not app_cached_variables.restart_weather_underground_thread:
-                    sleep(5)
+                wait_until_cancelled(_weather_underground_restart_requested)
         except Exception as error:
             logger.network_logger.error("Weather Underground - Error sending data")
             logger.network_logger.debug("Weather Underground - Detailed Error: " + str(error))
+        scheduler.wait_for_next_tick()
 
-        sleep_fraction_interval = 5
-        sleep_total = 0
-        while sleep_total < interval_seconds and not app_cached_variables.restart_weather_underground_thread:
-            sleep(sleep_fraction_interval)
-            sleep_total += sleep_fraction_interval
+
+def _weather_underground_restart_requested():
+    return app_cached_variables.restart_weather_underground_thread
 
 
 def get_weather_underground_readings():
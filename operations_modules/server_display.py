@@ -22,6 +22,7 @@ from operations_modules.app_generic_functions import CreateMonitoredThread
 from operations_modules import app_cached_variables
 from configuration_modules import app_config_access
 from sensor_modules import sensor_access
+from sensor_modules import sensor_bus_access
 
 
 def start_display_server():
@@ -34,6 +35,7 @@ def start_display_server():
 
 
 def _display_server():
+    sensor_bus_access.set_thread_priority(sensor_bus_access.priority_display)
     sleep(5)
     app_cached_variables.mini_display_thread.current_state = "Disabled"
     while not app_config_access.display_config.enable_display:
@@ -16,10 +16,34 @@
     You should have received a copy of the GNU General Public License
     along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
+import os
+import time
+import atexit
 import sqlite3
+from queue import Queue, Empty
+from threading import Lock, Event, local
 from operations_modules import file_locations
 from operations_modules import logger
+from operations_modules import app_cached_variables
 from operations_modules.app_cached_variables import database_variables
+from operations_modules.app_generic_functions import CreateMonitoredThread
+
+# Applied to every pooled connection. Negative cache_size is in KiB
+sqlite_busy_timeout_sec = 30
+sqlite_connection_pragmas = ["PRAGMA synchronous=NORMAL;",
+                             "PRAGMA temp_store=MEMORY;",
+                             "PRAGMA cache_size=-4000;"]
+
+# Queued rows are written once this many are waiting, even if the write delay has not passed
+write_queue_max_rows_per_flush = 250
+
+# Sensor Check-Ins are queued separately from recordings, each Check-In queues 3 rows
+checkin_write_queue_delay_seconds = 1.0
+checkin_write_queue_max_rows = 150000
+
+# Rows copied per transaction when converting a table to typed columns, small enough to not hold up recording
+migration_rows_per_chunk = 5000
+migration_pause_between_chunks_sec = 0.05
 
 
 class CreateOtherDataEntry:
@@ -38,63 +62,467 @@ class CreateOtherDataEntry:
                self.sensor_readings + self.sql_query_values_end
 
 
+class CreateSQLiteConnection:
+    """ Creates a persistent SQLite3 connection to the provided database with the pooled connection pragmas. """
+
+    def __init__(self, database_location, query_only=False, setup_sql_queries=None):
+        self.database_location = database_location
+        self.lock = Lock()
+        self.is_open = True
+
+        self.connection = sqlite3.connect(database_location, timeout=sqlite_busy_timeout_sec, check_same_thread=False)
+        if not query_only:
+            try:
+                self.connection.execute("PRAGMA journal_mode=WAL;")
+            except Exception as error:
+                logger.primary_logger.warning("Unable to set SQLite WAL mode on " + database_location + ": " + str(error))
+        for pragma in sqlite_connection_pragmas:
+            self.connection.execute(pragma)
+        if setup_sql_queries is not None:
+            for sql_query, data_entries in setup_sql_queries:
+                self.connection.execute(sql_query, data_entries)
+        if query_only:
+            self.connection.execute("PRAGMA query_only=1;")
+        self.file_inode = _get_file_inode(database_location)
+
+    def is_stale(self):
+        """ Returns True if the connection was closed or the database file was replaced or removed. """
+        return not self.is_open or self.file_inode != _get_file_inode(self.database_location)
+
+    def close(self):
+        with self.lock:
+            if self.is_open:
+                self.is_open = False
+                try:
+                    self.connection.close()
+                except Exception as error:
+                    logger.primary_logger.debug("SQLite Connection Close: " + str(error))
+
+
+class CreateDatabaseConnectionPool:
+    """
+    Creates and holds persistent SQLite3 connections, one set per database location.
+    All writes share a single writer connection guarded by a lock (SQLite only allows one writer at a time),
+    while each thread gets its own query only connection, which in WAL mode never blocks on the writer.
+    Query only connections run the database location's reader setup queries when opened, such as ATTACH.
+    """
+
+    def __init__(self):
+        self.process_id = os.getpid()
+        self.pool_lock = Lock()
+        self.writer_connections = {}
+        self.reader_connections = []
+        self.thread_readers = local()
+        self.reader_setup_sql_queries = {}
+
+    def set_reader_setup(self, setup_sql_queries, database_location):
+        """ Sets [sql_query, data_entries] run on each new query only connection, then re-opens current ones. """
+        self._check_process()
+        self.reader_setup_sql_queries[database_location] = setup_sql_queries
+        with self.pool_lock:
+            for connection in self.reader_connections:
+                if connection.database_location == database_location:
+                    connection.close()
+            self.reader_connections = [entry for entry in self.reader_connections if entry.is_open]
+
+    def write(self, sql_query, data_entries, database_location):
+        def execute_sql(connection):
+            if data_entries is None:
+                connection.execute(sql_query)
+            else:
+                connection.execute(sql_query, data_entries)
+
+        self._run_with_connection(self._get_writer, database_location, self._commit_or_drop(execute_sql))
+
+    def write_many(self, sql_queries_and_data_lists, database_location):
+        """ Runs executemany for each provided [sql_query, list_of_data_entries] in a single transaction. """
+        def execute_sql(connection):
+            for sql_query, data_entries_list in sql_queries_and_data_lists:
+                connection.executemany(sql_query, data_entries_list)
+
+        self._run_with_connection(self._get_writer, database_location, self._commit_or_drop(execute_sql))
+
+    def write_transaction(self, sql_queries_and_data, database_location):
+        """ Runs each provided [sql_query, data_entries or None] in a single immediate transaction. """
+        def execute_sql(connection):
+            connection.execute("BEGIN IMMEDIATE;")
+            for sql_query, data_entries in sql_queries_and_data:
+                if data_entries is None:
+                    connection.execute(sql_query)
+                else:
+                    connection.execute(sql_query, data_entries)
+
+        self._run_with_connection(self._get_writer, database_location, self._commit_or_drop(execute_sql))
+
+    @staticmethod
+    def _commit_or_drop(execute_sql_function):
+        def execute_and_commit(connection):
+            try:
+                execute_sql_function(connection.connection)
+                connection.connection.commit()
+            except Exception:
+                # Drop the connection so the next write starts with a clean connection & transaction
+                connection.is_open = False
+                connection.connection.close()
+                raise
+        return execute_and_commit
+
+    def read(self, sql_query, database_location):
+        def execute_and_fetch(connection):
+            return connection.connection.execute(sql_query).fetchall()
+
+        return self._run_with_connection(self._get_reader, database_location, execute_and_fetch)
+
+    def get_read_cursor(self, database_location):
+        """ Returns a cursor on the calling thread's query only connection. """
+        self._check_process()
+        return self._get_reader(database_location).connection.cursor()
+
+    def get_long_read_connection(self, database_location):
+        """
+        Returns a new query only CreateSQLiteConnection with the location's reader setup, for reads kept open
+        for a long time, like streamed exports. It's not pooled, close it when done.
+        """
+        self._check_process()
+        return CreateSQLiteConnection(database_location, query_only=True,
+                                      setup_sql_queries=self.reader_setup_sql_queries.get(database_location))
+
+    def checkpoint(self, database_location):
+        """ Copies all committed data from the WAL file into the main database file. """
+        def execute_checkpoint(connection):
+            connection.connection.execute("PRAGMA wal_checkpoint(TRUNCATE);")
+
+        self._run_with_connection(self._get_writer, database_location, execute_checkpoint)
+
+    def _run_with_connection(self, get_connection_function, database_location, sql_function):
+        self._check_process()
+        connection = get_connection_function(database_location)
+        with connection.lock:
+            if connection.is_open:
+                return sql_function(connection)
+        # Closed by close_connections() between lookup and lock, retry on a new connection
+        connection = get_connection_function(database_location)
+        with connection.lock:
+            return sql_function(connection)
+
+    def close_connections(self, database_location=None):
+        """ Closes pooled connections for the provided database location, or all locations if None. """
+        self._check_process()
+        with self.pool_lock:
+            for location in list(self.writer_connections):
+                if database_location is None or location == database_location:
+                    self.writer_connections.pop(location).close()
+            for connection in self.reader_connections:
+                if database_location is None or connection.database_location == database_location:
+                    connection.close()
+            self.reader_connections = [entry for entry in self.reader_connections if entry.is_open]
+
+    def _get_writer(self, database_location):
+        with self.pool_lock:
+            connection = self.writer_connections.get(database_location)
+            if connection is None or connection.is_stale():
+                if connection is not None:
+                    connection.close()
+                connection = CreateSQLiteConnection(database_location)
+                self.writer_connections[database_location] = connection
+            return connection
+
+    def _get_reader(self, database_location):
+        if not hasattr(self.thread_readers, "connections"):
+            self.thread_readers.connections = {}
+        connection = self.thread_readers.connections.get(database_location)
+        if connection is None or connection.is_stale():
+            if connection is not None:
+                connection.close()
+            setup_sql_queries = self.reader_setup_sql_queries.get(database_location)
+            connection = CreateSQLiteConnection(database_location, query_only=True,
+                                                setup_sql_queries=setup_sql_queries)
+            self.thread_readers.connections[database_location] = connection
+            with self.pool_lock:
+                self.reader_connections = [entry for entry in self.reader_connections if entry.is_open]
+                self.reader_connections.append(connection)
+        return connection
+
+    def _check_process(self):
+        # SQLite connections must not be used across a fork, such as the Plotly graph Process
+        if self.process_id != os.getpid():
+            self.process_id = os.getpid()
+            self.pool_lock = Lock()
+            self.writer_connections = {}
+            self.reader_connections = []
+            self.thread_readers = local()
+
+
+class CreateDatabaseWriteQueue:
+    """
+    Creates a queue for SQL row inserts, which a background thread writes in batches with executemany.
+    Rows are committed together once the oldest has waited max_write_delay_seconds or enough rows are waiting,
+    so frequent recordings share one disk sync instead of one each.
+    Queued rows not yet written are lost on power failure, the delay sets the longest this window can be.
+    If group_same_queries is True, all rows of a SQL query are written together in the order the query was
+    first queued, only use it when rows of the same query don't need to be between rows of other queries.
+    """
+
+    def __init__(self, group_same_queries=False):
+        self.group_same_queries = group_same_queries
+        self.max_queued_rows = 0
+        self.write_queue = Queue()
+        self.flush_lock = Lock()
+        self.rows_queued = Event()
+        self.flush_requested = Event()
+        self.writer_running = False
+        self.max_write_delay_seconds = 2.0
+
+        self.total_rows_written = 0
+        self.last_flush_row_count = 0
+        self.last_flush_latency_ms = 0.0
+        self.max_flush_latency_ms = 0.0
+
+    def add_row(self, sql_query, data_entries, sql_database_location):
+        self.write_queue.put([sql_query, data_entries, sql_database_location])
+        if not self.writer_running or self.max_write_delay_seconds <= 0:
+            self.flush()
+        else:
+            if self.write_queue.qsize() >= write_queue_max_rows_per_flush:
+                self.flush_requested.set()
+            self.rows_queued.set()
+
+    def get_queue_depth(self):
+        return self.write_queue.qsize()
+
+    def is_full(self):
+        """ Returns True if max_queued_rows is set and that many rows are waiting to be written. """
+        return 0 < self.max_queued_rows <= self.write_queue.qsize()
+
+    def get_status_str(self):
+        """ Returns queue depth and last flush statistics as a human readable String. """
+        return str(self.get_queue_depth()) + " Queued || Last Write: " + str(self.last_flush_row_count) + \
+            " Rows in " + str(round(self.last_flush_latency_ms, 1)) + " ms || Max Write: " + \
+            str(round(self.max_flush_latency_ms, 1)) + " ms"
+
+    def run_writer(self):
+        """ Waits for queued rows then writes them after max_write_delay_seconds or once enough rows are waiting. """
+        self.writer_running = True
+        try:
+            while True:
+                self.rows_queued.wait()
+                self.flush_requested.wait(timeout=self.max_write_delay_seconds)
+                self.rows_queued.clear()
+                self.flush_requested.clear()
+                self.flush()
+        finally:
+            self.writer_running = False
+            self.flush()
+
+    def flush(self):
+        """ Writes all currently queued rows to their database, one transaction per database. """
+        with self.flush_lock:
+            queued_rows = []
+            while True:
+                try:
+                    queued_rows.append(self.write_queue.get_nowait())
+                except Empty:
+                    break
+            if queued_rows:
+                start_time = time.perf_counter()
+                database_groups = _group_queued_rows(queued_rows, group_same_queries=self.group_same_queries)
+                for database_location, sql_queries_and_data_lists in database_groups.items():
+                    self._write_rows(sql_queries_and_data_lists, database_location)
+                self.last_flush_latency_ms = (time.perf_counter() - start_time) * 1000
+                if self.last_flush_latency_ms > self.max_flush_latency_ms:
+                    self.max_flush_latency_ms = self.last_flush_latency_ms
+                self.last_flush_row_count = len(queued_rows)
+                self.total_rows_written += len(queued_rows)
+
+    @staticmethod
+    def _write_rows(sql_queries_and_data_lists, database_location):
+        try:
+            database_connection_pool.write_many(sql_queries_and_data_lists, database_location)
+            logger.primary_logger.debug("SQL Queued Write to DataBase OK - " + database_location)
+        except Exception as error:
+            # Retry each query on its own, so one bad query doesn't lose the other queued rows
+            logger.primary_logger.warning("SQL Queued Write to DataBase Failed, Retrying Separately - " + str(error))
+            for sql_query_and_data_list in sql_queries_and_data_lists:
+                try:
+                    database_connection_pool.write_many([sql_query_and_data_list], database_location)
+                except Exception as error:
+                    logger.primary_logger.error("SQL Queued Write to DataBase Failed - " + str(error))
+                    logger.primary_logger.debug("Bad SQL Write String: " + str(sql_query_and_data_list[0]))
+
+
+def _group_queued_rows(queued_rows, group_same_queries=False):
+    """
+    Returns queued rows grouped by database, then by SQL query for executemany, keeping the order added.
+    If group_same_queries is True, rows are grouped with every other row of the same query, not just the one before.
+    """
+    database_groups = {}
+    for sql_query, data_entries, database_location in queued_rows:
+        query_groups = database_groups.setdefault(database_location, [])
+        if query_groups and query_groups[-1][0] == sql_query:
+            query_groups[-1][1].append(data_entries)
+        elif group_same_queries:
+            for query_group in query_groups:
+                if query_group[0] == sql_query:
+                    query_group[1].append(data_entries)
+                    break
+            else:
+                query_groups.append([sql_query, [data_entries]])
+        else:
+            query_groups.append([sql_query, [data_entries]])
+    return database_groups
+
+
+def _get_file_inode(file_location):
+    try:
+        return os.stat(file_location).st_ino
+    except OSError:
+        return None
+
+
+database_connection_pool = CreateDatabaseConnectionPool()
+database_write_queue = CreateDatabaseWriteQueue()
+checkin_write_queue = CreateDatabaseWriteQueue(group_same_queries=True)
+checkin_write_queue.max_write_delay_seconds = checkin_write_queue_delay_seconds
+checkin_write_queue.max_queued_rows = checkin_write_queue_max_rows
+atexit.register(database_write_queue.flush)
+atexit.register(checkin_write_queue.flush)
+
+
+def start_database_write_queue_server(max_write_delay_seconds):
+    database_write_queue.max_write_delay_seconds = max_write_delay_seconds
+    text_name = "Database Write Queue"
+    function = database_write_queue.run_writer
+    app_cached_variables.database_write_queue_thread = CreateMonitoredThread(function, thread_name=text_name)
+
+
+def start_checkin_write_queue_server():
+    text_name = "Check-In Write Queue"
+    function = checkin_write_queue.run_writer
+    app_cached_variables.checkin_write_queue_thread = CreateMonitoredThread(function, thread_name=text_name)
+
+
 def write_to_sql_database(sql_query, data_entries,
                           sql_database_location=file_locations.sensor_database):
     """ Executes provided string with SQLite3.  Used to write sensor readings to the SQL Database. """
     try:
-        db_connection = sqlite3.connect(sql_database_location)
-        db_cursor = db_connection.cursor()
-        if data_entries is None:
-            db_cursor.execute(sql_query)
-        else:
-            db_cursor.execute(sql_query, data_entries)
-        db_connection.commit()
-        db_connection.close()
-        logger.primary_logger.debug("SQL Write to DataBase OK - " + file_locations.sensor_database)
+        database_connection_pool.write(sql_query, data_entries, sql_database_location)
+        logger.primary_logger.debug("SQL Write to DataBase OK - " + sql_database_location)
     except Exception as error:
         logger.primary_logger.error("SQL Write to DataBase Failed - " + str(error))
         logger.primary_logger.debug("Bad SQL Write String: " + str(sql_query))
 
 
+def queue_write_to_sql_database(sql_query, data_entries, sql_database_location=file_locations.sensor_database):
+    """
+    Queues provided SQL insert & data to be written in a batch by the Database Write Queue thread.
+    Used for frequent sensor recordings, writes immediately if the write queue is not running.
+    """
+    try:
+        database_write_queue.add_row(sql_query, data_entries, sql_database_location)
+    except Exception as error:
+        logger.primary_logger.error("SQL Queued Write to DataBase Failed - " + str(error))
+
+
+def flush_sql_database_write_queue():
+    """ Writes all queued SQL inserts to the database now. """
+    try:
+        database_write_queue.flush()
+    except Exception as error:
+        logger.primary_logger.error("SQL Write Queue Flush Failed - " + str(error))
+
+
 def sql_execute_get_data(sql_query, sql_database_location=file_locations.sensor_database):
     """ Returns SQL data based on provided sql_query. """
     try:
-        database_connection = sqlite3.connect(sql_database_location)
-        sqlite_database = database_connection.cursor()
-        sqlite_database.execute(sql_query)
-        sql_column_data = sqlite_database.fetchall()
-        database_connection.close()
+        sql_column_data = database_connection_pool.read(sql_query, sql_database_location)
     except Exception as error:
         logger.primary_logger.warning("SQL Execute Get Data Error: " + str(error))
         sql_column_data = []
     return sql_column_data
 
 
+def get_sql_columns_data(sql_columns, sql_table=database_variables.table_interval,
+                         start_datetime="1111-08-21 00:00:01", end_datetime="9999-01-01 00:00:01",
+                         rowid_skip=0, max_rows=200000, newest_first=False,
+                         sql_database_location=file_locations.sensor_database):
+    """
+    Returns DateTime and all provided columns using a single query, as a dictionary of column: [DateTimes, Values].
+    NULLs are removed per column, so each column's DateTimes only include rows where that column has a value.
+    """
+    sql_columns = [column for column in sql_columns if column != database_variables.all_tables_datetime]
+    sql_query = "SELECT " + ",".join([database_variables.all_tables_datetime] + sql_columns) + \
+                " FROM " + sql_table + \
+                " WHERE DateTime BETWEEN datetime('" + start_datetime + "') AND datetime('" + end_datetime + "')"
+
+    # Skip rows that have none of the requested readings, like the per column IS NOT NULL used to
+    reading_columns = [column for column in sql_columns
+                       if column not in [database_variables.sensor_name, database_variables.ip]]
+    if reading_columns:
+        sql_query += " AND (" + " OR ".join([column + " IS NOT NULL" for column in reading_columns]) + ")"
+    if rowid_skip:
+        sql_query += " AND ROWID % " + str(rowid_skip + 1) + " = 0"
+    if newest_first:
+        sql_query += " ORDER BY DateTime DESC"
+    sql_query += " LIMIT " + str(max_rows)
+
+    sql_rows = sql_execute_get_data(sql_query, sql_database_location=sql_database_location)
+    datetime_list = [row[0] for row in sql_rows]
+    columns_data = {database_variables.all_tables_datetime: [datetime_list, datetime_list]}
+    for index, column in enumerate(sql_columns, start=1):
+        column_datetime_list = []
+        column_values_list = []
+        for row in sql_rows:
+            if row[index] is not None:
+                column_datetime_list.append(row[0])
+                column_values_list.append(row[index])
+        columns_data[column] = [column_datetime_list, column_values_list]
+    return columns_data
+
+
+def checkpoint_database(sql_database_location=file_locations.sensor_database):
+    """ Writes pending WAL data into the database file. Use before copying or sending the database file. """
+    try:
+        database_connection_pool.checkpoint(sql_database_location)
+    except Exception as error:
+        logger.primary_logger.warning("SQL Database Checkpoint Failed - " + str(error))
+
+
+def close_database_connections(sql_database_location=None):
+    """ Closes pooled connections to the provided database. Use before removing or replacing the database file. """
+    try:
+        database_connection_pool.close_connections(database_location=sql_database_location)
+    except Exception as error:
+        logger.primary_logger.warning("SQL Database Connection Close Failed - " + str(error))
+
+
 def check_checkin_database_structure(database_location=file_locations.sensor_checkin_database):
+    """
+    Creates or verifies the Check-Ins & latest Check-In state tables.
+    Then moves any Check-Ins from the old one table per Sensor ID layout into them.
+    """
     logger.primary_logger.debug("Running Check on 'Checkin' Database")
     try:
-        db_connection = sqlite3.connect(database_location)
+        db_connection = sqlite3.connect(database_location, timeout=sqlite_busy_timeout_sec)
         db_cursor = db_connection.cursor()
-
-        get_sensor_checkin_ids_sql = "SELECT name FROM sqlite_master WHERE type='table';"
-        sensor_ids = sql_execute_get_data(get_sensor_checkin_ids_sql, sql_database_location=database_location)
-
-        columns = [database_variables.sensor_check_in_version,
-                   database_variables.sensor_uptime,
-                   database_variables.sensor_check_in_installed_sensors,
-                   database_variables.sensor_check_in_primary_log,
-                   database_variables.sensor_check_in_sensors_log]
-        for sensor_id in sensor_ids:
-            cleaned_id = str(sensor_id[0]).strip()
-            for column in columns:
-                try:
-                    add_columns_sql = "ALTER TABLE '" + cleaned_id + "' ADD COLUMN " + column + " TEXT"
-                    db_cursor.execute(add_columns_sql)
-                except Exception as error:
-                    if str(error)[:21] != "duplicate column name":
-                        logger.primary_logger.error("Checkin Database Error: " + str(error))
+        db_cursor.execute("PRAGMA journal_mode=WAL;")
+        for sql_query in get_checkin_tables_sql():
+            db_cursor.execute(sql_query)
         db_connection.commit()
+
+        checkin_tables = [database_variables.table_checkins, database_variables.table_checkins_latest]
+        old_checkin_tables = []
+        for table_name in db_cursor.execute("SELECT name FROM sqlite_master WHERE type='table';").fetchall():
+            table_name = str(table_name[0])
+            if table_name not in checkin_tables and not table_name.startswith("sqlite_") \
+                    and table_name != "android_metadata":
+                old_checkin_tables.append(table_name)
         db_connection.close()
+
+        if len(old_checkin_tables) > 0:
+            logger.primary_logger.info("Moving " + str(len(old_checkin_tables)) + " Sensor Check-In Tables")
+            for table_name in old_checkin_tables:
+                migrate_old_checkin_table(table_name, database_location=database_location)
+            logger.primary_logger.info("Sensor Check-In Tables Move Complete")
         logger.primary_logger.debug("Check on 'Checkin' Database Complete")
         return True
     except Exception as error:
@@ -102,20 +530,113 @@ def check_checkin_database_structure(database_location=file_locations.sensor_che
         return False
 
 
+def get_checkin_tables_sql():
+    """ Returns a list of SQL queries that create the Check-Ins & latest Check-In state tables and indexes. """
+    checkin_id = database_variables.sensor_check_in_id
+    datetime_column = database_variables.all_tables_datetime
+    text_columns_sql = ""
+    for column in _get_checkin_text_columns():
+        text_columns_sql += ", " + column + " TEXT"
+
+    checkins_sql = "CREATE TABLE IF NOT EXISTS " + database_variables.table_checkins + \
+                   " (" + checkin_id + " TEXT NOT NULL, " + datetime_column + " TEXT NOT NULL" + text_columns_sql + \
+                   ", PRIMARY KEY (" + checkin_id + ", " + datetime_column + "))"
+    checkins_latest_sql = "CREATE TABLE IF NOT EXISTS " + database_variables.table_checkins_latest + \
+                          " (" + checkin_id + " TEXT PRIMARY KEY, " + datetime_column + " TEXT" + \
+                          text_columns_sql + ", " + database_variables.sensor_check_in_count + " INTEGER)"
+    checkins_latest_index_sql = "CREATE INDEX IF NOT EXISTS " + database_variables.table_checkins_latest + \
+                                "DateTimeIndex ON " + database_variables.table_checkins_latest + \
+                                " (" + datetime_column + ")"
+    return [checkins_sql, checkins_latest_sql, checkins_latest_index_sql]
+
+
+def migrate_old_checkin_table(table_name, database_location=file_locations.sensor_checkin_database):
+    """
+    Copies a old per Sensor ID Check-In table into the Check-Ins table, rebuilds the sensor's latest state,
+    then removes the old table, all in one transaction. Columns missing from very old tables are left blank.
+    """
+    try:
+        db_cursor = database_connection_pool.get_read_cursor(database_location)
+        old_table_columns = [column[0] for column in get_table_columns_and_types(table_name, db_cursor)]
+        select_columns = []
+        for column in _get_checkin_text_columns():
+            if column in old_table_columns:
+                select_columns.append(column)
+            else:
+                select_columns.append("''")
+
+        sql_table_name = '"' + table_name.replace('"', '""') + '"'
+        sql_copy_rows = "INSERT OR IGNORE INTO " + database_variables.table_checkins + \
+                        " (" + ",".join(get_checkin_columns()) + ") SELECT ?," + \
+                        database_variables.all_tables_datetime + "," + ",".join(select_columns) + \
+                        " FROM " + sql_table_name + " WHERE " + database_variables.all_tables_datetime + " IS NOT NULL"
+        database_connection_pool.write_transaction(
+            [[sql_copy_rows, [table_name]],
+             [get_checkin_latest_rebuild_sql(), {"sensor_id": table_name}],
+             ["DROP TABLE " + sql_table_name, None]], database_location)
+        return True
+    except Exception as error:
+        logger.primary_logger.error("Sensor Check-In Table " + table_name + " Move Failed: " + str(error))
+    return False
+
+
+def get_checkin_latest_rebuild_sql():
+    """
+    Returns SQL that rebuilds a Sensor ID's latest Check-In state from all its Check-Ins.
+    Installed sensors & logs are the latest non-blank ones. Use with data entries {"sensor_id": sensor_id}.
+    """
+    checkin_id = database_variables.sensor_check_in_id
+    datetime_column = database_variables.all_tables_datetime
+    blank_skipped_columns = [database_variables.sensor_check_in_installed_sensors,
+                             database_variables.sensor_check_in_primary_log,
+                             database_variables.sensor_check_in_sensors_log]
+
+    select_latest_columns = []
+    for column in _get_checkin_text_columns():
+        sql_latest_value = "(SELECT " + column + " FROM " + database_variables.table_checkins + \
+                           " WHERE " + checkin_id + " = :sensor_id"
+        if column in blank_skipped_columns:
+            sql_latest_value += " AND " + column + " != ''"
+        select_latest_columns.append(sql_latest_value + " ORDER BY " + datetime_column + " DESC LIMIT 1)")
+    return "INSERT OR REPLACE INTO " + database_variables.table_checkins_latest + \
+           " (" + ",".join(get_checkin_columns()) + "," + database_variables.sensor_check_in_count + ")" + \
+           " SELECT :sensor_id, max(" + datetime_column + ")," + ",".join(select_latest_columns) + ", count(*)" + \
+           " FROM " + database_variables.table_checkins + " WHERE " + checkin_id + " = :sensor_id" + \
+           " GROUP BY " + checkin_id
+
+
+def get_checkin_columns():
+    """ Returns the Check-Ins table column names in order, Sensor ID & DateTime first. """
+    return [database_variables.sensor_check_in_id, database_variables.all_tables_datetime] + \
+           _get_checkin_text_columns()
+
+
+def _get_checkin_text_columns():
+    return [database_variables.sensor_check_in_version,
+            database_variables.sensor_check_in_installed_sensors,
+            database_variables.sensor_uptime,
+            database_variables.sensor_check_in_primary_log,
+            database_variables.sensor_check_in_sensors_log]
+
+
 def check_main_database_structure(database_location=file_locations.sensor_database):
     """ Loads or creates the SQLite database then verifies or adds all tables and columns. """
     logger.primary_logger.debug("Running Checks on Main Database")
     columns_created = 0
     columns_already_made = 0
     try:
-        db_connection = sqlite3.connect(database_location)
+        db_connection = sqlite3.connect(database_location, timeout=sqlite_busy_timeout_sec)
         db_cursor = db_connection.cursor()
+        db_cursor.execute("PRAGMA journal_mode=WAL;")
 
         create_table_and_datetime(database_variables.table_interval, db_cursor)
         create_table_and_datetime(database_variables.table_trigger, db_cursor)
         for column in database_variables.get_sensor_columns_list():
-            interval_response = check_sql_table_and_column(database_variables.table_interval, column, db_cursor)
-            trigger_response = check_sql_table_and_column(database_variables.table_trigger, column, db_cursor)
+            column_type = get_sql_column_type(column)
+            interval_response = check_sql_table_and_column(database_variables.table_interval, column, db_cursor,
+                                                           column_type=column_type)
+            trigger_response = check_sql_table_and_column(database_variables.table_trigger, column, db_cursor,
+                                                          column_type=column_type)
             for response in [interval_response, trigger_response]:
                 if response:
                     columns_created += 1
@@ -134,9 +655,24 @@ def check_main_database_structure(database_location=file_locations.sensor_databa
             else:
                 columns_already_made += 1
 
+        for rollup_table in database_variables.get_rollup_tables_list():
+            create_table_and_datetime(rollup_table, db_cursor)
+            for column in database_variables.get_rollup_columns_list():
+                if check_sql_table_and_column(rollup_table, column, db_cursor,
+                                              column_type=get_sql_column_type(column)):
+                    columns_created += 1
+                else:
+                    columns_already_made += 1
+            create_datetime_index(rollup_table, db_cursor)
+
+        for table_name in [database_variables.table_interval, database_variables.table_trigger]:
+            # Tables with old TEXT only columns get their index when converted by the database upgrade
+            if not check_table_needs_typed_columns(get_table_columns_and_types(table_name, db_cursor)):
+                create_datetime_index(table_name, db_cursor)
+
         db_connection.commit()
         db_connection.close()
-        debug_log_message = str(columns_already_made) + " Columns found in 3 SQL Tables, "
+        debug_log_message = str(columns_already_made) + " Columns found in 6 SQL Tables, "
         logger.primary_logger.debug(debug_log_message + str(columns_created) + " Created")
         logger.primary_logger.debug("Checks on Main Database Complete")
         return True
@@ -145,6 +681,26 @@ def check_main_database_structure(database_location=file_locations.sensor_databa
         return False
 
 
+def check_partition_database_structure(database_location):
+    """ Creates or verifies a database partition's Interval & Trigger tables with typed columns and indexes. """
+    try:
+        db_connection = sqlite3.connect(database_location, timeout=sqlite_busy_timeout_sec)
+        db_cursor = db_connection.cursor()
+        db_cursor.execute("PRAGMA journal_mode=WAL;")
+        for table_name in [database_variables.table_interval, database_variables.table_trigger]:
+            create_table_and_datetime(table_name, db_cursor)
+            for column in database_variables.get_sensor_columns_list():
+                check_sql_table_and_column(table_name, column, db_cursor, column_type=get_sql_column_type(column))
+            create_datetime_index(table_name, db_cursor)
+        check_sql_table_and_column(database_variables.table_trigger, database_variables.trigger_state, db_cursor)
+        db_connection.commit()
+        db_connection.close()
+        return True
+    except Exception as error:
+        logger.primary_logger.error("Checks on Database Partition Failed: " + str(error))
+        return False
+
+
 def create_table_and_datetime(table, db_cursor):
     """ Add's or verifies provided table and DateTime column in the SQLite Database. """
     try:
@@ -155,10 +711,11 @@ def create_table_and_datetime(table, db_cursor):
         logger.primary_logger.debug("SQLite3 Table Check/Creation: " + str(error))
 
 
-def check_sql_table_and_column(table_name, column_name, db_cursor):
+def check_sql_table_and_column(table_name, column_name, db_cursor, column_type="TEXT"):
     """ Add's or verifies provided table and column in the SQLite Database. """
     try:
-        db_cursor.execute("ALTER TABLE {tn} ADD COLUMN '{cn}' {ct}".format(tn=table_name, cn=column_name, ct="TEXT"))
+        sql_query = "ALTER TABLE {tn} ADD COLUMN '{cn}' {ct}".format(tn=table_name, cn=column_name, ct=column_type)
+        db_cursor.execute(sql_query)
         return True
     except Exception as error:
         if str(error)[:21] != "duplicate column name":
@@ -166,6 +723,110 @@ def check_sql_table_and_column(table_name, column_name, db_cursor):
     return False
 
 
+def create_datetime_index(table_name, db_cursor):
+    """ Add's or verifies the DateTime index used by date range queries and sorting on the provided table. """
+    try:
+        db_cursor.execute("CREATE INDEX IF NOT EXISTS {tn}DateTimeIndex ON {tn} (DateTime)".format(tn=table_name))
+    except Exception as error:
+        logger.primary_logger.warning("SQLite3 DateTime Index Check Error: " + str(error))
+
+
+def get_sql_column_type(column_name):
+    """ Returns the SQLite column type used for the provided Interval or Trigger column name. """
+    if column_name in [database_variables.all_tables_datetime, database_variables.sensor_name,
+                       database_variables.ip, database_variables.trigger_state]:
+        return "TEXT"
+    elif column_name == database_variables.sensor_uptime or column_name.endswith(database_variables.rollup_count):
+        return "INTEGER"
+    return "REAL"
+
+
+def get_sql_numeric_value(column_name):
+    """ Returns a SQL expression for the column's numeric value, or NULL for text like 'NoSensor'. """
+    return "(CASE WHEN typeof(" + column_name + ") IN ('real', 'integer') THEN " + column_name + \
+           " WHEN " + column_name + " GLOB '*[0-9]*' AND NOT " + column_name + " GLOB '*[^0-9.eE+-]*'" + \
+           " THEN CAST(" + column_name + " AS REAL) END)"
+
+
+def get_table_columns_and_types(table_name, db_cursor):
+    """ Returns a list of [column_name, declared_type] for the provided table. """
+    # main. skips any TEMP view of the same name, like the ones joining database partitions
+    table_info = db_cursor.execute("PRAGMA main.table_info(" + table_name + ");").fetchall()
+    return [[column[1], column[2].upper()] for column in table_info]
+
+
+def check_table_needs_typed_columns(table_columns_and_types):
+    """ Returns True if any of the provided [column_name, declared_type] are not the expected type. """
+    for column_name, column_type in table_columns_and_types:
+        if column_type != get_sql_column_type(column_name):
+            return True
+    return False
+
+
+def migrate_table_to_typed_columns(table_name, sql_database_location=file_locations.sensor_database):
+    """
+    Converts provided table to typed columns with a DateTime index, while recording continues.
+    Rows are copied to a new table in small transactions, then the remaining rows are copied and the
+    tables swapped in a final transaction. An interrupted conversion continues where it left off on the next run.
+    Non numeric values such as 'NoSensor' are kept as TEXT by SQLite's column type affinity.
+    """
+    migration_table = table_name + "Migration"
+    # A connection of its own, without the pooled reader setup, so reads are not of the partition views
+    # and attaching partitions during the conversion doesn't close it
+    read_connection = None
+    try:
+        read_connection = CreateSQLiteConnection(sql_database_location, query_only=True)
+        db_cursor = read_connection.connection.cursor()
+        columns_and_types = get_table_columns_and_types(table_name, db_cursor)
+        column_names = [column[0] for column in columns_and_types]
+        sql_columns = ",".join(column_names)
+
+        if [column[0] for column in get_table_columns_and_types(migration_table, db_cursor)] == column_names:
+            sql_query = "SELECT max(ROWID) FROM main." + migration_table
+            last_rowid_copied = db_cursor.execute(sql_query).fetchone()[0] or 0
+            logger.primary_logger.info(table_name + " Typed Column Conversion Resuming at Row " + str(last_rowid_copied))
+        else:
+            sql_new_columns = ",".join([name + " " + get_sql_column_type(name) for name in column_names])
+            database_connection_pool.write_transaction(
+                [["DROP TABLE IF EXISTS " + migration_table, None],
+                 ["CREATE TABLE " + migration_table + " (" + sql_new_columns + ")", None],
+                 ["CREATE INDEX IF NOT EXISTS " + table_name + "DateTimeIndex ON " + migration_table + " (DateTime)",
+                  None]], sql_database_location)
+            last_rowid_copied = 0
+            logger.primary_logger.info(table_name + " Typed Column Conversion Started")
+
+        sql_copy_rows = "INSERT INTO " + migration_table + " (ROWID," + sql_columns + ") SELECT ROWID," + \
+                        sql_columns + " FROM " + table_name + " WHERE ROWID > ? AND ROWID <= ? ORDER BY ROWID"
+        chunk_count = 0
+        while True:
+            last_rowid = db_cursor.execute("SELECT max(ROWID) FROM main." + table_name).fetchone()[0] or 0
+            if last_rowid - last_rowid_copied <= migration_rows_per_chunk:
+                break
+            next_last_rowid = last_rowid_copied + migration_rows_per_chunk
+            database_connection_pool.write(sql_copy_rows, [last_rowid_copied, next_last_rowid], sql_database_location)
+            last_rowid_copied = next_last_rowid
+            chunk_count += 1
+            if chunk_count % 100 == 0:
+                progress = str(last_rowid_copied) + " of " + str(last_rowid)
+                logger.primary_logger.info(table_name + " Typed Column Conversion - " + progress + " Rows Copied")
+            time.sleep(migration_pause_between_chunks_sec)
+
+        # Rows recorded during the conversion are copied along with the table swap
+        database_connection_pool.write_transaction(
+            [["INSERT INTO " + migration_table + " (ROWID," + sql_columns + ") SELECT ROWID," + sql_columns +
+              " FROM " + table_name + " WHERE ROWID > ? ORDER BY ROWID", [last_rowid_copied]],
+             ["DROP TABLE " + table_name, None],
+             ["ALTER TABLE " + migration_table + " RENAME TO " + table_name, None]], sql_database_location)
+        logger.primary_logger.info(table_name + " Typed Column Conversion Complete")
+        return True
+    except Exception as error:
+        logger.primary_logger.error(table_name + " Typed Column Conversion Failed: " + str(error))
+    finally:
+        if read_connection is not None:
+            read_connection.close()
+    return False
+
+
 def validate_sqlite_database(database_location):
     table_to_check = database_variables.table_interval
     sql_table_check_query = "SELECT name FROM sqlite_master WHERE type='table' AND name='" + table_to_check + "';"
@@ -0,0 +1,84 @@
+"""
+    KootNet Sensors is a collection of programs and scripts to deploy,
+    interact with, and collect readings from various Sensors.
+    Copyright (C) 2018  Chad Ermacora  chad.ermacora@gmail.com
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import time
+from contextlib import contextmanager
+from threading import Lock, local
+
+# Sections quicker than this are left out of the Startup Profile page, like '-X importtime' noise
+minimum_section_seconds = 0.001
+
+
+class CreateStartupProfile:
+    """
+    Creates a record of how long each part of the program startup took, like module imports and sensor
+    initializations, measured from when this module was first imported.
+    Nested sections are indented under the section they ran in, similar to 'python3 -X importtime'.
+    """
+
+    def __init__(self):
+        self.start_time = time.perf_counter()
+        self.web_portal_ready_seconds = None
+        self.sections = []
+        self._lock = Lock()
+        self._thread_local = local()
+
+    @contextmanager
+    def time_section(self, section_name):
+        """ Times the code run inside the with statement and adds it to the profile as section_name. """
+        depth = getattr(self._thread_local, "depth", 0)
+        section = [section_name, depth, time.perf_counter() - self.start_time, None]
+        with self._lock:
+            self.sections.append(section)
+        self._thread_local.depth = depth + 1
+        section_start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            section[3] = time.perf_counter() - section_start_time
+            self._thread_local.depth = depth
+
+    def set_web_portal_ready(self):
+        """ Records how long after startup the Web Portal started accepting connections. """
+        if self.web_portal_ready_seconds is None:
+            self.web_portal_ready_seconds = time.perf_counter() - self.start_time
+
+    def get_web_portal_ready_str(self):
+        """ Returns how long the Web Portal took to start as a string. """
+        if self.web_portal_ready_seconds is None:
+            return "Not Started"
+        return str(round(self.web_portal_ready_seconds, 3)) + " Seconds"
+
+    def get_profile_str(self):
+        """ Returns the startup profile as text, one section per line in the order they started. """
+        profile_lines = ["  Started At |   Duration | Section"]
+        with self._lock:
+            sections = list(self.sections)
+        for section_name, depth, started_at, duration in sections:
+            if duration is None:
+                duration_str = "Running"
+            elif duration < minimum_section_seconds:
+                continue
+            else:
+                duration_str = "{0:>9.3f}s".format(duration)
+            profile_lines.append("{0:>11.3f}s | {1:>10} | {2}{3}".format(started_at, duration_str,
+                                                                         "  " * depth, section_name))
+        return "\n".join(profile_lines)
+
+
+startup_profile = CreateStartupProfile()
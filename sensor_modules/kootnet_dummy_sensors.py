@@ -10,9 +10,9 @@ import time
 import random
 from operations_modules import logger
 from operations_modules.app_cached_variables import database_variables
+from sensor_modules import sensor_bus_access
 
 round_decimal_to = 5
-pause_sensor_during_access_sec = 0.005
 
 senor_delay_min = 0.001
 sensor_delay_max = 0.015
@@ -22,7 +22,7 @@ class CreateDummySensors:
     """ Creates Function access to the Kootnet Dummy Sensors. """
 
     def __init__(self):
-        self.sensor_in_use = False
+        self.bus_access = sensor_bus_access.get_bus_access(sensor_bus_access.bus_dummy, "Kootnet Dummy Sensors")
         self.display_in_use = False
         logger.sensors_logger.debug("Kootnet Dummy Sensors Initialization - OK")
 
@@ -38,74 +38,50 @@ class CreateDummySensors:
 
     def cpu_temperature(self):
         """ Returns System CPU Temperature as a Float in Celsius. """
-        while self.sensor_in_use:
-            time.sleep(pause_sensor_during_access_sec)
-        self.sensor_in_use = True
-        time.sleep(random.uniform(senor_delay_min, sensor_delay_max))
-        self.sensor_in_use = False
+        with self.bus_access:
+            time.sleep(random.uniform(senor_delay_min, sensor_delay_max))
         return self._get_random_float(min_number=25, max_number=85)
 
     def temperature(self):
         """ Returns Temperature as a Float in Celsius. """
-        while self.sensor_in_use:
-            time.sleep(pause_sensor_during_access_sec)
-        self.sensor_in_use = True
-        time.sleep(random.uniform(senor_delay_min, sensor_delay_max))
-        self.sensor_in_use = False
+        with self.bus_access:
+            time.sleep(random.uniform(senor_delay_min, sensor_delay_max))
         return self._get_random_float(min_number=-20, max_number=65)
 
     def pressure(self):
         """ Returns Pressure as a Integer. """
-        while self.sensor_in_use:
-            time.sleep(pause_sensor_during_access_sec)
-        self.sensor_in_use = True
-        time.sleep(random.uniform(senor_delay_min, sensor_delay_max))
-        self.sensor_in_use = False
+        with self.bus_access:
+            time.sleep(random.uniform(senor_delay_min, sensor_delay_max))
         return self._get_random_int(min_number=650, max_number=1200)
 
     def humidity(self):
         """ Returns Altitude as a Float. """
-        while self.sensor_in_use:
-            time.sleep(pause_sensor_during_access_sec)
-        self.sensor_in_use = True
-        time.sleep(random.uniform(senor_delay_min, sensor_delay_max))
-        self.sensor_in_use = False
+        with self.bus_access:
+            time.sleep(random.uniform(senor_delay_min, sensor_delay_max))
         return self._get_random_float(min_number=35, max_number=65)
 
     def distance(self):
         """ Returns Altitude as a Float. """
-        while self.sensor_in_use:
-            time.sleep(pause_sensor_during_access_sec)
-        self.sensor_in_use = True
-        time.sleep(random.uniform(senor_delay_min, sensor_delay_max))
-        self.sensor_in_use = False
+        with self.bus_access:
+            time.sleep(random.uniform(senor_delay_min, sensor_delay_max))
         return self._get_random_float(min_number=25, max_number=133)
 
     def gas_resistance_index(self):
         """ Returns Gas Resistance Index as a float. """
-        while self.sensor_in_use:
-            time.sleep(pause_sensor_during_access_sec)
-        self.sensor_in_use = True
-        time.sleep(random.uniform(senor_delay_min, sensor_delay_max))
-        self.sensor_in_use = False
+        with self.bus_access:
+            time.sleep(random.uniform(senor_delay_min, sensor_delay_max))
         return self._get_random_float(min_number=25, max_number=133)
 
     def gas_data(self):
         """ Returns 3 gas readings Oxidised, Reduced and nh3 as floats in a list. """
-        while self.sensor_in_use:
-            time.sleep(pause_sensor_during_access_sec)
-        self.sensor_in_use = True
-        time.sleep(random.uniform(senor_delay_min, sensor_delay_max))
-        self.sensor_in_use = False
+        with self.bus_access:
+            time.sleep(random.uniform(senor_delay_min, sensor_delay_max))
         return self._get_random_tri_float(min_number=200, max_number=2200)
 
     def particulate_matter_data(self):
         """ Returns 3 Particulate Matter readings pm1, pm25 and pm10 as floats in a list. """
-        while self.sensor_in_use:
-            time.sleep(pause_sensor_during_access_sec)
-        self.sensor_in_use = True
-        time.sleep(random.uniform(senor_delay_min, sensor_delay_max))
-        self.sensor_in_use = False
+        with self.bus_access:
+            time.sleep(random.uniform(senor_delay_min, sensor_delay_max))
         return {database_variables.particulate_matter_1: self._get_random_float(min_number=10, max_number=135),
                 database_variables.particulate_matter_2_5: self._get_random_float(min_number=10, max_number=135),
                 database_variables.particulate_matter_4: self._get_random_float(min_number=10, max_number=135),
@@ -113,70 +89,49 @@ class CreateDummySensors:
 
     def ultra_violet_index(self):
         """ Returns Ultra Violet (A,B) comparators as floats in a list. """
-        while self.sensor_in_use:
-            time.sleep(pause_sensor_during_access_sec)
-        self.sensor_in_use = True
-        time.sleep(random.uniform(senor_delay_min, sensor_delay_max))
-        uv_index = self._get_random_float(min_number=0, max_number=65)
-        self.sensor_in_use = False
+        with self.bus_access:
+            time.sleep(random.uniform(senor_delay_min, sensor_delay_max))
+            uv_index = self._get_random_float(min_number=0, max_number=65)
         return uv_index
 
     def ultra_violet(self):
         """ Returns Ultra Violet (A,B) as floats in a list. """
-        while self.sensor_in_use:
-            time.sleep(pause_sensor_during_access_sec)
-        self.sensor_in_use = True
-        time.sleep(random.uniform(senor_delay_min, sensor_delay_max))
-        self.sensor_in_use = False
+        with self.bus_access:
+            time.sleep(random.uniform(senor_delay_min, sensor_delay_max))
         ultra_a = self._get_random_float(min_number=0, max_number=65)
         ultra_b = self._get_random_float(min_number=0, max_number=65)
         return [ultra_a, ultra_b]
 
     def lumen(self):
         """ Returns Lumen as a Float. """
-        while self.sensor_in_use:
-            time.sleep(pause_sensor_during_access_sec)
-        self.sensor_in_use = True
-        time.sleep(random.uniform(senor_delay_min, sensor_delay_max))
-        self.sensor_in_use = False
+        with self.bus_access:
+            time.sleep(random.uniform(senor_delay_min, sensor_delay_max))
         return self._get_random_float(min_number=5, max_number=1700)
 
     def spectral_six_channel(self):
         """ Returns Red, Orange, Yellow, Green, Blue and Violet as floats in a list. """
-        while self.sensor_in_use:
-            time.sleep(pause_sensor_during_access_sec)
-        self.sensor_in_use = True
-        time.sleep(random.uniform(senor_delay_min, sensor_delay_max))
-        self.sensor_in_use = False
+        with self.bus_access:
+            time.sleep(random.uniform(senor_delay_min, sensor_delay_max))
         return_six = self._get_random_tri_float(min_number=10, max_number=135) + \
                      self._get_random_tri_float(min_number=10, max_number=135)
         return return_six
 
     def accelerometer_xyz(self):
         """ Returns Accelerometer X, Y, Z as floats in a list. """
-        while self.sensor_in_use:
-            time.sleep(pause_sensor_during_access_sec)
-        self.sensor_in_use = True
-        time.sleep(random.uniform(senor_delay_min, sensor_delay_max))
-        self.sensor_in_use = False
+        with self.bus_access:
+            time.sleep(random.uniform(senor_delay_min, sensor_delay_max))
         return self._get_random_tri_float(min_number=0, max_number=0)
 
     def magnetometer_xyz(self):
         """ Returns Magnetometer X, Y, Z as floats in a list. """
-        while self.sensor_in_use:
-            time.sleep(pause_sensor_during_access_sec)
-        self.sensor_in_use = True
-        time.sleep(random.uniform(senor_delay_min, sensor_delay_max))
-        self.sensor_in_use = False
+        with self.bus_access:
+            time.sleep(random.uniform(senor_delay_min, sensor_delay_max))
         return self._get_random_tri_float(min_number=35, max_number=85)
 
     def gyroscope_xyz(self):
         """ Returns Gyroscope X, Y, Z as floats in a list. """
-        while self.sensor_in_use:
-            time.sleep(pause_sensor_during_access_sec)
-        self.sensor_in_use = True
-        time.sleep(random.uniform(senor_delay_min, sensor_delay_max))
-        self.sensor_in_use = False
+        with self.bus_access:
+            time.sleep(random.uniform(senor_delay_min, sensor_delay_max))
         return self._get_random_tri_float(min_number=0, max_number=135)
 
     @staticmethod
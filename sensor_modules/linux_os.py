@@ -17,6 +17,7 @@ from operations_modules import logger
 from operations_modules import file_locations
 from operations_modules import app_generic_functions
 from operations_modules import sqlite_database
+from operations_modules import database_partitions
 
 round_decimal_to = 2
 
@@ -142,10 +143,13 @@ class CreateLinuxSystem:
 
     @staticmethod
     def get_sql_db_size():
-        """ Returns Sensor SQLite DB Size in MB as a Float. """
+        """ Returns Sensor SQLite DB Size, including any database partitions, in MB as a Float. """
         try:
+            db_size_bytes = os.path.getsize(file_locations.sensor_database)
+            for partition_location in database_partitions.get_partition_locations():
+                db_size_bytes += os.path.getsize(partition_location)
             # Num 1,000,000. Not using underscores to maintain compatibility with Python 3.5.x
-            db_size_mb = os.path.getsize(file_locations.sensor_database) / 1000000
+            db_size_mb = db_size_bytes / 1000000
         except Exception as error:
             logger.sensors_logger.error("Linux System - Interval Database Size Failed: " + str(error))
             db_size_mb = 0.0
@@ -210,7 +214,7 @@ class CreateLinuxSystem:
         bad_entries = 0
         for entry in sql_column_data:
             try:
-                entry_int = int(str(entry)[2:-3])
+                entry_int = int(entry[0])
             except Exception as error:
                 print("Bad SQL Entry in System Uptime column: " + str(entry) + " : " + str(error))
                 bad_entries += 1
@@ -16,19 +16,18 @@ Created on Tue June 15 12:53:56 2020
 
 @author: OO-Dragon
 """
-import time
 from operations_modules import logger
 from configuration_modules import app_config_access
+from sensor_modules import sensor_bus_access
 
 round_decimal_to = 5
-pause_sensor_during_access_sec = 0.02
 
 
 class CreateW1ThermSenor:
     """ Creates Function access to W1ThermSensor. """
 
     def __init__(self):
-        self.sensor_in_use = False
+        self.bus_access = sensor_bus_access.get_bus_access(sensor_bus_access.bus_1_wire, "W1ThermSensor")
         try:
             w1thermsensor_import = __import__("sensor_modules.drivers.w1thermsensor", fromlist=["W1ThermSensor"])
             self.w1thermsensor = w1thermsensor_import.W1ThermSensor()
@@ -41,13 +40,10 @@ class CreateW1ThermSenor:
 
     def temperature(self):
         """ Returns Temperature as a Float. """
-        while self.sensor_in_use:
-            time.sleep(pause_sensor_during_access_sec)
-        self.sensor_in_use = True
-        try:
-            temp_var = self.w1thermsensor.get_temperature()
-        except Exception as error:
-            temp_var = 0.0
-            logger.sensors_logger.error("W1ThermSensor Temperature - Failed: " + str(error))
-        self.sensor_in_use = False
+        with self.bus_access:
+            try:
+                temp_var = self.w1thermsensor.get_temperature()
+            except Exception as error:
+                temp_var = 0.0
+                logger.sensors_logger.error("W1ThermSensor Temperature - Failed: " + str(error))
         return round(temp_var, round_decimal_to)
@@ -20,19 +20,18 @@ Created on Sat Aug 25 08:53:56 2018
 
 @author: OO-Dragon
 """
-import time
 from operations_modules import logger
 from configuration_modules import app_config_access
+from sensor_modules import sensor_bus_access
 
 round_decimal_to = 5
-pause_sensor_during_access_sec = 0.02
 
 
 class CreateBH1745:
     """ Creates Function access to the Pimoroni BH1745. """
 
     def __init__(self):
-        self.sensor_in_use = False
+        self.bus_access = sensor_bus_access.get_bus_access(sensor_bus_access.bus_i2c_1, "Pimoroni BH1745")
         try:
             bh1745_import = __import__("sensor_modules.drivers.bh1745", fromlist=["BH1745"])
             self.bh1745 = bh1745_import.BH1745()
@@ -45,26 +44,20 @@ class CreateBH1745:
 
     def lumen(self):
         """ Returns Lumen as a Float. """
-        while self.sensor_in_use:
-            time.sleep(pause_sensor_during_access_sec)
-        self.sensor_in_use = True
-        try:
-            var_lumen = self.bh1745.get_rgbc_raw()[3]
-        except Exception as error:
-            logger.sensors_logger.error("Pimoroni BH1745 Lumen - Failed: " + str(error))
-            var_lumen = 0
-        self.sensor_in_use = False
+        with self.bus_access:
+            try:
+                var_lumen = self.bh1745.get_rgbc_raw()[3]
+            except Exception as error:
+                logger.sensors_logger.error("Pimoroni BH1745 Lumen - Failed: " + str(error))
+                var_lumen = 0
         return round(var_lumen, round_decimal_to)
 
     def ems(self):
         """ Returns Electromagnetic Spectrum of Red, Green, Blue as a list of Floats. """
-        while self.sensor_in_use:
-            time.sleep(pause_sensor_during_access_sec)
-        self.sensor_in_use = True
-        try:
-            rgb_red, rgb_green, rgb_blue, var_lumen = self.bh1745.get_rgbc_raw()
-        except Exception as error:
-            logger.sensors_logger.error("Pimoroni BH1745 RGB - Failed: " + str(error))
-            rgb_red, rgb_green, rgb_blue = 0, 0, 0
-        self.sensor_in_use = False
+        with self.bus_access:
+            try:
+                rgb_red, rgb_green, rgb_blue, var_lumen = self.bh1745.get_rgbc_raw()
+            except Exception as error:
+                logger.sensors_logger.error("Pimoroni BH1745 RGB - Failed: " + str(error))
+                rgb_red, rgb_green, rgb_blue = 0, 0, 0
         return [round(rgb_red, round_decimal_to), round(rgb_green, round_decimal_to), round(rgb_blue, round_decimal_to)]
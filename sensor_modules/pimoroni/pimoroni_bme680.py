@@ -18,10 +18,10 @@ import time
 from threading import Thread
 from operations_modules import logger
 from configuration_modules import app_config_access
+from sensor_modules import sensor_bus_access
 
 round_decimal_to = 5
 readings_update_threshold_sec = 0.25
-pause_sensor_during_access_sec = 0.007
 gas_keep_alive_update_sec = 1
 
 
@@ -29,7 +29,7 @@ class CreateBME680:
     """ Creates Function access to the Pimoroni BME680. """
 
     def __init__(self):
-        self.sensor_in_use = False
+        self.bus_access = sensor_bus_access.get_bus_access(sensor_bus_access.bus_i2c_1, "Pimoroni BME680")
         self.readings_last_updated = time.time()
         try:
             bme680_import = __import__("sensor_modules.drivers.bme680", fromlist=["BME680"])
@@ -43,6 +43,7 @@ class CreateBME680:
 
             self.sensor.get_sensor_data()
 
+            self.keep_alive_running = True
             self.thread_gas_keep_alive = Thread(target=self._gas_readings_keep_alive)
             self.thread_gas_keep_alive.daemon = True
             self.thread_gas_keep_alive.start()
@@ -54,25 +55,25 @@ class CreateBME680:
 
     def _gas_readings_keep_alive(self):
         logger.sensors_logger.debug("Pimoroni BME680 Gas keep alive started")
-        while True:
+        while self.keep_alive_running:
             self._update_sensor_readings()
             time.sleep(gas_keep_alive_update_sec)
 
     def _update_sensor_readings(self):
         if (time.time() - self.readings_last_updated) > readings_update_threshold_sec:
-            update_readings = True
-            while self.sensor_in_use:
-                update_readings = False
-                time.sleep(pause_sensor_during_access_sec)
-            if update_readings:
-                self.sensor_in_use = True
-                try:
-                    self.sensor.get_sensor_data()
-                    self.readings_last_updated = time.time()
-                except Exception as error:
-                    logger.sensors_logger.error("Pimoroni BME680 Sensor Update - Failed: " + str(error))
-                    time.sleep(1)
-                self.sensor_in_use = False
+            update_failed = False
+            with self.bus_access:
+                # Skip the update if another thread updated the readings while this one waited for the bus
+                if (time.time() - self.readings_last_updated) > readings_update_threshold_sec:
+                    try:
+                        self.sensor.get_sensor_data()
+                        self.readings_last_updated = time.time()
+                    except Exception as error:
+                        logger.sensors_logger.error("Pimoroni BME680 Sensor Update - Failed: " + str(error))
+                        update_failed = True
+            # Wait after a failed update with the bus released, so other sensors on the bus are not held up
+            if update_failed:
+                time.sleep(1)
 
     def temperature(self):
         """ Returns Temperature as a Float. """
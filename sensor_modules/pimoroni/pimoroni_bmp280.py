@@ -15,19 +15,18 @@ Created on Tue June 25 10:53:56 2019
 
 @author: OO-Dragon
 """
-import time
 from operations_modules import logger
 from configuration_modules import app_config_access
+from sensor_modules import sensor_bus_access
 
 round_decimal_to = 5
-pause_sensor_during_access_sec = 0.02
 
 
 class CreateBMP280:
     """ Creates Function access to the Pimoroni BMP280. """
 
     def __init__(self):
-        self.sensor_in_use = False
+        self.bus_access = sensor_bus_access.get_bus_access(sensor_bus_access.bus_i2c_1, "Pimoroni BMP280")
         try:
             bmp280_import = __import__("sensor_modules.drivers.bmp280", fromlist=["BMP280"])
             smbus2_import = __import__("smbus2", fromlist=["SMBus"])
@@ -42,26 +41,20 @@ class CreateBMP280:
 
     def temperature(self):
         """ Returns Temperature as a Float. """
-        while self.sensor_in_use:
-            time.sleep(pause_sensor_during_access_sec)
-        self.sensor_in_use = True
-        try:
-            temp_var = self.bmp280.get_temperature()
-        except Exception as error:
-            temp_var = 0.0
-            logger.sensors_logger.error("Pimoroni BMP280 Temperature - Failed: " + str(error))
-        self.sensor_in_use = False
+        with self.bus_access:
+            try:
+                temp_var = self.bmp280.get_temperature()
+            except Exception as error:
+                temp_var = 0.0
+                logger.sensors_logger.error("Pimoroni BMP280 Temperature - Failed: " + str(error))
         return round(temp_var, round_decimal_to)
 
     def pressure(self):
         """ Returns Pressure as a Integer. """
-        while self.sensor_in_use:
-            time.sleep(pause_sensor_during_access_sec)
-        self.sensor_in_use = True
-        try:
-            pressure_hpa = self.bmp280.get_pressure()
-        except Exception as error:
-            pressure_hpa = 0.0
-            logger.sensors_logger.error("Pimoroni BMP280 Pressure - Failed: " + str(error))
-        self.sensor_in_use = False
+        with self.bus_access:
+            try:
+                pressure_hpa = self.bmp280.get_pressure()
+            except Exception as error:
+                pressure_hpa = 0.0
+                logger.sensors_logger.error("Pimoroni BMP280 Pressure - Failed: " + str(error))
         return int(pressure_hpa)
@@ -24,11 +24,10 @@ from operations_modules import file_locations
 from PIL import Image
 from PIL import ImageDraw
 from PIL import ImageFont
+from sensor_modules import sensor_bus_access
 
 round_decimal_to = 5
 turn_off_display_seconds = 25
-pause_sensor_during_access_sec = 0.02
-pause_sensor_during_access_sec_gas = 0.095
 
 
 class CreateEnviroPlus:
@@ -40,7 +39,7 @@ class CreateEnviroPlus:
             self.display_is_on = True
 
             self.display_in_use = False
-            self.sensor_in_use = False
+            self.bus_access = sensor_bus_access.get_bus_access(sensor_bus_access.bus_i2c_1, "Pimoroni Enviro+")
 
             self.font = ImageFont.truetype(file_locations.display_font, 40)
 
@@ -108,86 +107,68 @@ class CreateEnviroPlus:
 
     def temperature(self):
         """ Returns Temperature as a Float. """
-        while self.sensor_in_use:
-            time.sleep(pause_sensor_during_access_sec)
-        self.sensor_in_use = True
-        try:
-            temp_var = float(self.bme280.get_temperature())
-        except Exception as error:
-            temp_var = 0.0
-            logger.sensors_logger.error("Pimoroni Enviro+ Temperature - Failed: " + str(error))
-        self.sensor_in_use = False
+        with self.bus_access:
+            try:
+                temp_var = float(self.bme280.get_temperature())
+            except Exception as error:
+                temp_var = 0.0
+                logger.sensors_logger.error("Pimoroni Enviro+ Temperature - Failed: " + str(error))
         return round(temp_var, round_decimal_to)
 
     def pressure(self):
         """ Returns Pressure as a Integer. """
-        while self.sensor_in_use:
-            time.sleep(pause_sensor_during_access_sec)
-        self.sensor_in_use = True
-        try:
-            pressure_hpa = self.bme280.get_pressure()
-        except Exception as error:
-            pressure_hpa = 0.0
-            logger.sensors_logger.error("Pimoroni Enviro+ Pressure - Failed: " + str(error))
-        self.sensor_in_use = False
+        with self.bus_access:
+            try:
+                pressure_hpa = self.bme280.get_pressure()
+            except Exception as error:
+                pressure_hpa = 0.0
+                logger.sensors_logger.error("Pimoroni Enviro+ Pressure - Failed: " + str(error))
         return int(pressure_hpa)
 
     def humidity(self):
         """ Returns Humidity as a Float. """
-        while self.sensor_in_use:
-            time.sleep(pause_sensor_during_access_sec)
-        self.sensor_in_use = True
-        try:
-            var_humidity = self.bme280.get_humidity()
-        except Exception as error:
-            var_humidity = 0.0
-            logger.sensors_logger.error("Pimoroni Enviro+ Humidity - Failed: " + str(error))
-        self.sensor_in_use = False
+        with self.bus_access:
+            try:
+                var_humidity = self.bme280.get_humidity()
+            except Exception as error:
+                var_humidity = 0.0
+                logger.sensors_logger.error("Pimoroni Enviro+ Humidity - Failed: " + str(error))
         return round(var_humidity, round_decimal_to)
 
     def lumen(self):
         """ Returns Lumen as a Float. """
-        while self.sensor_in_use:
-            time.sleep(pause_sensor_during_access_sec)
-        self.sensor_in_use = True
-        try:
-            lumen = float(self.ltr_559.get_lux())
-        except Exception as error:
-            logger.sensors_logger.error("Pimoroni Enviro+ Lumen - Failed: " + str(error))
-            lumen = 0.0
-        self.sensor_in_use = False
+        with self.bus_access:
+            try:
+                lumen = float(self.ltr_559.get_lux())
+            except Exception as error:
+                logger.sensors_logger.error("Pimoroni Enviro+ Lumen - Failed: " + str(error))
+                lumen = 0.0
         return round(lumen, round_decimal_to)
 
     def distance(self):
         """ Returns distance in cm?. """
-        while self.sensor_in_use:
-            time.sleep(pause_sensor_during_access_sec)
-        self.sensor_in_use = True
-        try:
-            distance = float(self.ltr_559.get_proximity())
-        except Exception as error:
-            logger.sensors_logger.error("Pimoroni Enviro+ Proximity - Failed: " + str(error))
-            distance = 0.0
-        self.sensor_in_use = False
+        with self.bus_access:
+            try:
+                distance = float(self.ltr_559.get_proximity())
+            except Exception as error:
+                logger.sensors_logger.error("Pimoroni Enviro+ Proximity - Failed: " + str(error))
+                distance = 0.0
         return round(distance, round_decimal_to)
 
     def gas_data(self):
         """ Returns 3 gas readings Oxidised, Reduced and nh3 as a list. """
-        while self.sensor_in_use:
-            time.sleep(pause_sensor_during_access_sec_gas)
-        self.sensor_in_use = True
-        try:
-            enviro_plus_gas_data = self.gas_access.read_all()
-            oxidised = enviro_plus_gas_data.oxidising / 1000
-            reduced = enviro_plus_gas_data.reducing / 1000
-            nh3 = enviro_plus_gas_data.nh3 / 1000
+        with self.bus_access:
+            try:
+                enviro_plus_gas_data = self.gas_access.read_all()
+                oxidised = enviro_plus_gas_data.oxidising / 1000
+                reduced = enviro_plus_gas_data.reducing / 1000
+                nh3 = enviro_plus_gas_data.nh3 / 1000
 
-            gas_list_oxidised_reduced_nh3 = [round(oxidised, round_decimal_to),
-                                             round(reduced, round_decimal_to),
-                                             round(nh3, round_decimal_to)]
+                gas_list_oxidised_reduced_nh3 = [round(oxidised, round_decimal_to),
+                                                 round(reduced, round_decimal_to),
+                                                 round(nh3, round_decimal_to)]
 
-        except Exception as error:
-            logger.sensors_logger.error("Pimoroni Enviro+ GAS - Failed: " + str(error))
-            gas_list_oxidised_reduced_nh3 = [0.0, 0.0, 0.0]
-        self.sensor_in_use = False
+            except Exception as error:
+                logger.sensors_logger.error("Pimoroni Enviro+ GAS - Failed: " + str(error))
+                gas_list_oxidised_reduced_nh3 = [0.0, 0.0, 0.0]
         return gas_list_oxidised_reduced_nh3
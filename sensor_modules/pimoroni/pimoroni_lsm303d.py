@@ -17,20 +17,19 @@ Created on Sat Aug 25 08:53:56 2018
 
 @author: OO-Dragon
 """
-import time
 from operations_modules import logger
 from configuration_modules import app_config_access
+from sensor_modules import sensor_bus_access
 
 lsm303d_address = 0x1d
 round_decimal_to = 5
-pause_sensor_during_access_sec = 0.007
 
 
 class CreateLSM303D:
     """ Creates Function access to the Pimoroni LSM303D. """
 
     def __init__(self):
-        self.sensor_in_use = False
+        self.bus_access = sensor_bus_access.get_bus_access(sensor_bus_access.bus_i2c_1, "Pimoroni LSM303D")
         try:
             lsm303d_import = __import__("sensor_modules.drivers.lsm303d", fromlist=["LSM303D"])
             self.lsm = lsm303d_import.LSM303D(lsm303d_address)
@@ -43,26 +42,20 @@ class CreateLSM303D:
 
     def accelerometer_xyz(self):
         """ Returns Accelerometer X, Y, Z as Floats. """
-        while self.sensor_in_use:
-            time.sleep(pause_sensor_during_access_sec)
-        self.sensor_in_use = True
-        try:
-            acc_x, acc_y, acc_z = self.lsm.accelerometer()
-        except Exception as error:
-            logger.sensors_logger.error("Pimoroni LSM303D Accelerometer XYZ - Failed: " + str(error))
-            acc_x, acc_y, acc_z = 0.0, 0.0, 0.0
-        self.sensor_in_use = False
+        with self.bus_access:
+            try:
+                acc_x, acc_y, acc_z = self.lsm.accelerometer()
+            except Exception as error:
+                logger.sensors_logger.error("Pimoroni LSM303D Accelerometer XYZ - Failed: " + str(error))
+                acc_x, acc_y, acc_z = 0.0, 0.0, 0.0
         return round(acc_x, round_decimal_to), round(acc_y, round_decimal_to), round(acc_z, round_decimal_to)
 
     def magnetometer_xyz(self):
         """ Returns Magnetometer X, Y, Z as Floats. """
-        while self.sensor_in_use:
-            time.sleep(pause_sensor_during_access_sec)
-        self.sensor_in_use = True
-        try:
-            mag_x, mag_y, mag_z = self.lsm.magnetometer()
-        except Exception as error:
-            mag_x, mag_y, mag_z = 0.0, 0.0, 0.0
-            logger.sensors_logger.error("Pimoroni LSM303D Magnetometer XYZ - Failed: " + str(error))
-        self.sensor_in_use = False
+        with self.bus_access:
+            try:
+                mag_x, mag_y, mag_z = self.lsm.magnetometer()
+            except Exception as error:
+                mag_x, mag_y, mag_z = 0.0, 0.0, 0.0
+                logger.sensors_logger.error("Pimoroni LSM303D Magnetometer XYZ - Failed: " + str(error))
         return [round(mag_x, round_decimal_to), round(mag_y, round_decimal_to), round(mag_z, round_decimal_to)]
@@ -17,19 +17,18 @@ pip3 install ltr559
 
 @author: OO-Dragon
 """
-import time
 from operations_modules import logger
 from configuration_modules import app_config_access
+from sensor_modules import sensor_bus_access
 
 round_decimal_to = 5
-pause_sensor_during_access_sec = 0.02
 
 
 class CreateLTR559:
     """ Creates Function access to the Pimoroni LTR-559. """
 
     def __init__(self):
-        self.sensor_in_use = False
+        self.bus_access = sensor_bus_access.get_bus_access(sensor_bus_access.bus_i2c_1, "Pimoroni LTR-559")
         try:
             ltr559_import = __import__("sensor_modules.drivers.ltr559", fromlist=["LTR559"])
             self.ltr_559 = ltr559_import.LTR559()
@@ -42,26 +41,20 @@ class CreateLTR559:
 
     def lumen(self):
         """ Returns Lumen as a Float. """
-        while self.sensor_in_use:
-            time.sleep(pause_sensor_during_access_sec)
-        self.sensor_in_use = True
-        try:
-            lumen = float(self.ltr_559.get_lux())
-        except Exception as error:
-            logger.sensors_logger.error("Pimoroni LTR-559 Lumen - Failed: " + str(error))
-            lumen = 0.0
-        self.sensor_in_use = False
+        with self.bus_access:
+            try:
+                lumen = float(self.ltr_559.get_lux())
+            except Exception as error:
+                logger.sensors_logger.error("Pimoroni LTR-559 Lumen - Failed: " + str(error))
+                lumen = 0.0
         return round(lumen, round_decimal_to)
 
     def distance(self):
         """ Returns distance in cm?. """
-        while self.sensor_in_use:
-            time.sleep(pause_sensor_during_access_sec)
-        self.sensor_in_use = True
-        try:
-            distance = float(self.ltr_559.get_proximity())
-        except Exception as error:
-            logger.sensors_logger.error("Pimoroni LTR-559 Proximity - Failed: " + str(error))
-            distance = 0.0
-        self.sensor_in_use = False
+        with self.bus_access:
+            try:
+                distance = float(self.ltr_559.get_proximity())
+            except Exception as error:
+                logger.sensors_logger.error("Pimoroni LTR-559 Proximity - Failed: " + str(error))
+                distance = 0.0
         return round(distance, round_decimal_to)
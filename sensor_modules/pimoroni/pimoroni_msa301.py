@@ -15,19 +15,18 @@ Created on Mon Jan 20 07:03:56 2020
 
 @author: OO-Dragon
 """
-import time
 from operations_modules import logger
 from configuration_modules import app_config_access
+from sensor_modules import sensor_bus_access
 
 round_decimal_to = 5
-pause_sensor_during_access_sec = 0.007
 
 
 class CreateMSA301:
     """ Creates Function access to the Pimoroni MSA301. """
 
     def __init__(self):
-        self.sensor_in_use = False
+        self.bus_access = sensor_bus_access.get_bus_access(sensor_bus_access.bus_i2c_1, "Pimoroni MSA301")
         try:
             msa301_import = __import__("sensor_modules.drivers.msa301", fromlist=["MSA301"])
             self.msa301 = msa301_import.MSA301()
@@ -41,13 +40,10 @@ class CreateMSA301:
 
     def accelerometer_xyz(self):
         """ Returns Accelerometer X, Y, Z as Floats. """
-        while self.sensor_in_use:
-            time.sleep(pause_sensor_during_access_sec)
-        self.sensor_in_use = True
-        try:
-            acc_x, acc_y, acc_z = self.msa301.get_measurements()
-        except Exception as error:
-            logger.sensors_logger.error("Pimoroni MSA301 Accelerometer XYZ - Failed: " + str(error))
-            acc_x, acc_y, acc_z = 0.0, 0.0, 0.0
-        self.sensor_in_use = False
+        with self.bus_access:
+            try:
+                acc_x, acc_y, acc_z = self.msa301.get_measurements()
+            except Exception as error:
+                logger.sensors_logger.error("Pimoroni MSA301 Accelerometer XYZ - Failed: " + str(error))
+                acc_x, acc_y, acc_z = 0.0, 0.0, 0.0
         return [round(acc_x, round_decimal_to), round(acc_y, round_decimal_to), round(acc_z, round_decimal_to)]
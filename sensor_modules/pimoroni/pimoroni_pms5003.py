@@ -21,10 +21,10 @@ from operations_modules import logger
 from configuration_modules import app_config_access
 from operations_modules import app_generic_functions
 from operations_modules.app_cached_variables import database_variables, no_sensor_present
+from sensor_modules import sensor_bus_access
 
 round_decimal_to = 5
 readings_update_threshold_sec = 0.25
-pause_sensor_during_access_sec_pm = 0.002
 
 
 class CreatePimoroniPMS5003:
@@ -32,7 +32,7 @@ class CreatePimoroniPMS5003:
 
     def __init__(self):
         if app_config_access.installed_sensors.pimoroni_pms5003:
-            self.sensor_in_use = False
+            self.bus_access = sensor_bus_access.get_bus_access(sensor_bus_access.bus_uart, "Pimoroni PMS5003")
 
             self.pm_readings_last_updated = time.time()
             self.pm1 = 0.0
@@ -43,6 +43,7 @@ class CreatePimoroniPMS5003:
                 pms5003_import = __import__("sensor_modules.drivers.pms5003", fromlist=["PMS5003"])
                 self._enable_psm5003_serial()
                 self.enviro_plus_pm_access = pms5003_import.PMS5003()
+                self.keep_alive_running = True
                 self.thread_pm_keep_alive = Thread(target=self._readings_keep_alive)
                 self.thread_pm_keep_alive.daemon = True
                 self.thread_pm_keep_alive.start()
@@ -54,28 +55,24 @@ class CreatePimoroniPMS5003:
 
     def _readings_keep_alive(self):
         logger.sensors_logger.debug("Pimoroni PMS5003 Particulate Matter & Gas keep alive started")
-        while True:
+        while self.keep_alive_running:
             self.particulate_matter_data()
             time.sleep(1)
 
     def particulate_matter_data(self):
         """ Returns 3 Particulate Matter readings pm1, pm25 and pm10 as a Dictionary. """
         if (time.time() - self.pm_readings_last_updated) > readings_update_threshold_sec:
-            update_readings = True
-            while self.sensor_in_use:
-                update_readings = False
-                time.sleep(pause_sensor_during_access_sec_pm)
-            if update_readings:
-                self.sensor_in_use = True
-                try:
-                    enviro_plus_pm_data = self.enviro_plus_pm_access.read()
-                    self.pm1 = enviro_plus_pm_data.pm_ug_per_m3(1.0)
-                    self.pm25 = enviro_plus_pm_data.pm_ug_per_m3(2.5)
-                    self.pm10 = enviro_plus_pm_data.pm_ug_per_m3(10)
-                    self.pm_readings_last_updated = time.time()
-                except Exception as error:
-                    logger.sensors_logger.error("Pimoroni Particulate Matter Update - Failed: " + str(error))
-                self.sensor_in_use = False
+            with self.bus_access:
+                # Skip the update if another thread updated the readings while this one waited for the bus
+                if (time.time() - self.pm_readings_last_updated) > readings_update_threshold_sec:
+                    try:
+                        enviro_plus_pm_data = self.enviro_plus_pm_access.read()
+                        self.pm1 = enviro_plus_pm_data.pm_ug_per_m3(1.0)
+                        self.pm25 = enviro_plus_pm_data.pm_ug_per_m3(2.5)
+                        self.pm10 = enviro_plus_pm_data.pm_ug_per_m3(10)
+                        self.pm_readings_last_updated = time.time()
+                    except Exception as error:
+                        logger.sensors_logger.error("Pimoroni Particulate Matter Update - Failed: " + str(error))
         return {database_variables.particulate_matter_1: round(self.pm1, round_decimal_to),
                 database_variables.particulate_matter_2_5: round(self.pm25, round_decimal_to),
                 database_variables.particulate_matter_4: no_sensor_present,
@@ -21,9 +21,9 @@ import time
 from threading import Thread
 from operations_modules import logger
 from configuration_modules import app_config_access
+from sensor_modules import sensor_bus_access
 
 round_decimal_to = 5
-pause_sensor_during_access_sec = 0.1
 gas_keep_alive_update_sec = 1
 
 
@@ -31,13 +31,13 @@ class CreateSGP30:
     """ Creates Function access to the Pimoroni SGP30. """
 
     def __init__(self):
-        self.sensor_in_use = False
+        self.bus_access = sensor_bus_access.get_bus_access(sensor_bus_access.bus_i2c_1, "Pimoroni SGP30")
         try:
             sgp30_import = __import__("sensor_modules.drivers.sgp30", fromlist=["SGP30"])
             self.sensor = sgp30_import.SGP30()
-            self.sensor_in_use = True
-            self.sensor.start_measurement()
-            self.sensor_in_use = False
+            with self.bus_access:
+                self.sensor.start_measurement()
+            self.keep_alive_running = True
             self.thread_gas_keep_alive = Thread(target=self._gas_readings_keep_alive)
             self.thread_gas_keep_alive.daemon = True
             self.thread_gas_keep_alive.start()
@@ -49,21 +49,15 @@ class CreateSGP30:
 
     def _gas_readings_keep_alive(self):
         logger.sensors_logger.debug("Pimoroni SGP30 Gas keep alive started")
-        while True:
-            while self.sensor_in_use:
-                time.sleep(pause_sensor_during_access_sec)
-            self.sensor_in_use = True
-            self.sensor.get_air_quality()
-            self.sensor_in_use = False
+        while self.keep_alive_running:
+            with self.bus_access:
+                self.sensor.get_air_quality()
             time.sleep(gas_keep_alive_update_sec)
 
     def gas_resistance_index(self):
         """ Returns Gas Resistance Index as a float in kΩ. """
-        while self.sensor_in_use:
-            time.sleep(pause_sensor_during_access_sec)
-        self.sensor_in_use = True
-        eco2, tvoc = self.sensor.get_air_quality()
-        self.sensor_in_use = False
+        with self.bus_access:
+            eco2, tvoc = self.sensor.get_air_quality()
         try:
             gas_var = round(tvoc / 1000, round_decimal_to)
         except Exception as error:
@@ -73,11 +67,8 @@ class CreateSGP30:
 
     def gas_e_co2(self):
         """ Returns Equivalent CO2 as a float in kΩ? """
-        while self.sensor_in_use:
-            time.sleep(pause_sensor_during_access_sec)
-        self.sensor_in_use = True
-        eco2, tvoc = self.sensor.get_air_quality()
-        self.sensor_in_use = False
+        with self.bus_access:
+            eco2, tvoc = self.sensor.get_air_quality()
         try:
             gas_var = round(eco2 / 1000, round_decimal_to)
         except Exception as error:
@@ -16,19 +16,18 @@ Created on Sat Aug 25 08:53:56 2018
 
 @author: OO-Dragon
 """
-import time
 from operations_modules import logger
 from configuration_modules import app_config_access
+from sensor_modules import sensor_bus_access
 
 round_decimal_to = 5
-pause_sensor_during_access_sec = 0.3
 
 
 class CreateVL53L1X:
     """ Creates Function access to the Pimoroni VL53L1X. """
 
     def __init__(self):
-        self.sensor_in_use = False
+        self.bus_access = sensor_bus_access.get_bus_access(sensor_bus_access.bus_i2c_1, "Pimoroni VL53L1X")
         try:
             vl53l1x_import = __import__("sensor_modules.drivers.vl53l1x", fromlist=["VL53L1X"])
             # Initialise the i2c bus and configure the sensor
@@ -41,18 +40,15 @@ class CreateVL53L1X:
 
     def distance(self):
         """ Returns distance in mm. """
-        while self.sensor_in_use:
-            time.sleep(pause_sensor_during_access_sec)
-        self.sensor_in_use = True
-        try:
-            self.time_of_flight.open()
-            # Start ranging, 1 = Short Range, 2 = Medium Range, 3 = Long Range
-            self.time_of_flight.start_ranging(2)
-            distance_in_mm = self.time_of_flight.get_distance()
-            self.time_of_flight.stop_ranging()
-            self.time_of_flight.close()
-        except Exception as error:
-            logger.sensors_logger.error("Pimoroni VL53L1X Distance Sensor - Failed: " + str(error))
-            distance_in_mm = 0.0
-        self.sensor_in_use = False
+        with self.bus_access:
+            try:
+                self.time_of_flight.open()
+                # Start ranging, 1 = Short Range, 2 = Medium Range, 3 = Long Range
+                self.time_of_flight.start_ranging(2)
+                distance_in_mm = self.time_of_flight.get_distance()
+                self.time_of_flight.stop_ranging()
+                self.time_of_flight.close()
+            except Exception as error:
+                logger.sensors_logger.error("Pimoroni VL53L1X Distance Sensor - Failed: " + str(error))
+                distance_in_mm = 0.0
         return distance_in_mm
@@ -9,19 +9,18 @@ Created on Sat Aug 25 08:53:56 2018
 @author: OO-Dragon
 """
 import os
-import time
 from operations_modules import logger
 from configuration_modules import app_config_access
+from sensor_modules import sensor_bus_access
 
 round_decimal_to = 5
-pause_sensor_during_access_sec = 0.005
 
 
 class CreateRPSystem:
     """ Creates Function access to Raspberry Pi Hardware Information. """
 
     def __init__(self):
-        self.sensor_in_use = False
+        self.bus_access = sensor_bus_access.get_bus_access(sensor_bus_access.bus_system, "Raspberry Pi System")
         try:
             self.gp_import = __import__("gpiozero")
             self.enable_raspberry_pi_hardware()
@@ -33,16 +32,13 @@ class CreateRPSystem:
 
     def cpu_temperature(self):
         """ Returns System CPU Temperature as a Float. """
-        while self.sensor_in_use:
-            time.sleep(pause_sensor_during_access_sec)
-        self.sensor_in_use = True
-        try:
-            cpu = self.gp_import.CPUTemperature()
-            cpu_temp_c = float(cpu.temperature)
-        except Exception as error:
-            cpu_temp_c = 0.0
-            logger.sensors_logger.error("Raspberry Pi CPU Temperature Sensor - Failed: " + str(error))
-        self.sensor_in_use = False
+        with self.bus_access:
+            try:
+                cpu = self.gp_import.CPUTemperature()
+                cpu_temp_c = float(cpu.temperature)
+            except Exception as error:
+                cpu_temp_c = 0.0
+                logger.sensors_logger.error("Raspberry Pi CPU Temperature Sensor - Failed: " + str(error))
         return round(cpu_temp_c, round_decimal_to)
 
     @staticmethod
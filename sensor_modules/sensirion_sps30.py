@@ -41,9 +41,9 @@ from queue import Queue
 from operations_modules import logger
 from operations_modules.app_cached_variables import database_variables, no_sensor_present
 from configuration_modules import app_config_access
+from sensor_modules import sensor_bus_access
 
 round_decimal_to = 5
-pause_sensor_during_access_sec_pm = 0.1
 
 # Specify serial port name for sensor
 # i.e. "COM10" for Windows or "/dev/ttyUSB0" for Linux
@@ -55,7 +55,7 @@ class CreateSPS30:
     """ Creates Function access to the Sensirion SPS30. """
 
     def __init__(self):
-        self.sensor_in_use = False
+        self.bus_access = sensor_bus_access.get_bus_access(sensor_bus_access.bus_usb_uart, "Sensirion SPS30")
         try:
             self.sps30_pm_import = __import__("sensor_modules.drivers.SPS30.sps30", fromlist=["SPS30"])
             self.sensirion_sps30_access = self.sps30_pm_import.SPS30(device_port)
@@ -69,9 +69,10 @@ class CreateSPS30:
 
     def particulate_matter_data(self):
         """ Returns 3 Particulate Matter readings pm1, pm25, pm4 and pm10 as a list. """
-        while self.sensor_in_use:
-            time.sleep(pause_sensor_during_access_sec_pm)
-        self.sensor_in_use = True
+        with self.bus_access:
+            return self._get_pm_readings()
+
+    def _get_pm_readings(self):
         background_readings = Thread(target=self._get_pm_readings_threaded)
         background_readings.daemon = True
         background_readings.start()
@@ -83,7 +84,6 @@ class CreateSPS30:
                     logger.sensors_logger.debug("Sensirion SPS30 - In the Get Que")
                     readings = pm_reading_que.get(block=True, timeout=10)
                     pm_reading_que.task_done()
-                    self.sensor_in_use = False
                     logger.sensors_logger.debug("Sensirion SPS30 - Past the Get Que")
                     return readings
                 time.sleep(1)
@@ -98,7 +98,6 @@ class CreateSPS30:
         self.sensirion_sps30_access.__init__(device_port)
         time.sleep(1)
         self.sensirion_sps30_access.start()
-        self.sensor_in_use = False
         return {database_variables.particulate_matter_1: no_sensor_present,
                 database_variables.particulate_matter_2_5: no_sensor_present,
                 database_variables.particulate_matter_4: no_sensor_present,
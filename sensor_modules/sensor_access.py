@@ -18,6 +18,7 @@
 """
 import os
 import math
+import json
 import time
 from datetime import datetime
 from operations_modules import logger
@@ -28,8 +29,38 @@ from operations_modules.app_cached_variables import no_sensor_present, command_d
 from operations_modules import sqlite_database
 from configuration_modules import app_config_access
 from sensor_modules import sensors_initialization
-
-sensors_direct = sensors_initialization.CreateSensorAccess(first_start=True)
+from sensor_modules.sensor_sampling import CreateSensorSamplingEngine
+
+# Units of the readings in get_all_sensors_as_json(), by Interval database column name
+sensor_reading_units = {database_variables.sensor_uptime: "Minutes",
+                        database_variables.system_temperature: "°C",
+                        database_variables.env_temperature: "°C",
+                        database_variables.env_temperature_offset: "°C",
+                        database_variables.pressure: "hPa",
+                        database_variables.altitude: "Meters",
+                        database_variables.humidity: "%RH",
+                        database_variables.distance: "?",
+                        database_variables.gas_resistance_index: "kΩ",
+                        database_variables.gas_oxidising: "kΩ",
+                        database_variables.gas_reducing: "kΩ",
+                        database_variables.gas_nh3: "kΩ",
+                        database_variables.particulate_matter_1: "µg/m³",
+                        database_variables.particulate_matter_2_5: "µg/m³",
+                        database_variables.particulate_matter_4: "µg/m³",
+                        database_variables.particulate_matter_10: "µg/m³",
+                        database_variables.lumen: "lm",
+                        database_variables.acc_x: "g",
+                        database_variables.acc_y: "g",
+                        database_variables.acc_z: "g",
+                        database_variables.mag_x: "μT",
+                        database_variables.mag_y: "μT",
+                        database_variables.mag_z: "μT",
+                        database_variables.gyro_x: "°/s",
+                        database_variables.gyro_y: "°/s",
+                        database_variables.gyro_z: "°/s"}
+
+sensors_direct = sensors_initialization.CreateSensorAccess()
+sensor_sampling_engine = CreateSensorSamplingEngine(sensors_direct)
 
 
 def get_operating_system_name():
@@ -168,7 +199,9 @@ def get_sensors_latency():
 def _get_sensor_latency(sensor_function):
     try:
         start_time = time.time()
-        sensor_reading = sensor_function()
+        # Stored readings are bypassed, as the latency of the sensor hardware is what's being measured
+        with sensor_sampling_engine.readings_context(bypass_cache=True):
+            sensor_reading = sensor_function()
         end_time = time.time()
         if sensor_reading == no_sensor_present:
             return None
@@ -178,12 +211,52 @@ def _get_sensor_latency(sensor_function):
         return 0.0
 
 
+def update_installed_sensors(restart_consumers=True):
+    """
+    Adds & removes sensors to match the Installed Sensors configuration, one sensor at a time.
+    Only the changed sensors' stored readings are cleared, other sensors keep being sampled.
+    Use restart_consumers=False to restart the threads using the changed sensors later, with restart_sensor_consumers().
+    """
+    changed_sensors = sensors_direct.update_installed_sensors(restart_consumers=False)
+    for sensor_name in changed_sensors:
+        sensor_sampling_engine.clear_sensor_readings(sensor_name)
+    if restart_consumers:
+        restart_sensor_consumers(changed_sensors)
+    return changed_sensors
+
+
+def restart_sensor_consumers(changed_sensors):
+    """ Restarts threads using the provided changed sensors (attribute names like 'pimoroni_bme680_a'). """
+    sensors_initialization.restart_sensor_consumers(changed_sensors)
+
+
+def reinitialize_sensor(sensor_name):
+    """ Re-initializes one sensor by name (like 'pimoroni_bme680_a'), while the other sensors keep running. """
+    if sensors_direct.reinitialize_sensor(sensor_name):
+        sensor_sampling_engine.clear_sensor_readings(sensor_name)
+        return True
+    return False
+
+
+def get_reading_and_datetime(sensor_function, bypass_cache=False, max_age_seconds=None, **kwargs):
+    """
+    Returns the provided sensor function's reading (like get_altitude) and the UTC capture DateTime
+    of the oldest sensor reading used to make it, as a list.
+    Readings are from the store if within their max age, use bypass_cache for a fresh reading from the sensors.
+    Use max_age_seconds to lower the max age for this reading, like to the sample rate of a trigger.
+    """
+    with sensor_sampling_engine.readings_context(bypass_cache=bypass_cache,
+                                                 max_age_seconds=max_age_seconds) as readings_context:
+        reading = sensor_function(**kwargs)
+    return [reading, readings_context.get_oldest_capture_datetime()]
+
+
 def get_cpu_temperature():
     """ Returns sensors CPU temperature. """
     if app_config_access.installed_sensors.raspberry_pi:
-        temperature = sensors_direct.raspberry_pi_a.cpu_temperature()
+        temperature = sensor_sampling_engine.get_reading("raspberry_pi_a", "cpu_temperature")
     elif app_config_access.installed_sensors.kootnet_dummy_sensor:
-        temperature = sensors_direct.dummy_sensors.cpu_temperature()
+        temperature = sensor_sampling_engine.get_reading("dummy_sensors", "cpu_temperature")
     else:
         return no_sensor_present
     return temperature
@@ -192,21 +265,21 @@ def get_cpu_temperature():
 def get_sensor_temperature(temperature_correction=True, get_both=False):
     """ Returns sensors Environmental temperature. """
     if app_config_access.installed_sensors.pimoroni_enviro:
-        temperature = sensors_direct.pimoroni_enviro_a.temperature()
+        temperature = sensor_sampling_engine.get_reading("pimoroni_enviro_a", "temperature")
     elif app_config_access.installed_sensors.pimoroni_enviroplus:
-        temperature = sensors_direct.pimoroni_enviroplus_a.temperature()
+        temperature = sensor_sampling_engine.get_reading("pimoroni_enviroplus_a", "temperature")
     elif app_config_access.installed_sensors.pimoroni_mcp9600:
-        temperature = sensors_direct.pimoroni_mcp9600_a.temperature()
+        temperature = sensor_sampling_engine.get_reading("pimoroni_mcp9600_a", "temperature")
     elif app_config_access.installed_sensors.pimoroni_bmp280:
-        temperature = sensors_direct.pimoroni_bmp280_a.temperature()
+        temperature = sensor_sampling_engine.get_reading("pimoroni_bmp280_a", "temperature")
     elif app_config_access.installed_sensors.pimoroni_bme680:
-        temperature = sensors_direct.pimoroni_bme680_a.temperature()
+        temperature = sensor_sampling_engine.get_reading("pimoroni_bme680_a", "temperature")
     elif app_config_access.installed_sensors.raspberry_pi_sense_hat:
-        temperature = sensors_direct.rp_sense_hat_a.temperature()
+        temperature = sensor_sampling_engine.get_reading("rp_sense_hat_a", "temperature")
     elif app_config_access.installed_sensors.w1_therm_sensor:
-        temperature = sensors_direct.w1_therm_sensor_a.temperature()
+        temperature = sensor_sampling_engine.get_reading("w1_therm_sensor_a", "temperature")
     elif app_config_access.installed_sensors.kootnet_dummy_sensor:
-        temperature = sensors_direct.dummy_sensors.temperature()
+        temperature = sensor_sampling_engine.get_reading("dummy_sensors", "temperature")
     else:
         if get_both:
             return [no_sensor_present, no_sensor_present]
@@ -257,17 +330,17 @@ def get_temperature_correction():
 def get_pressure():
     """ Returns sensors pressure. """
     if app_config_access.installed_sensors.pimoroni_enviro:
-        pressure = sensors_direct.pimoroni_enviro_a.pressure()
+        pressure = sensor_sampling_engine.get_reading("pimoroni_enviro_a", "pressure")
     elif app_config_access.installed_sensors.pimoroni_enviroplus:
-        pressure = sensors_direct.pimoroni_enviroplus_a.pressure()
+        pressure = sensor_sampling_engine.get_reading("pimoroni_enviroplus_a", "pressure")
     elif app_config_access.installed_sensors.pimoroni_bmp280:
-        pressure = sensors_direct.pimoroni_bmp280_a.pressure()
+        pressure = sensor_sampling_engine.get_reading("pimoroni_bmp280_a", "pressure")
     elif app_config_access.installed_sensors.pimoroni_bme680:
-        pressure = sensors_direct.pimoroni_bme680_a.pressure()
+        pressure = sensor_sampling_engine.get_reading("pimoroni_bme680_a", "pressure")
     elif app_config_access.installed_sensors.raspberry_pi_sense_hat:
-        pressure = sensors_direct.rp_sense_hat_a.pressure()
+        pressure = sensor_sampling_engine.get_reading("rp_sense_hat_a", "pressure")
     elif app_config_access.installed_sensors.kootnet_dummy_sensor:
-        pressure = sensors_direct.dummy_sensors.pressure()
+        pressure = sensor_sampling_engine.get_reading("dummy_sensors", "pressure")
     else:
         return no_sensor_present
     return pressure
@@ -292,13 +365,13 @@ def get_altitude(qnh=1013.25):
 def get_humidity():
     """ Returns sensors humidity. """
     if app_config_access.installed_sensors.pimoroni_enviroplus:
-        humidity = sensors_direct.pimoroni_enviroplus_a.humidity()
+        humidity = sensor_sampling_engine.get_reading("pimoroni_enviroplus_a", "humidity")
     elif app_config_access.installed_sensors.pimoroni_bme680:
-        humidity = sensors_direct.pimoroni_bme680_a.humidity()
+        humidity = sensor_sampling_engine.get_reading("pimoroni_bme680_a", "humidity")
     elif app_config_access.installed_sensors.raspberry_pi_sense_hat:
-        humidity = sensors_direct.rp_sense_hat_a.humidity()
+        humidity = sensor_sampling_engine.get_reading("rp_sense_hat_a", "humidity")
     elif app_config_access.installed_sensors.kootnet_dummy_sensor:
-        humidity = sensors_direct.dummy_sensors.humidity()
+        humidity = sensor_sampling_engine.get_reading("dummy_sensors", "humidity")
     else:
         return no_sensor_present
     return humidity
@@ -325,13 +398,13 @@ def get_dew_point():
 def get_distance():
     """ Returns sensors distance. """
     if app_config_access.installed_sensors.pimoroni_enviroplus:
-        distance = sensors_direct.pimoroni_enviroplus_a.distance()
+        distance = sensor_sampling_engine.get_reading("pimoroni_enviroplus_a", "distance")
     elif app_config_access.installed_sensors.pimoroni_vl53l1x:
-        distance = sensors_direct.pimoroni_vl53l1x_a.distance()
+        distance = sensor_sampling_engine.get_reading("pimoroni_vl53l1x_a", "distance")
     elif app_config_access.installed_sensors.pimoroni_ltr_559:
-        distance = sensors_direct.pimoroni_ltr_559_a.distance()
+        distance = sensor_sampling_engine.get_reading("pimoroni_ltr_559_a", "distance")
     elif app_config_access.installed_sensors.kootnet_dummy_sensor:
-        distance = sensors_direct.dummy_sensors.distance()
+        distance = sensor_sampling_engine.get_reading("dummy_sensors", "distance")
     else:
         return no_sensor_present
     return distance
@@ -340,23 +413,23 @@ def get_distance():
 def get_gas(return_as_dictionary=False):
     """ Returns sensors gas readings as a list. """
     if app_config_access.installed_sensors.pimoroni_bme680:
-        gas_readings = sensors_direct.pimoroni_bme680_a.gas_resistance_index()
+        gas_readings = sensor_sampling_engine.get_reading("pimoroni_bme680_a", "gas_resistance_index")
         if return_as_dictionary:
             return {database_variables.gas_resistance_index: gas_readings}
     elif app_config_access.installed_sensors.pimoroni_enviroplus:
-        gas_readings = sensors_direct.pimoroni_enviroplus_a.gas_data()
+        gas_readings = sensor_sampling_engine.get_reading("pimoroni_enviroplus_a", "gas_data")
         if return_as_dictionary:
             return {database_variables.gas_oxidising: gas_readings[0],
                     database_variables.gas_reducing: gas_readings[1],
                     database_variables.gas_nh3: gas_readings[2]}
     elif app_config_access.installed_sensors.pimoroni_sgp30:
         # TODO: Add e-co2 this sensor can do into program (In DB?)
-        gas_readings = sensors_direct.pimoroni_sgp30_a.gas_resistance_index()
+        gas_readings = sensor_sampling_engine.get_reading("pimoroni_sgp30_a", "gas_resistance_index")
         if return_as_dictionary:
             return {database_variables.gas_resistance_index: gas_readings}
     elif app_config_access.installed_sensors.kootnet_dummy_sensor:
-        gas_readings = [sensors_direct.dummy_sensors.gas_resistance_index()]
-        gas_readings += sensors_direct.dummy_sensors.gas_data()
+        gas_readings = [sensor_sampling_engine.get_reading("dummy_sensors", "gas_resistance_index")]
+        gas_readings += sensor_sampling_engine.get_reading("dummy_sensors", "gas_data")
         if return_as_dictionary:
             return {database_variables.gas_resistance_index: gas_readings[0],
                     database_variables.gas_oxidising: gas_readings[1],
@@ -370,11 +443,11 @@ def get_gas(return_as_dictionary=False):
 def get_particulate_matter(return_as_dictionary=False):
     """ Returns selected Particulate Matter readings in a Dictionary. """
     if app_config_access.installed_sensors.pimoroni_pms5003:
-        pm_readings = sensors_direct.pimoroni_pms5003_a.particulate_matter_data()
+        pm_readings = sensor_sampling_engine.get_reading("pimoroni_pms5003_a", "particulate_matter_data")
     elif app_config_access.installed_sensors.sensirion_sps30:
-        pm_readings = sensors_direct.sensirion_sps30_a.particulate_matter_data()
+        pm_readings = sensor_sampling_engine.get_reading("sensirion_sps30_a", "particulate_matter_data")
     elif app_config_access.installed_sensors.kootnet_dummy_sensor:
-        pm_readings = sensors_direct.dummy_sensors.particulate_matter_data()
+        pm_readings = sensor_sampling_engine.get_reading("dummy_sensors", "particulate_matter_data")
     else:
         if return_as_dictionary:
             return {database_variables.particulate_matter_1: no_sensor_present,
@@ -399,15 +472,15 @@ def get_particulate_matter(return_as_dictionary=False):
 def get_lumen():
     """ Returns sensors lumen. """
     if app_config_access.installed_sensors.pimoroni_enviro:
-        lumen = sensors_direct.pimoroni_enviro_a.lumen()
+        lumen = sensor_sampling_engine.get_reading("pimoroni_enviro_a", "lumen")
     elif app_config_access.installed_sensors.pimoroni_enviroplus:
-        lumen = sensors_direct.pimoroni_enviroplus_a.lumen()
+        lumen = sensor_sampling_engine.get_reading("pimoroni_enviroplus_a", "lumen")
     elif app_config_access.installed_sensors.pimoroni_bh1745:
-        lumen = sensors_direct.pimoroni_bh1745_a.lumen()
+        lumen = sensor_sampling_engine.get_reading("pimoroni_bh1745_a", "lumen")
     elif app_config_access.installed_sensors.pimoroni_ltr_559:
-        lumen = sensors_direct.pimoroni_ltr_559_a.lumen()
+        lumen = sensor_sampling_engine.get_reading("pimoroni_ltr_559_a", "lumen")
     elif app_config_access.installed_sensors.kootnet_dummy_sensor:
-        lumen = sensors_direct.dummy_sensors.lumen()
+        lumen = sensor_sampling_engine.get_reading("dummy_sensors", "lumen")
     else:
         return no_sensor_present
     return lumen
@@ -416,7 +489,7 @@ def get_lumen():
 def get_ems_colors(return_as_dictionary=False):
     """ Returns Electromagnetic Spectrum Wavelengths in the form of Red, Orange, Yellow, Green, Cyan, Blue, Violet. """
     if app_config_access.installed_sensors.pimoroni_as7262:
-        colours = sensors_direct.pimoroni_as7262_a.spectral_six_channel()
+        colours = sensor_sampling_engine.get_reading("pimoroni_as7262_a", "spectral_six_channel")
         if return_as_dictionary:
             return {database_variables.red: colours[0],
                     database_variables.orange: colours[1],
@@ -425,19 +498,19 @@ def get_ems_colors(return_as_dictionary=False):
                     database_variables.blue: colours[4],
                     database_variables.violet: colours[5]}
     elif app_config_access.installed_sensors.pimoroni_enviro:
-        colours = sensors_direct.pimoroni_enviro_a.ems()
+        colours = sensor_sampling_engine.get_reading("pimoroni_enviro_a", "ems")
         if return_as_dictionary:
             return {database_variables.red: colours[0],
                     database_variables.green: colours[1],
                     database_variables.blue: colours[2]}
     elif app_config_access.installed_sensors.pimoroni_bh1745:
-        colours = sensors_direct.pimoroni_bh1745_a.ems()
+        colours = sensor_sampling_engine.get_reading("pimoroni_bh1745_a", "ems")
         if return_as_dictionary:
             return {database_variables.red: colours[0],
                     database_variables.green: colours[1],
                     database_variables.blue: colours[2]}
     elif app_config_access.installed_sensors.kootnet_dummy_sensor:
-        colours = sensors_direct.dummy_sensors.spectral_six_channel()
+        colours = sensor_sampling_engine.get_reading("dummy_sensors", "spectral_six_channel")
         if return_as_dictionary:
             return {database_variables.red: colours[0],
                     database_variables.orange: colours[1],
@@ -453,15 +526,15 @@ def get_ems_colors(return_as_dictionary=False):
 def get_ultra_violet(return_as_dictionary=False):
     """ Returns Ultra Violet Index. """
     if app_config_access.installed_sensors.pimoroni_veml6075:
-        uv_index = sensors_direct.pimoroni_veml6075_a.ultra_violet_index()
-        uv_reading = sensors_direct.pimoroni_veml6075_a.ultra_violet()
+        uv_index = sensor_sampling_engine.get_reading("pimoroni_veml6075_a", "ultra_violet_index")
+        uv_reading = sensor_sampling_engine.get_reading("pimoroni_veml6075_a", "ultra_violet")
         if return_as_dictionary:
             return {database_variables.ultra_violet_index: uv_index,
                     database_variables.ultra_violet_a: uv_reading[0],
                     database_variables.ultra_violet_b: uv_reading[1]}
     elif app_config_access.installed_sensors.kootnet_dummy_sensor:
-        uv_index = sensors_direct.dummy_sensors.ultra_violet_index()
-        uv_reading = sensors_direct.dummy_sensors.ultra_violet()
+        uv_index = sensor_sampling_engine.get_reading("dummy_sensors", "ultra_violet_index")
+        uv_reading = sensor_sampling_engine.get_reading("dummy_sensors", "ultra_violet")
         if return_as_dictionary:
             return {database_variables.ultra_violet_index: uv_index,
                     database_variables.ultra_violet_a: uv_reading[0],
@@ -474,17 +547,17 @@ def get_ultra_violet(return_as_dictionary=False):
 def get_accelerometer_xyz():
     """ Returns sensors Accelerometer XYZ as tuple. """
     if app_config_access.installed_sensors.raspberry_pi_sense_hat:
-        xyz = sensors_direct.rp_sense_hat_a.accelerometer_xyz()
+        xyz = sensor_sampling_engine.get_reading("rp_sense_hat_a", "accelerometer_xyz")
     elif app_config_access.installed_sensors.pimoroni_enviro:
-        xyz = sensors_direct.pimoroni_enviro_a.accelerometer_xyz()
+        xyz = sensor_sampling_engine.get_reading("pimoroni_enviro_a", "accelerometer_xyz")
     elif app_config_access.installed_sensors.pimoroni_msa301:
-        xyz = sensors_direct.pimoroni_msa301_a.accelerometer_xyz()
+        xyz = sensor_sampling_engine.get_reading("pimoroni_msa301_a", "accelerometer_xyz")
     elif app_config_access.installed_sensors.pimoroni_lsm303d:
-        xyz = sensors_direct.pimoroni_lsm303d_a.accelerometer_xyz()
+        xyz = sensor_sampling_engine.get_reading("pimoroni_lsm303d_a", "accelerometer_xyz")
     elif app_config_access.installed_sensors.pimoroni_icm20948:
-        xyz = sensors_direct.pimoroni_icm20948_a.accelerometer_xyz()
+        xyz = sensor_sampling_engine.get_reading("pimoroni_icm20948_a", "accelerometer_xyz")
     elif app_config_access.installed_sensors.kootnet_dummy_sensor:
-        xyz = sensors_direct.dummy_sensors.accelerometer_xyz()
+        xyz = sensor_sampling_engine.get_reading("dummy_sensors", "accelerometer_xyz")
     else:
         return no_sensor_present
     return xyz
@@ -493,15 +566,15 @@ def get_accelerometer_xyz():
 def get_magnetometer_xyz():
     """ Returns sensors Magnetometer XYZ as tuple. """
     if app_config_access.installed_sensors.raspberry_pi_sense_hat:
-        xyz = sensors_direct.rp_sense_hat_a.magnetometer_xyz()
+        xyz = sensor_sampling_engine.get_reading("rp_sense_hat_a", "magnetometer_xyz")
     elif app_config_access.installed_sensors.pimoroni_enviro:
-        xyz = sensors_direct.pimoroni_enviro_a.magnetometer_xyz()
+        xyz = sensor_sampling_engine.get_reading("pimoroni_enviro_a", "magnetometer_xyz")
     elif app_config_access.installed_sensors.pimoroni_lsm303d:
-        xyz = sensors_direct.pimoroni_lsm303d_a.magnetometer_xyz()
+        xyz = sensor_sampling_engine.get_reading("pimoroni_lsm303d_a", "magnetometer_xyz")
     elif app_config_access.installed_sensors.pimoroni_icm20948:
-        xyz = sensors_direct.pimoroni_icm20948_a.magnetometer_xyz()
+        xyz = sensor_sampling_engine.get_reading("pimoroni_icm20948_a", "magnetometer_xyz")
     elif app_config_access.installed_sensors.kootnet_dummy_sensor:
-        xyz = sensors_direct.dummy_sensors.magnetometer_xyz()
+        xyz = sensor_sampling_engine.get_reading("dummy_sensors", "magnetometer_xyz")
     else:
         return no_sensor_present
     return xyz
@@ -510,20 +583,88 @@ def get_magnetometer_xyz():
 def get_gyroscope_xyz():
     """ Returns sensors Gyroscope XYZ as tuple. """
     if app_config_access.installed_sensors.raspberry_pi_sense_hat:
-        xyz = sensors_direct.rp_sense_hat_a.gyroscope_xyz()
+        xyz = sensor_sampling_engine.get_reading("rp_sense_hat_a", "gyroscope_xyz")
     elif app_config_access.installed_sensors.pimoroni_icm20948:
-        xyz = sensors_direct.pimoroni_icm20948_a.gyroscope_xyz()
+        xyz = sensor_sampling_engine.get_reading("pimoroni_icm20948_a", "gyroscope_xyz")
     elif app_config_access.installed_sensors.kootnet_dummy_sensor:
-        xyz = sensors_direct.dummy_sensors.gyroscope_xyz()
+        xyz = sensor_sampling_engine.get_reading("dummy_sensors", "gyroscope_xyz")
     else:
         return no_sensor_present
     return xyz
 
 
-# TODO: Send all sensors in JSON format
 def get_all_sensors_as_json():
-    """ Returns all sensor readings in JSON format. """
-    return "WIP"
+    """
+    Returns all available sensor readings in JSON format, keyed by their Interval database column names.
+    Each reading holds its value, unit and the UTC capture DateTime of the sensor reading(s) it was made from.
+    Readings are taken in one pass, sharing stored readings, so derived readings like Altitude match the rest.
+    """
+    all_sensors = {database_variables.sensor_name: get_hostname(),
+                   database_variables.ip: get_ip(),
+                   "Readings": get_readings_by_sql_column()}
+    return json.dumps(all_sensors)
+
+
+def get_readings_by_sql_column(sql_columns=None):
+    """
+    Returns available sensor readings as a dictionary keyed by their Interval database column names.
+    Each reading is a dictionary of its value, unit and UTC capture DateTime.
+    Only the sensor functions for the provided sql_columns are read, or all of them if None.
+    """
+    sensor_readings = {}
+    single_reading_functions = [[database_variables.sensor_uptime, get_uptime_minutes],
+                                [database_variables.system_temperature, get_cpu_temperature],
+                                [database_variables.env_temperature, get_sensor_temperature],
+                                [database_variables.env_temperature_offset, get_temperature_correction],
+                                [database_variables.pressure, get_pressure],
+                                [database_variables.altitude, get_altitude],
+                                [database_variables.humidity, get_humidity],
+                                [database_variables.distance, get_distance],
+                                [database_variables.lumen, get_lumen]]
+    for sql_column, sensor_function in single_reading_functions:
+        if sql_columns is None or sql_column in sql_columns:
+            reading, capture_datetime = get_reading_and_datetime(sensor_function)
+            _add_json_reading(sensor_readings, sql_column, reading, capture_datetime)
+
+    # [SQL columns, sensor function, function has a return_as_dictionary option]
+    multi_reading_functions = [
+        [[database_variables.gas_resistance_index, database_variables.gas_oxidising,
+          database_variables.gas_reducing, database_variables.gas_nh3], get_gas, True],
+        [[database_variables.particulate_matter_1, database_variables.particulate_matter_2_5,
+          database_variables.particulate_matter_4, database_variables.particulate_matter_10],
+         get_particulate_matter, True],
+        [[database_variables.red, database_variables.orange, database_variables.yellow,
+          database_variables.green, database_variables.blue, database_variables.violet], get_ems_colors, True],
+        [[database_variables.ultra_violet_index, database_variables.ultra_violet_a,
+          database_variables.ultra_violet_b], get_ultra_violet, True],
+        [[database_variables.acc_x, database_variables.acc_y, database_variables.acc_z],
+         get_accelerometer_xyz, False],
+        [[database_variables.mag_x, database_variables.mag_y, database_variables.mag_z],
+         get_magnetometer_xyz, False],
+        [[database_variables.gyro_x, database_variables.gyro_y, database_variables.gyro_z],
+         get_gyroscope_xyz, False]
+    ]
+    for function_sql_columns, sensor_function, returns_dictionary in multi_reading_functions:
+        if sql_columns is not None and not any(column in sql_columns for column in function_sql_columns):
+            continue
+        if returns_dictionary:
+            readings, capture_datetime = get_reading_and_datetime(sensor_function, return_as_dictionary=True)
+        else:
+            readings, capture_datetime = get_reading_and_datetime(sensor_function)
+            if readings != no_sensor_present:
+                readings = dict(zip(function_sql_columns, readings))
+        if readings != no_sensor_present:
+            for sql_column, reading in readings.items():
+                if sql_columns is None or sql_column in sql_columns:
+                    _add_json_reading(sensor_readings, sql_column, reading, capture_datetime)
+    return sensor_readings
+
+
+def _add_json_reading(sensor_readings, sql_column, reading, capture_datetime):
+    if reading != no_sensor_present:
+        sensor_readings[sql_column] = {"Value": reading,
+                                       "Unit": sensor_reading_units.get(sql_column, ""),
+                                       "CaptureDateTime": capture_datetime}
 
 
 def display_message(text_msg, check_test=False):
@@ -570,6 +711,7 @@ def display_message(text_msg, check_test=False):
 def restart_services(sleep_before_restart=1):
     """ Reloads systemd service files & restarts KootnetSensors service. """
     time.sleep(sleep_before_restart)
+    sqlite_database.flush_sql_database_write_queue()
     os.system(bash_commands["RestartService"])
 
 
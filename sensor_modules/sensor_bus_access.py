@@ -0,0 +1,160 @@
+"""
+    KootNet Sensors is a collection of programs and scripts to deploy,
+    interact with, and collect readings from various Sensors.
+    Copyright (C) 2018  Chad Ermacora  chad.ermacora@gmail.com
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import heapq
+import itertools
+import time
+from threading import Condition, Lock, get_ident, local
+
+# Physical buses sensors are attached to, each has one lock shared by every sensor on it
+bus_i2c_1 = "I2C-1"
+bus_spi_0 = "SPI-0"
+bus_uart = "UART"
+bus_usb_uart = "USB-UART"
+bus_1_wire = "1-Wire"
+bus_system = "System"
+bus_dummy = "Dummy"
+
+# Lower numbers get the bus first, requests with the same priority get it in the order they were made
+priority_trigger = 0
+priority_recording = 1
+priority_display = 2
+
+_thread_settings = local()
+_bus_locks_lock = Lock()
+_bus_locks = {}
+_sensor_bus_accesses = {}
+
+
+class CreateBusLock:
+    """
+    Creates a lock for one physical bus, handed out by priority then in request order.
+    The thread holding the lock may acquire it again, like when one reading updates another on the same sensor.
+    """
+
+    def __init__(self, bus_name):
+        self.bus_name = bus_name
+        self.condition = Condition()
+        self.waiting_requests = []
+        self.request_counter = itertools.count()
+        self.owner_thread_id = None
+        self.owner_depth = 0
+
+    def acquire(self, priority):
+        """ Waits for the bus, returns False if the current thread was already holding it. """
+        thread_id = get_ident()
+        with self.condition:
+            if self.owner_thread_id == thread_id:
+                self.owner_depth += 1
+                return False
+            bus_request = (priority, next(self.request_counter))
+            heapq.heappush(self.waiting_requests, bus_request)
+            while self.owner_thread_id is not None or self.waiting_requests[0] != bus_request:
+                self.condition.wait()
+            heapq.heappop(self.waiting_requests)
+            self.owner_thread_id = thread_id
+            self.owner_depth = 1
+            return True
+
+    def release(self):
+        with self.condition:
+            self.owner_depth -= 1
+            if self.owner_depth < 1:
+                self.owner_thread_id = None
+                self.condition.notify_all()
+
+    def get_waiting_count(self):
+        with self.condition:
+            return len(self.waiting_requests)
+
+
+class CreateSensorBusAccess:
+    """
+    Creates a context manager giving one sensor access to its bus, while recording how long it waited for it.
+    Use 'with self.bus_access:' around every hardware access of the sensor.
+    """
+
+    def __init__(self, bus_lock, sensor_name):
+        self.bus_lock = bus_lock
+        self.sensor_name = sensor_name
+        self.access_count = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def __enter__(self):
+        wait_start_time = time.monotonic()
+        if not self.bus_lock.acquire(get_thread_priority()):
+            return self
+        wait_seconds = time.monotonic() - wait_start_time
+        self.access_count += 1
+        self.total_wait_seconds += wait_seconds
+        if wait_seconds > self.max_wait_seconds:
+            self.max_wait_seconds = wait_seconds
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.bus_lock.release()
+        return False
+
+    def get_average_wait_seconds(self):
+        if self.access_count:
+            return self.total_wait_seconds / self.access_count
+        return 0.0
+
+    def get_status_str(self):
+        """ Returns the sensor's bus, access count and lock wait times as a human readable String. """
+        return self.sensor_name + " on " + self.bus_lock.bus_name + ": " + str(self.access_count) + \
+            " Reads, Average Wait " + str(round(self.get_average_wait_seconds() * 1000, 2)) + \
+            " ms, Max Wait " + str(round(self.max_wait_seconds * 1000, 2)) + " ms"
+
+
+def get_bus_access(bus_name, sensor_name):
+    """
+    Returns the provided sensor's CreateSensorBusAccess for the provided bus.
+    Re-initialized sensors get their previous access back, so wait times are kept.
+    """
+    with _bus_locks_lock:
+        if bus_name not in _bus_locks:
+            _bus_locks[bus_name] = CreateBusLock(bus_name)
+        sensor_bus_access = _sensor_bus_accesses.get(sensor_name)
+        if sensor_bus_access is None or sensor_bus_access.bus_lock.bus_name != bus_name:
+            sensor_bus_access = CreateSensorBusAccess(_bus_locks[bus_name], sensor_name)
+            _sensor_bus_accesses[sensor_name] = sensor_bus_access
+        return sensor_bus_access
+
+
+def set_thread_priority(priority):
+    """ Sets the bus priority used by sensor reads made from the current thread. """
+    _thread_settings.priority = priority
+
+
+def get_thread_priority():
+    """ Returns the current thread's bus priority, threads that did not set one read at recording priority. """
+    return getattr(_thread_settings, "priority", priority_recording)
+
+
+def get_status_str():
+    """ Returns every sensor's bus lock wait times as a human readable String. """
+    with _bus_locks_lock:
+        sensor_bus_accesses = list(_sensor_bus_accesses.values())
+    if not sensor_bus_accesses:
+        return "No Sensors Accessed"
+    status_list = []
+    for sensor_bus_access in sensor_bus_accesses:
+        status_list.append(sensor_bus_access.get_status_str())
+    return " || ".join(status_list)
@@ -0,0 +1,260 @@
+"""
+    KootNet Sensors is a collection of programs and scripts to deploy,
+    interact with, and collect readings from various Sensors.
+    Copyright (C) 2018  Chad Ermacora  chad.ermacora@gmail.com
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import copy
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from threading import Lock, Thread, local
+from operations_modules import logger
+from configuration_modules import app_config_access
+from sensor_modules import sensor_bus_access
+
+# Each physical sensor is polled by its own thread at this rate, slow sensors are polled less often
+sampling_rate_default_seconds = 2.0
+sensor_sampling_rates_seconds = {"sensirion_sps30_a": 10.0,
+                                 "pimoroni_pms5003_a": 5.0,
+                                 "w1_therm_sensor_a": 5.0}
+# Readings nobody asked for in this long stop being polled, until asked for again
+sampling_idle_stop_seconds = 120.0
+# Stored readings are returned until this old, then the sensor is read again, set in the Primary Configuration
+# Primary Configuration max age attribute names by measurement (reading) name, others use sensor_reading_max_age_seconds
+reading_max_age_config_names = {"particulate_matter_data": "particulate_matter_max_age_seconds",
+                                "cpu_temperature": "cpu_temperature_max_age_seconds"}
+
+_thread_readings = local()
+
+
+class CreateSensorReading:
+    """ Creates a sensor reading with the UTC DateTime and monotonic time it was taken. """
+
+    def __init__(self, value):
+        self.value = value
+        self.capture_time = time.monotonic()
+        self.capture_datetime = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+
+    def get_age_seconds(self):
+        return time.monotonic() - self.capture_time
+
+
+class CreateReadingsContext:
+    """
+    Creates a record of the sensor readings taken by one thread inside CreateSensorSamplingEngine.readings_context().
+    Holds the capture DateTimes of every reading used, like both Temperature & Pressure for Altitude.
+    """
+
+    def __init__(self, bypass_cache, max_age_seconds=None):
+        self.bypass_cache = bypass_cache
+        self.max_age_seconds = max_age_seconds
+        self.capture_datetimes = []
+
+    def get_oldest_capture_datetime(self):
+        """ Returns the UTC capture DateTime of the oldest reading used, or None if no readings were taken. """
+        if self.capture_datetimes:
+            return min(self.capture_datetimes)
+        return None
+
+
+class CreateSensorSamplingEngine:
+    """
+    Creates a latest value store for sensor readings, kept up to date by one polling thread per physical sensor.
+    Sensors are the CreateSensorAccess attribute names like 'pimoroni_bme680_a' and readings their method names.
+    Readings are polled once something has asked for them, for as long as they keep being asked for,
+    so every consumer shares one hardware read per sampling period instead of reading the sensor itself.
+    Stored readings older then their max age (see get_reading_max_age) are read through to the sensor,
+    which is also how readings are cached before start() is called.
+    """
+
+    def __init__(self, sensor_access):
+        self.sensor_access = sensor_access
+        self.is_running = False
+        self.store_lock = Lock()
+        self.latest_readings = {}
+        self.requested_readings = {}
+        self.requested_priorities = {}
+        self.sampling_sensors = {}
+        # Bumped when a sensor is re-initialized, so readings from its previous driver are not stored
+        self.sensor_generations = {}
+
+        self.hardware_read_count = 0
+        self.store_read_count = 0
+
+    def start(self):
+        self.is_running = True
+        logger.sensors_logger.debug("Sensor Sampling Engine Started")
+
+    def clear_readings(self):
+        """ Removes all stored readings and stops the polling threads. Use after re-initializing all sensors. """
+        with self.store_lock:
+            for sensor_name in self.sensor_generations:
+                self.sensor_generations[sensor_name] += 1
+            self.latest_readings = {}
+            self.requested_readings = {}
+            self.requested_priorities = {}
+            self.sampling_sensors = {}
+
+    def clear_sensor_readings(self, sensor_name):
+        """
+        Removes the provided sensor's stored readings and restarts its polling thread, leaving other sensors
+        sampling. Use after adding, removing or re-initializing one sensor.
+        """
+        with self.store_lock:
+            self.sensor_generations[sensor_name] = self.sensor_generations.get(sensor_name, 0) + 1
+            for reading_key in list(self.latest_readings):
+                if reading_key.startswith(sensor_name + "."):
+                    del self.latest_readings[reading_key]
+            self.sampling_sensors.pop(sensor_name, None)
+            if self.is_running and sensor_name in self.requested_readings:
+                self._start_sampling_thread(sensor_name)
+
+    def get_reading(self, sensor_name, reading_name):
+        """ Returns the provided sensor's latest reading, from the store if recent enough. """
+        return copy.copy(self.get_reading_with_datetime(sensor_name, reading_name).value)
+
+    @contextmanager
+    def readings_context(self, bypass_cache=False, max_age_seconds=None):
+        """
+        Returns a CreateReadingsContext recording the capture DateTimes of readings taken by this thread within it.
+        With bypass_cache, every reading within it is read from the sensor, for callers needing a fresh reading.
+        With max_age_seconds, stored readings older then it are read from the sensor, even if within their max age.
+        """
+        previous_context = getattr(_thread_readings, "context", None)
+        readings_context = CreateReadingsContext(bypass_cache, max_age_seconds=max_age_seconds)
+        _thread_readings.context = readings_context
+        try:
+            yield readings_context
+        finally:
+            _thread_readings.context = previous_context
+
+    def get_reading_with_datetime(self, sensor_name, reading_name):
+        """ Returns the provided sensor's latest reading as a CreateSensorReading, holding its capture DateTime. """
+        reading_key = sensor_name + "." + reading_name
+        readings_context = getattr(_thread_readings, "context", None)
+        bypass_cache = readings_context is not None and readings_context.bypass_cache
+        max_age_seconds = get_reading_max_age(sensor_name, reading_name)
+        if readings_context is not None and readings_context.max_age_seconds is not None:
+            max_age_seconds = min(max_age_seconds, readings_context.max_age_seconds)
+        with self.store_lock:
+            sensor_requested_readings = self.requested_readings.setdefault(sensor_name, {})
+            sensor_requested_readings[reading_name] = time.monotonic()
+            sensor_requested_priorities = self.requested_priorities.setdefault(sensor_name, {})
+            sensor_requested_priorities[sensor_bus_access.get_thread_priority()] = time.monotonic()
+            sensor_generation = self.sensor_generations.setdefault(sensor_name, 0)
+            if self.is_running and sensor_name not in self.sampling_sensors:
+                self._start_sampling_thread(sensor_name)
+
+            sensor_reading = self.latest_readings.get(reading_key)
+            if not bypass_cache and sensor_reading is not None and \
+                    sensor_reading.get_age_seconds() <= max_age_seconds:
+                self.store_read_count += 1
+                _add_to_readings_context(readings_context, sensor_reading)
+                return sensor_reading
+
+        sensor_reading = CreateSensorReading(self._read_sensor(sensor_name, reading_name))
+        self._store_reading(sensor_name, reading_key, sensor_reading, sensor_generation)
+        _add_to_readings_context(readings_context, sensor_reading)
+        return sensor_reading
+
+    def get_status_str(self):
+        """ Returns sampled sensor & reading counts and store hit statistics as a human readable String. """
+        with self.store_lock:
+            sampled_sensors_count = len(self.sampling_sensors)
+            stored_readings_count = len(self.latest_readings)
+        return str(sampled_sensors_count) + " Sensors Sampled || " + str(stored_readings_count) + \
+            " Stored Readings || Hardware Reads: " + str(self.hardware_read_count) + \
+            " || Reads from Store: " + str(self.store_read_count)
+
+    def _start_sampling_thread(self, sensor_name):
+        """ Starts the provided sensor's polling thread. Call with store_lock held. """
+        sensor_generation = self.sensor_generations.setdefault(sensor_name, 0)
+        self.sampling_sensors[sensor_name] = sensor_generation
+        sampling_thread = Thread(target=self._sample_sensor, args=[sensor_name, sensor_generation])
+        sampling_thread.daemon = True
+        sampling_thread.start()
+
+    def _sample_sensor(self, sensor_name, sensor_generation):
+        sampling_rate = get_sampling_rate(sensor_name)
+        next_sample_time = time.monotonic()
+        while True:
+            with self.store_lock:
+                if self.sensor_generations.get(sensor_name) != sensor_generation:
+                    return
+                idle_cutoff_time = time.monotonic() - sampling_idle_stop_seconds
+                reading_names = []
+                for reading_name, last_requested in self.requested_readings.get(sensor_name, {}).items():
+                    if last_requested > idle_cutoff_time:
+                        reading_names.append(reading_name)
+                if not reading_names:
+                    self.sampling_sensors.pop(sensor_name, None)
+                    self.requested_readings.pop(sensor_name, None)
+                    self.requested_priorities.pop(sensor_name, None)
+                    return
+
+                # Sensors are sampled at the most urgent bus priority of the threads still asking for them
+                sampling_priority = sensor_bus_access.priority_display
+                for priority, last_requested in self.requested_priorities.get(sensor_name, {}).items():
+                    if last_requested > idle_cutoff_time and priority < sampling_priority:
+                        sampling_priority = priority
+            sensor_bus_access.set_thread_priority(sampling_priority)
+
+            for reading_name in reading_names:
+                try:
+                    sensor_reading = CreateSensorReading(self._read_sensor(sensor_name, reading_name))
+                    reading_key = sensor_name + "." + reading_name
+                    self._store_reading(sensor_name, reading_key, sensor_reading, sensor_generation)
+                except Exception as error:
+                    logger.sensors_logger.debug("Sensor Sampling - Skipped Reading: " + str(error))
+
+            # Missed samples are skipped rather than read back to back
+            next_sample_time += sampling_rate
+            current_time = time.monotonic()
+            if next_sample_time < current_time:
+                next_sample_time = current_time + sampling_rate
+            time.sleep(next_sample_time - current_time)
+
+    def _store_reading(self, sensor_name, reading_key, sensor_reading, sensor_generation):
+        with self.store_lock:
+            if self.sensor_generations.get(sensor_name) == sensor_generation:
+                self.latest_readings[reading_key] = sensor_reading
+
+    def _read_sensor(self, sensor_name, reading_name):
+        self.hardware_read_count += 1
+        try:
+            return getattr(getattr(self.sensor_access, sensor_name), reading_name)()
+        except Exception as error:
+            logger.sensors_logger.error("Sensor Sampling - " + sensor_name + " " + reading_name + ": " + str(error))
+            raise
+
+
+def get_sampling_rate(sensor_name):
+    return sensor_sampling_rates_seconds.get(sensor_name, sampling_rate_default_seconds)
+
+
+def get_reading_max_age(sensor_name, reading_name):
+    """ Returns how old in seconds the provided sensor's stored reading can be, before reading the sensor again. """
+    primary_config = app_config_access.primary_config
+    if reading_name in reading_max_age_config_names:
+        return getattr(primary_config, reading_max_age_config_names[reading_name])
+    if primary_config.sensor_reading_max_age_seconds > 0:
+        return primary_config.sensor_reading_max_age_seconds
+    return get_sampling_rate(sensor_name) * 2
+
+
+def _add_to_readings_context(readings_context, sensor_reading):
+    if readings_context is not None:
+        readings_context.capture_datetimes.append(sensor_reading.capture_datetime)
@@ -17,67 +17,105 @@
     along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 from os import geteuid
+from importlib import import_module
 from operations_modules import logger
 from operations_modules import app_cached_variables
+from operations_modules import deadline_scheduler
+from operations_modules.startup_profile import startup_profile
 from configuration_modules import app_config_access
 from sensor_modules import linux_os as _linux_os
-from sensor_modules import kootnet_dummy_sensors as _kootnet_dummy_sensors
-from sensor_modules import raspberry_pi_system as _raspberry_pi_system
-from sensor_modules.pimoroni import pimoroni_enviroplus as _pimoroni_enviroplus
-from sensor_modules.pimoroni import pimoroni_pms5003 as _pimoroni_pms5003
-from sensor_modules.pimoroni import pimoroni_vl53l1x as _pimoroni_vl53l1x
-from sensor_modules.pimoroni import pimoroni_enviro as _pimoroni_enviro
-from sensor_modules.pimoroni import pimoroni_lsm303d as _pimoroni_lsm303d
-from sensor_modules.pimoroni import pimoroni_bmp280 as _pimoroni_bmp280
-from sensor_modules.pimoroni import pimoroni_bh1745 as _pimoroni_bh1745
-from sensor_modules.pimoroni import pimoroni_msa301 as _pimoroni_msa301
-from sensor_modules.pimoroni import pimoroni_1_12_mono_oled as _pimoroni_1_12_mono_oled
-from sensor_modules.pimoroni import pimoroni_icm20948 as _pimoroni_icm20948
-from sensor_modules.pimoroni import pimoroni_0_96_spi_colour_lcd as _pimoroni_0_96_spi_colour_lcd
-from sensor_modules.pimoroni import pimoroni_11x7_led_matrix as _pimoroni_11x7_led_matrix
-from sensor_modules.pimoroni import pimoroni_bme680 as _pimoroni_bme680
-from sensor_modules.pimoroni import pimoroni_mcp9600 as _pimoroni_mcp9600
-from sensor_modules.pimoroni import pimoroni_as7262 as _pimoroni_as7262
-from sensor_modules.pimoroni import pimoroni_sgp30 as _pimoroni_sgp30
-from sensor_modules.pimoroni import pimoroni_veml6075 as _pimoroni_veml6075
-from sensor_modules.pimoroni import pimoroni_ltr_559 as _pimoroni_ltr_559
-from sensor_modules import raspberry_pi_sensehat as _raspberry_pi_sense_hat
-from sensor_modules import sensirion_sps30 as _sensirion_sps30
-from sensor_modules import maxim_dallas_1_wire_multi as _maxim_dallas_1_wire_multi
 from sensor_modules.no_sensors_dummy_sensors import CreateNoSensorsDummySensor
 
+# Hardware sensor drivers, imported and initialized only if enabled in the Installed Sensors configuration
+# Each entry is [CreateSensorAccess attribute, Installed Sensors variable, driver module, driver class]
+# Raspberry Pi System is first to enable I2C, SPI & Wifi, to ensure they are enabled for the other hardware Sensors
+sensor_driver_registry = [
+    ["raspberry_pi_a", "raspberry_pi", "sensor_modules.raspberry_pi_system", "CreateRPSystem"],
+    ["rp_sense_hat_a", "raspberry_pi_sense_hat", "sensor_modules.raspberry_pi_sensehat", "CreateRPSenseHAT"],
+    ["pimoroni_bh1745_a", "pimoroni_bh1745", "sensor_modules.pimoroni.pimoroni_bh1745", "CreateBH1745"],
+    ["pimoroni_as7262_a", "pimoroni_as7262", "sensor_modules.pimoroni.pimoroni_as7262", "CreateAS7262"],
+    ["pimoroni_bme680_a", "pimoroni_bme680", "sensor_modules.pimoroni.pimoroni_bme680", "CreateBME680"],
+    ["pimoroni_mcp9600_a", "pimoroni_mcp9600", "sensor_modules.pimoroni.pimoroni_mcp9600", "CreateMCP9600"],
+    ["pimoroni_bmp280_a", "pimoroni_bmp280", "sensor_modules.pimoroni.pimoroni_bmp280", "CreateBMP280"],
+    ["pimoroni_enviro_a", "pimoroni_enviro", "sensor_modules.pimoroni.pimoroni_enviro", "CreateEnviro"],
+    ["pimoroni_enviroplus_a", "pimoroni_enviroplus", "sensor_modules.pimoroni.pimoroni_enviroplus",
+     "CreateEnviroPlus"],
+    ["pimoroni_pms5003_a", "pimoroni_pms5003", "sensor_modules.pimoroni.pimoroni_pms5003", "CreatePimoroniPMS5003"],
+    ["pimoroni_sgp30_a", "pimoroni_sgp30", "sensor_modules.pimoroni.pimoroni_sgp30", "CreateSGP30"],
+    ["pimoroni_msa301_a", "pimoroni_msa301", "sensor_modules.pimoroni.pimoroni_msa301", "CreateMSA301"],
+    ["pimoroni_lsm303d_a", "pimoroni_lsm303d", "sensor_modules.pimoroni.pimoroni_lsm303d", "CreateLSM303D"],
+    ["pimoroni_icm20948_a", "pimoroni_icm20948", "sensor_modules.pimoroni.pimoroni_icm20948", "CreateICM20948"],
+    ["pimoroni_ltr_559_a", "pimoroni_ltr_559", "sensor_modules.pimoroni.pimoroni_ltr_559", "CreateLTR559"],
+    ["pimoroni_vl53l1x_a", "pimoroni_vl53l1x", "sensor_modules.pimoroni.pimoroni_vl53l1x", "CreateVL53L1X"],
+    ["pimoroni_veml6075_a", "pimoroni_veml6075", "sensor_modules.pimoroni.pimoroni_veml6075", "CreateVEML6075"],
+    ["pimoroni_matrix_11x7_a", "pimoroni_matrix_11x7", "sensor_modules.pimoroni.pimoroni_11x7_led_matrix",
+     "CreateMatrix11x7"],
+    ["pimoroni_st7735_a", "pimoroni_st7735", "sensor_modules.pimoroni.pimoroni_0_96_spi_colour_lcd", "CreateST7735"],
+    ["pimoroni_mono_oled_luma_a", "pimoroni_mono_oled_luma", "sensor_modules.pimoroni.pimoroni_1_12_mono_oled",
+     "CreateLumaOLED"],
+    ["sensirion_sps30_a", "sensirion_sps30", "sensor_modules.sensirion_sps30", "CreateSPS30"],
+    ["w1_therm_sensor_a", "w1_therm_sensor", "sensor_modules.maxim_dallas_1_wire_multi", "CreateW1ThermSenor"]
+]
+
+
+# Threads that only check for their sensors when started, restarted when one of these sensors is added or removed
+# Other threads check installed sensors each time they take readings & keep running
+# The Trigger engines rebuild their rules on any change instead, see app_cached_variables.installed_sensors_changes
+reading_consumer_restarts = ["restart_mqtt_publisher_thread"]
+weather_consumer_restarts = ["restart_mqtt_publisher_thread", "restart_weather_underground_thread",
+                             "restart_open_sense_map_thread"]
+sensor_consumer_restarts = {
+    "dummy_sensors": ["restart_mini_display_thread", "restart_luftdaten_thread"] + weather_consumer_restarts,
+    "raspberry_pi_a": reading_consumer_restarts,
+    "rp_sense_hat_a": ["restart_mini_display_thread"] + weather_consumer_restarts,
+    "pimoroni_bh1745_a": reading_consumer_restarts + ["restart_open_sense_map_thread"],
+    "pimoroni_as7262_a": reading_consumer_restarts + ["restart_open_sense_map_thread"],
+    "pimoroni_bme680_a": ["restart_luftdaten_thread"] + weather_consumer_restarts,
+    "pimoroni_mcp9600_a": weather_consumer_restarts,
+    "pimoroni_bmp280_a": ["restart_luftdaten_thread"] + weather_consumer_restarts,
+    "pimoroni_enviro_a": ["restart_luftdaten_thread"] + weather_consumer_restarts,
+    "pimoroni_enviroplus_a": ["restart_mini_display_thread", "restart_luftdaten_thread"] + weather_consumer_restarts,
+    "pimoroni_pms5003_a": ["restart_luftdaten_thread"] + weather_consumer_restarts,
+    "pimoroni_sgp30_a": reading_consumer_restarts + ["restart_open_sense_map_thread"],
+    "pimoroni_msa301_a": reading_consumer_restarts,
+    "pimoroni_lsm303d_a": reading_consumer_restarts,
+    "pimoroni_icm20948_a": reading_consumer_restarts,
+    "pimoroni_ltr_559_a": reading_consumer_restarts + ["restart_open_sense_map_thread"],
+    "pimoroni_vl53l1x_a": reading_consumer_restarts,
+    "pimoroni_veml6075_a": weather_consumer_restarts,
+    "pimoroni_matrix_11x7_a": ["restart_mini_display_thread"],
+    "pimoroni_st7735_a": ["restart_mini_display_thread"],
+    "pimoroni_mono_oled_luma_a": ["restart_mini_display_thread"],
+    "sensirion_sps30_a": ["restart_luftdaten_thread"] + weather_consumer_restarts,
+    "w1_therm_sensor_a": weather_consumer_restarts
+}
+
 
 class CreateSensorAccess:
-    def __init__(self, first_start=False):
-        # Initialize sensor access, based on installed sensors file
-        if first_start:
-            logger.primary_logger.info(" -- Initializing Sensors")
-            self._set_dummy_sensors()
-            self.operating_system_a = _linux_os.CreateLinuxSystem()
-        else:
-            logger.primary_logger.info(" -- Re-initializing Sensors")
-            app_cached_variables.restart_interval_recording_thread = True
-            app_cached_variables.restart_mini_display_thread = True
-            app_cached_variables.restart_mqtt_publisher_thread = True
-            app_cached_variables.restart_weather_underground_thread = True
-            app_cached_variables.restart_luftdaten_thread = True
-            app_cached_variables.restart_open_sense_map_thread = True
+    """
+    Creates access to the installed sensor drivers, as attributes named in sensor_driver_registry.
+    Sensors not installed are a CreateNoSensorsDummySensor. Sensors are added, removed & re-initialized
+    one at a time, so sensors that did not change keep running.
+    """
+
+    def __init__(self):
+        logger.primary_logger.info(" -- Initializing Sensors")
+        self.operating_system_a = _linux_os.CreateLinuxSystem()
+        self.dummy_sensors = CreateNoSensorsDummySensor()
+        for attribute_name, installed_variable, module_name, class_name in sensor_driver_registry:
+            setattr(self, attribute_name, CreateNoSensorsDummySensor())
+        self.update_installed_sensors(restart_consumers=False)
+        logger.primary_logger.info(" -- Sensors Initialized")
+
+    def update_installed_sensors(self, restart_consumers=True):
+        """
+        Initializes sensors enabled in the Installed Sensors configuration & removes disabled ones.
+        Returns a list of the changed sensors (attribute names) after restarting threads using them,
+        unless restart_consumers is False, then use restart_sensor_consumers() once ready.
+        """
+        installed_sensors = app_config_access.installed_sensors
+        changed_sensors = []
         if geteuid() == 0:
-            installed_sensors = app_config_access.installed_sensors
-            # Raspberry Pi System is created first to enable I2C, SPI & Wifi
-            # This is to ensure they are enabled for the other hardware Sensors
-            if installed_sensors.raspberry_pi and not self.raspberry_pi_a.initialized_sensor:
-                self.raspberry_pi_a = _raspberry_pi_system.CreateRPSystem()
-                self.raspberry_pi_a.initialized_sensor = True
-            if installed_sensors.raspberry_pi_sense_hat and not self.rp_sense_hat_a.initialized_sensor:
-                self.rp_sense_hat_a = _raspberry_pi_sense_hat.CreateRPSenseHAT()
-                self.rp_sense_hat_a.initialized_sensor = True
-            if installed_sensors.pimoroni_bh1745 and not self.pimoroni_bh1745_a.initialized_sensor:
-                self.pimoroni_bh1745_a = _pimoroni_bh1745.CreateBH1745()
-                self.pimoroni_bh1745_a.initialized_sensor = True
-            if installed_sensors.pimoroni_as7262 and not self.pimoroni_as7262_a.initialized_sensor:
-                self.pimoroni_as7262_a = _pimoroni_as7262.CreateAS7262()
-                self.pimoroni_as7262_a.initialized_sensor = True
             if installed_sensors.pimoroni_bme680 and not self.pimoroni_bme680_a.initialized_sensor:
                 if installed_sensors.pimoroni_bmp280:
                     message = "Pimoroni BME680 cannot be installed if the BMP280 is installed. " + \
@@ -86,89 +124,81 @@ class CreateSensorAccess:
                     logger.sensors_logger.warning(message)
                     installed_sensors.pimoroni_bme680 = 0
                     installed_sensors.pimoroni_bmp280 = 0
-                else:
-                    self.pimoroni_bme680_a = _pimoroni_bme680.CreateBME680()
-                    self.pimoroni_bme680_a.initialized_sensor = True
-            if installed_sensors.pimoroni_mcp9600 and not self.pimoroni_mcp9600_a.initialized_sensor:
-                self.pimoroni_mcp9600_a = _pimoroni_mcp9600.CreateMCP9600()
-                self.pimoroni_mcp9600_a.initialized_sensor = True
-            if installed_sensors.pimoroni_bmp280 and not self.pimoroni_bmp280_a.initialized_sensor:
-                self.pimoroni_bmp280_a = _pimoroni_bmp280.CreateBMP280()
-                self.pimoroni_bmp280_a.initialized_sensor = True
-            if installed_sensors.pimoroni_enviro and not self.pimoroni_enviro_a.initialized_sensor:
-                self.pimoroni_enviro_a = _pimoroni_enviro.CreateEnviro()
-                self.pimoroni_enviro_a.initialized_sensor = True
-            if installed_sensors.pimoroni_enviroplus and not self.pimoroni_enviroplus_a.initialized_sensor:
-                self.pimoroni_enviroplus_a = _pimoroni_enviroplus.CreateEnviroPlus()
-                self.pimoroni_enviroplus_a.initialized_sensor = True
-            if installed_sensors.pimoroni_pms5003 and not self.pimoroni_pms5003_a.initialized_sensor:
-                self.pimoroni_pms5003_a = _pimoroni_pms5003.CreatePimoroniPMS5003()
-                self.pimoroni_pms5003_a.initialized_sensor = True
-            if installed_sensors.pimoroni_sgp30 and not self.pimoroni_sgp30_a.initialized_sensor:
-                self.pimoroni_sgp30_a = _pimoroni_sgp30.CreateSGP30()
-                self.pimoroni_sgp30_a.initialized_sensor = True
-            if installed_sensors.pimoroni_msa301 and not self.pimoroni_msa301_a.initialized_sensor:
-                self.pimoroni_msa301_a = _pimoroni_msa301.CreateMSA301()
-                self.pimoroni_msa301_a.initialized_sensor = True
-            if installed_sensors.pimoroni_lsm303d and not self.pimoroni_lsm303d_a.initialized_sensor:
-                self.pimoroni_lsm303d_a = _pimoroni_lsm303d.CreateLSM303D()
-                self.pimoroni_lsm303d_a.initialized_sensor = True
-            if installed_sensors.pimoroni_icm20948 and not self.pimoroni_icm20948_a.initialized_sensor:
-                self.pimoroni_icm20948_a = _pimoroni_icm20948.CreateICM20948()
-                self.pimoroni_icm20948_a.initialized_sensor = True
-            if installed_sensors.pimoroni_ltr_559 and not self.pimoroni_ltr_559_a.initialized_sensor:
-                self.pimoroni_ltr_559_a = _pimoroni_ltr_559.CreateLTR559()
-                self.pimoroni_ltr_559_a.initialized_sensor = True
-            if installed_sensors.pimoroni_vl53l1x and not self.pimoroni_vl53l1x_a.initialized_sensor:
-                self.pimoroni_vl53l1x_a = _pimoroni_vl53l1x.CreateVL53L1X()
-                self.pimoroni_vl53l1x_a.initialized_sensor = True
-            if installed_sensors.pimoroni_veml6075 and not self.pimoroni_veml6075_a.initialized_sensor:
-                self.pimoroni_veml6075_a = _pimoroni_veml6075.CreateVEML6075()
-                self.pimoroni_veml6075_a.initialized_sensor = True
-            if installed_sensors.pimoroni_matrix_11x7 and not self.pimoroni_matrix_11x7_a.initialized_sensor:
-                self.pimoroni_matrix_11x7_a = _pimoroni_11x7_led_matrix.CreateMatrix11x7()
-                self.pimoroni_matrix_11x7_a.initialized_sensor = True
-            if installed_sensors.pimoroni_st7735 and not self.pimoroni_st7735_a.initialized_sensor:
-                self.pimoroni_st7735_a = _pimoroni_0_96_spi_colour_lcd.CreateST7735()
-                self.pimoroni_st7735_a.initialized_sensor = True
-            if installed_sensors.pimoroni_mono_oled_luma and not self.pimoroni_mono_oled_luma_a.initialized_sensor:
-                self.pimoroni_mono_oled_luma_a = _pimoroni_1_12_mono_oled.CreateLumaOLED()
-                self.pimoroni_mono_oled_luma_a.initialized_sensor = True
-            if installed_sensors.sensirion_sps30 and not self.sensirion_sps30_a.initialized_sensor:
-                self.sensirion_sps30_a = _sensirion_sps30.CreateSPS30()
-                self.sensirion_sps30_a.initialized_sensor = True
-            if installed_sensors.w1_therm_sensor and not self.w1_therm_sensor_a.initialized_sensor:
-                self.w1_therm_sensor_a = _maxim_dallas_1_wire_multi.CreateW1ThermSenor()
-                self.w1_therm_sensor_a.initialized_sensor = True
+            for attribute_name, installed_variable, module_name, class_name in sensor_driver_registry:
+                sensor_installed = bool(getattr(installed_sensors, installed_variable))
+                if sensor_installed != getattr(self, attribute_name).initialized_sensor:
+                    if sensor_installed:
+                        self._initialize_sensor(attribute_name, module_name, class_name)
+                    else:
+                        self._remove_sensor(attribute_name)
+                    changed_sensors.append(attribute_name)
         else:
             logger.sensors_logger.info(" -- Hardware Based Sensor Initializations Skipped - root required")
 
-        if app_config_access.installed_sensors.kootnet_dummy_sensor:
-            self.dummy_sensors = _kootnet_dummy_sensors.CreateDummySensors()
-            log_msg2 = "Readings will be randomly generated for any missing sensor types"
-            logger.sensors_logger.warning(" - Dummy Sensors Enabled, " + log_msg2)
-        logger.primary_logger.info(" -- Sensors Initialized")
+        dummy_sensors_installed = bool(installed_sensors.kootnet_dummy_sensor)
+        if dummy_sensors_installed != self.dummy_sensors.initialized_sensor:
+            if dummy_sensors_installed:
+                self._initialize_sensor("dummy_sensors", "sensor_modules.kootnet_dummy_sensors", "CreateDummySensors")
+                log_msg2 = "Readings will be randomly generated for any missing sensor types"
+                logger.sensors_logger.warning(" - Dummy Sensors Enabled, " + log_msg2)
+            else:
+                self._remove_sensor("dummy_sensors")
+            changed_sensors.append("dummy_sensors")
+
+        if restart_consumers:
+            restart_sensor_consumers(changed_sensors)
+        return changed_sensors
+
+    def reinitialize_sensor(self, sensor_name):
+        """
+        Re-initializes one installed sensor (attribute name like 'pimoroni_bme680_a'), leaving the others running.
+        Returns True if the sensor was re-initialized.
+        """
+        for attribute_name, installed_variable, module_name, class_name in sensor_driver_registry:
+            if attribute_name == sensor_name:
+                if geteuid() == 0 and getattr(app_config_access.installed_sensors, installed_variable):
+                    logger.primary_logger.info(" -- Re-initializing Sensor " + class_name[6:])
+                    self._initialize_sensor(attribute_name, module_name, class_name)
+                    return True
+                return False
+        logger.sensors_logger.warning("Unable to Re-initialize Sensor - Unknown Sensor: " + str(sensor_name))
+        return False
+
+    def _initialize_sensor(self, attribute_name, module_name, class_name):
+        """ Replaces the sensor with a newly initialized driver, readings in progress finish on the old driver. """
+        with startup_profile.time_section("Sensor " + class_name[6:]):
+            sensor = _get_driver_class(module_name, class_name)()
+            sensor.initialized_sensor = True
+        previous_sensor = getattr(self, attribute_name)
+        setattr(self, attribute_name, sensor)
+        _stop_sensor(previous_sensor)
+
+    def _remove_sensor(self, attribute_name):
+        previous_sensor = getattr(self, attribute_name)
+        setattr(self, attribute_name, CreateNoSensorsDummySensor())
+        _stop_sensor(previous_sensor)
+
+
+def _stop_sensor(sensor):
+    """ Stops the background keep alive thread of drivers that have one, like the BME680 & SGP30. """
+    sensor.keep_alive_running = False
+
+
+def restart_sensor_consumers(changed_sensors):
+    """ Restarts threads using the provided changed sensors & has the Trigger engines rebuild their rules. """
+    if changed_sensors:
+        app_cached_variables.installed_sensors_changes += 1
+    restart_variables = set()
+    for sensor_name in changed_sensors:
+        restart_variables.update(sensor_consumer_restarts.get(sensor_name, []))
+    for restart_variable in restart_variables:
+        setattr(app_cached_variables, restart_variable, True)
+    if changed_sensors:
+        deadline_scheduler.notify_restart()
+
 
-    def _set_dummy_sensors(self):
-        self.raspberry_pi_a = CreateNoSensorsDummySensor()
-        self.rp_sense_hat_a = CreateNoSensorsDummySensor()
-        self.pimoroni_bh1745_a = CreateNoSensorsDummySensor()
-        self.pimoroni_as7262_a = CreateNoSensorsDummySensor()
-        self.pimoroni_bme680_a = CreateNoSensorsDummySensor()
-        self.pimoroni_mcp9600_a = CreateNoSensorsDummySensor()
-        self.pimoroni_bmp280_a = CreateNoSensorsDummySensor()
-        self.pimoroni_enviro_a = CreateNoSensorsDummySensor()
-        self.pimoroni_enviroplus_a = CreateNoSensorsDummySensor()
-        self.pimoroni_pms5003_a = CreateNoSensorsDummySensor()
-        self.pimoroni_sgp30_a = CreateNoSensorsDummySensor()
-        self.pimoroni_msa301_a = CreateNoSensorsDummySensor()
-        self.pimoroni_lsm303d_a = CreateNoSensorsDummySensor()
-        self.pimoroni_icm20948_a = CreateNoSensorsDummySensor()
-        self.pimoroni_ltr_559_a = CreateNoSensorsDummySensor()
-        self.pimoroni_vl53l1x_a = CreateNoSensorsDummySensor()
-        self.pimoroni_veml6075_a = CreateNoSensorsDummySensor()
-        self.pimoroni_matrix_11x7_a = CreateNoSensorsDummySensor()
-        self.pimoroni_st7735_a = CreateNoSensorsDummySensor()
-        self.pimoroni_mono_oled_luma_a = CreateNoSensorsDummySensor()
-        self.sensirion_sps30_a = CreateNoSensorsDummySensor()
-        self.w1_therm_sensor_a = CreateNoSensorsDummySensor()
+def _get_driver_class(module_name, class_name):
+    """ Returns the sensor driver class, importing its module the first time it's needed. """
+    with startup_profile.time_section("import " + module_name):
+        driver_module = import_module(module_name)
+    return getattr(driver_module, class_name)
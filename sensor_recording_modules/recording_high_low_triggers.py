@@ -16,18 +16,36 @@
     You should have received a copy of the GNU General Public License
     along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
-from time import sleep
-from datetime import datetime
+import time
+import heapq
 from operations_modules import logger
-from operations_modules.app_generic_functions import CreateMonitoredThread as CMT
+from operations_modules.app_generic_functions import CreateMonitoredThread
 from operations_modules import app_cached_variables
 from configuration_modules import app_config_access
 from operations_modules import sqlite_database
+from operations_modules import database_partitions
+from operations_modules.deadline_scheduler import sleep_unless_cancelled, wait_until_cancelled
 from sensor_modules import sensor_access
+from sensor_modules import sensor_bus_access
 from sensor_recording_modules.recording_interval import available_sensors
+from sensor_recording_modules.recording_triggers import get_column_readings, set_rules_thread_status
+try:
+    import numpy
+except ImportError as import_error:
+    numpy = None
+    log_message = "**** Missing NumPy - High/Low Triggers will be checked one reading at a time: "
+    logger.primary_logger.error(log_message + str(import_error))
 
 database_variables = app_cached_variables.database_variables
 
+state_low = -1
+state_normal = 0
+state_high = 1
+state_starting = 2
+state_names = {state_low: "Low", state_normal: "Normal", state_high: "High", state_starting: "Starting"}
+
+high_low_engine_thread = None
+
 
 class _CreateHighLowTriggerThreadData:
     def __init__(self):
@@ -195,231 +213,205 @@ class _CreateHighLowTriggerThreadData:
         }
 
 
-class _SingleTriggerThread:
-    def __init__(self, custom_trigger_variables):
-        self.current_state = "Disabled"
-
-        self.custom_trigger_variables = custom_trigger_variables
-        if self.custom_trigger_variables["enabled"]:
-            self.current_state = "Starting"
-            if self.custom_trigger_variables["get_reading_func"]() != app_cached_variables.no_sensor_present:
-                self.low_trigger = self.custom_trigger_variables["low_trigger"]
-                self.high_trigger = self.custom_trigger_variables["high_trigger"]
-
-                while not app_cached_variables.restart_all_trigger_threads:
-                    try:
-                        sensor_reading = self.custom_trigger_variables["get_reading_func"]()
-                        reading_taken_at = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-                        if self.high_trigger > sensor_reading > self.low_trigger:
-                            if self.current_state != "Normal":
-                                self.current_state = "Normal"
-                            self._write_readings_to_sql(reading_taken_at, sensor_reading, self.current_state)
-                        elif sensor_reading < self.low_trigger:
-                            if self.current_state != "Low":
-                                self.current_state = "Low"
-                                self._write_readings_to_sql(reading_taken_at, sensor_reading, self.current_state)
-                        elif sensor_reading > self.high_trigger:
-                            if self.current_state != "High":
-                                self.current_state = "High"
-                                self._write_readings_to_sql(reading_taken_at, sensor_reading, self.current_state)
-                    except Exception as error:
-                        log_msg = "Trigger problem in '" + str(self.custom_trigger_variables["database_column"])
-                        logger.primary_logger.error(log_msg + "' Trigger Thread: " + str(error))
-
-                    sleep_fraction_interval = 5
-                    if self.custom_trigger_variables["sleep_duration"] < 5:
-                        sleep_fraction_interval = self.custom_trigger_variables["sleep_duration"]
-                    sleep_total = 0
-                    while sleep_total < self.custom_trigger_variables["sleep_duration"] \
-                            and not app_cached_variables.restart_all_trigger_threads:
-                        sleep(sleep_fraction_interval)
-                        sleep_total += sleep_fraction_interval
-            else:
-                self.current_state = "Sensor Missing"
-
-    def _write_readings_to_sql(self, reading_datetime, reading, trigger_state):
-        try:
-            sql_data = [str(reading_datetime), app_cached_variables.hostname, str(reading), trigger_state]
-            sql_string = "INSERT OR IGNORE INTO TriggerData (" + \
-                         database_variables.all_tables_datetime + "," + \
-                         database_variables.sensor_name + "," + \
-                         self.custom_trigger_variables["database_column"] + "," + \
-                         database_variables.trigger_state + \
-                         ") VALUES (?,?,?,?)"
-            sqlite_database.write_to_sql_database(sql_string, sql_data)
-        except Exception as error:
-            log_msg = "Trigger '" + str(self.custom_trigger_variables["database_column"])
-            logger.primary_logger.error(log_msg + "' Recording Failure: " + str(error))
-
-
-class _MultiTriggerThread:
-    def __init__(self, custom_trigger_variables):
-        self.current_state = []
-        for _ in custom_trigger_variables["database_column"]:
-            self.current_state.append("Disabled")
-        if custom_trigger_variables["enabled"]:
-            for index, _ in enumerate(custom_trigger_variables["database_column"]):
-                self.current_state[index] = "Starting"
-            if custom_trigger_variables["get_reading_func"]() != app_cached_variables.no_sensor_present:
-                while not app_cached_variables.restart_all_trigger_threads:
-                    try:
-                        sensor_readings = custom_trigger_variables["get_reading_func"]()
-                        reading_taken_at = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-                        db_col_list = custom_trigger_variables["database_column"]
-                        trig_low_list = custom_trigger_variables["low_trigger"]
-                        trig_high_list = custom_trigger_variables["high_trigger"]
-                        for reading, trig_high, trig_low, db_col in zip(sensor_readings, trig_high_list,
-                                                                        trig_low_list, enumerate(db_col_list)):
-                            index = db_col[0]
-                            db_col = db_col[1]
-                            if str(reading) != app_cached_variables.no_sensor_present:
-                                if trig_low < reading < trig_high:
-                                    if self.current_state[index] != "Normal":
-                                        self.current_state[index] = "Normal"
-                                        self._write_readings_to_sql(reading_taken_at, reading,
-                                                                    self.current_state[index], db_col)
-                                elif trig_low > reading:
-                                    if self.current_state[index] != "Low":
-                                        self.current_state[index] = "Low"
-                                        self._write_readings_to_sql(reading_taken_at, reading,
-                                                                    self.current_state[index], db_col)
-                                elif trig_high < reading:
-                                    if self.current_state[index] != "High":
-                                        self.current_state[index] = "High"
-                                        self._write_readings_to_sql(reading_taken_at, reading,
-                                                                    self.current_state[index], db_col)
-                    except Exception as error:
-                        log_msg = "Trigger problem in '" + str(custom_trigger_variables["database_column"])
-                        logger.primary_logger.error(log_msg + "' Trigger Thread: " + str(error))
-
-                    sleep_fraction_interval = 5
-                    if custom_trigger_variables["sleep_duration"] < 5:
-                        sleep_fraction_interval = custom_trigger_variables["sleep_duration"]
-                    sleep_total = 0
-                    while sleep_total < custom_trigger_variables["sleep_duration"] \
-                            and not app_cached_variables.restart_all_trigger_threads:
-                        sleep(sleep_fraction_interval)
-                        sleep_total += sleep_fraction_interval
+class CreateHighLowRule:
+    """
+    Creates a High/Low trigger rule for one sensor type, sampled every sample_seconds.
+    All the sensor type's readings are checked against their triggers together, as arrays.
+    A state change is recorded once it has been seen the configured debounce samples in a row,
+    and leaving a High or Low state requires coming back inside the trigger by the configured hysteresis band.
+    """
+
+    def __init__(self, custom_trigger_variables, returns_dictionary=False):
+        self.sensor_function = custom_trigger_variables["get_reading_func"]
+        self.returns_dictionary = returns_dictionary
+        self.sql_column_names = custom_trigger_variables["database_column"]
+        low_triggers = custom_trigger_variables["low_trigger"]
+        high_triggers = custom_trigger_variables["high_trigger"]
+        if not isinstance(self.sql_column_names, list):
+            self.sql_column_names = [self.sql_column_names]
+            low_triggers = [low_triggers]
+            high_triggers = [high_triggers]
+        self.rule_name = ", ".join(self.sql_column_names)
+        self.sample_seconds = max(custom_trigger_variables["sleep_duration"], 0.1)
+        self.next_sample_time = time.monotonic()
+        self.debounce_samples = app_config_access.trigger_high_low.debounce_samples
+        hysteresis_percent = app_config_access.trigger_high_low.hysteresis_percent
+
+        self.low_triggers = [float(low_trigger) for low_trigger in low_triggers]
+        self.high_triggers = [float(high_trigger) for high_trigger in high_triggers]
+        self.hysteresis_bands = []
+        for low_trigger, high_trigger in zip(self.low_triggers, self.high_triggers):
+            self.hysteresis_bands.append(abs(high_trigger - low_trigger) * hysteresis_percent / 100)
+        if numpy is not None:
+            self.low_triggers = numpy.array(self.low_triggers)
+            self.high_triggers = numpy.array(self.high_triggers)
+            self.hysteresis_bands = numpy.array(self.hysteresis_bands)
+
+        self.states = [state_starting] * len(self.sql_column_names)
+        self.pending_states = [state_starting] * len(self.sql_column_names)
+        self.pending_counts = [0] * len(self.sql_column_names)
+        self.last_capture_datetime = None
+        self.rows_recorded = 0
+
+    def evaluate(self):
+        """
+        Takes a sample of the rule's readings and records the ones that changed state.
+        Readings with the same capture DateTime as the previous sample are skipped, so they don't count as
+        more samples towards the debounce samples.
+        """
+        readings, capture_datetime = get_column_readings(self.sensor_function, self.sql_column_names,
+                                                         returns_dictionary=self.returns_dictionary,
+                                                         max_age_seconds=self.sample_seconds)
+        if capture_datetime == self.last_capture_datetime:
+            return
+        self.last_capture_datetime = capture_datetime
+
+        reading_list = [readings.get(sql_column_name, float("nan")) for sql_column_name in self.sql_column_names]
+        new_states = self._get_new_states(reading_list)
+        for index, new_state in enumerate(new_states):
+            if new_state == self.states[index]:
+                self.pending_counts[index] = 0
+                continue
+            if new_state == self.pending_states[index]:
+                self.pending_counts[index] += 1
             else:
-                self.current_state = "Sensor Missing"
-
-    @staticmethod
-    def _write_readings_to_sql(reading_datetime, reading, trigger_state, database_column):
-        try:
-            sql_data = [str(reading_datetime), app_cached_variables.hostname, str(reading), trigger_state]
-            sql_string = "INSERT OR IGNORE INTO TriggerData (" + \
-                         database_variables.all_tables_datetime + "," + \
-                         database_variables.sensor_name + "," + \
-                         database_column + "," + \
-                         database_variables.trigger_state + \
-                         ") VALUES (?,?,?,?)"
-            sqlite_database.write_to_sql_database(sql_string, sql_data)
-        except Exception as error:
-            log_msg = "Trigger '" + str(database_column) + "' Recording Failure: " + str(error)
-            logger.primary_logger.error(log_msg)
+                self.pending_states[index] = new_state
+                self.pending_counts[index] = 1
+            # The first reading's state is recorded right away, like the trigger's starting point
+            if self.pending_counts[index] >= self.debounce_samples or self.states[index] == state_starting:
+                self.states[index] = new_state
+                self.pending_counts[index] = 0
+                _write_readings_to_sql(capture_datetime, reading_list[index], state_names[new_state],
+                                       self.sql_column_names[index])
+                self.rows_recorded += 1
+
+    def schedule_next_sample(self):
+        """ Sets the next sample time, skipping samples missed while other rules were evaluated. """
+        self.next_sample_time += self.sample_seconds
+        current_time = time.monotonic()
+        if self.next_sample_time < current_time:
+            self.next_sample_time = current_time + self.sample_seconds
+
+    def _get_new_states(self, reading_list):
+        """ Returns the state of each reading, keeping the current state for missing readings (NaN). """
+        if numpy is None:
+            new_states = []
+            for reading, low_trigger, high_trigger, band, state in zip(reading_list, self.low_triggers,
+                                                                        self.high_triggers, self.hysteresis_bands,
+                                                                        self.states):
+                if reading != reading:
+                    new_states.append(state)
+                elif reading < low_trigger or (state == state_low and reading < low_trigger + band):
+                    new_states.append(state_low)
+                elif reading > high_trigger or (state == state_high and reading > high_trigger - band):
+                    new_states.append(state_high)
+                else:
+                    new_states.append(state_normal)
+            return new_states
+
+        readings = numpy.array(reading_list, dtype=numpy.float64)
+        states = numpy.array(self.states)
+        new_states = numpy.full(readings.shape, state_normal)
+        new_states[(readings > self.high_triggers) |
+                   ((states == state_high) & (readings > self.high_triggers - self.hysteresis_bands))] = state_high
+        new_states[(readings < self.low_triggers) |
+                   ((states == state_low) & (readings < self.low_triggers + self.hysteresis_bands))] = state_low
+        missing_readings = numpy.isnan(readings)
+        new_states[missing_readings] = states[missing_readings]
+        return new_states.tolist()
+
+
+def _write_readings_to_sql(reading_datetime, reading, trigger_state, database_column):
+    try:
+        sql_data = [str(reading_datetime), app_cached_variables.hostname, str(reading), trigger_state]
+        sql_string = "INSERT OR IGNORE INTO TriggerData (" + \
+                     database_variables.all_tables_datetime + "," + \
+                     database_variables.sensor_name + "," + \
+                     database_column + "," + \
+                     database_variables.trigger_state + \
+                     ") VALUES (?,?,?,?)"
+        recording_location = database_partitions.get_recording_database_location()
+        sqlite_database.queue_write_to_sql_database(sql_string, sql_data, sql_database_location=recording_location)
+    except Exception as error:
+        logger.primary_logger.error("Trigger '" + str(database_column) + "' Recording Failure: " + str(error))
 
 
 def start_trigger_high_low_recording_server():
+    global high_low_engine_thread
+
     if app_config_access.trigger_high_low.enable_high_low_trigger_recording:
-        tmp_tv = _CreateHighLowTriggerThreadData()
-
-        if available_sensors.has_cpu_temperature and app_config_access.trigger_high_low.cpu_temperature_enabled:
-            app_cached_variables.trigger_high_low_cpu_temp = CMT(
-                _SingleTriggerThread,
-                args=[tmp_tv.system_temperature],
-                thread_name="High/Low Trigger CPU Temperature"
-            )
-
-        if available_sensors.has_env_temperature and app_config_access.trigger_high_low.env_temperature_enabled:
-            app_cached_variables.trigger_high_low_env_temp = CMT(
-                _SingleTriggerThread,
-                args=[tmp_tv.env_temperature],
-                thread_name="High/Low Trigger Env Temperature"
-            )
-
-        if available_sensors.has_pressure and app_config_access.trigger_high_low.pressure_enabled:
-            app_cached_variables.trigger_high_low_pressure = CMT(
-                _SingleTriggerThread,
-                args=[tmp_tv.pressure],
-                thread_name="High/Low Trigger Pressure"
-            )
-
-        if available_sensors.has_humidity and app_config_access.trigger_high_low.humidity_enabled:
-            app_cached_variables.trigger_high_low_humidity = CMT(
-                _SingleTriggerThread,
-                args=[tmp_tv.humidity],
-                thread_name="High/Low Trigger Humidity"
-            )
-
-        if available_sensors.has_altitude and app_config_access.trigger_high_low.altitude_enabled:
-            app_cached_variables.trigger_high_low_altitude = CMT(
-                _SingleTriggerThread,
-                args=[tmp_tv.altitude],
-                thread_name="High/Low Trigger Altitude"
-            )
-
-        if available_sensors.has_distance and app_config_access.trigger_high_low.distance_enabled:
-            app_cached_variables.trigger_high_low_distance = CMT(
-                _SingleTriggerThread,
-                args=[tmp_tv.distance],
-                thread_name="High/Low Trigger Distance"
-            )
-
-        if available_sensors.has_lumen and app_config_access.trigger_high_low.lumen_enabled:
-            app_cached_variables.trigger_high_low_lumen = CMT(
-                _SingleTriggerThread,
-                args=[tmp_tv.lumen],
-                thread_name="High/Low Trigger Lumen"
-            )
-
-        if available_sensors.has_color and app_config_access.trigger_high_low.colour_enabled:
-            app_cached_variables.trigger_high_low_visible_colours = CMT(
-                _MultiTriggerThread,
-                args=[tmp_tv.colours],
-                thread_name="High/Low Trigger Colours"
-            )
-
-        if available_sensors.has_ultra_violet and app_config_access.trigger_high_low.ultra_violet_enabled:
-            app_cached_variables.trigger_high_low_ultra_violet = CMT(
-                _MultiTriggerThread,
-                args=[tmp_tv.ultra_violet],
-                thread_name="High/Low Trigger Ultra Violet"
-            )
-
-        if available_sensors.has_gas and app_config_access.trigger_high_low.gas_enabled:
-            app_cached_variables.trigger_high_low_gas = CMT(
-                _MultiTriggerThread,
-                args=[tmp_tv.gas_resistance],
-                thread_name="High/Low Trigger Gas"
-            )
-
-        if available_sensors.has_particulate_matter and app_config_access.trigger_high_low.particulate_matter_enabled:
-            app_cached_variables.trigger_high_low_particulate_matter = CMT(
-                _MultiTriggerThread,
-                args=[tmp_tv.particulate_matter],
-                thread_name="High/Low Trigger Particulate Matter"
-            )
-
-        if available_sensors.has_acc and app_config_access.trigger_high_low.accelerometer_enabled:
-            app_cached_variables.trigger_high_low_accelerometer = CMT(
-                _MultiTriggerThread,
-                args=[tmp_tv.accelerometer],
-                thread_name="High/Low Trigger Accelerometer"
-            )
-
-        if available_sensors.has_mag and app_config_access.trigger_high_low.magnetometer_enabled:
-            app_cached_variables.trigger_high_low_magnetometer = CMT(
-                _MultiTriggerThread,
-                args=[tmp_tv.magnetometer],
-                thread_name="High/Low Trigger Magnetometer"
-            )
-
-        if available_sensors.has_gyro and app_config_access.trigger_high_low.gyroscope_enabled:
-            app_cached_variables.trigger_high_low_gyroscope = CMT(
-                _MultiTriggerThread,
-                args=[tmp_tv.gyroscope],
-                thread_name="High/Low Trigger Gyroscope"
-            )
-        logger.primary_logger.info(" -- High/Low Trigger Recording Threads Started")
+        high_low_rules_and_variables = _get_high_low_rules()
+        if not high_low_rules_and_variables:
+            logger.primary_logger.debug("No High/Low Triggers Enabled for the Installed Sensors")
+        # Started either way, as sensors added later get their rules when the engine rebuilds them
+        high_low_engine_thread = CreateMonitoredThread(_high_low_trigger_engine, thread_name="High/Low Trigger Engine")
+        set_rules_thread_status(high_low_rules_and_variables, [], high_low_engine_thread)
+        logger.primary_logger.info(" -- High/Low Trigger Recording Started")
     else:
         logger.primary_logger.debug("High/Low Trigger Recording Disabled in Configuration")
+
+
+def _high_low_trigger_engine():
+    """
+    Evaluates every enabled High/Low trigger rule on this one thread, each at its own sample rate.
+    Rules are rebuilt when sensors are added or removed.
+    """
+    sensor_bus_access.set_thread_priority(sensor_bus_access.priority_trigger)
+    thread_variables = []
+    while not app_cached_variables.restart_all_trigger_threads:
+        installed_sensors_changes = app_cached_variables.installed_sensors_changes
+
+        def rules_changed():
+            return app_cached_variables.restart_all_trigger_threads or \
+                installed_sensors_changes != app_cached_variables.installed_sensors_changes
+
+        high_low_rules_and_variables = _get_high_low_rules()
+        thread_variables = set_rules_thread_status(high_low_rules_and_variables, thread_variables,
+                                                   high_low_engine_thread)
+        high_low_rules = [rule_and_variable[0] for rule_and_variable in high_low_rules_and_variables]
+        rules_schedule = [[rule.next_sample_time, index] for index, rule in enumerate(high_low_rules)]
+        heapq.heapify(rules_schedule)
+        while rules_schedule:
+            next_sample_time, index = heapq.heappop(rules_schedule)
+            if not sleep_unless_cancelled(next_sample_time - time.monotonic(), rules_changed):
+                break
+            high_low_rule = high_low_rules[index]
+            try:
+                high_low_rule.evaluate()
+            except Exception as error:
+                log_msg = "Trigger problem in '" + high_low_rule.rule_name + "' High/Low Trigger: "
+                logger.primary_logger.error(log_msg + str(error))
+            high_low_rule.schedule_next_sample()
+            heapq.heappush(rules_schedule, [high_low_rule.next_sample_time, index])
+        if not high_low_rules:
+            wait_until_cancelled(rules_changed)
+
+
+def _get_high_low_rules():
+    """ Returns a list of [CreateHighLowRule, status thread variable name] for each enabled & available sensor. """
+    tmp_tv = _CreateHighLowTriggerThreadData()
+    high_low_triggers = app_config_access.trigger_high_low
+    rule_settings = [
+        [available_sensors.has_cpu_temperature, tmp_tv.system_temperature, False, "trigger_high_low_cpu_temp"],
+        [available_sensors.has_env_temperature, tmp_tv.env_temperature, False, "trigger_high_low_env_temp"],
+        [available_sensors.has_pressure, tmp_tv.pressure, False, "trigger_high_low_pressure"],
+        [available_sensors.has_humidity, tmp_tv.humidity, False, "trigger_high_low_humidity"],
+        [available_sensors.has_altitude, tmp_tv.altitude, False, "trigger_high_low_altitude"],
+        [available_sensors.has_distance, tmp_tv.distance, False, "trigger_high_low_distance"],
+        [available_sensors.has_lumen, tmp_tv.lumen, False, "trigger_high_low_lumen"],
+        [available_sensors.has_color, tmp_tv.colours, True, "trigger_high_low_visible_colours"],
+        [available_sensors.has_ultra_violet, tmp_tv.ultra_violet, True, "trigger_high_low_ultra_violet"],
+        [available_sensors.has_gas, tmp_tv.gas_resistance, True, "trigger_high_low_gas"],
+        [available_sensors.has_particulate_matter, tmp_tv.particulate_matter, True,
+         "trigger_high_low_particulate_matter"],
+        [available_sensors.has_acc, tmp_tv.accelerometer, False, "trigger_high_low_accelerometer"],
+        [available_sensors.has_mag, tmp_tv.magnetometer, False, "trigger_high_low_magnetometer"],
+        [available_sensors.has_gyro, tmp_tv.gyroscope, False, "trigger_high_low_gyroscope"]
+    ]
+    high_low_rules = []
+    if high_low_triggers.enable_high_low_trigger_recording:
+        for sensor_available, custom_trigger_variables, returns_dictionary, thread_variable in rule_settings:
+            if sensor_available and custom_trigger_variables["enabled"]:
+                rule = CreateHighLowRule(custom_trigger_variables, returns_dictionary=returns_dictionary)
+                high_low_rules.append([rule, thread_variable])
+    return high_low_rules
@@ -17,16 +17,58 @@
     along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 import datetime
-from time import sleep
+from time import sleep, monotonic
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from operations_modules import logger
 from operations_modules.app_generic_functions import CreateMonitoredThread
 from operations_modules import app_cached_variables
 from configuration_modules import app_config_access
 from operations_modules import sqlite_database
+from operations_modules import database_partitions
+from operations_modules.deadline_scheduler import CreateDeadlineScheduler
 from sensor_modules import sensor_access
 
 database_variables = app_cached_variables.database_variables
 
+# All sensors for an Interval row are read at the same time by this many threads
+interval_read_workers = 8
+# Readings not returned this long after the row started are recorded as NULL, slow Particulate Matter sensors get more
+interval_read_timeout_seconds = 5.0
+interval_read_timeouts_seconds = {"particulate_matter": 15.0}
+_interval_read_pool = ThreadPoolExecutor(max_workers=interval_read_workers)
+# Each reading's latest read, so a read still stuck from a previous row is not submitted again
+_interval_read_futures = {}
+
+
+class CreateCaptureDurationStatistics:
+    """ Creates statistics on how long it takes to read all the sensors for one Interval row. """
+
+    def __init__(self):
+        self.capture_count = 0
+        self.last_capture_seconds = 0.0
+        self.total_capture_seconds = 0.0
+        self.max_capture_seconds = 0.0
+        self.timed_out_count = 0
+
+    def add_capture(self, capture_seconds, timed_out_readings):
+        self.capture_count += 1
+        self.last_capture_seconds = capture_seconds
+        self.total_capture_seconds += capture_seconds
+        if capture_seconds > self.max_capture_seconds:
+            self.max_capture_seconds = capture_seconds
+        self.timed_out_count += len(timed_out_readings)
+        logger.primary_logger.debug("Interval Row Captured in " + str(round(capture_seconds, 3)) + " Seconds")
+
+    def get_status_str(self):
+        """ Returns Interval row capture durations and timed out reading count as a human readable String. """
+        if not self.capture_count:
+            return "No Rows Captured"
+        average_seconds = self.total_capture_seconds / self.capture_count
+        return "Last Row " + str(round(self.last_capture_seconds, 3)) + " sec || Average " + \
+            str(round(average_seconds, 3)) + " sec || Max " + str(round(self.max_capture_seconds, 3)) + \
+            " sec || " + str(self.capture_count) + " Rows || " + str(self.timed_out_count) + \
+            " Timed Out or Failed Readings"
+
 
 class CreateHasSensorVariables:
     def __init__(self):
@@ -98,6 +140,8 @@ def _interval_recording():
     app_cached_variables.interval_recording_thread.current_state = "Running"
     logger.primary_logger.info(" -- Interval Recording Started")
     app_cached_variables.restart_interval_recording_thread = False
+    scheduler = CreateDeadlineScheduler(app_config_access.interval_recording_config.sleep_duration_interval,
+                                        _interval_recording_restart_requested)
     while not app_cached_variables.restart_interval_recording_thread:
         try:
             new_sensor_data = get_interval_sensor_readings()
@@ -105,122 +149,171 @@ def _interval_recording():
             sql_data = []
             for entry in new_sensor_data[1]:
                 sql_string += "?,"
-                sql_data.append(str(entry))
+                if entry is None:
+                    sql_data.append(None)
+                else:
+                    sql_data.append(str(entry))
             sql_string = sql_string[:-1] + ")"
-            sqlite_database.write_to_sql_database(sql_string, sql_data)
+            recording_location = database_partitions.get_recording_database_location()
+            sqlite_database.queue_write_to_sql_database(sql_string, sql_data, sql_database_location=recording_location)
         except Exception as error:
             logger.primary_logger.error("Interval Recording Failure: " + str(error))
+        scheduler.wait_for_next_tick()
+    if scheduler.skipped_ticks:
+        logger.primary_logger.warning("Interval Recording - " + str(scheduler.skipped_ticks) +
+                                      " Intervals Skipped, Sensor Reads took longer then the Interval")
+    sqlite_database.flush_sql_database_write_queue()
+
 
-        sleep_duration_interval = app_config_access.interval_recording_config.sleep_duration_interval
-        sleep_fraction_interval = 1
-        if sleep_fraction_interval > sleep_duration_interval:
-            sleep_fraction_interval = sleep_duration_interval
-        sleep_total = 0
-        while sleep_total < sleep_duration_interval and not app_cached_variables.restart_interval_recording_thread:
-            sleep(sleep_fraction_interval)
-            sleep_total += sleep_fraction_interval
+def _interval_recording_restart_requested():
+    return app_cached_variables.restart_interval_recording_thread
 
 
 def get_interval_sensor_readings():
     """
     Returns Interval formatted sensor readings based on installed sensors.
     Format = 'CSV String Installed Sensor Types' + special separator + 'CSV String Sensor Readings'
+    Sensors are read at the same time, readings that time out are left out, so they are NULL in the row.
     """
+    capture_start_time = monotonic()
     sensor_types = [app_cached_variables.database_variables.all_tables_datetime]
     sensor_readings = [datetime.datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]]
     interval_recording_config = app_config_access.interval_recording_config
+
+    read_functions = {}
     if app_config_access.installed_sensors.linux_system:
-        sensor_types += [app_cached_variables.database_variables.sensor_name,
-                         app_cached_variables.database_variables.ip]
-        sensor_readings += [sensor_access.get_hostname(),
-                            sensor_access.get_ip()]
+        read_functions["hostname"] = sensor_access.get_hostname
+        read_functions["ip"] = sensor_access.get_ip
         if interval_recording_config.sensor_uptime_enabled:
-            sensor_types += [app_cached_variables.database_variables.sensor_uptime]
-            sensor_readings += [sensor_access.get_uptime_minutes()]
-
+            read_functions["uptime"] = sensor_access.get_uptime_minutes
     if available_sensors.has_cpu_temperature and interval_recording_config.cpu_temperature_enabled:
-        sensor_types.append(app_cached_variables.database_variables.system_temperature)
-        sensor_readings.append(sensor_access.get_cpu_temperature())
+        read_functions["cpu_temperature"] = sensor_access.get_cpu_temperature
     if available_sensors.has_env_temperature and interval_recording_config.env_temperature_enabled:
-        sensor_types.append(app_cached_variables.database_variables.env_temperature)
-        sensor_types.append(app_cached_variables.database_variables.env_temperature_offset)
-        sensor_readings.append(sensor_access.get_sensor_temperature())
+        read_functions["env_temperature"] = sensor_access.get_sensor_temperature
         if app_config_access.primary_config.enable_custom_temp or \
                 app_config_access.primary_config.enable_temperature_comp_factor:
-            sensor_readings.append(sensor_access.get_temperature_correction())
-        else:
-            sensor_readings.append("0.0")
+            read_functions["env_temperature_offset"] = sensor_access.get_temperature_correction
     if available_sensors.has_pressure and interval_recording_config.pressure_enabled:
-        sensor_types.append(app_cached_variables.database_variables.pressure)
-        sensor_readings.append(sensor_access.get_pressure())
+        read_functions["pressure"] = sensor_access.get_pressure
     if available_sensors.has_altitude and interval_recording_config.altitude_enabled:
-        sensor_types.append(app_cached_variables.database_variables.altitude)
-        sensor_readings.append(sensor_access.get_altitude())
+        read_functions["altitude"] = sensor_access.get_altitude
     if available_sensors.has_humidity and interval_recording_config.humidity_enabled:
-        sensor_types.append(app_cached_variables.database_variables.humidity)
-        sensor_readings.append(sensor_access.get_humidity())
+        read_functions["humidity"] = sensor_access.get_humidity
     if available_sensors.has_distance and interval_recording_config.distance_enabled:
-        sensor_types.append(app_cached_variables.database_variables.distance)
-        sensor_readings.append(sensor_access.get_distance())
+        read_functions["distance"] = sensor_access.get_distance
     if available_sensors.has_gas and interval_recording_config.gas_enabled:
-        gas_readings = sensor_access.get_gas(return_as_dictionary=True)
-        for text_name, item_value in gas_readings.items():
-            if item_value != app_cached_variables.no_sensor_present:
-                sensor_types.append(text_name)
-                sensor_readings.append(item_value)
+        read_functions["gas"] = lambda: sensor_access.get_gas(return_as_dictionary=True)
     if available_sensors.has_particulate_matter and interval_recording_config.particulate_matter_enabled:
-        pm_readings = sensor_access.get_particulate_matter(return_as_dictionary=True)
-        for text_name, item_value in pm_readings.items():
-            if item_value != app_cached_variables.no_sensor_present:
-                sensor_types.append(text_name)
-                sensor_readings.append(item_value)
+        read_functions["particulate_matter"] = lambda: sensor_access.get_particulate_matter(return_as_dictionary=True)
     if available_sensors.has_lumen and interval_recording_config.lumen_enabled:
-        sensor_types.append(app_cached_variables.database_variables.lumen)
-        sensor_readings.append(sensor_access.get_lumen())
+        read_functions["lumen"] = sensor_access.get_lumen
     if available_sensors.has_color and interval_recording_config.colour_enabled:
-        ems_colours = sensor_access.get_ems_colors(return_as_dictionary=True)
-        for text_name, item_value in ems_colours.items():
-            if item_value != app_cached_variables.no_sensor_present:
-                sensor_types.append(text_name)
-                sensor_readings.append(item_value)
+        read_functions["colours"] = lambda: sensor_access.get_ems_colors(return_as_dictionary=True)
     if available_sensors.has_ultra_violet and interval_recording_config.ultra_violet_enabled:
-        uv_reading = sensor_access.get_ultra_violet(return_as_dictionary=True)
-        for text_name, item_value in uv_reading.items():
-            if item_value != app_cached_variables.no_sensor_present:
-                sensor_types.append(text_name)
-                sensor_readings.append(item_value)
+        read_functions["ultra_violet"] = lambda: sensor_access.get_ultra_violet(return_as_dictionary=True)
     if available_sensors.has_acc and interval_recording_config.accelerometer_enabled:
-        accelerometer_readings = sensor_access.get_accelerometer_xyz()
-
-        sensor_types += [app_cached_variables.database_variables.acc_x,
-                         app_cached_variables.database_variables.acc_y,
-                         app_cached_variables.database_variables.acc_z]
-        sensor_readings += [accelerometer_readings[0],
-                            accelerometer_readings[1],
-                            accelerometer_readings[2]]
+        read_functions["accelerometer"] = sensor_access.get_accelerometer_xyz
     if available_sensors.has_mag and interval_recording_config.magnetometer_enabled:
-        magnetometer_readings = sensor_access.get_magnetometer_xyz()
-
-        sensor_types += [app_cached_variables.database_variables.mag_x,
-                         app_cached_variables.database_variables.mag_y,
-                         app_cached_variables.database_variables.mag_z]
-        sensor_readings += [magnetometer_readings[0],
-                            magnetometer_readings[1],
-                            magnetometer_readings[2]]
+        read_functions["magnetometer"] = sensor_access.get_magnetometer_xyz
     if available_sensors.has_gyro and interval_recording_config.gyroscope_enabled:
-        gyroscope_readings = sensor_access.get_gyroscope_xyz()
+        read_functions["gyroscope"] = sensor_access.get_gyroscope_xyz
+    readings = _get_readings_concurrently(read_functions, capture_start_time)
 
-        sensor_types += [app_cached_variables.database_variables.gyro_x,
-                         app_cached_variables.database_variables.gyro_y,
-                         app_cached_variables.database_variables.gyro_z]
-        sensor_readings += [gyroscope_readings[0],
-                            gyroscope_readings[1],
-                            gyroscope_readings[2]]
+    if readings.get("hostname") is not None:
+        sensor_types.append(app_cached_variables.database_variables.sensor_name)
+        sensor_readings.append(readings["hostname"])
+    if readings.get("ip") is not None:
+        sensor_types.append(app_cached_variables.database_variables.ip)
+        sensor_readings.append(readings["ip"])
+    if readings.get("uptime") is not None:
+        sensor_types.append(app_cached_variables.database_variables.sensor_uptime)
+        sensor_readings.append(readings["uptime"])
+    if readings.get("cpu_temperature") is not None:
+        sensor_types.append(app_cached_variables.database_variables.system_temperature)
+        sensor_readings.append(readings["cpu_temperature"])
+    if readings.get("env_temperature") is not None:
+        sensor_types.append(app_cached_variables.database_variables.env_temperature)
+        sensor_types.append(app_cached_variables.database_variables.env_temperature_offset)
+        sensor_readings.append(readings["env_temperature"])
+        if "env_temperature_offset" in read_functions:
+            sensor_readings.append(readings.get("env_temperature_offset"))
+        else:
+            sensor_readings.append("0.0")
+    for reading_name, sql_column in [["pressure", app_cached_variables.database_variables.pressure],
+                                     ["altitude", app_cached_variables.database_variables.altitude],
+                                     ["humidity", app_cached_variables.database_variables.humidity],
+                                     ["distance", app_cached_variables.database_variables.distance]]:
+        if readings.get(reading_name) is not None:
+            sensor_types.append(sql_column)
+            sensor_readings.append(readings[reading_name])
+    for reading_name in ["gas", "particulate_matter"]:
+        if readings.get(reading_name) is not None:
+            for text_name, item_value in readings[reading_name].items():
+                if item_value != app_cached_variables.no_sensor_present:
+                    sensor_types.append(text_name)
+                    sensor_readings.append(item_value)
+    if readings.get("lumen") is not None:
+        sensor_types.append(app_cached_variables.database_variables.lumen)
+        sensor_readings.append(readings["lumen"])
+    for reading_name in ["colours", "ultra_violet"]:
+        if readings.get(reading_name) is not None:
+            for text_name, item_value in readings[reading_name].items():
+                if item_value != app_cached_variables.no_sensor_present:
+                    sensor_types.append(text_name)
+                    sensor_readings.append(item_value)
+    for reading_name, sql_columns in [["accelerometer", [app_cached_variables.database_variables.acc_x,
+                                                         app_cached_variables.database_variables.acc_y,
+                                                         app_cached_variables.database_variables.acc_z]],
+                                      ["magnetometer", [app_cached_variables.database_variables.mag_x,
+                                                        app_cached_variables.database_variables.mag_y,
+                                                        app_cached_variables.database_variables.mag_z]],
+                                      ["gyroscope", [app_cached_variables.database_variables.gyro_x,
+                                                     app_cached_variables.database_variables.gyro_y,
+                                                     app_cached_variables.database_variables.gyro_z]]]:
+        if readings.get(reading_name) is not None:
+            xyz_readings = readings[reading_name]
+            sensor_types += sql_columns
+            sensor_readings += [xyz_readings[0], xyz_readings[1], xyz_readings[2]]
 
+    timed_out_readings = [reading_name for reading_name in read_functions if reading_name not in readings]
+    interval_capture_statistics.add_capture(monotonic() - capture_start_time, timed_out_readings)
     return_interval_data = [_list_to_csv_string(sensor_types), sensor_readings]
     return return_interval_data
 
 
+def _get_readings_concurrently(read_functions, capture_start_time):
+    """
+    Returns a dictionary of reading names and values, from running the provided reading functions in the read pool.
+    Sensors on the same bus still take turns through their bus lock, so only sensors on other buses overlap.
+    Readings that fail or take longer then their timeout are not in the returned dictionary.
+    Readings still running from a previous row are skipped (not in the dictionary), so a hung sensor
+    only ever holds one read pool thread.
+    """
+    reading_futures = {}
+    for reading_name, read_function in read_functions.items():
+        previous_future = _interval_read_futures.get(reading_name)
+        if previous_future is not None and not previous_future.done():
+            logger.primary_logger.warning("Interval Recording - " + reading_name +
+                                          " Still Reading from a Previous Row, Recorded as NULL")
+            continue
+        reading_futures[reading_name] = _interval_read_pool.submit(read_function)
+        _interval_read_futures[reading_name] = reading_futures[reading_name]
+
+    readings = {}
+    for reading_name, reading_future in reading_futures.items():
+        read_timeout = interval_read_timeouts_seconds.get(reading_name, interval_read_timeout_seconds)
+        remaining_seconds = max(capture_start_time + read_timeout - monotonic(), 0)
+        try:
+            readings[reading_name] = reading_future.result(timeout=remaining_seconds)
+        except FutureTimeoutError:
+            # Only stops reads still waiting for a read pool thread, running ones are left to finish
+            reading_future.cancel()
+            logger.primary_logger.warning("Interval Recording - " + reading_name + " Timed Out, Recorded as NULL")
+        except Exception as error:
+            logger.primary_logger.error("Interval Recording - " + reading_name + " Failed: " + str(error))
+    return readings
+
+
 def _list_to_csv_string(list_to_add):
     if len(list_to_add) > 0:
         text_string = ""
@@ -239,4 +332,5 @@ def _list_to_csv_string_quoted(list_to_add):
     return ""
 
 
+interval_capture_statistics = CreateCaptureDurationStatistics()
 available_sensors = CreateHasSensorVariables()
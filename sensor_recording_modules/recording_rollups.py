@@ -0,0 +1,197 @@
+"""
+    KootNet Sensors is a collection of programs and scripts to deploy,
+    interact with, and collect readings from various Sensors.
+    Copyright (C) 2018  Chad Ermacora  chad.ermacora@gmail.com
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from datetime import datetime, timedelta
+from time import sleep
+from operations_modules import logger
+from operations_modules import file_locations
+from operations_modules import app_cached_variables
+from operations_modules.app_generic_functions import CreateMonitoredThread
+from operations_modules import sqlite_database
+from configuration_modules import app_config_access
+
+database_variables = app_cached_variables.database_variables
+
+rollup_update_interval_seconds = 60
+# Interval rows newer then this may still be read or in the database write queue, they are rolled up on a later update
+# Also see get_rollup_late_row_margin_seconds(), which raises it for long write delays & sensor read timeouts
+rollup_late_row_margin_seconds = 120
+# Existing data is backfilled this many rollup buckets at a time, pausing between each to let recording continue
+rollup_buckets_per_chunk = 360
+rollup_pause_between_chunks_sec = 0.5
+
+
+class CreateRollupLevel:
+    """
+    Creates a object instance holding a rollup table's name, bucket size and the rollup it's built from.
+    Buckets are keyed by their start DateTime, made by trimming DateTime's down to the bucket size.
+    """
+
+    def __init__(self, table_name, bucket_seconds, bucket_datetime_length, bucket_datetime_ending,
+                 source_level=None):
+        self.table_name = table_name
+        self.bucket_seconds = bucket_seconds
+        self.bucket_datetime_length = bucket_datetime_length
+        self.bucket_datetime_ending = bucket_datetime_ending
+        self.source_level = source_level
+
+    def get_source_table(self):
+        """ Returns the table this rollup is built from, Interval data for the finest rollup. """
+        if self.source_level is None:
+            return database_variables.table_interval
+        return self.source_level.table_name
+
+    def get_bucket_datetime(self, datetime_str):
+        """ Returns the start DateTime of the bucket the provided DateTime string falls in. """
+        return datetime_str[:self.bucket_datetime_length] + self.bucket_datetime_ending
+
+    def get_sql_bucket_datetime(self):
+        return "substr(DateTime, 1, " + str(self.bucket_datetime_length) + ") || '" + \
+               self.bucket_datetime_ending + "'"
+
+
+_minute_rollup = CreateRollupLevel(database_variables.table_interval_rollup_minute, 60, 16, ":00.000")
+_hour_rollup = CreateRollupLevel(database_variables.table_interval_rollup_hour, 3600, 13, ":00:00.000",
+                                 source_level=_minute_rollup)
+_day_rollup = CreateRollupLevel(database_variables.table_interval_rollup_day, 86400, 10, " 00:00:00.000",
+                                source_level=_hour_rollup)
+# Finest first, each built from the one before it
+rollup_levels = [_minute_rollup, _hour_rollup, _day_rollup]
+
+
+def start_rollup_recording_server():
+    text_name = "Database Rollups"
+    app_cached_variables.rollup_recording_thread = CreateMonitoredThread(_rollup_recording, thread_name=text_name)
+
+
+def _rollup_recording():
+    """ Keeps the Interval rollup tables up to date, backfilling any existing data not yet rolled up. """
+    sleep(10)
+    logger.primary_logger.info(" -- Database Rollups Started")
+    while True:
+        more_to_update = False
+        try:
+            more_to_update = update_rollup_tables()
+        except Exception as error:
+            logger.primary_logger.error("Database Rollup Update Failure: " + str(error))
+
+        if more_to_update:
+            app_cached_variables.rollup_recording_thread.current_state = "Backfilling"
+            sleep(rollup_pause_between_chunks_sec)
+        else:
+            app_cached_variables.rollup_recording_thread.current_state = "Running"
+            sleep(rollup_update_interval_seconds)
+
+
+def get_rollup_late_row_margin_seconds():
+    """
+    Returns how old in seconds Interval rows must be before they are rolled up.
+    Rows are dated when their readings start, then written up to two of the longest sensor read timeouts
+    and the database write delay later.
+    """
+    # Imported here, so graphing can use the rollups without loading the sensors
+    from sensor_recording_modules import recording_interval
+
+    read_timeouts = [recording_interval.interval_read_timeout_seconds]
+    read_timeouts += list(recording_interval.interval_read_timeouts_seconds.values())
+    write_delay = app_config_access.interval_recording_config.database_write_delay_seconds
+    return max(rollup_late_row_margin_seconds, write_delay + 2 * max(read_timeouts))
+
+
+def update_rollup_tables(sql_database_location=file_locations.sensor_database):
+    """
+    Adds rollup buckets for Interval data recorded since the last update, one chunk per rollup.
+    Returns True if there is more to add, such as when backfilling an existing database.
+    """
+    more_to_update = False
+    rollup_cutoff = datetime.utcnow() - timedelta(seconds=get_rollup_late_row_margin_seconds())
+    source_complete_before = _get_datetime_str(rollup_cutoff)
+    for rollup_level in rollup_levels:
+        level_end = rollup_level.get_bucket_datetime(source_complete_before)
+        sql_query = "SELECT min(DateTime) FROM " + rollup_level.get_source_table()
+        update_start = get_rollup_complete_before(rollup_level, sql_database_location=sql_database_location)
+        if update_start is not None:
+            # Skips over gaps in recording, so backfill always makes progress
+            sql_query += " WHERE DateTime >= '" + update_start + "'"
+        next_source_datetime = sqlite_database.sql_execute_get_data(sql_query, sql_database_location)[0][0]
+
+        if next_source_datetime is None or next_source_datetime >= level_end:
+            source_complete_before = level_end
+            continue
+        chunk_start = rollup_level.get_bucket_datetime(next_source_datetime)
+        chunk_end = _get_datetime_str(_get_datetime(chunk_start) +
+                                      timedelta(seconds=rollup_level.bucket_seconds * rollup_buckets_per_chunk))
+        if chunk_end >= level_end:
+            chunk_end = level_end
+        else:
+            more_to_update = True
+        _update_rollup_buckets(rollup_level, chunk_start, chunk_end, sql_database_location)
+        source_complete_before = chunk_end
+    return more_to_update
+
+
+def get_rollup_complete_before(rollup_level, sql_database_location=file_locations.sensor_database):
+    """ Returns the DateTime string the provided rollup's buckets are complete up to, or None if it's empty. """
+    sql_query = "SELECT max(DateTime) FROM " + rollup_level.table_name
+    last_bucket_datetime = sqlite_database.sql_execute_get_data(sql_query, sql_database_location)[0][0]
+    if last_bucket_datetime is None:
+        return None
+    return _get_datetime_str(_get_datetime(last_bucket_datetime) + timedelta(seconds=rollup_level.bucket_seconds))
+
+
+def _update_rollup_buckets(rollup_level, chunk_start, chunk_end, sql_database_location):
+    """ Replaces the provided rollup's buckets between chunk_start and chunk_end in a single transaction. """
+    sql_select = [rollup_level.get_sql_bucket_datetime(),
+                  "max(" + database_variables.sensor_name + ")",
+                  "max(" + database_variables.ip + ")"]
+    for column in database_variables.get_rollup_sensor_columns_list():
+        if rollup_level.source_level is None:
+            sql_numeric_value = sqlite_database.get_sql_numeric_value(column)
+            sql_select += ["min(" + sql_numeric_value + ")",
+                           "max(" + sql_numeric_value + ")",
+                           "avg(" + sql_numeric_value + ")",
+                           "count(" + sql_numeric_value + ")"]
+        else:
+            column_average = column + database_variables.rollup_average
+            column_count = column + database_variables.rollup_count
+            sql_select += ["min(" + column + database_variables.rollup_min + ")",
+                           "max(" + column + database_variables.rollup_max + ")",
+                           "sum(" + column_average + " * " + column_count + ") / sum(" + column_count + ")",
+                           "sum(" + column_count + ")"]
+
+    # Buckets are read then written separately, as only read connections see the Interval data in partitions
+    sql_query = "SELECT " + ",".join(sql_select) + " FROM " + rollup_level.get_source_table() + \
+                " WHERE DateTime >= '" + chunk_start + "' AND DateTime < '" + chunk_end + "' GROUP BY 1"
+    rollup_rows = sqlite_database.database_connection_pool.read(sql_query, sql_database_location)
+
+    sql_columns = [database_variables.all_tables_datetime] + database_variables.get_rollup_columns_list()
+    sql_delete = "DELETE FROM " + rollup_level.table_name + " WHERE DateTime >= ? AND DateTime < ?"
+    sql_insert = "INSERT INTO " + rollup_level.table_name + " (" + ",".join(sql_columns) + ") VALUES (" + \
+                 ",".join(["?"] * len(sql_columns)) + ")"
+    sqlite_database.database_connection_pool.write_many([[sql_delete, [[chunk_start, chunk_end]]],
+                                                         [sql_insert, rollup_rows]], sql_database_location)
+    logger.primary_logger.debug("Database Rollup '" + rollup_level.table_name + "' Updated from " +
+                                chunk_start + " to " + chunk_end)
+
+
+def _get_datetime(datetime_str):
+    return datetime.strptime(datetime_str[:19], "%Y-%m-%d %H:%M:%S")
+
+
+def _get_datetime_str(datetime_value):
+    return datetime_value.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
@@ -16,68 +16,142 @@
     You should have received a copy of the GNU General Public License
     along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
-from time import sleep
+import time
+import heapq
+from collections import deque
 from datetime import datetime
 from operations_modules import logger
 from operations_modules.app_generic_functions import thread_function, CreateMonitoredThread
 from configuration_modules import app_config_access
-from operations_modules.app_cached_variables import database_variables
+from operations_modules.app_cached_variables import database_variables, no_sensor_present
 from operations_modules import app_cached_variables
-from operations_modules.sqlite_database import write_to_sql_database
+from operations_modules.sqlite_database import queue_write_to_sql_database
+from operations_modules.database_partitions import get_recording_database_location
+from operations_modules.deadline_scheduler import sleep_unless_cancelled, wait_until_cancelled
 from sensor_modules import sensor_access
+from sensor_modules import sensor_bus_access
 from sensor_recording_modules.recording_interval import available_sensors
 
 installed_sensors = app_config_access.installed_sensors
 trigger_variances = app_config_access.trigger_variances
 
+# Readings are compared to the average of this many previous samples, so slow drifts trigger as well as jumps
+variance_baseline_sample_count = 5
 
-class StartTriggerVariance:
-    def __init__(self, get_sensor_readings, sql_column_name_list, sleep_time, variances_list):
-        self.readings_per_sensor_get = len(sql_column_name_list)
-        sleep_fraction_interval = 1
-        if sleep_fraction_interval > sleep_time:
-            sleep_fraction_interval = sleep_time
-
-        while not app_cached_variables.restart_all_trigger_threads:
-            readings1 = get_sensor_readings()
-            datetime_stamp1 = get_datetime_stamp()
-            sleep_total = 0
-            while sleep_total < sleep_time and not app_cached_variables.restart_all_trigger_threads:
-                sleep(sleep_fraction_interval)
-                sleep_total += sleep_fraction_interval
-            readings2 = get_sensor_readings()
-            datetime_stamp2 = get_datetime_stamp()
-            if self.readings_per_sensor_get == 1:
-                if abs(readings2 - readings1) > variances_list[0]:
-                    self.record_trigger(readings1, sql_column_name_list[0], datetime_stamp1)
-                    self.record_trigger(readings2, sql_column_name_list[0], datetime_stamp2)
+variance_engine_thread = None
+
+
+class CreateVarianceRule:
+    """
+    Creates a variance trigger rule for one sensor type, sampled every sample_seconds.
+    Each reading is compared to the average of the previous samples (the baseline) of the same reading.
+    When the difference is larger then the variance, the previous sample & the new one are recorded.
+    """
+
+    def __init__(self, rule_name, sensor_function, sql_column_name_list, variances_list, sample_seconds,
+                 returns_dictionary=False):
+        self.rule_name = rule_name
+        self.sensor_function = sensor_function
+        self.returns_dictionary = returns_dictionary
+        self.sql_column_names = sql_column_name_list
+        self.variances = dict(zip(sql_column_name_list, variances_list))
+        self.sample_seconds = max(sample_seconds, 0.1)
+        self.next_sample_time = time.monotonic()
+
+        self.baselines = {}
+        self.previous_samples = {}
+        self.last_capture_datetimes = {}
+        self.triggers_recorded = 0
+
+    def evaluate(self):
+        """ Takes a sample of the rule's readings and records the ones that changed more then their variance. """
+        for sql_column_name, reading, datetime_stamp in self._get_samples():
+            baseline = self.baselines.setdefault(sql_column_name, deque(maxlen=variance_baseline_sample_count))
+            if baseline and abs(reading - (sum(baseline) / len(baseline))) > self.variances[sql_column_name]:
+                previous_reading, previous_datetime_stamp, previous_recorded = self.previous_samples[sql_column_name]
+                if not previous_recorded:
+                    record_trigger(previous_reading, sql_column_name, previous_datetime_stamp)
+                record_trigger(reading, sql_column_name, datetime_stamp)
+                self.triggers_recorded += 1
+                self.previous_samples[sql_column_name] = [reading, datetime_stamp, True]
             else:
-                for reading1, reading2, variance, sql_column_name in zip(
-                        readings1, readings2, variances_list, sql_column_name_list
-                ):
-                    if abs(reading1 - reading2) > variance:
-                        self.record_trigger(reading1, sql_column_name, datetime_stamp1)
-                        self.record_trigger(reading2, sql_column_name, datetime_stamp2)
+                self.previous_samples[sql_column_name] = [reading, datetime_stamp, False]
+            baseline.append(reading)
+
+    def schedule_next_sample(self):
+        """ Sets the next sample time, skipping samples missed while other rules were evaluated. """
+        self.next_sample_time += self.sample_seconds
+        current_time = time.monotonic()
+        if self.next_sample_time < current_time:
+            self.next_sample_time = current_time + self.sample_seconds
 
-    @staticmethod
-    def record_trigger(reading, sql_column_name, datetime_stamp):
-        sql_query = "INSERT OR IGNORE INTO TriggerData ("
+    def _get_samples(self):
+        """
+        Returns a list of [SQL column name, reading, DateTime stamp] for the rule's numerical readings.
+        Readings with the same capture DateTime as the column's previous sample are skipped,
+        as they are the same sensor reading, not a new sample.
+        """
+        readings, capture_datetime = get_column_readings(self.sensor_function, self.sql_column_names,
+                                                         returns_dictionary=self.returns_dictionary,
+                                                         max_age_seconds=self.sample_seconds)
+        samples = []
+        for sql_column_name, reading in readings.items():
+            if self.last_capture_datetimes.get(sql_column_name) != capture_datetime:
+                self.last_capture_datetimes[sql_column_name] = capture_datetime
+                samples.append([sql_column_name, reading, capture_datetime])
+        return samples
 
-        sql_data_list = [datetime_stamp]
-        if installed_sensors.linux_system:
-            sql_query += "DateTime,SensorName,IP," + sql_column_name + ") VALUES ("
-            sql_data_list.append(sensor_access.get_hostname())
-            sql_data_list.append(sensor_access.get_ip())
-        else:
-            sql_query += "DateTime," + sql_column_name + ") VALUES ("
 
-        sql_data_list.append(str(reading))
+def get_column_readings(sensor_function, sql_column_name_list, returns_dictionary=False, max_age_seconds=None):
+    """
+    Returns the sensor function's numerical readings as a dictionary by SQL column name,
+    along with the capture DateTime stamp of the readings, as a list.
+    Use returns_dictionary for sensor functions with a return_as_dictionary option, like get_gas.
+    Use max_age_seconds to only use stored sensor readings up to that old, like a trigger's sample rate.
+    """
+    if returns_dictionary:
+        readings, capture_datetime = sensor_access.get_reading_and_datetime(sensor_function,
+                                                                            max_age_seconds=max_age_seconds,
+                                                                            return_as_dictionary=True)
+    else:
+        readings, capture_datetime = sensor_access.get_reading_and_datetime(sensor_function,
+                                                                            max_age_seconds=max_age_seconds)
+        if len(sql_column_name_list) == 1:
+            readings = [readings]
+        if readings != no_sensor_present:
+            readings = dict(zip(sql_column_name_list, readings))
+    if capture_datetime is None:
+        capture_datetime = get_datetime_stamp()
+
+    column_readings = {}
+    if readings != no_sensor_present:
+        for sql_column_name in sql_column_name_list:
+            try:
+                column_readings[sql_column_name] = float(readings[sql_column_name])
+            except (KeyError, TypeError, ValueError):
+                pass
+    return [column_readings, capture_datetime]
+
+
+def record_trigger(reading, sql_column_name, datetime_stamp):
+    sql_query = "INSERT OR IGNORE INTO TriggerData ("
+
+    sql_data_list = [datetime_stamp]
+    if installed_sensors.linux_system:
+        sql_query += "DateTime,SensorName,IP," + sql_column_name + ") VALUES ("
+        sql_data_list.append(sensor_access.get_hostname())
+        sql_data_list.append(sensor_access.get_ip())
+    else:
+        sql_query += "DateTime," + sql_column_name + ") VALUES ("
 
-        for _ in range(len(sql_data_list)):
-            sql_query += "?,"
-        sql_query = sql_query[:-1] + ");"
+    sql_data_list.append(str(reading))
 
-        write_to_sql_database(sql_query, sql_data_list)
+    for _ in range(len(sql_data_list)):
+        sql_query += "?,"
+    sql_query = sql_query[:-1] + ");"
+
+    queue_write_to_sql_database(sql_query, sql_data_list,
+                                sql_database_location=get_recording_database_location())
 
 
 def start_trigger_variance_recording_server():
@@ -88,192 +162,225 @@ def start_trigger_variance_recording_server():
 
 
 def _trigger_variance_recording():
-    """ Starts recording all enabled sensors to the SQL database based on set trigger variances (set in config). """
-    logger.primary_logger.debug("Trigger Thread(s) Starting")
+    """
+    Starts recording all enabled sensors to the SQL database based on set trigger variances (set in config).
+    All variance rules are evaluated by one thread, from the sensor readings shared by the Sensor Sampling Engine.
+    """
+    global variance_engine_thread
+
+    logger.primary_logger.debug("Trigger Variance Engine Starting")
+    variance_rules_and_variables = _get_variance_rules()
+    if not variance_rules_and_variables:
+        logger.primary_logger.debug("No Trigger Variances Enabled for the Installed Sensors")
+    # Started either way, as sensors added later get their rules when the engine rebuilds them
+    variance_engine_thread = CreateMonitoredThread(_trigger_variance_engine, thread_name="Trigger Variance Engine")
+    set_rules_thread_status(variance_rules_and_variables, [], variance_engine_thread)
+
+
+def _trigger_variance_engine():
+    """ Evaluates every enabled variance rule on this one thread, rebuilding the rules when sensors change. """
+    sensor_bus_access.set_thread_priority(sensor_bus_access.priority_trigger)
+    thread_variables = []
+    while not app_cached_variables.restart_all_trigger_threads:
+        installed_sensors_changes = app_cached_variables.installed_sensors_changes
+
+        def rules_changed():
+            return app_cached_variables.restart_all_trigger_threads or \
+                installed_sensors_changes != app_cached_variables.installed_sensors_changes
+
+        variance_rules_and_variables = _get_variance_rules()
+        thread_variables = set_rules_thread_status(variance_rules_and_variables, thread_variables,
+                                                   variance_engine_thread)
+        variance_rules = [rule_and_variable[0] for rule_and_variable in variance_rules_and_variables]
+        rules_schedule = [[rule.next_sample_time, index] for index, rule in enumerate(variance_rules)]
+        heapq.heapify(rules_schedule)
+        while rules_schedule:
+            next_sample_time, index = heapq.heappop(rules_schedule)
+            if not sleep_unless_cancelled(next_sample_time - time.monotonic(), rules_changed):
+                break
+            variance_rule = variance_rules[index]
+            try:
+                variance_rule.evaluate()
+            except Exception as error:
+                logger.primary_logger.error("Trigger Variance " + variance_rule.rule_name + " - Failed: " + str(error))
+            variance_rule.schedule_next_sample()
+            heapq.heappush(rules_schedule, [variance_rule.next_sample_time, index])
+        if not variance_rules:
+            wait_until_cancelled(rules_changed)
+
+
+def set_rules_thread_status(rules_and_variables, previous_thread_variables, engine_thread):
+    """
+    Points the status thread variables of the provided [rule, status thread variable name] to the engine thread,
+    so each enabled sensor type shows the engine's state on the Recording Status page.
+    Variables of rules no longer enabled are set back to Disabled. Returns the new list of thread variable names.
+    The engine thread is None while it's being created, then it's set by the thread starting the engine.
+    """
+    thread_variables = [rule_and_variable[1] for rule_and_variable in rules_and_variables]
+    for thread_variable in previous_thread_variables:
+        if thread_variable not in thread_variables:
+            setattr(app_cached_variables, thread_variable, app_cached_variables.CreateEmptyThreadClass())
+    if engine_thread is not None:
+        for thread_variable in thread_variables:
+            setattr(app_cached_variables, thread_variable, engine_thread)
+    return thread_variables
+
+
+def _get_variance_rules():
+    """ Returns a list of [CreateVarianceRule, status thread variable name] for each enabled & available sensor. """
+    variance_rules = []
     if trigger_variances.cpu_temperature_enabled and available_sensors.has_cpu_temperature:
-        sensor_get_function = sensor_access.get_cpu_temperature
         sql_column_name_list = [database_variables.system_temperature]
-        sleep_time = trigger_variances.cpu_temperature_wait_seconds
         variances_list = [trigger_variances.cpu_temperature_variance]
-        app_cached_variables.trigger_variance_thread_cpu_temp = CreateMonitoredThread(
-            StartTriggerVariance, thread_name="CPU Temperature Trigger Variance",
-            args=(sensor_get_function, sql_column_name_list, sleep_time, variances_list)
-        )
+        sleep_time = trigger_variances.cpu_temperature_wait_seconds
+        sensor_get_function = sensor_access.get_cpu_temperature
+        rule = CreateVarianceRule("CPU Temperature", sensor_get_function, sql_column_name_list, variances_list,
+                                  sleep_time)
+        variance_rules.append([rule, "trigger_variance_thread_cpu_temp"])
     if trigger_variances.env_temperature_enabled and available_sensors.has_env_temperature:
-        sensor_get_function = sensor_access.get_sensor_temperature
         sql_column_name_list = [database_variables.env_temperature]
-        sleep_time = trigger_variances.env_temperature_wait_seconds
         variances_list = [trigger_variances.env_temperature_variance]
-        app_cached_variables.trigger_variance_thread_env_temp = CreateMonitoredThread(
-            StartTriggerVariance, thread_name="Environmental Temperature Trigger Variance",
-            args=(sensor_get_function, sql_column_name_list, sleep_time, variances_list)
-        )
+        sleep_time = trigger_variances.env_temperature_wait_seconds
+        sensor_get_function = sensor_access.get_sensor_temperature
+        rule = CreateVarianceRule("Environmental Temperature", sensor_get_function,
+                                  sql_column_name_list, variances_list, sleep_time)
+        variance_rules.append([rule, "trigger_variance_thread_env_temp"])
     if trigger_variances.pressure_enabled and available_sensors.has_pressure:
-        sensor_get_function = sensor_access.get_pressure
         sql_column_name_list = [database_variables.pressure]
-        sleep_time = trigger_variances.pressure_wait_seconds
         variances_list = [trigger_variances.pressure_variance]
-        app_cached_variables.trigger_variance_thread_pressure = CreateMonitoredThread(
-            StartTriggerVariance, thread_name="Pressure Trigger Variance",
-            args=(sensor_get_function, sql_column_name_list, sleep_time, variances_list)
-        )
+        sleep_time = trigger_variances.pressure_wait_seconds
+        sensor_get_function = sensor_access.get_pressure
+        rule = CreateVarianceRule("Pressure", sensor_get_function, sql_column_name_list, variances_list, sleep_time)
+        variance_rules.append([rule, "trigger_variance_thread_pressure"])
     if trigger_variances.altitude_enabled and available_sensors.has_altitude:
-        sensor_get_function = sensor_access.get_altitude
         sql_column_name_list = [database_variables.altitude]
-        sleep_time = trigger_variances.altitude_wait_seconds
         variances_list = [trigger_variances.altitude_variance]
-        app_cached_variables.trigger_variance_thread_altitude = CreateMonitoredThread(
-            StartTriggerVariance, thread_name="Altitude Trigger Variance",
-            args=(sensor_get_function, sql_column_name_list, sleep_time, variances_list)
-        )
+        sleep_time = trigger_variances.altitude_wait_seconds
+        sensor_get_function = sensor_access.get_altitude
+        rule = CreateVarianceRule("Altitude", sensor_get_function, sql_column_name_list, variances_list, sleep_time)
+        variance_rules.append([rule, "trigger_variance_thread_altitude"])
     if trigger_variances.humidity_enabled and available_sensors.has_humidity:
-        sensor_get_function = sensor_access.get_humidity
         sql_column_name_list = [database_variables.humidity]
-        sleep_time = trigger_variances.humidity_wait_seconds
         variances_list = [trigger_variances.humidity_variance]
-        app_cached_variables.trigger_variance_thread_humidity = CreateMonitoredThread(
-            StartTriggerVariance, thread_name="Humidity Trigger Variance",
-            args=(sensor_get_function, sql_column_name_list, sleep_time, variances_list)
-        )
+        sleep_time = trigger_variances.humidity_wait_seconds
+        sensor_get_function = sensor_access.get_humidity
+        rule = CreateVarianceRule("Humidity", sensor_get_function, sql_column_name_list, variances_list, sleep_time)
+        variance_rules.append([rule, "trigger_variance_thread_humidity"])
     if trigger_variances.distance_enabled and available_sensors.has_distance:
-        sensor_get_function = sensor_access.get_distance
         sql_column_name_list = [database_variables.distance]
-        sleep_time = trigger_variances.distance_wait_seconds
         variances_list = [trigger_variances.distance_variance]
-        app_cached_variables.trigger_variance_thread_distance = CreateMonitoredThread(
-            StartTriggerVariance, thread_name="Distance Trigger Variance",
-            args=(sensor_get_function, sql_column_name_list, sleep_time, variances_list)
-        )
+        sleep_time = trigger_variances.distance_wait_seconds
+        sensor_get_function = sensor_access.get_distance
+        rule = CreateVarianceRule("Distance", sensor_get_function, sql_column_name_list, variances_list, sleep_time)
+        variance_rules.append([rule, "trigger_variance_thread_distance"])
     if trigger_variances.gas_enabled and available_sensors.has_gas:
-        sensor_get_function = sensor_access.get_gas
-        readings_test = sensor_get_function(return_as_dictionary=True)
-        sql_column_name_list = []
-        variances_list = []
-        for key, value in readings_test.items():
-            sql_column_name_list.append(key)
-            if key == database_variables.gas_resistance_index:
-                variances_list.append(trigger_variances.gas_resistance_index_variance)
-            elif key == database_variables.gas_oxidising:
-                variances_list.append(trigger_variances.gas_oxidising_variance)
-            elif key == database_variables.gas_reducing:
-                variances_list.append(trigger_variances.gas_reducing_variance)
-            elif key == database_variables.gas_nh3:
-                variances_list.append(trigger_variances.gas_nh3_variance)
+        sql_column_name_list = [
+            database_variables.gas_resistance_index,
+            database_variables.gas_oxidising,
+            database_variables.gas_reducing,
+            database_variables.gas_nh3
+        ]
+        variances_list = [
+            trigger_variances.gas_resistance_index_variance,
+            trigger_variances.gas_oxidising_variance,
+            trigger_variances.gas_reducing_variance,
+            trigger_variances.gas_nh3_variance
+        ]
         sleep_time = trigger_variances.gas_wait_seconds
-        app_cached_variables.trigger_variance_thread_gas = CreateMonitoredThread(
-            StartTriggerVariance, thread_name="GAS Trigger Variance",
-            args=(sensor_get_function, sql_column_name_list, sleep_time, variances_list)
-        )
+        sensor_get_function = sensor_access.get_gas
+        rule = CreateVarianceRule("GAS", sensor_get_function, sql_column_name_list, variances_list,
+                                  sleep_time, returns_dictionary=True)
+        variance_rules.append([rule, "trigger_variance_thread_gas"])
     if trigger_variances.particulate_matter_enabled and available_sensors.has_particulate_matter:
-        sensor_get_function = sensor_access.get_particulate_matter
-
-        readings_test = sensor_get_function(return_as_dictionary=True)
-        sql_column_name_list = []
-        variances_list = []
-        for key, value in readings_test.items():
-            if value != app_cached_variables.no_sensor_present:
-                sql_column_name_list.append(key)
-                if key == database_variables.particulate_matter_1:
-                    variances_list.append(trigger_variances.particulate_matter_1_variance)
-                elif key == database_variables.particulate_matter_2_5:
-                    variances_list.append(trigger_variances.particulate_matter_2_5_variance)
-                elif key == database_variables.particulate_matter_4:
-                    variances_list.append(trigger_variances.particulate_matter_4_variance)
-                elif key == database_variables.particulate_matter_10:
-                    variances_list.append(trigger_variances.particulate_matter_10_variance)
-
+        sql_column_name_list = [
+            database_variables.particulate_matter_1,
+            database_variables.particulate_matter_2_5,
+            database_variables.particulate_matter_4,
+            database_variables.particulate_matter_10
+        ]
+        variances_list = [
+            trigger_variances.particulate_matter_1_variance,
+            trigger_variances.particulate_matter_2_5_variance,
+            trigger_variances.particulate_matter_4_variance,
+            trigger_variances.particulate_matter_10_variance
+        ]
         sleep_time = trigger_variances.particulate_matter_wait_seconds
-        app_cached_variables.trigger_variance_thread_particulate_matter = CreateMonitoredThread(
-            StartTriggerVariance, thread_name="Particulate Matter Trigger Variance",
-            args=(sensor_get_function, sql_column_name_list, sleep_time, variances_list)
-        )
+        sensor_get_function = sensor_access.get_particulate_matter
+        rule = CreateVarianceRule("Particulate Matter", sensor_get_function, sql_column_name_list, variances_list,
+                                  sleep_time, returns_dictionary=True)
+        variance_rules.append([rule, "trigger_variance_thread_particulate_matter"])
     if trigger_variances.lumen_enabled and available_sensors.has_lumen:
-        sensor_get_function = sensor_access.get_lumen
         sql_column_name_list = [database_variables.lumen]
-        sleep_time = trigger_variances.lumen_wait_seconds
         variances_list = [trigger_variances.lumen_variance]
-        app_cached_variables.trigger_variance_thread_lumen = CreateMonitoredThread(
-            StartTriggerVariance, thread_name="Lumen Trigger Variance",
-            args=(sensor_get_function, sql_column_name_list, sleep_time, variances_list)
-        )
+        sleep_time = trigger_variances.lumen_wait_seconds
+        sensor_get_function = sensor_access.get_lumen
+        rule = CreateVarianceRule("Lumen", sensor_get_function, sql_column_name_list, variances_list, sleep_time)
+        variance_rules.append([rule, "trigger_variance_thread_lumen"])
     if trigger_variances.colour_enabled and available_sensors.has_color:
-        sensor_get_function = sensor_access.get_ems_colors
         sql_column_name_list = [
-            database_variables.red, database_variables.green, database_variables.blue
+            database_variables.red,
+            database_variables.orange,
+            database_variables.yellow,
+            database_variables.green,
+            database_variables.blue,
+            database_variables.violet
         ]
-        sleep_time = trigger_variances.colour_wait_seconds
         variances_list = [
-            trigger_variances.red_variance, trigger_variances.green_variance, trigger_variances.blue_variance
+            trigger_variances.red_variance,
+            trigger_variances.orange_variance,
+            trigger_variances.yellow_variance,
+            trigger_variances.green_variance,
+            trigger_variances.blue_variance,
+            trigger_variances.violet_variance
         ]
-
-        if installed_sensors.pimoroni_as7262 or installed_sensors.kootnet_dummy_sensor:
-            sql_column_name_list = [
-                database_variables.red, database_variables.orange, database_variables.yellow,
-                database_variables.green, database_variables.blue, database_variables.violet
-            ]
-            variances_list = [
-                trigger_variances.red_variance, trigger_variances.orange_variance, trigger_variances.yellow_variance,
-                trigger_variances.green_variance, trigger_variances.blue_variance, trigger_variances.violet_variance
-            ]
-
-        app_cached_variables.trigger_variance_thread_visible_ems = CreateMonitoredThread(
-            StartTriggerVariance, thread_name="EMS Colours Trigger Variance",
-            args=(sensor_get_function, sql_column_name_list, sleep_time, variances_list)
-        )
+        sleep_time = trigger_variances.colour_wait_seconds
+        sensor_get_function = sensor_access.get_ems_colors
+        rule = CreateVarianceRule("EMS Colours", sensor_get_function, sql_column_name_list, variances_list,
+                                  sleep_time, returns_dictionary=True)
+        variance_rules.append([rule, "trigger_variance_thread_visible_ems"])
     if trigger_variances.ultra_violet_enabled and available_sensors.has_ultra_violet:
-        sensor_get_function = sensor_access.get_ultra_violet
         sql_column_name_list = [database_variables.ultra_violet_a, database_variables.ultra_violet_b]
-        sleep_time = trigger_variances.ultra_violet_wait_seconds
         variances_list = [trigger_variances.ultra_violet_a_variance, trigger_variances.ultra_violet_b_variance]
-        app_cached_variables.trigger_variance_thread_ultra_violet = CreateMonitoredThread(
-            StartTriggerVariance, thread_name="Ultra Violet Trigger Variance",
-            args=(sensor_get_function, sql_column_name_list, sleep_time, variances_list)
-        )
+        sleep_time = trigger_variances.ultra_violet_wait_seconds
+        sensor_get_function = sensor_access.get_ultra_violet
+        rule = CreateVarianceRule("Ultra Violet", sensor_get_function, sql_column_name_list, variances_list,
+                                  sleep_time, returns_dictionary=True)
+        variance_rules.append([rule, "trigger_variance_thread_ultra_violet"])
     if trigger_variances.accelerometer_enabled and available_sensors.has_acc:
-        sensor_get_function = sensor_access.get_accelerometer_xyz
-        sql_column_name_list = [
-            database_variables.acc_x, database_variables.acc_y, database_variables.acc_z
-        ]
-        sleep_time = trigger_variances.accelerometer_wait_seconds
+        sql_column_name_list = [database_variables.acc_x, database_variables.acc_y, database_variables.acc_z]
         variances_list = [
             trigger_variances.accelerometer_x_variance,
             trigger_variances.accelerometer_y_variance,
             trigger_variances.accelerometer_z_variance
         ]
-        app_cached_variables.trigger_variance_thread_accelerometer = CreateMonitoredThread(
-            StartTriggerVariance, thread_name="Accelerometer Trigger Variance",
-            args=(sensor_get_function, sql_column_name_list, sleep_time, variances_list)
-        )
+        sleep_time = trigger_variances.accelerometer_wait_seconds
+        sensor_get_function = sensor_access.get_accelerometer_xyz
+        rule = CreateVarianceRule("Accelerometer", sensor_get_function, sql_column_name_list, variances_list,
+                                  sleep_time)
+        variance_rules.append([rule, "trigger_variance_thread_accelerometer"])
     if trigger_variances.magnetometer_enabled and available_sensors.has_mag:
-        sensor_get_function = sensor_access.get_magnetometer_xyz
-        sql_column_name_list = [
-            database_variables.mag_x, database_variables.mag_y, database_variables.mag_z
-        ]
-        sleep_time = trigger_variances.magnetometer_wait_seconds
+        sql_column_name_list = [database_variables.mag_x, database_variables.mag_y, database_variables.mag_z]
         variances_list = [
             trigger_variances.magnetometer_x_variance,
             trigger_variances.magnetometer_y_variance,
             trigger_variances.magnetometer_z_variance
         ]
-        app_cached_variables.trigger_variance_thread_magnetometer = CreateMonitoredThread(
-            StartTriggerVariance, thread_name="Magnetometer Trigger Variance",
-            args=(sensor_get_function, sql_column_name_list, sleep_time, variances_list)
-        )
+        sleep_time = trigger_variances.magnetometer_wait_seconds
+        sensor_get_function = sensor_access.get_magnetometer_xyz
+        rule = CreateVarianceRule("Magnetometer", sensor_get_function, sql_column_name_list, variances_list, sleep_time)
+        variance_rules.append([rule, "trigger_variance_thread_magnetometer"])
     if trigger_variances.gyroscope_enabled and available_sensors.has_gyro:
-        sensor_get_function = sensor_access.get_gyroscope_xyz
-        sql_column_name_list = [
-            database_variables.gyro_x, database_variables.gyro_y, database_variables.gyro_z
-        ]
-        sleep_time = trigger_variances.gyroscope_wait_seconds
+        sql_column_name_list = [database_variables.gyro_x, database_variables.gyro_y, database_variables.gyro_z]
         variances_list = [
             trigger_variances.gyroscope_x_variance,
             trigger_variances.gyroscope_y_variance,
             trigger_variances.gyroscope_z_variance
         ]
-        app_cached_variables.trigger_variance_thread_gyroscope = CreateMonitoredThread(
-            StartTriggerVariance, thread_name="Gyroscope Trigger Variance",
-            args=(sensor_get_function, sql_column_name_list, sleep_time, variances_list)
-        )
+        sleep_time = trigger_variances.gyroscope_wait_seconds
+        sensor_get_function = sensor_access.get_gyroscope_xyz
+        rule = CreateVarianceRule("Gyroscope", sensor_get_function, sql_column_name_list, variances_list, sleep_time)
+        variance_rules.append([rule, "trigger_variance_thread_gyroscope"])
+    return variance_rules
 
 
 def get_datetime_stamp():
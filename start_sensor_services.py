@@ -16,45 +16,76 @@
     You should have received a copy of the GNU General Public License
     along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
+import sys
+import signal
 from time import sleep
+# Imported first, so the Startup Profile page covers the rest of the program startup
+from operations_modules.startup_profile import startup_profile
 from operations_modules import logger
 from operations_modules.initialization_checks import run_program_start_checks
 
 # Ensure files, database & configurations are OK
-run_program_start_checks()
+with startup_profile.time_section("Program Start Checks"):
+    run_program_start_checks()
 
 from operations_modules.app_cached_variables import running_with_root
+from operations_modules.sqlite_database import start_database_write_queue_server, start_checkin_write_queue_server
+from operations_modules.database_partitions import start_database_partitions_server
 
 try:
-    from sensor_modules import sensor_access
+    with startup_profile.time_section("import sensor_modules.sensor_access"):
+        from sensor_modules import sensor_access
 except Exception as import_error_raw:
     import_error_msg = str(import_error_raw)
     log_message = "--- Failed to Start Kootnet Sensors - Problem Loading Sensor Access: "
     logger.primary_logger.critical(log_message + import_error_msg)
     while True:
         sleep(3600)
-from operations_modules.software_version import start_new_version_check_server
-from configuration_modules import app_config_access
-from operations_modules.app_cached_variables_update import start_ip_hostname_refresh
-from sensor_recording_modules.recording_interval import start_interval_recording_server
-from sensor_recording_modules.recording_high_low_triggers import start_trigger_high_low_recording_server
-from sensor_recording_modules.recording_triggers import start_trigger_variance_recording_server
-from operations_modules.software_checkin import start_sensor_checkin_server
-from operations_modules.server_hardware_interactive import start_hardware_interactive_server
-from operations_modules.server_display import start_display_server
-from operations_modules.email_server import start_report_email_server
-from operations_modules.email_server import start_graph_email_server
-from operations_modules.mqtt.server_mqtt_publisher import start_mqtt_publisher_server
-from operations_modules.mqtt.server_mqtt_subscriber import start_mqtt_subscriber_server
-from operations_modules.online_services_modules.luftdaten import start_luftdaten_server
-from operations_modules.online_services_modules.weather_underground import start_weather_underground_server
-from operations_modules.online_services_modules.open_sense_map import start_open_sense_map_server
-from operations_modules.mqtt.server_mqtt_broker import start_mqtt_broker_server
-from http_server.server_http import start_https_server
+with startup_profile.time_section("import http_server.server_http"):
+    from http_server.server_http import start_https_server
+with startup_profile.time_section("import Recording, Display & Online Service Servers"):
+    from operations_modules.software_version import start_new_version_check_server
+    from configuration_modules import app_config_access
+    from operations_modules.app_cached_variables_update import start_ip_hostname_refresh
+    from sensor_recording_modules.recording_interval import start_interval_recording_server
+    from sensor_recording_modules.recording_rollups import start_rollup_recording_server
+    from sensor_recording_modules.recording_high_low_triggers import start_trigger_high_low_recording_server
+    from sensor_recording_modules.recording_triggers import start_trigger_variance_recording_server
+    from operations_modules.software_checkin import start_sensor_checkin_server
+    from operations_modules.server_hardware_interactive import start_hardware_interactive_server
+    from operations_modules.server_display import start_display_server
+    from operations_modules.email_server import start_report_email_server
+    from operations_modules.email_server import start_graph_email_server
+    from operations_modules.mqtt.server_mqtt_publisher import start_mqtt_publisher_server
+    from operations_modules.mqtt.server_mqtt_subscriber import start_mqtt_subscriber_server
+    from operations_modules.online_services_modules.luftdaten import start_luftdaten_server
+    from operations_modules.online_services_modules.weather_underground import start_weather_underground_server
+    from operations_modules.online_services_modules.open_sense_map import start_open_sense_map_server
+    from operations_modules.mqtt.server_mqtt_broker import start_mqtt_broker_server
+
+
+def _shutdown_on_signal(signal_number, stack_frame):
+    """ Exits normally on SIGTERM (systemd stop & restart) so queued database writes are flushed at exit. """
+    logger.primary_logger.info(" -- Kootnet Sensors Stopping, Signal " + str(signal_number) + " Received")
+    sys.exit(0)
+
+
+signal.signal(signal.SIGTERM, _shutdown_on_signal)
 
 logger.primary_logger.debug(" -- Starting Kootnet Sensor Threads")
+start_database_write_queue_server(app_config_access.interval_recording_config.database_write_delay_seconds)
+start_checkin_write_queue_server()
+start_database_partitions_server()
+
+# Start the HTTPS Web Portal Server, before the other servers, so the Web Portal is available as soon as possible
+start_https_server()
+
+start_rollup_recording_server()
 dummy_sensors_installed = app_config_access.installed_sensors.kootnet_dummy_sensor
 if dummy_sensors_installed or running_with_root and app_config_access.installed_sensors.no_sensors is False:
+    # Sensor readings are shared by Recording, Displays & Online Services, instead of each reading the hardware
+    sensor_access.sensor_sampling_engine.start()
+
     # Start up Interval & Trigger Sensor Recording
     start_interval_recording_server()
     start_trigger_high_low_recording_server()
@@ -73,9 +104,6 @@ else:
     if running_with_root:
         logger.primary_logger.warning("No Sensors in Installed Sensors Configuration file")
 
-# Start the HTTPS Web Portal Server
-start_https_server()
-
 # Start the MQTT Servers
 start_mqtt_broker_server()
 start_mqtt_subscriber_server()
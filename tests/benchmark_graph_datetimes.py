@@ -0,0 +1,63 @@
+"""
+    KootNet Sensors is a collection of programs and scripts to deploy,
+    interact with, and collect readings from various Sensors.
+    Copyright (C) 2018  Chad Ermacora  chad.ermacora@gmail.com
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+Benchmarks adjusting graph DateTimes by the hour offset, one row at a time with adjust_datetime
+(previous behaviour) against converting the whole column at once with get_adjusted_datetimes.
+Run from the project root with: python3 -m tests.benchmark_graph_datetimes
+"""
+import time
+from datetime import datetime, timedelta
+from operations_modules.app_generic_functions import adjust_datetime
+from http_server import server_graph_downsampling
+
+benchmark_datetime_count = 100000
+benchmark_hour_offset = -7.5
+
+
+def get_benchmark_datetimes():
+    """ Returns benchmark_datetime_count DateTimes, 1 second apart, as stored in the database. """
+    start_datetime = datetime(2020, 12, 31, 20, 0, 0)
+    datetime_list = []
+    for second in range(benchmark_datetime_count):
+        var_datetime = start_datetime + timedelta(seconds=second, milliseconds=second % 1000)
+        datetime_list.append(var_datetime.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3])
+    return datetime_list
+
+
+def _adjust_datetimes_per_row(datetime_list, hour_offset):
+    return [adjust_datetime(var_datetime, hour_offset) for var_datetime in datetime_list]
+
+
+def run_adjust_benchmark(adjust_function, datetime_list):
+    start_time = time.perf_counter()
+    adjusted_datetimes = adjust_function(datetime_list, benchmark_hour_offset)
+    return [time.perf_counter() - start_time, adjusted_datetimes]
+
+
+if __name__ == "__main__":
+    benchmark_datetimes = get_benchmark_datetimes()
+    per_row_seconds, per_row_datetimes = run_adjust_benchmark(_adjust_datetimes_per_row, benchmark_datetimes)
+    column_seconds, column_datetimes = run_adjust_benchmark(server_graph_downsampling.get_adjusted_datetimes,
+                                                            benchmark_datetimes)
+    if server_graph_downsampling.numpy is None:
+        print("NumPy not installed, column adjustment uses the per row fallback")
+    print("DateTimes adjusted:  " + str(benchmark_datetime_count))
+    print("Row by row:          " + str(round(per_row_seconds * 1000, 1)) + " ms")
+    print("Whole column:        " + str(round(column_seconds * 1000, 1)) + " ms")
+    print("Speedup:             " + str(round(per_row_seconds / column_seconds, 2)) + "x")
+    print("Results match:       " + str(per_row_datetimes == column_datetimes))
@@ -0,0 +1,165 @@
+"""
+    KootNet Sensors is a collection of programs and scripts to deploy,
+    interact with, and collect readings from various Sensors.
+    Copyright (C) 2018  Chad Ermacora  chad.ermacora@gmail.com
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+Load tests Sensor Check-In ingestion with simulated sensors all checking in at once, like a fleet restarting.
+Compares a connection, table check & commit per Check-In (previous behaviour), against the queued
+/SensorCheckin endpoint and the /SensorCheckinBatch gateway endpoint.
+Run from the project root with: python3 -m tests.benchmark_sensor_checkins
+"""
+import os
+import time
+import sqlite3
+import tempfile
+from threading import Thread
+from flask import Flask
+from operations_modules import file_locations
+from operations_modules import sqlite_database
+
+simulated_sensor_count = 10000
+# The previous behaviour slows down as sensor tables are added, 10000 sensors takes over 10 minutes
+per_sensor_table_sensor_count = 2000
+concurrent_senders = 32
+checkins_per_batch = 500
+
+
+def _get_checkin_form(sensor_number):
+    return {"checkin_id": "BenchmarkSensor" + str(sensor_number).zfill(19),
+            "program_version": "Beta.30.100",
+            "sensor_uptime": str(sensor_number % 5000),
+            "installed_sensors": "Kootnet Dummy Sensors\nRaspberry Pi",
+            "primary_log": "2020-01-01 00:00:00 - INFO:  -- Kootnet Sensors Starting\n" * 20,
+            "sensor_log": ""}
+
+
+def _write_checkin_per_sensor_table(checkin_form, database_location):
+    """ Previous behaviour, one table per sensor, checked & created on every Check-In. """
+    checkin_id = "KS" + checkin_form["checkin_id"]
+    db_connection = sqlite3.connect(database_location)
+    db_cursor = db_connection.cursor()
+    try:
+        db_cursor.execute("CREATE TABLE '" + checkin_id + "' (DateTime TEXT)")
+    except sqlite3.OperationalError as error:
+        if "already exists" not in str(error):
+            raise
+    for column in ["KootnetVersion", "installed_sensors", "SensorUpTime", "primary_log", "sensors_log"]:
+        try:
+            db_cursor.execute("ALTER TABLE '" + checkin_id + "' ADD COLUMN '" + column + "' TEXT")
+        except sqlite3.OperationalError as error:
+            if "duplicate column name" not in str(error):
+                raise
+    db_connection.commit()
+    db_cursor.execute("INSERT OR IGNORE INTO '" + checkin_id + "' (DateTime,KootnetVersion,installed_sensors," +
+                      "SensorUpTime,primary_log,sensors_log) VALUES (?,?,?,?,?,?)",
+                      [time.strftime("%Y-%m-%d %H:%M:%S"), checkin_form["program_version"],
+                       checkin_form["installed_sensors"], checkin_form["sensor_uptime"],
+                       checkin_form["primary_log"], checkin_form["sensor_log"]])
+    db_connection.commit()
+    db_connection.close()
+
+
+def _run_senders(send_function, work_items):
+    """ Sends work_items from concurrent_senders threads, returns [seconds taken, failure count]. """
+    failures = []
+
+    def sender(thread_number):
+        for work_item in work_items[thread_number::concurrent_senders]:
+            try:
+                if not send_function(work_item):
+                    failures.append(work_item)
+            except Exception:
+                failures.append(work_item)
+
+    threads = [Thread(target=sender, args=[number]) for number in range(concurrent_senders)]
+    start_time = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return [time.perf_counter() - start_time, len(failures)]
+
+
+def run_per_sensor_table_benchmark(database_location):
+    def send_checkin(checkin_form):
+        _write_checkin_per_sensor_table(checkin_form, database_location)
+        return True
+
+    checkin_forms = [_get_checkin_form(number) for number in range(per_sensor_table_sensor_count)]
+    return _run_senders(send_checkin, checkin_forms)
+
+
+def run_queued_benchmark(test_client, use_batches=False):
+    """ Returns [seconds until all Check-Ins were accepted, seconds until all were written, failure count]. """
+    checkin_forms = [_get_checkin_form(number) for number in range(simulated_sensor_count)]
+    if use_batches:
+        work_items = [checkin_forms[index:index + checkins_per_batch]
+                      for index in range(0, len(checkin_forms), checkins_per_batch)]
+
+        def send_function(checkins):
+            return test_client.post("/SensorCheckinBatch", json=checkins).status_code == 202
+    else:
+        work_items = checkin_forms
+
+        def send_function(checkin_form):
+            return test_client.post("/SensorCheckin", data=checkin_form).status_code == 202
+
+    start_time = time.perf_counter()
+    accepted_seconds, failures = _run_senders(send_function, work_items)
+    sqlite_database.checkin_write_queue.flush()
+    return [accepted_seconds, time.perf_counter() - start_time, failures]
+
+
+def _get_latest_checkin_count(database_location):
+    db_connection = sqlite3.connect(database_location)
+    sensor_count = db_connection.execute("SELECT count(*) FROM SensorCheckinsLatest").fetchone()[0]
+    db_connection.close()
+    return sensor_count
+
+
+def _print_results(name, sensor_count, accepted_seconds, written_seconds, failures):
+    print(name + " " + str(sensor_count) + " Sensors")
+    print("    Accepted: " + str(round(sensor_count / accepted_seconds, 1)) + " Check-Ins/sec" +
+          " || Written: " + str(round(sensor_count / written_seconds, 1)) + " Check-Ins/sec" +
+          " || Total: " + str(round(written_seconds, 2)) + " sec || Failed: " + str(failures))
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as temp_dir:
+        per_sensor_table_database = os.path.join(temp_dir, "PerSensorTableBenchmark.sqlite")
+        per_sensor_seconds, per_sensor_failures = run_per_sensor_table_benchmark(per_sensor_table_database)
+        _print_results("Table & connection per Check-In:", per_sensor_table_sensor_count,
+                       per_sensor_seconds, per_sensor_seconds, per_sensor_failures)
+
+        # Routes use the Check-In database location when called, set before sending Check-Ins
+        from configuration_modules import app_config_access
+        from http_server.flask_blueprints.html_sensor_check_ins import html_sensor_check_ins_routes
+        app_config_access.checkin_config.enable_checkin_recording = 1
+        benchmark_app = Flask(__name__)
+        benchmark_app.register_blueprint(html_sensor_check_ins_routes)
+
+        sqlite_database.start_checkin_write_queue_server()
+        for benchmark_name, use_batches in [["Queued /SensorCheckin:", False],
+                                            ["Queued /SensorCheckinBatch (" + str(checkins_per_batch) +
+                                             " per Batch):", True]]:
+            file_locations.sensor_checkin_database = os.path.join(temp_dir, str(use_batches) + "Benchmark.sqlite")
+            sqlite_database.check_checkin_database_structure(database_location=file_locations.sensor_checkin_database)
+            results = run_queued_benchmark(benchmark_app.test_client(), use_batches=use_batches)
+            _print_results(benchmark_name, simulated_sensor_count, *results)
+            print("    Sensors in Database: " + str(_get_latest_checkin_count(file_locations.sensor_checkin_database)))
+            print("    Write Queue: " + sqlite_database.checkin_write_queue.get_status_str())
+        sqlite_database.close_database_connections()
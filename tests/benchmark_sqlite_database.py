@@ -0,0 +1,69 @@
+"""
+    KootNet Sensors is a collection of programs and scripts to deploy,
+    interact with, and collect readings from various Sensors.
+    Copyright (C) 2018  Chad Ermacora  chad.ermacora@gmail.com
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+Benchmarks SQLite inserts per second, opening a new connection per write (previous behaviour)
+against the pooled connections in sqlite_database.
+Run from the project root with: python3 -m tests.benchmark_sqlite_database
+"""
+import os
+import time
+import sqlite3
+import tempfile
+from operations_modules import sqlite_database
+from operations_modules.app_cached_variables import database_variables
+
+benchmark_insert_count = 2000
+
+
+def _write_connection_per_call(sql_query, data_entries, sql_database_location):
+    db_connection = sqlite3.connect(sql_database_location)
+    db_connection.cursor().execute(sql_query, data_entries)
+    db_connection.commit()
+    db_connection.close()
+
+
+def _get_insert_query_and_values():
+    columns = [database_variables.all_tables_datetime] + database_variables.get_sensor_columns_list()
+    sql_query = "INSERT OR IGNORE INTO " + database_variables.table_interval + " (" + ",".join(columns) + \
+                ") VALUES (" + ",".join(["?"] * len(columns)) + ")"
+    values = ["2019-01-01 00:00:00.000"] + ["12.34"] * (len(columns) - 1)
+    return sql_query, values
+
+
+def run_insert_benchmark(write_function, database_location):
+    sql_query, values = _get_insert_query_and_values()
+    start_time = time.perf_counter()
+    for _ in range(benchmark_insert_count):
+        write_function(sql_query, values, database_location)
+    return benchmark_insert_count / (time.perf_counter() - start_time)
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as temp_dir:
+        per_call_database = os.path.join(temp_dir, "PerCallBenchmark.sqlite")
+        pooled_database = os.path.join(temp_dir, "PooledBenchmark.sqlite")
+        sqlite_database.check_main_database_structure(database_location=per_call_database)
+        sqlite_database.check_main_database_structure(database_location=pooled_database)
+
+        per_call_rate = run_insert_benchmark(_write_connection_per_call, per_call_database)
+        pooled_rate = run_insert_benchmark(sqlite_database.write_to_sql_database, pooled_database)
+        sqlite_database.close_database_connections()
+
+        print("Connection per write: " + str(round(per_call_rate, 1)) + " inserts/sec")
+        print("Pooled connections:   " + str(round(pooled_rate, 1)) + " inserts/sec")
+        print("Speedup:              " + str(round(pooled_rate / per_call_rate, 2)) + "x")
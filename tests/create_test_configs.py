@@ -188,6 +188,11 @@ class CreateIntervalRecordingConfigurationTest(CreateIntervalRecordingConfigurat
         self.accelerometer_enabled = 0
         self.magnetometer_enabled = 0
         self.gyroscope_enabled = 0
+        self.database_write_delay_seconds = 0.0
+        self.enable_database_partitions = 1
+        self.database_partition_months = 3
+        self.database_partition_keep_months = 0
+        self.database_partition_archive = 0
 
     def set_settings_for_test2(self):
         self.enable_interval_recording = 0
@@ -209,6 +214,11 @@ class CreateIntervalRecordingConfigurationTest(CreateIntervalRecordingConfigurat
         self.accelerometer_enabled = 0
         self.magnetometer_enabled = 0
         self.gyroscope_enabled = 0
+        self.database_write_delay_seconds = 5.5
+        self.enable_database_partitions = 0
+        self.database_partition_months = 1
+        self.database_partition_keep_months = 12
+        self.database_partition_archive = 1
 
 
 class CreateTriggerHighLowConfigurationTest(CreateTriggerHighLowConfiguration):
@@ -312,6 +322,9 @@ class CreateTriggerHighLowConfigurationTest(CreateTriggerHighLowConfiguration):
         self.gyroscope_z_high = 999.0
         self.gyroscope_wait_seconds = 33
 
+        self.hysteresis_percent = 5.5
+        self.debounce_samples = 3
+
     def set_settings_for_test2(self):
         self.enable_high_low_trigger_recording = 0
 
@@ -409,6 +422,9 @@ class CreateTriggerHighLowConfigurationTest(CreateTriggerHighLowConfiguration):
         self.gyroscope_z_high = 8888.0
         self.gyroscope_wait_seconds = 41
 
+        self.hysteresis_percent = 12.5
+        self.debounce_samples = 7
+
 
 class CreateTriggerVariancesConfigurationTest(CreateTriggerVariancesConfiguration):
     def __init__(self):
@@ -0,0 +1,37 @@
+"""
+    KootNet Sensors is a collection of programs and scripts to deploy,
+    interact with, and collect readings from various Sensors.
+    Copyright (C) 2018  Chad Ermacora  chad.ermacora@gmail.com
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from operations_modules import logger
+from operations_modules import file_locations
+from operations_modules.app_cached_variables import database_variables
+from operations_modules import sqlite_database
+
+
+def check_and_upgrade_main_database(database_location=file_locations.sensor_database):
+    """
+    Verifies or creates the main database tables and columns, then converts any Interval or Trigger
+    tables still using the old TEXT only columns, to typed columns with a DateTime index.
+    Meant to run in its own thread, as converting a large database can take a long time.
+    """
+    if sqlite_database.check_main_database_structure(database_location=database_location):
+        db_cursor = sqlite_database.database_connection_pool.get_read_cursor(database_location)
+        for table_name in [database_variables.table_interval, database_variables.table_trigger]:
+            table_columns_and_types = sqlite_database.get_table_columns_and_types(table_name, db_cursor)
+            if sqlite_database.check_table_needs_typed_columns(table_columns_and_types):
+                logger.primary_logger.info("Upgrading Main Database Table '" + table_name + "' to Typed Columns")
+                sqlite_database.migrate_table_to_typed_columns(table_name, sql_database_location=database_location)